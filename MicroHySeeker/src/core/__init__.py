@@ -8,62 +8,137 @@ Core 核心模块
 - batch_injection: 多批次注入管理
 - step_validator: 步骤验证器
 - experiment_adapter: 模型适配器
+- execution_plan: 预编译执行计划
+- precheck: 带缓存的增量预检查
+- param_access: 预编译参数路径访问器
+- experiment_variant: 写时复制的组合实验变体
+
+导出名在首次访问时才导入对应子模块 (PEP 562)，
+例如只用 execution_plan 时不会连带加载 precheck 依赖的 numpy。
 """
 
-from .exp_program import ExpProgram, ProgStep
-from .schemas import PROG_STEP_SCHEMA, EXP_PROGRAM_SCHEMA
-
-from .step_state import (
-    StepState,
-    EngineState,
-    StepTiming,
-    BatchInfo,
-    StepExecutionContext,
-    estimate_step_duration,
-    validate_step_params,
-)
-
-from .batch_injection import (
-    InjectionChannel,
-    InjectionBatch,
-    BatchInjectionManager,
-)
-
-from .step_validator import (
-    ValidationLevel,
-    ValidationMessage,
-    ValidationResult,
-    StepValidator,
-    get_step_summary,
-    calculate_prep_sol_volumes,
-)
-
-__all__ = [
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
     # exp_program
-    "ExpProgram",
-    "ProgStep",
-    "PROG_STEP_SCHEMA",
-    "EXP_PROGRAM_SCHEMA",
-    
+    "ExpProgram": ".exp_program",
+    "ProgStep": ".exp_program",
+    "PROG_STEP_SCHEMA": ".schemas",
+    "EXP_PROGRAM_SCHEMA": ".schemas",
+
     # step_state
-    "StepState",
-    "EngineState", 
-    "StepTiming",
-    "BatchInfo",
-    "StepExecutionContext",
-    "estimate_step_duration",
-    "validate_step_params",
-    
+    "StepState": ".step_state",
+    "EngineState": ".step_state",
+    "StepTiming": ".step_state",
+    "BatchInfo": ".step_state",
+    "StepExecutionContext": ".step_state",
+    "estimate_step_duration": ".step_state",
+    "validate_step_params": ".step_state",
+
     # batch_injection
-    "InjectionChannel",
-    "InjectionBatch",
-    "BatchInjectionManager",
-    
+    "InjectionChannel": ".batch_injection",
+    "InjectionBatch": ".batch_injection",
+    "BatchInjectionManager": ".batch_injection",
+
     # step_validator
-    "ValidationLevel",
-    "ValidationMessage",
-    "ValidationResult",
-    "StepValidator",
-    "get_step_summary",
-    "calculate_prep_sol_volumes",
-]
+    "ValidationLevel": ".step_validator",
+    "ValidationMessage": ".step_validator",
+    "ValidationResult": ".step_validator",
+    "StepValidator": ".step_validator",
+    "get_step_summary": ".step_validator",
+    "calculate_prep_sol_volumes": ".step_validator",
+
+    # execution_plan
+    "CalibrationTable": ".execution_plan",
+    "PumpCommand": ".execution_plan",
+    "StepPlan": ".execution_plan",
+    "ExecutionPlan": ".execution_plan",
+    "ExecutionPlanCache": ".execution_plan",
+    "compile_execution_plan": ".execution_plan",
+    "get_plan_cache": ".execution_plan",
+    "estimate_echem_seconds": ".execution_plan",
+    "estimate_ec_settings_seconds": ".execution_plan",
+
+    # precheck
+    "ComboColumns": ".precheck",
+    "PrecheckEngine": ".precheck",
+    "get_precheck_engine": ".precheck",
+
+    # param_access
+    "ParamAccessor": ".param_access",
+    "ComboField": ".param_access",
+    "COMBO_FIELDS": ".param_access",
+    "ComboApplier": ".param_access",
+    "compile_path": ".param_access",
+    "parse_combo_key": ".param_access",
+
+    # experiment_variant
+    "ExperimentVariant": ".experiment_variant",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .exp_program import ExpProgram, ProgStep
+    from .schemas import PROG_STEP_SCHEMA, EXP_PROGRAM_SCHEMA
+    from .step_state import (
+        StepState,
+        EngineState,
+        StepTiming,
+        BatchInfo,
+        StepExecutionContext,
+        estimate_step_duration,
+        validate_step_params,
+    )
+    from .batch_injection import (
+        InjectionChannel,
+        InjectionBatch,
+        BatchInjectionManager,
+    )
+    from .step_validator import (
+        ValidationLevel,
+        ValidationMessage,
+        ValidationResult,
+        StepValidator,
+        get_step_summary,
+        calculate_prep_sol_volumes,
+    )
+    from .execution_plan import (
+        CalibrationTable,
+        PumpCommand,
+        StepPlan,
+        ExecutionPlan,
+        ExecutionPlanCache,
+        compile_execution_plan,
+        get_plan_cache,
+        estimate_echem_seconds,
+        estimate_ec_settings_seconds,
+    )
+    from .precheck import (
+        ComboColumns,
+        PrecheckEngine,
+        get_precheck_engine,
+    )
+    from .param_access import (
+        ParamAccessor,
+        ComboField,
+        COMBO_FIELDS,
+        ComboApplier,
+        compile_path,
+        parse_combo_key,
+    )
+    from .experiment_variant import ExperimentVariant
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
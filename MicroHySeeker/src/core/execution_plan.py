@@ -0,0 +1,484 @@
+"""
+执行计划 - 实验编译为不可变执行计划
+
+将 Experiment + SystemConfig 预先编译为只读的 ExecutionPlan：
+- 每个配液步骤的泵命令列表（按注液顺序号分批）
+- 位置模式下的编码器计数 / 圈数
+- 基于校准数据与转速的预测时长
+- 基于技术参数的 CHI 运行时长预测
+
+预检查、ETA 显示和执行调度共用同一份计划，不再各自重算。
+计划按输入内容哈希缓存，输入不变时直接复用。
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.echem_sdl.utils.echem_timing import estimate_echem_seconds
+from src.models import (
+    Experiment,
+    ProgStep,
+    ProgramStepType,
+    ECSettings,
+    SystemConfig,
+)
+
+
+# ========================
+# 时序常量 (与 ExperimentWorker 执行逻辑保持一致)
+# ========================
+
+ENCODER_DIVISIONS_PER_REV = 16384   # 编码器每圈分度数
+PUMP_SETTLE_S = 2.0                 # 位置/时间模式的同步等待余量
+PUMP_STOP_GAP_S = 0.2               # RPM 时间模式逐泵停止间隔
+BATCH_GAP_S = 0.5                   # 配液批次间隔
+CYCLE_GAP_S = 0.5                   # 冲洗/排空每次循环后的间隔
+STEP_GAP_S = 0.1                    # 步骤间隔
+FALLBACK_UL_PER_SEC = 1.5           # 无任何校准时的保守流速 (100RPM约1.5uL/s)
+
+CHI_RUN_OVERHEAD_S = 4.0            # 宏对话框 + 输出文件稳定检测 (3s)
+
+
+# ========================
+# 电化学时长模型 (estimate_echem_seconds 见 echem_sdl.utils.echem_timing)
+# ========================
+
+def estimate_ec_settings_seconds(ec: ECSettings) -> float:
+    """ECSettings → 预测 CHI 运行时长（秒，不含宏开销）"""
+    tech = ec.technique.value if hasattr(ec.technique, 'value') else str(ec.technique)
+    return estimate_echem_seconds(
+        tech,
+        e_init=ec.e0,
+        e_high=ec.eh,
+        e_low=ec.el,
+        e_final=ec.ef,
+        scan_rate=ec.scan_rate,
+        segments=ec.seg_num,
+        quiet_time=ec.quiet_time_s,
+        run_time=ec.run_time_s,
+        freq_low=ec.freq_low,
+        freq_high=ec.freq_high,
+        scan_dir=ec.scan_dir,
+    )
+
+
+# ========================
+# 校准表
+# ========================
+
+@dataclass(frozen=True)
+class CalibrationTable:
+    """从 SystemConfig 提取的只读校准/通道查找表
+
+    Attributes:
+        pump_calibration: 泵地址 → 100RPM 下流速 (uL/s)
+        position_calibration: 泵地址 → {slope_k, intercept_b, ul_per_encoder_count}
+        dilution_channels: 溶液名 → {pump_address, direction, stock_concentration, default_rpm}
+        flush_pump_addresses: Inlet/Transfer/Outlet 泵地址（无需流速校准）
+    """
+    pump_calibration: Dict[int, float] = field(default_factory=dict)
+    position_calibration: Dict[int, Dict[str, float]] = field(default_factory=dict)
+    dilution_channels: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    flush_pump_addresses: frozenset = frozenset()
+
+    @staticmethod
+    def from_config(config: Optional[SystemConfig]) -> 'CalibrationTable':
+        """从系统配置构建查找表"""
+        pump_cal: Dict[int, float] = {}
+        pos_cal: Dict[int, Dict[str, float]] = {}
+        channels: Dict[str, Dict[str, Any]] = {}
+        flush_addrs = set()
+
+        if config is None:
+            return CalibrationTable()
+
+        # 泵自带校准数据 (100 RPM 下的流速)
+        for pump in config.pumps:
+            if pump.calibration and "ul_per_sec" in pump.calibration:
+                pump_cal[pump.address] = pump.calibration["ul_per_sec"]
+
+        # 全局校准数据覆盖泵自带数据
+        for addr_key, cal_data in config.calibration_data.items():
+            addr = int(addr_key) if isinstance(addr_key, str) else addr_key
+            if "ul_per_sec" in cal_data:
+                pump_cal[addr] = cal_data["ul_per_sec"]
+            # 位置校准 (线性回归: Volume = k * revolutions + b)
+            if "slope_k" in cal_data:
+                pos_cal[addr] = {
+                    "slope_k": cal_data["slope_k"],
+                    "intercept_b": cal_data.get("intercept_b", 0.0),
+                    "ul_per_encoder_count": cal_data.get("ul_per_encoder_count", 0.0),
+                }
+
+        for ch in config.dilution_channels:
+            channels[ch.solution_name] = {
+                "pump_address": ch.pump_address,
+                "direction": ch.direction,
+                "stock_concentration": ch.stock_concentration,
+                "default_rpm": ch.default_rpm,
+            }
+
+        # Inlet 泵作为 H2O 溶剂通道
+        for ch in config.flush_channels:
+            flush_addrs.add(ch.pump_address)
+        for ch in config.flush_channels:
+            if ch.work_type == "Inlet":
+                channels["H2O"] = {
+                    "pump_address": ch.pump_address,
+                    "direction": ch.direction,
+                    "stock_concentration": 0.0,
+                    "default_rpm": ch.rpm,
+                }
+                break
+
+        return CalibrationTable(
+            pump_calibration=pump_cal,
+            position_calibration=pos_cal,
+            dilution_channels=channels,
+            flush_pump_addresses=frozenset(flush_addrs),
+        )
+
+
+# ========================
+# 计划数据结构
+# ========================
+
+@dataclass(frozen=True)
+class PumpCommand:
+    """单条配液泵命令
+
+    Attributes:
+        sol_name: 溶液名称
+        volume_ul: 注入体积 (uL)
+        pump_address: 泵地址
+        direction: 方向 (FWD / REV)
+        rpm: 转速
+        order_num: 注液顺序号（相同编号同批次）
+        use_position_mode: True=位置模式 (run_position_rel)，False=RPM 时间模式
+        encoder_counts: 位置模式编码器计数（REV 为负）
+        revolutions: 位置模式圈数
+        run_seconds: 泵实际运转时长预测
+        estimated_seconds: 同步等待时长（含余量）
+        is_solvent: 是否为溶剂
+    """
+    sol_name: str
+    volume_ul: float
+    pump_address: int
+    direction: str
+    rpm: int
+    order_num: int
+    use_position_mode: bool
+    encoder_counts: int = 0
+    revolutions: float = 0.0
+    run_seconds: float = 0.0
+    estimated_seconds: float = 0.0
+    is_solvent: bool = False
+
+
+@dataclass(frozen=True)
+class StepPlan:
+    """单个步骤的执行计划
+
+    Attributes:
+        index: 步骤序号 (0-based)
+        step_id: 步骤ID
+        step_type: 步骤类型值 (prep_sol, transfer, ...)
+        predicted_seconds: 预测总时长（含步骤间隔）
+        batches: 配液批次，每批为同时启动的泵命令
+        echem_seconds: CHI 运行时长预测（仅电化学步骤）
+        notes: 编译期发现的提示（如回退 RPM 时间模式）
+    """
+    index: int
+    step_id: str
+    step_type: str
+    predicted_seconds: float
+    batches: Tuple[Tuple[PumpCommand, ...], ...] = ()
+    echem_seconds: float = 0.0
+    notes: Tuple[str, ...] = ()
+
+    @property
+    def commands(self) -> Tuple[PumpCommand, ...]:
+        """按执行顺序展开的全部泵命令"""
+        return tuple(cmd for batch in self.batches for cmd in batch)
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """实验执行计划（不可变）
+
+    Attributes:
+        key: 输入内容哈希
+        steps: 各步骤计划
+        total_seconds: 预测总时长
+    """
+    key: str
+    steps: Tuple[StepPlan, ...]
+    total_seconds: float
+
+    def step(self, index: int) -> Optional[StepPlan]:
+        """按序号获取步骤计划"""
+        if 0 <= index < len(self.steps):
+            return self.steps[index]
+        return None
+
+    @cached_property
+    def _elapsed(self) -> Tuple[float, ...]:
+        """前缀和: _elapsed[i] = 步骤 0..i-1 的预测时长之和"""
+        return (0.0, *accumulate(s.predicted_seconds for s in self.steps))
+
+    @cached_property
+    def _remaining(self) -> Tuple[float, ...]:
+        """后缀和: _remaining[i] = 步骤 i.. 的预测时长之和"""
+        tail = accumulate(s.predicted_seconds for s in reversed(self.steps))
+        return (*reversed(tuple(tail)), 0.0)
+
+    def _clamp(self, index: int) -> int:
+        return min(max(index, 0), len(self.steps))
+
+    def elapsed_before(self, index: int) -> float:
+        """步骤 index 开始前的预测累计时长"""
+        return self._elapsed[self._clamp(index)]
+
+    def remaining_from(self, index: int) -> float:
+        """从步骤 index (含) 开始的预测剩余时长"""
+        return self._remaining[self._clamp(index)]
+
+
+# ========================
+# 编译
+# ========================
+
+def _step_type_value(step: ProgStep) -> str:
+    return step.step_type.value if hasattr(step.step_type, 'value') else str(step.step_type)
+
+
+def _compile_prep_sol(step: ProgStep, cal: CalibrationTable
+                      ) -> Tuple[Tuple[Tuple[PumpCommand, ...], ...], float, List[str]]:
+    """编译配液步骤：体积计算 → 泵命令 → 分批 → 时长"""
+    notes: List[str] = []
+    params = step.prep_sol_params
+    if not params:
+        return (), 0.0, notes
+
+    total_volume_ul = params.total_volume_ul
+
+    # 计算各溶液体积 (C1*V1 = C2*V2)，溶剂取当时剩余体积
+    volumes: Dict[str, float] = {}
+    remaining_volume = total_volume_ul
+    for sol_name in params.injection_order:
+        if not params.selected_solutions.get(sol_name, False):
+            continue
+        if params.solvent_flags.get(sol_name, False):
+            volumes[sol_name] = remaining_volume
+            continue
+        target_conc = params.target_concentrations.get(sol_name, 0.0)
+        if target_conc <= 0:
+            continue
+        ch_info = cal.dilution_channels.get(sol_name, {})
+        stock_conc = ch_info.get("stock_concentration", target_conc)
+        if stock_conc <= 0:
+            notes.append(f"警告: {sol_name} 母液浓度为0，跳过")
+            continue
+        vol_needed = (target_conc * total_volume_ul) / stock_conc
+        volumes[sol_name] = vol_needed
+        remaining_volume -= vol_needed
+
+    commands: List[PumpCommand] = []
+    for sol_name in params.injection_order:
+        vol = volumes.get(sol_name)
+        if vol is None or vol <= 0:
+            continue
+
+        ch_info = cal.dilution_channels.get(sol_name, {})
+        pump_addr = ch_info.get("pump_address", 0)
+        direction = ch_info.get("direction", "FWD")
+        rpm = ch_info.get("default_rpm", 100)
+        if pump_addr <= 0:
+            notes.append(f"❌ {sol_name} 无对应泵配置，跳过")
+            continue
+
+        pos_cal = cal.position_calibration.get(pump_addr)
+        use_position_mode = bool(pos_cal and pos_cal.get("slope_k", 0) > 0)
+        encoder_counts = 0
+        revolutions = 0.0
+
+        if use_position_mode:
+            # revolutions = (Volume - b) / k
+            revolutions = (vol - pos_cal.get("intercept_b", 0.0)) / pos_cal["slope_k"]
+            if revolutions < 0:
+                revolutions = 0.0
+            encoder_counts = int(revolutions * ENCODER_DIVISIONS_PER_REV)
+            if direction == "REV":
+                encoder_counts = -encoder_counts
+            run_seconds = abs(revolutions) / (rpm / 60.0) if rpm > 0 else 0.0
+        else:
+            ul_per_sec = cal.pump_calibration.get(pump_addr, 0)
+            run_seconds = vol / ul_per_sec if ul_per_sec > 0 else vol / FALLBACK_UL_PER_SEC
+            notes.append(
+                f"⚠ 泵 {pump_addr} ({sol_name}) 无位置校准，"
+                f"回退 RPM 时间模式 ({run_seconds:.1f}s @ {rpm}RPM)"
+            )
+
+        commands.append(PumpCommand(
+            sol_name=sol_name,
+            volume_ul=vol,
+            pump_address=pump_addr,
+            direction=direction,
+            rpm=rpm,
+            order_num=params.injection_order_numbers.get(sol_name, 1),
+            use_position_mode=use_position_mode,
+            encoder_counts=encoder_counts,
+            revolutions=revolutions,
+            run_seconds=run_seconds,
+            estimated_seconds=run_seconds + PUMP_SETTLE_S,
+            is_solvent=params.solvent_flags.get(sol_name, False),
+        ))
+
+    # 按注液顺序号分批（批内保持注液顺序）
+    grouped: Dict[int, List[PumpCommand]] = {}
+    for cmd in commands:
+        grouped.setdefault(cmd.order_num, []).append(cmd)
+    batches = tuple(tuple(grouped[order]) for order in sorted(grouped))
+
+    # 每批等待最长的泵，RPM 模式逐泵停止，批次间固定间隔
+    duration = 0.0
+    for batch in batches:
+        duration += max(cmd.estimated_seconds for cmd in batch)
+        duration += PUMP_STOP_GAP_S * sum(1 for cmd in batch if not cmd.use_position_mode)
+        duration += BATCH_GAP_S
+    return batches, duration, notes
+
+
+def _compile_step(index: int, step: ProgStep, cal: CalibrationTable) -> StepPlan:
+    """编译单个步骤"""
+    stype = step.step_type
+    batches: Tuple[Tuple[PumpCommand, ...], ...] = ()
+    echem_seconds = 0.0
+    notes: List[str] = []
+
+    if stype == ProgramStepType.PREP_SOL:
+        batches, seconds, notes = _compile_prep_sol(step, cal)
+    elif stype == ProgramStepType.TRANSFER:
+        seconds = step.transfer_duration or 10.0
+    elif stype == ProgramStepType.FLUSH:
+        cycles = step.flush_cycles or 1
+        seconds = cycles * ((step.flush_cycle_duration_s or 30) + CYCLE_GAP_S)
+    elif stype == ProgramStepType.EVACUATE:
+        cycles = step.flush_cycles or 1
+        seconds = cycles * ((step.transfer_duration or 30.0) + CYCLE_GAP_S)
+    elif stype == ProgramStepType.ECHEM:
+        if step.ec_settings:
+            echem_seconds = estimate_ec_settings_seconds(step.ec_settings)
+            seconds = echem_seconds + CHI_RUN_OVERHEAD_S
+        else:
+            seconds = 0.0
+    elif stype == ProgramStepType.BLANK:
+        seconds = step.duration_s or 5.0
+    else:
+        seconds = 0.0
+
+    return StepPlan(
+        index=index,
+        step_id=step.step_id,
+        step_type=_step_type_value(step),
+        predicted_seconds=seconds + STEP_GAP_S,
+        batches=batches,
+        echem_seconds=echem_seconds,
+        notes=tuple(notes),
+    )
+
+
+def content_hash(payload: Any) -> str:
+    """计算可 JSON 序列化内容的稳定哈希"""
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def plan_key(experiment: Experiment, config: Optional[SystemConfig]) -> str:
+    """计算计划输入哈希 (实验内容 + 配置内容)"""
+    return content_hash({
+        "steps": [s.to_dict() for s in experiment.steps],
+        "config": config.to_dict() if config else None,
+    })
+
+
+def compile_execution_plan(experiment: Experiment,
+                           config: Optional[SystemConfig] = None) -> ExecutionPlan:
+    """编译执行计划（带缓存）
+
+    Args:
+        experiment: 实验程序
+        config: 系统配置（提供通道与校准数据）
+
+    Returns:
+        ExecutionPlan
+    """
+    return _plan_cache.get(experiment, config)
+
+
+class ExecutionPlanCache:
+    """按输入哈希缓存的执行计划（LRU，线程安全）"""
+
+    def __init__(self, max_size: int = 64):
+        self._max_size = max_size
+        self._plans: "OrderedDict[str, ExecutionPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, experiment: Experiment,
+            config: Optional[SystemConfig] = None) -> ExecutionPlan:
+        """获取计划，未命中时编译并缓存"""
+        key = plan_key(experiment, config)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                return plan
+
+        cal = CalibrationTable.from_config(config)
+        steps = tuple(_compile_step(i, s, cal) for i, s in enumerate(experiment.steps))
+        plan = ExecutionPlan(
+            key=key,
+            steps=steps,
+            total_seconds=sum(s.predicted_seconds for s in steps),
+        )
+
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self._max_size:
+                self._plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._plans.clear()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+
+_plan_cache = ExecutionPlanCache()
+
+
+def get_plan_cache() -> ExecutionPlanCache:
+    """获取全局计划缓存"""
+    return _plan_cache
+
+
+def format_duration(seconds: float) -> str:
+    """格式化时长 (用于 ETA 显示)"""
+    seconds = max(int(round(seconds)), 0)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h{m:02d}m{s:02d}s"
+    if m:
+        return f"{m}m{s:02d}s"
+    return f"{s}s"
@@ -51,11 +51,8 @@ class ModelAdapter:
             name=ui_exp.exp_name,
             description=ui_exp.notes,
         )
-        
-        for ui_step in ui_exp.steps:
-            engine_step = self.ui_to_engine_step(ui_step)
-            program.add_step(engine_step)
-        
+        # 一次性构建步骤列表（不逐个 add_step）
+        program.steps = [self.ui_to_engine_step(ui_step) for ui_step in ui_exp.steps]
         return program
     
     def ui_to_engine_step(self, ui_step: UIProgStep) -> EngineProgStep:
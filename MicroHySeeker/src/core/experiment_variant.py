@@ -0,0 +1,118 @@
+"""
+实验变体 - 写时复制的组合实验表示
+
+组合实验的每个变体 = 基础 Experiment + 少量覆盖字段 {(步骤序号, 路径): 值}。
+读取时优先取覆盖值，否则回落到基础实验；只有真正运行时才 materialize()，
+且只浅拷贝被覆盖字段所在的路径，未改动的步骤与基础实验共享。
+
+成千上万个变体因此可以廉价地保存、比较和序列化，
+每次运行也不再从整个对象图的 deepcopy 开始。
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.models import Experiment
+from src.core.param_access import compile_path
+
+
+OverrideKey = Tuple[int, str]
+
+
+class ExperimentVariant:
+    """写时复制的实验变体
+
+    Attributes:
+        base: 基础实验（变体不会修改它）
+        overrides: 覆盖字段 {(步骤序号 0-based, 相对步骤路径): 值}
+    """
+
+    __slots__ = ("base", "overrides")
+
+    def __init__(self, base: Experiment,
+                 overrides: Optional[Dict[OverrideKey, Any]] = None):
+        self.base = base
+        self.overrides: Dict[OverrideKey, Any] = dict(overrides or {})
+
+    def __len__(self) -> int:
+        return len(self.overrides)
+
+    def __iter__(self) -> Iterator[OverrideKey]:
+        return iter(self.overrides)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ExperimentVariant):
+            return NotImplemented
+        return self.base is other.base and self.overrides == other.overrides
+
+    def __repr__(self) -> str:
+        return f"ExperimentVariant({self.base.exp_id!r}, {len(self.overrides)} overrides)"
+
+    # ========================
+    # 读取
+    # ========================
+
+    def get(self, step_index: int, path: str) -> Any:
+        """读取字段值：覆盖值优先，否则取基础实验"""
+        key = (step_index, path)
+        if key in self.overrides:
+            return self.overrides[key]
+        return compile_path(path).get(self.base.steps[step_index])
+
+    def with_overrides(self, overrides: Dict[OverrideKey, Any]) -> "ExperimentVariant":
+        """在当前变体之上叠加覆盖，返回新变体"""
+        merged = dict(self.overrides)
+        merged.update(overrides)
+        return ExperimentVariant(self.base, merged)
+
+    def diff(self, other: "ExperimentVariant") -> Dict[OverrideKey, Tuple[Any, Any]]:
+        """比较两个变体，返回取值不同的字段 {键: (本变体值, 对方值)}"""
+        result: Dict[OverrideKey, Tuple[Any, Any]] = {}
+        for key in self.overrides.keys() | other.overrides.keys():
+            mine = self.get(*key)
+            theirs = other.get(*key)
+            if mine != theirs:
+                result[key] = (mine, theirs)
+        return result
+
+    # ========================
+    # 物化
+    # ========================
+
+    def materialize(self) -> Experiment:
+        """生成可运行的 Experiment
+
+        只复制覆盖字段所在路径上的对象，其余步骤及子对象与基础实验共享，
+        因此结果应视为只读。
+        """
+        experiment = Experiment(
+            exp_id=self.base.exp_id,
+            exp_name=self.base.exp_name,
+            steps=list(self.base.steps),
+            notes=self.base.notes,
+        )
+        steps = experiment.steps
+        for (step_index, path), value in self.overrides.items():
+            steps[step_index] = compile_path(path).replace(steps[step_index], value)
+        return experiment
+
+    # ========================
+    # 序列化
+    # ========================
+
+    def to_dict(self) -> Dict[str, Any]:
+        """只序列化覆盖字段（基础实验单独保存）"""
+        return {
+            'exp_id': self.base.exp_id,
+            'overrides': [
+                {'step': step_index, 'path': path, 'value': value}
+                for (step_index, path), value in self.overrides.items()
+            ],
+        }
+
+    @staticmethod
+    def from_dict(base: Experiment, data: Dict[str, Any]) -> 'ExperimentVariant':
+        overrides = {
+            (int(item['step']), item['path']): item['value']
+            for item in data.get('overrides', [])
+        }
+        return ExperimentVariant(base, overrides)
@@ -0,0 +1,202 @@
+"""
+参数访问器 - 预编译的参数路径读写
+
+- compile_path(): 将 "steps[0].ec_config.scan_rate" 这类路径解析一次，
+  生成缓存的 getter/setter 闭包，避免每次读写都重新 split 路径并逐级 getattr
+  (实现位于 echem_sdl.utils.param_path，此处再导出)
+- COMBO_FIELDS: 组合参数 (步骤类型, 参数显示名) → 步骤字段 的类型化映射，
+  取代按中文显示名逐个 if/elif 的分派
+- ComboApplier: 针对一组组合键预编译赋值列表，应用组合时只需一个紧凑循环
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.echem_sdl.utils.param_path import ParamAccessor, compile_path
+from src.models import Experiment, ProgStep, ProgramStepType
+
+
+# ========================
+# 组合参数类型化映射
+# ========================
+
+@dataclass(frozen=True)
+class ComboField:
+    """组合参数对应的步骤字段
+
+    Attributes:
+        path: 相对步骤的属性路径（{solution} 为溶液名占位符）
+        cast: 类型转换 (int / float)
+        scale: 显示单位 → 存储单位的倍率（如 mL → uL 为 1000）
+    """
+    path: str
+    cast: Callable[[Any], Any] = float
+    scale: float = 1.0
+
+
+# (步骤类型, 参数显示名) → 字段；同义显示名来自组合编辑器和旧版参数名
+COMBO_FIELDS: Dict[ProgramStepType, Dict[str, ComboField]] = {
+    ProgramStepType.TRANSFER: {
+        "转速(RPM)": ComboField("pump_rpm", int),
+        "持续时间(s)": ComboField("transfer_duration"),
+    },
+    ProgramStepType.FLUSH: {
+        "转速(RPM)": ComboField("flush_rpm", int),
+        "单次时长(s)": ComboField("flush_cycle_duration_s"),
+        "持续时间(s)": ComboField("flush_cycle_duration_s"),
+        "循环次数": ComboField("flush_cycles", int),
+    },
+    ProgramStepType.EVACUATE: {
+        "转速(RPM)": ComboField("pump_rpm", int),
+        "单次时长(s)": ComboField("transfer_duration"),
+        "持续时间(s)": ComboField("transfer_duration"),
+        "循环次数": ComboField("flush_cycles", int),
+    },
+    ProgramStepType.ECHEM: {
+        "扫描速率": ComboField("ec_settings.scan_rate"),
+        "扫速(V/s)": ComboField("ec_settings.scan_rate"),
+        "初始电位": ComboField("ec_settings.e0"),
+        "E0(V)": ComboField("ec_settings.e0"),
+        "上限电位": ComboField("ec_settings.eh"),
+        "EH(V)": ComboField("ec_settings.eh"),
+        "下限电位": ComboField("ec_settings.el"),
+        "EL(V)": ComboField("ec_settings.el"),
+        "EF(V)": ComboField("ec_settings.ef"),
+        "运行时间": ComboField("ec_settings.run_time_s"),
+        "运行时间(s)": ComboField("ec_settings.run_time_s"),
+        "静置时间(s)": ComboField("ec_settings.quiet_time_s"),
+    },
+    ProgramStepType.BLANK: {
+        "持续时间(s)": ComboField("duration_s"),
+    },
+    ProgramStepType.PREP_SOL: {
+        "总体积(mL)": ComboField("prep_sol_params.total_volume_ul", float, 1000.0),
+        "浓度(M)": ComboField("prep_sol_params.target_concentrations[{solution}]"),
+    },
+}
+
+# 组合编辑器生成的键: step_{序号0-based}_[{溶液}_]{参数名}
+_EDITOR_KEY_RE = re.compile(r'^step_(\d+)_(.+)$')
+
+
+def parse_combo_key(key: str) -> Optional[Tuple[int, Optional[str], str]]:
+    """解析组合参数键
+
+    支持两种格式:
+        "步骤序号:参数名" / "步骤序号:溶液/参数名"   (序号 1-based)
+        "step_序号_参数名" / "step_序号_溶液_参数名"  (序号 0-based，组合编辑器)
+
+    Returns:
+        (步骤序号 0-based, 溶液名或 None, 参数名)，无法解析时返回 None
+    """
+    if ':' in key:
+        index_str, name = key.split(':', 1)
+        if not index_str.strip().isdigit():
+            return None
+        solution = None
+        if '/' in name:
+            solution, name = name.split('/', 1)
+        return int(index_str) - 1, solution, name
+
+    m = _EDITOR_KEY_RE.match(key)
+    if not m:
+        return None
+    rest = m.group(2)
+    solution = None
+    if '_' in rest:
+        solution, rest = rest.rsplit('_', 1)
+    return int(m.group(1)), solution, rest
+
+
+def resolve_combo_field(step: ProgStep, solution: Optional[str],
+                        name: str) -> Optional[Tuple[str, ComboField]]:
+    """查找组合参数对应的 (相对步骤路径, 字段定义)"""
+    fields = COMBO_FIELDS.get(step.step_type, {})
+    spec = fields.get(name)
+    if spec is None:
+        return None
+    if "{solution}" in spec.path:
+        if not solution:
+            return None
+        return spec.path.format(solution=solution), spec
+    return spec.path, spec
+
+
+# ========================
+# 组合应用
+# ========================
+
+class ComboApplier:
+    """预编译的组合参数应用器
+
+    对一组组合键只解析一次，得到 (键, 步骤序号, 访问器, 类型转换, 倍率) 列表，
+    之后每个组合的应用都是对该列表的紧凑循环。
+
+    用法:
+        applier = ComboApplier(base_experiment, combo_params[0].keys())
+        applier.apply(variant, combo_params[i])
+    """
+
+    def __init__(self, experiment: Experiment, keys: Sequence[str]):
+        self._experiment = experiment
+        self._assignments: List[Tuple[str, int, str, ParamAccessor, Callable[[Any], Any], float]] = []
+        self.unknown_keys: List[str] = []
+
+        for key in keys:
+            parsed = parse_combo_key(key)
+            if parsed is None:
+                self.unknown_keys.append(key)
+                continue
+            step_index, solution, name = parsed
+            if not 0 <= step_index < len(experiment.steps):
+                self.unknown_keys.append(key)
+                continue
+            resolved = resolve_combo_field(experiment.steps[step_index], solution, name)
+            if resolved is None:
+                self.unknown_keys.append(key)
+                continue
+            path, spec = resolved
+            self._assignments.append(
+                (key, step_index, path, compile_path(path), spec.cast, spec.scale)
+            )
+
+    @property
+    def paths(self) -> Dict[str, Tuple[int, str]]:
+        """组合键 → (步骤序号 0-based, 相对步骤路径)"""
+        return {key: (idx, path) for key, idx, path, _, _, _ in self._assignments}
+
+    def apply(self, experiment: Experiment, values: Dict[str, Any]) -> None:
+        """将一组组合值写入实验（原地修改）"""
+        steps = experiment.steps
+        for key, step_index, _, accessor, cast, scale in self._assignments:
+            if key in values:
+                accessor.set(steps[step_index], cast(values[key] * scale))
+
+    def overrides(self, values: Dict[str, Any]) -> Dict[Tuple[int, str], Any]:
+        """将一组组合值转为覆盖字典 {(步骤序号, 路径): 值}（已做类型转换和单位换算）"""
+        return {
+            (step_index, path): cast(values[key] * scale)
+            for key, step_index, path, _, cast, scale in self._assignments
+            if key in values
+        }
+
+    def variant(self, base: Experiment, values: Dict[str, Any]) -> "ExperimentVariant":
+        """生成写时复制的实验变体（不复制基础实验）"""
+        from src.core.experiment_variant import ExperimentVariant
+        return ExperimentVariant(base, self.overrides(values))
+
+    def columns(self, combo_params: Sequence[Dict[str, Any]]) -> Dict[Tuple[int, str], List[float]]:
+        """将组合列表转为列式取值 {(步骤序号, 路径): [各组合值]}，供向量化预检查使用"""
+        result: Dict[Tuple[int, str], List[float]] = {}
+        for key, step_index, path, accessor, cast, scale in self._assignments:
+            try:
+                base = accessor.get(self._experiment.steps[step_index])
+            except (AttributeError, KeyError, IndexError, TypeError):
+                base = None
+            base = float("nan") if base is None else float(base)
+            result[(step_index, path)] = [
+                float(cast(combo[key] * scale)) if key in combo else base
+                for combo in combo_params
+            ]
+        return result
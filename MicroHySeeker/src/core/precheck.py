@@ -0,0 +1,349 @@
+"""
+预检查引擎 - 带缓存的增量实验预检查
+
+- 每个步骤的检查结果按 (步骤内容哈希, 配置版本) 缓存，仅重新检查变化的步骤
+- 检查分为两部分：
+    结构检查（泵配置、校准、缺失参数）—— 与数值无关，按内容缓存
+    数值检查（体积、浓度、时长、电位窗口）—— 以 NumPy 数组表示，
+    组合实验的全部组合在一次向量化计算中完成
+- 错误消息与 ExperimentWorker.pre_check 原有格式保持一致
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models import Experiment, ProgStep, ProgramStepType, SystemConfig
+from .execution_plan import CalibrationTable, content_hash
+
+
+# 组合列: (步骤序号 0-based, 属性路径) → 各组合取值
+ComboColumns = Dict[Tuple[int, str], Sequence[float]]
+
+# 数值规则: (违规掩码, 消息生成函数 i -> str)
+_Rule = Tuple[np.ndarray, Callable[[int], str]]
+
+_PUMP_STEP_NAMES = {
+    ProgramStepType.TRANSFER: "移液",
+    ProgramStepType.FLUSH: "冲洗",
+    ProgramStepType.EVACUATE: "排空",
+}
+
+
+def _as_float(value: Any) -> float:
+    """None → NaN，便于向量化比较"""
+    return float("nan") if value is None else float(value)
+
+
+def _column(columns: Dict[str, Sequence[float]], path: str, base: Any, n: int) -> np.ndarray:
+    """取组合列，未参与组合的字段用基础值广播"""
+    if path in columns:
+        return np.asarray(columns[path], dtype=float)
+    return np.full(n, _as_float(base))
+
+
+def _fmt(value: float) -> str:
+    """数值格式化 (整数值不带小数点)"""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def _technique_value(step: ProgStep) -> str:
+    tech = step.ec_settings.technique
+    return tech.value if hasattr(tech, 'value') else str(tech)
+
+
+# ========================
+# 结构检查 (与数值无关)
+# ========================
+
+def _structural_messages(step: ProgStep, cal: CalibrationTable) -> List[str]:
+    """结构检查，返回不带步骤序号前缀的消息"""
+    messages: List[str] = []
+    stype = step.step_type
+
+    if stype == ProgramStepType.PREP_SOL:
+        if not step.prep_sol_params:
+            return ["[配液]: 缺少配液参数"]
+        params = step.prep_sol_params
+        has_any_selected = False
+        for sol_name in params.injection_order:
+            if not params.selected_solutions.get(sol_name, False):
+                continue
+            has_any_selected = True
+            pump_addr = cal.dilution_channels.get(sol_name, {}).get("pump_address", 0)
+            if pump_addr <= 0:
+                messages.append(f"[配液]: 溶液 '{sol_name}' 没有对应的泵配置")
+                continue
+            # 配液泵必须校准（不是 Inlet/Transfer/Outlet 泵）
+            if pump_addr not in cal.flush_pump_addresses and pump_addr not in cal.pump_calibration:
+                messages.append(
+                    f"[配液]: 泵 {pump_addr} ({sol_name}) 未校准流速。"
+                    f"请先在配置中完成泵流速校准，否则无法准确控制注液量"
+                )
+        if not has_any_selected:
+            messages.append("[配液]: 没有选择任何溶液")
+
+    elif stype in _PUMP_STEP_NAMES:
+        type_name = _PUMP_STEP_NAMES[stype]
+        if not step.pump_address:
+            messages.append(f"[{type_name}]: 未指定泵地址")
+        elif step.pump_address < 1 or step.pump_address > 12:
+            messages.append(f"[{type_name}]: 泵地址 {step.pump_address} 超出有效范围 (1-12)")
+
+    elif stype == ProgramStepType.ECHEM:
+        if not step.ec_settings:
+            messages.append("[电化学]: 缺少电化学参数")
+
+    return messages
+
+
+# ========================
+# 数值检查 (向量化)
+# ========================
+
+def _numeric_rules(step: ProgStep, cal: CalibrationTable,
+                   columns: Dict[str, Sequence[float]], n: int) -> List[_Rule]:
+    """生成步骤的数值规则，每条规则对 n 个组合同时求值"""
+    rules: List[_Rule] = []
+    stype = step.step_type
+
+    if stype == ProgramStepType.PREP_SOL:
+        params = step.prep_sol_params
+        if not params:
+            return rules
+        total = _column(columns, "prep_sol_params.total_volume_ul", params.total_volume_ul, n)
+        rules.append((~(total > 0), lambda i: "[配液]: 总体积必须大于 0"))
+
+        solute = np.zeros(n)
+        has_any_selected = False
+        for sol_name in params.injection_order:
+            if not params.selected_solutions.get(sol_name, False):
+                continue
+            has_any_selected = True
+            if params.solvent_flags.get(sol_name, False):
+                continue
+            ch_info = cal.dilution_channels.get(sol_name, {})
+            if ch_info.get("pump_address", 0) <= 0:
+                continue
+            stock = float(ch_info.get("stock_concentration", 0) or 0)
+            if stock <= 0:
+                continue
+            target = _column(
+                columns, f"prep_sol_params.target_concentrations[{sol_name}]",
+                params.target_concentrations.get(sol_name, 0), n,
+            )
+            target = np.nan_to_num(target)
+            exceeds = target > stock
+            rules.append((
+                exceeds,
+                lambda i, name=sol_name, t=target, s=stock:
+                    f"[配液]: {name} 目标浓度 ({_fmt(t[i])}M) 超过母液浓度 ({_fmt(s)}M)",
+            ))
+            solute = solute + np.where((target > 0) & ~exceeds, target * total / stock, 0.0)
+
+        if has_any_selected:
+            rules.append((
+                solute > total,
+                lambda i, v=solute, t=total:
+                    f"[配液]: 溶质总体积 ({v[i]:,.0f}μL) 超过总体积 ({t[i]:,.0f}μL)",
+            ))
+
+    elif stype == ProgramStepType.TRANSFER:
+        duration = _column(columns, "transfer_duration", step.transfer_duration, n)
+        rules.append((~(duration > 0), lambda i: "[移液]: 持续时间必须大于 0"))
+
+    elif stype == ProgramStepType.FLUSH:
+        cycle = _column(columns, "flush_cycle_duration_s", step.flush_cycle_duration_s, n)
+        cycles = _column(columns, "flush_cycles", step.flush_cycles, n)
+        rules.append((~(cycle > 0), lambda i: "[冲洗]: 单次冲洗时长必须大于 0"))
+        rules.append((~(cycles > 0), lambda i: "[冲洗]: 循环次数必须大于 0"))
+
+    elif stype == ProgramStepType.ECHEM and step.ec_settings:
+        tech = _technique_value(step)
+        if tech in ("CV", "LSV"):
+            ec = step.ec_settings
+            eh = _column(columns, "ec_settings.eh", ec.eh, n)
+            el = _column(columns, "ec_settings.el", ec.el, n)
+            rate = _column(columns, "ec_settings.scan_rate", ec.scan_rate, n)
+            rules.append((
+                eh <= el,
+                lambda i, h=eh, l=el:
+                    f"[电化学 {tech}]: 上限电位 ({_fmt(h[i])}V) 必须大于下限电位 ({_fmt(l[i])}V)",
+            ))
+            rules.append((~(rate > 0), lambda i: f"[电化学 {tech}]: 扫描速率必须大于 0"))
+
+    return rules
+
+
+def _apply_rules(rules: List[_Rule], n: int) -> List[List[str]]:
+    """将规则结果展开为每个组合的消息列表"""
+    per_combo: List[List[str]] = [[] for _ in range(n)]
+    for mask, make_message in rules:
+        for i in np.flatnonzero(mask):
+            per_combo[i].append(make_message(int(i)))
+    return per_combo
+
+
+# ========================
+# 预检查引擎
+# ========================
+
+class PrecheckEngine:
+    """带缓存的增量预检查引擎
+
+    用法:
+        engine = get_precheck_engine()
+        errors = engine.check_experiment(experiment, config)
+        failures = engine.check_combos(experiment, config, {(3, "ec_settings.scan_rate"): [0.05, 0.1, 0]})
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self._max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[Tuple[str, ...], Tuple[str, ...]]]" = OrderedDict()
+        self._calibration: Dict[str, CalibrationTable] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------
+    # 缓存
+    # ------------------------------------------------------------
+
+    def _config_version(self, config: Optional[SystemConfig]) -> Tuple[str, CalibrationTable]:
+        """配置版本号 (内容哈希) 与对应的校准表"""
+        version = content_hash(config.to_dict()) if config else ""
+        cal = self._calibration.get(version)
+        if cal is None:
+            cal = CalibrationTable.from_config(config)
+            with self._lock:
+                self._calibration = {version: cal}
+        return version, cal
+
+    def _step_entry(self, step: ProgStep, version: str,
+                    cal: CalibrationTable) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """获取步骤的 (结构消息, 基础数值消息)，未命中时检查并缓存"""
+        key = (content_hash(step.to_dict()), version)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        structural = tuple(_structural_messages(step, cal))
+        numeric = tuple(_apply_rules(_numeric_rules(step, cal, {}, 1), 1)[0])
+        entry = (structural, numeric)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = entry
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+        return entry
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._cache.clear()
+            self._calibration.clear()
+            self.hits = 0
+            self.misses = 0
+
+    # ------------------------------------------------------------
+    # 检查接口
+    # ------------------------------------------------------------
+
+    def check_experiment(self, experiment: Experiment,
+                         config: Optional[SystemConfig] = None,
+                         rs485_connected: bool = True) -> List[str]:
+        """检查单个实验，返回错误消息列表（空列表表示通过）
+
+        Args:
+            experiment: 实验程序
+            config: 系统配置
+            rs485_connected: RS485 是否可用 (Mock 模式视为可用)
+        """
+        if not experiment or not experiment.steps:
+            return ["实验没有任何步骤"]
+
+        errors: List[str] = []
+        if not rs485_connected:
+            errors.append("RS485 端口未连接。请先在配置中打开串口连接，或切换到 Mock 模式")
+
+        version, cal = self._config_version(config)
+        for i, step in enumerate(experiment.steps):
+            structural, numeric = self._step_entry(step, version, cal)
+            errors.extend(f"步骤 {i + 1} {msg}" for msg in structural + numeric)
+        return errors
+
+    def check_combos(self, experiment: Experiment,
+                     config: Optional[SystemConfig],
+                     columns: ComboColumns,
+                     rs485_connected: bool = True) -> Dict[int, List[str]]:
+        """一次性检查组合实验的全部组合
+
+        未参与组合的步骤直接复用缓存结果，参与组合的步骤的数值规则
+        对所有组合向量化求值。
+
+        Args:
+            experiment: 基础实验
+            config: 系统配置
+            columns: {(步骤序号 0-based, 属性路径): 各组合取值}
+            rs485_connected: RS485 是否可用
+
+        Returns:
+            {组合序号: 错误消息列表}，仅包含未通过的组合
+        """
+        lengths = {len(v) for v in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"组合列长度不一致: {sorted(lengths)}")
+        n = lengths.pop() if lengths else 1
+
+        if not columns:
+            base_errors = self.check_experiment(experiment, config, rs485_connected)
+            return {0: base_errors} if base_errors else {}
+
+        by_step: Dict[int, Dict[str, Sequence[float]]] = {}
+        for (step_index, path), values in columns.items():
+            by_step.setdefault(step_index, {})[path] = values
+
+        version, cal = self._config_version(config)
+        shared: List[str] = []
+        if not rs485_connected:
+            shared.append("RS485 端口未连接。请先在配置中打开串口连接，或切换到 Mock 模式")
+
+        # 结构消息对所有组合相同；参与组合的步骤数值消息逐组合求值
+        entries = []
+        varied: Dict[int, List[List[str]]] = {}
+        dirty = set()
+        for i, step in enumerate(experiment.steps):
+            entries.append(self._step_entry(step, version, cal))
+            if i in by_step:
+                varied[i] = _apply_rules(_numeric_rules(step, cal, by_step[i], n), n)
+                dirty.update(c for c, msgs in enumerate(varied[i]) if msgs)
+
+        def assemble(combo: Optional[int]) -> List[str]:
+            errors = list(shared)
+            for i, (structural, numeric) in enumerate(entries):
+                if i in varied:
+                    numeric = tuple(varied[i][combo]) if combo is not None else ()
+                errors.extend(f"步骤 {i + 1} {msg}" for msg in structural + numeric)
+            return errors
+
+        failures: Dict[int, List[str]] = {combo: assemble(combo) for combo in sorted(dirty)}
+        static_errors = assemble(None)
+        if static_errors:
+            for combo in range(n):
+                failures.setdefault(combo, list(static_errors))
+        return dict(sorted(failures.items()))
+
+
+_precheck_engine = PrecheckEngine()
+
+
+def get_precheck_engine() -> PrecheckEngine:
+    """获取全局预检查引擎"""
+    return _precheck_engine
@@ -11,6 +11,8 @@ from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from .execution_plan import estimate_echem_seconds
+
 
 class StepState(IntFlag):
     """步骤状态位标志
@@ -233,26 +235,21 @@ def estimate_step_duration(step_type: str, params: Dict[str, Any]) -> float:
         return cycle_duration * cycles
     
     elif step_type == "echem":
-        # 电化学：基于技术类型和参数计算
-        technique = params.get("technique", "CV")
-        quiet_time = params.get("quiet_time_s", 2.0)
-        
-        if technique in ["CV", "LSV"]:
-            e_high = params.get("eh", params.get("e_high", 0.8))
-            e_low = params.get("el", params.get("e_low", -0.2))
-            scan_rate = params.get("scan_rate", 0.1)
-            segments = params.get("seg_num", params.get("segments", 2))
-            
-            e_range = abs(e_high - e_low)
-            return quiet_time + (e_range * segments / scan_rate)
-        
-        elif technique in ["i-t", "IT", "CA"]:
-            return quiet_time + params.get("run_time_s", params.get("run_time", 60.0))
-        
-        elif technique == "OCPT":
-            return params.get("run_time_s", params.get("run_time", 60.0))
-        
-        return 60.0  # 默认
+        # 电化学：与执行计划共用同一时长模型
+        return estimate_echem_seconds(
+            params.get("technique", "CV"),
+            e_init=params.get("e0", params.get("e_init")),
+            e_high=params.get("eh", params.get("e_high")),
+            e_low=params.get("el", params.get("e_low")),
+            e_final=params.get("ef", params.get("e_final")),
+            scan_rate=params.get("scan_rate"),
+            segments=params.get("seg_num", params.get("segments")),
+            quiet_time=params.get("quiet_time_s", params.get("quiet_time", 2.0)),
+            run_time=params.get("run_time_s", params.get("run_time")),
+            freq_low=params.get("freq_low"),
+            freq_high=params.get("freq_high"),
+            scan_dir=params.get("scan_dir", "FWD"),
+        )
     
     elif step_type == "blank":
         return params.get("duration_s", params.get("wait_time", 5.0))
@@ -6,6 +6,7 @@
 2. 错误和警告消息
 3. 验证状态图标
 """
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
@@ -14,6 +15,7 @@ from src.models import (
     ProgStep, ProgramStepType, PrepSolStep, ECSettings, ECTechnique,
     SystemConfig, DilutionChannel
 )
+from .execution_plan import content_hash
 
 
 class ValidationLevel(Enum):
@@ -74,16 +76,47 @@ class ValidationResult:
 
 
 class StepValidator:
-    """步骤验证器"""
+    """步骤验证器
     
-    def __init__(self, config: Optional[SystemConfig] = None):
+    验证结果按 (步骤内容哈希, 配置版本) 缓存 (LRU)；配置版本在 set_config() 时计算一次，
+    配置修改后需重新调用 set_config()。
+    """
+    
+    def __init__(self, config: Optional[SystemConfig] = None, max_entries: int = 1024):
+        self._max_entries = max_entries
+        # (步骤内容哈希, 配置版本) -> 验证结果
+        self._cache: "OrderedDict[Tuple[str, str], ValidationResult]" = OrderedDict()
+        self.set_config(config)
+    
+    def set_config(self, config: Optional[SystemConfig]):
+        """设置 (或刷新) 系统配置: 重建通道查找表并计算配置版本"""
         self.config = config
         self._dilution_channels: Dict[str, DilutionChannel] = {}
         if config:
             for ch in config.dilution_channels:
                 self._dilution_channels[ch.solution_name] = ch
+        self._config_version = content_hash(config.to_dict()) if config else ""
+    
+    def validate_step(self, step: ProgStep, config_version: Optional[str] = None) -> ValidationResult:
+        """验证单个步骤（结果按步骤内容与配置版本缓存）"""
+        if config_version is None:
+            config_version = self._config_version
+        key = (content_hash(step.to_dict()), config_version)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+        else:
+            cached = self._validate_step_uncached(step)
+            self._cache[key] = cached
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+        # 返回副本，避免调用方修改缓存内容
+        return ValidationResult(
+            is_valid=cached.is_valid,
+            messages=[ValidationMessage(m.level, m.field, m.message) for m in cached.messages],
+        )
     
-    def validate_step(self, step: ProgStep) -> ValidationResult:
+    def _validate_step_uncached(self, step: ProgStep) -> ValidationResult:
         """验证单个步骤"""
         validators = {
             ProgramStepType.TRANSFER: self._validate_transfer,
@@ -35,6 +35,11 @@ STEP_TYPE_NAMES = {
 }
 
 
+def _value_or(value, default):
+    """字段未设置 (None) 时才使用默认值；0 是合法取值"""
+    return default if value is None else value
+
+
 class ComboExpEditorDialog(QDialog):
     """
     组合实验编辑器 - 紧凑版
@@ -317,8 +322,9 @@ class ComboExpEditorDialog(QDialog):
         elif step.step_type == ProgramStepType.PREP_SOL:
             # 配液: 显示各溶液浓度
             if self.config and self.config.dilution_channels:
+                targets = step.prep_sol_params.target_concentrations if step.prep_sol_params else {}
                 for ch in self.config.dilution_channels:
-                    params.append((ch.solution_name, "浓度(M)", 0.01))
+                    params.append((ch.solution_name, "浓度(M)", targets.get(ch.solution_name, 0.0)))
             # 总体积
             if step.prep_sol_params:
                 vol_ml = (step.prep_sol_params.total_volume_ul or 5000) / 1000.0
@@ -334,21 +340,21 @@ class ComboExpEditorDialog(QDialog):
             # 电化学根据技术类型显示不同参数
             if step.ec_settings:
                 ec = step.ec_settings
-                params.append(("静置时间(s)", ec.quiet_time_s or 2))
-                params.append(("E0(V)", ec.e0 or 0))
+                params.append(("静置时间(s)", _value_or(ec.quiet_time_s, 2)))
+                params.append(("E0(V)", _value_or(ec.e0, 0)))
                 
                 if ec.technique == ECTechnique.CV:
-                    params.append(("EH(V)", ec.eh or 0.8))
-                    params.append(("EL(V)", ec.el or -0.2))
-                    params.append(("EF(V)", ec.ef or 0))
-                    params.append(("扫速(V/s)", ec.scan_rate or 0.05))
+                    params.append(("EH(V)", _value_or(ec.eh, 0.8)))
+                    params.append(("EL(V)", _value_or(ec.el, -0.2)))
+                    params.append(("EF(V)", _value_or(ec.ef, 0)))
+                    params.append(("扫速(V/s)", _value_or(ec.scan_rate, 0.05)))
                     
                 elif ec.technique == ECTechnique.LSV:
-                    params.append(("EF(V)", ec.ef or 0))
-                    params.append(("扫速(V/s)", ec.scan_rate or 0.05))
+                    params.append(("EF(V)", _value_or(ec.ef, 0)))
+                    params.append(("扫速(V/s)", _value_or(ec.scan_rate, 0.05)))
                     
                 elif ec.technique == ECTechnique.I_T:
-                    params.append(("运行时间(s)", ec.run_time_s or 60))
+                    params.append(("运行时间(s)", _value_or(ec.run_time_s, 60)))
             else:
                 params.append(("静置时间(s)", 2.0))
                 params.append(("E0(V)", 0))
@@ -393,28 +399,27 @@ class ComboExpEditorDialog(QDialog):
             else:
                 key = f"step_{step_idx}_{param_name}"
             
-            if interval > 0.001 and abs(end_val - init_val) > 0.001:
-                # 生成该参数的所有值
-                values = []
-                val = init_val
-                step = interval if end_val > init_val else -interval
-                
-                while (step > 0 and val <= end_val + 0.001) or (step < 0 and val >= end_val - 0.001):
-                    values.append(round(val, 2))
-                    val += step
-                
-                # 扩展组合列表
-                new_combo_list = []
-                for combo in combo_list:
-                    for v in values:
-                        new_combo = combo.copy()
-                        new_combo[key] = v
-                        new_combo_list.append(new_combo)
-                combo_list = new_combo_list
-            else:
-                # 固定值
-                for combo in combo_list:
-                    combo[key] = round(init_val, 2)
+            # 只输出被扫描的参数；未扫描的参数保持程序中的原值
+            if interval <= 0.001 or abs(end_val - init_val) <= 0.001:
+                continue
+            
+            # 生成该参数的所有值 (保留足够精度，避免小扫速等被舍入)
+            values = []
+            val = init_val
+            step = interval if end_val > init_val else -interval
+            
+            while (step > 0 and val <= end_val + 0.001) or (step < 0 and val >= end_val - 0.001):
+                values.append(round(val, 6))
+                val += step
+            
+            # 扩展组合列表
+            new_combo_list = []
+            for combo in combo_list:
+                for v in values:
+                    new_combo = combo.copy()
+                    new_combo[key] = v
+                    new_combo_list.append(new_combo)
+            combo_list = new_combo_list
         
         return combo_list
     
@@ -5,6 +5,9 @@ echem_sdl.core - 实验引擎核心模块
 - ProgStep: 程序步骤
 - ExpProgram: 实验程序
 - ExperimentEngine: 实验执行引擎
+- EventBus: 引擎事件总线
+- FeatureExtractor: 电化学特征增量提取
+- AdaptiveSampler: LHS + 高斯过程的自适应组合采样
 """
 
 from .prog_step import (
@@ -26,6 +29,28 @@ from .exp_program import (
     ExpProgram,
 )
 
+from .event_bus import (
+    OverflowPolicy,
+    Subscription,
+    EventBus,
+)
+
+from .echem_features import (
+    FeatureExtractor,
+    feature_category,
+    extract_features,
+    attach_features,
+)
+
+from .adaptive import (
+    ParamRange,
+    GaussianProcess,
+    FeatureObjective,
+    AdaptiveSampler,
+    latin_hypercube,
+    expected_improvement,
+)
+
 from .experiment_engine import (
     EngineState,
     EngineStatus,
@@ -41,6 +66,7 @@ from .experiment_engine import (
     EVENT_COMBO_ADVANCED,
     EVENT_ECHEM_DATA,
     EVENT_STATE_CHANGED,
+    LOSSY_EVENTS,
 )
 
 __all__ = [
@@ -59,6 +85,22 @@ __all__ = [
     "ComboParameter",
     "ParamMatrix",
     "ExpProgram",
+    # event_bus
+    "OverflowPolicy",
+    "Subscription",
+    "EventBus",
+    # echem_features
+    "FeatureExtractor",
+    "feature_category",
+    "extract_features",
+    "attach_features",
+    # adaptive
+    "ParamRange",
+    "GaussianProcess",
+    "FeatureObjective",
+    "AdaptiveSampler",
+    "latin_hypercube",
+    "expected_improvement",
     # experiment_engine
     "EngineState",
     "EngineStatus",
@@ -74,4 +116,5 @@ __all__ = [
     "EVENT_COMBO_ADVANCED",
     "EVENT_ECHEM_DATA",
     "EVENT_STATE_CHANGED",
+    "LOSSY_EVENTS",
 ]
@@ -0,0 +1,312 @@
+"""
+自适应采样 - 按已有结果选择下一个组合，替代全笛卡尔积网格
+
+流程 (仅依赖 NumPy):
+1. 拉丁超立方 (LHS) 播种 n_init 个点，均匀覆盖参数空间
+2. 之后每次用全部观测拟合高斯过程代理模型 (RBF 核，长度尺度按边际似然选取)
+3. 在候选点上最大化期望改进 (Expected Improvement) 得到下一个组合
+
+参数定义沿用 ComboParameter: 默认把取值列表当作离散候选集 (吸附到最近值)，
+continuous=True 时只取其最小/最大值作为连续区间。
+
+用法:
+    objective = FeatureObjective("anodic_peak_current")          # 或 target=... 逼近目标值
+    sampler = AdaptiveSampler.from_program(program, objective, budget=20)
+    engine.set_adaptive_sampler(sampler)
+    engine.start(combo_mode=True)
+    ...
+    sampler.best  # (参数, 目标值)
+
+也可脱离引擎使用 (ask / tell):
+    params = sampler.ask()        # {参数路径: 值}
+    sampler.tell(params, y)
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 长度尺度候选 (单位超立方内)
+_LENGTH_SCALES = (0.05, 0.1, 0.2, 0.35, 0.5, 0.8, 1.2)
+_NOISE = 1e-4
+
+
+@dataclass
+class ParamRange:
+    """单个参数的取值范围
+
+    Attributes:
+        name: 参数名 (显示 / 结果中的键)
+        target_path: 参数路径 (如 "steps[0].ec_config.scan_rate")
+        low, high: 区间
+        choices: 离散候选值 (升序)；为 None 时为连续区间
+        log: 是否按对数尺度采样 (low > 0)
+    """
+    name: str
+    target_path: str
+    low: float
+    high: float
+    choices: Optional[Sequence[float]] = None
+    log: bool = False
+
+    def to_unit(self, value: float) -> float:
+        lo, hi, v = self.low, self.high, float(value)
+        if self.log:
+            lo, hi, v = math.log(lo), math.log(hi), math.log(v)
+        return 0.0 if hi == lo else (v - lo) / (hi - lo)
+
+    def from_unit(self, u: float) -> float:
+        lo, hi = (math.log(self.low), math.log(self.high)) if self.log else (self.low, self.high)
+        value = lo + min(max(u, 0.0), 1.0) * (hi - lo)
+        if self.log:
+            value = math.exp(value)
+        if self.choices is not None:
+            choices = np.asarray(self.choices, dtype=float)
+            value = choices[np.argmin(np.abs(choices - value))]
+        return float(value)
+
+
+def latin_hypercube(n: int, d: int, rng: np.random.Generator) -> np.ndarray:
+    """n 个 d 维 LHS 点 (每维 n 等分，每段恰一个点)"""
+    u = (rng.random((n, d)) + np.arange(n)[:, None]) / n
+    for k in range(d):
+        u[:, k] = u[rng.permutation(n), k]
+    return u
+
+
+class GaussianProcess:
+    """RBF 核高斯过程回归 (输入为单位超立方，输出内部标准化)"""
+
+    def __init__(self, noise: float = _NOISE):
+        self.noise = noise
+        self.length_scale = 0.3
+
+    @staticmethod
+    def _kernel(a: np.ndarray, b: np.ndarray, length_scale: float) -> np.ndarray:
+        d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(-1)
+        return np.exp(-0.5 * d2 / (length_scale * length_scale))
+
+    def _factor(self, x: np.ndarray, y: np.ndarray, length_scale: float):
+        k = self._kernel(x, x, length_scale) + self.noise * np.eye(len(x))
+        chol = np.linalg.cholesky(k)
+        alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, y))
+        # 对数边际似然 (省略常数项)
+        lml = -0.5 * float(y @ alpha) - float(np.log(np.diag(chol)).sum())
+        return chol, alpha, lml
+
+    def fit(self, x: np.ndarray, y: np.ndarray) -> "GaussianProcess":
+        self._x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self._mean = float(y.mean())
+        self._scale = float(y.std()) or 1.0
+        ys = (y - self._mean) / self._scale
+        best = None
+        for length_scale in _LENGTH_SCALES:
+            try:
+                chol, alpha, lml = self._factor(self._x, ys, length_scale)
+            except np.linalg.LinAlgError:
+                continue
+            if best is None or lml > best[0]:
+                best = (lml, length_scale, chol, alpha)
+        if best is None:
+            raise np.linalg.LinAlgError("GP 拟合失败")
+        _, self.length_scale, self._chol, self._alpha = best
+        return self
+
+    def predict(self, xs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """预测均值与标准差 (原始尺度)"""
+        ks = self._kernel(np.asarray(xs, dtype=float), self._x, self.length_scale)
+        mu = ks @ self._alpha
+        v = np.linalg.solve(self._chol, ks.T)
+        var = np.clip(1.0 - (v * v).sum(0), 1e-12, None)
+        return mu * self._scale + self._mean, np.sqrt(var) * self._scale
+
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def expected_improvement(mu: np.ndarray, sigma: np.ndarray, best: float,
+                         xi: float = 0.01) -> np.ndarray:
+    """最大化问题的期望改进"""
+    improve = mu - best - xi
+    z = improve / sigma
+    cdf = 0.5 * (1.0 + _erf(z / math.sqrt(2.0)).astype(float))
+    pdf = np.exp(-0.5 * z * z) / math.sqrt(2.0 * math.pi)
+    return improve * cdf + sigma * pdf
+
+
+class FeatureObjective:
+    """从 ExperimentResult 的电化学特征计算目标值 (越大越好)
+
+    Args:
+        feature: 特征名 (如 anodic_peak_current)
+        target: 给定时目标为 -|特征 - target| (逼近目标区域)
+        maximize: 无 target 时是否最大化特征
+        technique: 只取该技术的数据；默认取最后一条电化学数据
+    """
+
+    def __init__(self, feature: str, target: Optional[float] = None,
+                 maximize: bool = True, technique: Optional[str] = None):
+        self.feature = feature
+        self.target = target
+        self.maximize = maximize
+        self.technique = technique.upper() if technique else None
+
+    def __call__(self, result: Any) -> Optional[float]:
+        for data_set in reversed(getattr(result, "ec_data_sets", []) or []):
+            if self.technique and str(getattr(data_set, "technique", "")).upper() != self.technique:
+                continue
+            value = (getattr(data_set, "metadata", {}) or {}).get("features", {}).get(self.feature)
+            if value is None or not math.isfinite(value):
+                return None
+            if self.target is not None:
+                return -abs(value - self.target)
+            return value if self.maximize else -value
+        return None
+
+
+class AdaptiveSampler:
+    """LHS 播种 + 高斯过程代理 + EI 采集的序贯采样器
+
+    Attributes:
+        space: 参数范围列表
+        budget: 总实验次数上限
+        history: [(参数, 目标值或 None)]
+    """
+
+    def __init__(
+        self,
+        space: List[ParamRange],
+        objective: Optional[Callable[[Any], Optional[float]]] = None,
+        budget: int = 20,
+        n_init: Optional[int] = None,
+        n_candidates: int = 2000,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            space: 参数范围
+            objective: objective(result) -> 目标值 (越大越好，失败返回 None)；
+                仅引擎集成时需要
+            budget: 实验总数
+            n_init: LHS 播种点数，默认 max(4, 2 × 维数)
+            n_candidates: 每次采集函数评估的候选点数
+            seed: 随机种子
+        """
+        if not space:
+            raise ValueError("参数空间为空")
+        self.space = list(space)
+        self.objective = objective
+        self.budget = budget
+        self.n_init = min(budget, n_init or max(4, 2 * len(space)))
+        self.n_candidates = n_candidates
+        self._rng = np.random.default_rng(seed)
+        self._seeds = latin_hypercube(self.n_init, len(space), self._rng)
+        self._asked = 0
+        self.history: List[Tuple[Dict[str, Any], Optional[float]]] = []
+
+    @classmethod
+    def from_program(cls, program, objective=None, budget: int = 20,
+                     continuous: bool = False, **kwargs) -> "AdaptiveSampler":
+        """由程序的组合参数 (ComboParameter，数值型) 构造"""
+        space = []
+        for param in program.combo_params:
+            values = sorted(float(v) for v in param.values)
+            if not values:
+                continue
+            space.append(ParamRange(param.name, param.target_path, values[0], values[-1],
+                                    None if continuous else values))
+        return cls(space, objective, budget, **kwargs)
+
+    # ========================
+    # 状态
+    # ========================
+
+    @property
+    def dim(self) -> int:
+        return len(self.space)
+
+    @property
+    def done(self) -> bool:
+        return self._asked >= self.budget or self._exhausted()
+
+    @property
+    def best(self) -> Optional[Tuple[Dict[str, Any], float]]:
+        """目前最优的 (参数, 目标值)"""
+        scored = [(p, y) for p, y in self.history if y is not None]
+        return max(scored, key=lambda item: item[1]) if scored else None
+
+    def _exhausted(self) -> bool:
+        """离散空间已全部评估"""
+        if any(r.choices is None for r in self.space):
+            return False
+        total = math.prod(len(set(r.choices)) for r in self.space)
+        return self._asked >= total
+
+    def _key(self, u: np.ndarray) -> Tuple[float, ...]:
+        return tuple(r.from_unit(x) for r, x in zip(self.space, u))
+
+    def _to_params(self, u: np.ndarray) -> Dict[str, Any]:
+        return {r.target_path: r.from_unit(x) for r, x in zip(self.space, u)}
+
+    def _to_unit(self, params: Dict[str, Any]) -> np.ndarray:
+        return np.array([r.to_unit(params[r.target_path]) for r in self.space])
+
+    # ========================
+    # ask / tell
+    # ========================
+
+    def ask(self) -> Dict[str, Any]:
+        """下一个待测组合 {参数路径: 值}"""
+        seen = {self._key(self._to_unit(p)) for p, _ in self.history}
+        if self._asked < self.n_init:
+            u = self._seeds[self._asked]
+            if self._key(u) in seen:
+                u = self._fresh(seen)
+        else:
+            u = self._acquire(seen)
+        self._asked += 1
+        return self._to_params(u)
+
+    def tell(self, params: Dict[str, Any], value: Optional[float]) -> None:
+        """记录一次观测 (value 为 None 表示实验失败)"""
+        if value is not None and not math.isfinite(value):
+            value = None
+        self.history.append((dict(params), value))
+
+    def _fresh(self, seen) -> np.ndarray:
+        """随机取一个未评估过的点"""
+        for _ in range(1000):
+            u = self._rng.random(self.dim)
+            if self._key(u) not in seen:
+                return u
+        return self._rng.random(self.dim)
+
+    def _acquire(self, seen) -> np.ndarray:
+        scored = [(self._to_unit(p), y) for p, y in self.history if y is not None]
+        if len(scored) < 2:
+            return self._fresh(seen)
+        x = np.array([u for u, _ in scored])
+        y = np.array([v for _, v in scored])
+        try:
+            gp = GaussianProcess().fit(x, y)
+        except np.linalg.LinAlgError:
+            return self._fresh(seen)
+
+        # 候选: 全局随机 + 当前最优附近的局部扰动
+        n_local = self.n_candidates // 4
+        best_u = x[np.argmax(y)]
+        local = best_u + self._rng.normal(0.0, 0.05, (n_local, self.dim))
+        candidates = np.clip(np.vstack([self._rng.random((self.n_candidates - n_local, self.dim)),
+                                        local]), 0.0, 1.0)
+        # 离散参数吸附到候选值后再评估
+        snapped = np.array([[r.to_unit(r.from_unit(c)) for r, c in zip(self.space, row)]
+                            for row in candidates])
+        mu, sigma = gp.predict(snapped)
+        ei = expected_improvement(mu, sigma, float(y.max()))
+        for k in np.argsort(-ei):
+            if self._key(snapped[k]) not in seen:
+                return snapped[k]
+        return self._fresh(seen)
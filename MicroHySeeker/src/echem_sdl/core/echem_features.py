@@ -0,0 +1,270 @@
+"""
+电化学特征提取 - 随数据流增量计算的单次测量特征
+
+基于列式 ECDataSet 与 NumPy 向量化运算，每批新数据只处理新增行:
+- 伏安 (CV / LSV / DPV / SWV): 阳极/阴极峰电位与峰电流、峰间距、起始电位
+- 安培 (i-t / CA): 积分电荷 (梯形)、末点电流、平均电流
+- 电位 (OCPT / CP): 初末电位、平均电位、漂移速率 (线性回归斜率)
+- 阻抗 (EIS): Nyquist 图单半圆代数拟合 (Kasa)，给出 Rs、Rct
+
+所有累加量 (极值、积分、回归与圆拟合的求和项) 都是 O(新增行) 更新，
+features() 随时可取当前快照；测量结束后写入 data_set.metadata["features"]，
+汇总成千上万次测量时不必重新解析原始文件。
+
+用法:
+    extractor = FeatureExtractor("CV")
+    chi.on_data_batch(extractor.update)     # 每批 (times, potentials, currents)
+    ...
+    data_set.metadata["features"] = extractor.features()
+
+    # 或对已有数据集一次性计算
+    attach_features(data_set)
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# 技术名 → 特征类别
+_CATEGORIES = {
+    "CV": "voltammetry", "LSV": "voltammetry", "DPV": "voltammetry", "SWV": "voltammetry",
+    "IT": "amperometry", "I-T": "amperometry", "CA": "amperometry",
+    "CC": "amperometry", "BE": "amperometry",
+    "OCPT": "potentiometry", "OCP": "potentiometry", "CP": "potentiometry",
+    "EIS": "impedance", "IMP": "impedance",
+}
+
+
+def feature_category(technique: Any) -> str:
+    """技术名 (字符串或枚举) 对应的特征类别，未知技术返回 ''"""
+    name = getattr(technique, "value", technique)
+    return _CATEGORIES.get(str(name).upper(), "")
+
+
+class FeatureExtractor:
+    """单次测量的增量特征提取器
+
+    可自带数据集 (update(times, potentials, currents) 追加数据)，
+    也可绑定一个由他处填充的 ECDataSet (update() 只处理新增行)。
+    非线程安全: update() 与 features() 应在同一线程调用。
+    """
+
+    # 起始电位: 电流超过 基线 + ONSET_FRACTION × (峰电流 − 基线) 的第一个点
+    ONSET_FRACTION = 0.1
+    # 基线取前若干点电流的中位数 (累计满这么多点后确定，与分块方式无关)
+    BASELINE_POINTS = 5
+
+    def __init__(self, technique: Any, data_set=None):
+        """
+        Args:
+            technique: 技术名或枚举 (CV / LSV / i-t / OCPT / EIS ...)
+            data_set: 绑定的 ECDataSet；为 None 时内部新建
+        """
+        from ..hardware.chi import ECDataSet
+
+        self.technique = str(getattr(technique, "value", technique)).upper()
+        self.category = feature_category(self.technique)
+        self._owns_data = data_set is None
+        self._data = data_set if data_set is not None else ECDataSet(technique=self.technique)
+        self._done = 0          # 已处理的行数
+
+        # 极值
+        self._i_max = -math.inf
+        self._e_at_i_max = math.nan
+        self._i_min = math.inf
+        self._e_at_i_min = math.nan
+        # 起始电位搜索位置 (基线确定后阈值随峰电流单调上升，越界点只会后移)
+        self._baseline: Optional[float] = None
+        self._onset_index = 0
+        # 积分 / 平均
+        self._charge = 0.0
+        self._i_sum = 0.0
+        self._last_ti: Optional[tuple] = None
+        # 线性回归 Σt, Σe, Σt², Σte, Σe²
+        self._reg = np.zeros(5)
+        self._t0: Optional[float] = None
+        # 圆拟合 Σx, Σy, Σx², Σy², Σxy, Σx³, Σy³, Σxy², Σx²y
+        self._circ = np.zeros(9)
+
+    @property
+    def data_set(self):
+        return self._data
+
+    def __len__(self) -> int:
+        return self._done
+
+    # ========================
+    # 增量更新
+    # ========================
+
+    def update(self, times=None, potentials=None, currents=None) -> int:
+        """处理新增数据
+
+        Args:
+            times, potentials, currents: 新数据块 (仅自带数据集时)；
+                全为 None 时处理绑定数据集中新增的行
+
+        Returns:
+            本次处理的行数
+        """
+        if times is not None:
+            if not self._owns_data:
+                raise ValueError("绑定外部数据集时不能直接追加数据")
+            self._data.extend(times, potentials, currents)
+
+        n = len(self._data)
+        if n <= self._done:
+            return 0
+        block = self._data.as_array()[self._done:n]
+        self._consume(block[:, 0], block[:, 1], block[:, 2])
+        self._done = n
+        if self._baseline is None and n >= self.BASELINE_POINTS:
+            self._baseline = float(np.median(self._data.currents[:self.BASELINE_POINTS]))
+        return len(block)
+
+    def _consume(self, t: np.ndarray, e: np.ndarray, i: np.ndarray) -> None:
+        k = int(np.argmax(i))
+        if i[k] > self._i_max:
+            self._i_max, self._e_at_i_max = float(i[k]), float(e[k])
+        k = int(np.argmin(i))
+        if i[k] < self._i_min:
+            self._i_min, self._e_at_i_min = float(i[k]), float(e[k])
+
+        self._i_sum += float(i.sum())
+
+        if self.category == "amperometry":
+            # 与上一块末点衔接的梯形积分
+            if self._last_ti is not None:
+                t = np.concatenate(([self._last_ti[0]], t))
+                i = np.concatenate(([self._last_ti[1]], i))
+            if len(t) > 1:
+                self._charge += float(np.sum((i[1:] + i[:-1]) * np.diff(t)) / 2)
+            self._last_ti = (float(t[-1]), float(i[-1]))
+
+        elif self.category == "potentiometry":
+            if self._t0 is None:
+                self._t0 = float(t[0])
+            tt = t - self._t0       # 平移时间原点，避免大时间戳下的相消误差
+            self._reg += (tt.sum(), e.sum(), (tt * tt).sum(), (tt * e).sum(), (e * e).sum())
+
+        elif self.category == "impedance":
+            x, y = e, -i            # Z', -Z''
+            x2, y2 = x * x, y * y
+            self._circ += (x.sum(), y.sum(), x2.sum(), y2.sum(), (x * y).sum(),
+                           (x2 * x).sum(), (y2 * y).sum(), (x * y2).sum(), (x2 * y).sum())
+
+    # ========================
+    # 特征快照
+    # ========================
+
+    def features(self) -> Dict[str, float]:
+        """当前特征 (可 JSON 序列化的 float 字典)"""
+        n = self._done
+        out: Dict[str, float] = {"n_points": n}
+        if n == 0:
+            return out
+
+        if self.category == "voltammetry":
+            out["anodic_peak_potential"] = self._e_at_i_max
+            out["anodic_peak_current"] = self._i_max
+            if self.technique == "CV":
+                out["cathodic_peak_potential"] = self._e_at_i_min
+                out["cathodic_peak_current"] = self._i_min
+                out["peak_separation"] = self._e_at_i_max - self._e_at_i_min
+            onset = self._onset_potential()
+            if onset is not None:
+                out["onset_potential"] = onset
+
+        elif self.category == "amperometry":
+            times = self._data.times
+            out["charge"] = self._charge
+            out["duration"] = float(times[n - 1] - times[0])
+            out["final_current"] = float(self._data.currents[n - 1])
+            out["mean_current"] = self._i_sum / n
+
+        elif self.category == "potentiometry":
+            potentials = self._data.potentials
+            st, se, stt, ste, _ = self._reg
+            out["ocp_initial"] = float(potentials[0])
+            out["ocp_final"] = float(potentials[n - 1])
+            out["ocp_mean"] = se / n
+            denom = n * stt - st * st
+            if n > 1 and denom > 0:
+                out["ocp_drift"] = (n * ste - st * se) / denom
+
+        elif self.category == "impedance":
+            out.update(self._fit_semicircle())
+
+        return out
+
+    def _onset_potential(self) -> Optional[float]:
+        """电流首次超过起始阈值处的电位 (从上次位置继续向后搜索)
+
+        点数不足 BASELINE_POINTS 时用已有点临时估计基线，且不推进搜索位置。
+        """
+        n = self._done
+        baseline = self._baseline
+        start = self._onset_index
+        if baseline is None:
+            baseline = float(np.median(self._data.currents[:n]))
+            start = 0
+        if not self._i_max > baseline:
+            return None
+        threshold = baseline + self.ONSET_FRACTION * (self._i_max - baseline)
+        currents = self._data.currents[start:n]
+        if not len(currents):
+            return None
+        above = currents >= threshold
+        k = int(np.argmax(above))
+        if not above[k]:
+            if self._baseline is not None:
+                self._onset_index = n
+            return None
+        if self._baseline is None:
+            return float(self._data.potentials[k])
+        self._onset_index += k
+        return float(self._data.potentials[self._onset_index])
+
+    def _fit_semicircle(self) -> Dict[str, float]:
+        """Nyquist 图 (Z', -Z'') 单半圆的代数最小二乘拟合
+
+        x² + y² + Dx + Ey + F = 0，正规方程的系数全部来自增量求和项。
+        """
+        n = self._done
+        if n < 3:
+            return {}
+        sx, sy, sxx, syy, sxy, sxxx, syyy, sxyy, sxxy = self._circ
+        a = np.array([[sxx, sxy, sx], [sxy, syy, sy], [sx, sy, n]])
+        b = -np.array([sxxx + sxyy, sxxy + syyy, sxx + syy])
+        try:
+            d, e, f = np.linalg.solve(a, b)
+        except np.linalg.LinAlgError:
+            return {}
+        cx, cy = -d / 2, -e / 2
+        r2 = cx * cx + cy * cy - f
+        if not r2 > 0:
+            return {}
+        out = {"semicircle_center_re": float(cx), "semicircle_center_im": float(cy),
+               "semicircle_radius": float(math.sqrt(r2))}
+        chord2 = r2 - cy * cy
+        if chord2 > 0:
+            half = math.sqrt(chord2)
+            # 半圆与实轴的两个交点: 高频端 Rs, 弦长 Rct
+            out["rs"] = float(cx - half)
+            out["rct"] = float(2 * half)
+        return out
+
+
+def extract_features(data_set, technique: Any = None) -> Dict[str, float]:
+    """对完整数据集一次性计算特征"""
+    extractor = FeatureExtractor(technique or data_set.technique, data_set)
+    extractor.update()
+    return extractor.features()
+
+
+def attach_features(data_set, technique: Any = None) -> Dict[str, float]:
+    """计算特征并写入 data_set.metadata["features"]"""
+    features = extract_features(data_set, technique)
+    data_set.metadata["features"] = features
+    return features
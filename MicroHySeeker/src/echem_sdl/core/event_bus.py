@@ -0,0 +1,318 @@
+"""
+EventBus - 引擎事件总线
+
+发布方（引擎线程）只做一次入队，不调用任何回调；每个订阅者拥有
+自己的有界队列和投递线程，慢速的 UI / 日志消费者不会拖慢采集。
+
+- 有界队列: 高频事件（如逐点电化学数据）超出容量时按策略丢弃或合并
+- 控制事件（实验开始/完成、步骤开始/完成等）永不丢弃
+- 批量投递: 订阅者可选择一次接收同类事件列表，降低回调开销
+"""
+from enum import Enum
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+import threading
+import time
+
+
+class OverflowPolicy(Enum):
+    """队列满时的处理策略"""
+    DROP_OLDEST = "drop_oldest"      # 丢弃最旧的高频事件
+    DROP_NEWEST = "drop_newest"      # 丢弃新到的事件
+    COALESCE = "coalesce"            # 同类事件只保留最新一条（始终生效，不等队列满）
+
+
+class Subscription:
+    """事件订阅（自带有界队列和投递线程）
+
+    Attributes:
+        name: 订阅名称（线程名）
+        dropped: 因队列满被丢弃的事件数
+        coalesced: 被合并的事件数
+        delivered: 已投递的事件数
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[str, Any], None],
+        event_types: Optional[Iterable[str]] = None,
+        maxsize: int = 1024,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        batch: bool = False,
+        max_batch: int = 256,
+        lossy_events: Iterable[str] = (),
+        error_handler: Optional[Callable[[Exception], None]] = None,
+        name: str = "",
+    ) -> None:
+        """初始化订阅
+
+        Args:
+            callback: 回调 callback(event_type, data)；batch=True 时 data 为同类事件数据列表
+            event_types: 关注的事件类型（None 表示全部）
+            maxsize: 高频事件队列容量
+            policy: 溢出策略
+            batch: 是否批量投递
+            max_batch: 单批最大事件数
+            lossy_events: 允许丢弃/合并的高频事件类型
+            error_handler: 回调异常处理
+            name: 订阅名称
+        """
+        self.callback = callback
+        self.event_types: Optional[Set[str]] = set(event_types) if event_types is not None else None
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.batch = batch
+        self.max_batch = max(1, max_batch)
+        self.lossy_events: Set[str] = set(lossy_events)
+        self.name = name or f"EventSub-{id(self):x}"
+        self._error_handler = error_handler
+
+        self._queue: Deque[List[Any]] = deque()
+        self._lossy_count = 0
+        self._pending: Dict[str, List[Any]] = {}  # COALESCE: 事件类型 → 队列中的条目
+        self._cond = threading.Condition()
+        self._closed = False
+        self._busy = False
+
+        self.dropped = 0
+        self.coalesced = 0
+        self.delivered = 0
+
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    # ========================
+    # 入队（发布方线程）
+    # ========================
+
+    def accepts(self, event_type: str) -> bool:
+        return self.event_types is None or event_type in self.event_types
+
+    def offer(self, event_type: str, data: Any) -> bool:
+        """入队（不阻塞）
+
+        Returns:
+            bool: 事件是否被接受
+        """
+        if not self.accepts(event_type):
+            return False
+        lossy = event_type in self.lossy_events
+
+        with self._cond:
+            if self._closed:
+                return False
+
+            if lossy and self.policy == OverflowPolicy.COALESCE:
+                entry = self._pending.get(event_type)
+                if entry is not None:
+                    entry[1] = data
+                    self.coalesced += 1
+                    return True
+
+            if lossy and self._lossy_count >= self.maxsize:
+                if self.policy == OverflowPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                self._drop_oldest_lossy()
+
+            entry = [event_type, data, lossy]
+            self._queue.append(entry)
+            if lossy:
+                self._lossy_count += 1
+                if self.policy == OverflowPolicy.COALESCE:
+                    self._pending[event_type] = entry
+            self._cond.notify()
+            return True
+
+    def _drop_oldest_lossy(self) -> None:
+        for i, entry in enumerate(self._queue):
+            if entry[2]:
+                del self._queue[i]
+                self._lossy_count -= 1
+                if self._pending.get(entry[0]) is entry:
+                    del self._pending[entry[0]]
+                self.dropped += 1
+                return
+
+    # ========================
+    # 投递（订阅者线程）
+    # ========================
+
+    def _take(self) -> List[List[Any]]:
+        items = []
+        while self._queue and len(items) < self.max_batch:
+            entry = self._queue.popleft()
+            if entry[2]:
+                self._lossy_count -= 1
+                if self._pending.get(entry[0]) is entry:
+                    del self._pending[entry[0]]
+            items.append(entry)
+        return items
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue and self._closed:
+                    self._cond.notify_all()
+                    return
+                items = self._take()
+                self._busy = True
+
+            try:
+                self._deliver(items)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self.delivered += len(items)
+                    self._cond.notify_all()
+
+    def _deliver(self, items: List[List[Any]]) -> None:
+        if not self.batch:
+            for event_type, data, _ in items:
+                self._invoke(event_type, data)
+            return
+
+        # 连续的同类事件合为一批，保持事件顺序
+        start = 0
+        for i in range(1, len(items) + 1):
+            if i == len(items) or items[i][0] != items[start][0]:
+                self._invoke(items[start][0], [entry[1] for entry in items[start:i]])
+                start = i
+
+    def _invoke(self, event_type: str, data: Any) -> None:
+        try:
+            self.callback(event_type, data)
+        except Exception as e:
+            if self._error_handler:
+                self._error_handler(e)
+
+    # ========================
+    # 控制
+    # ========================
+
+    @property
+    def pending(self) -> int:
+        """队列中待投递的事件数"""
+        return len(self._queue)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待队列投递完毕
+
+        Returns:
+            bool: 是否在超时前完成
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                if self._closed and not self._thread.is_alive():
+                    return not self._queue
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout: Optional[float] = 1.0) -> None:
+        """停止接收新事件，投递剩余事件后退出线程"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+
+class EventBus:
+    """事件总线
+
+    Example:
+        >>> bus = EventBus(lossy_events={"echem_data"})
+        >>> bus.subscribe(on_points, event_types={"echem_data"}, batch=True)
+        >>> bus.publish("echem_data", {"point": {...}})
+    """
+
+    def __init__(
+        self,
+        lossy_events: Iterable[str] = (),
+        error_handler: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """初始化事件总线
+
+        Args:
+            lossy_events: 允许丢弃/合并的高频事件类型（对所有订阅生效）
+            error_handler: 回调异常处理
+        """
+        self.lossy_events: Set[str] = set(lossy_events)
+        self._error_handler = error_handler
+        self._subscriptions: Tuple[Subscription, ...] = ()
+        self._lock = threading.Lock()
+
+    @property
+    def subscriptions(self) -> Tuple[Subscription, ...]:
+        return self._subscriptions
+
+    def subscribe(
+        self,
+        callback: Callable[[str, Any], None],
+        event_types: Optional[Iterable[str]] = None,
+        maxsize: int = 1024,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        batch: bool = False,
+        max_batch: int = 256,
+        name: str = "",
+    ) -> Subscription:
+        """订阅事件，参数见 Subscription"""
+        sub = Subscription(
+            callback,
+            event_types=event_types,
+            maxsize=maxsize,
+            policy=policy,
+            batch=batch,
+            max_batch=max_batch,
+            lossy_events=self.lossy_events,
+            error_handler=self._error_handler,
+            name=name,
+        )
+        with self._lock:
+            self._subscriptions = self._subscriptions + (sub,)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """取消订阅并停止其投递线程"""
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not sub)
+        sub.close()
+
+    def publish(self, event_type: str, data: Any = None) -> None:
+        """发布事件（只入队，不阻塞）"""
+        for sub in self._subscriptions:
+            sub.offer(event_type, data)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待所有订阅投递完毕"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for sub in self._subscriptions:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not sub.flush(remaining):
+                return False
+        return True
+
+    def close(self) -> None:
+        """关闭全部订阅"""
+        with self._lock:
+            subs, self._subscriptions = self._subscriptions, ()
+        for sub in subs:
+            sub.close()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """各订阅的队列统计"""
+        return {
+            sub.name: {
+                "pending": sub.pending,
+                "delivered": sub.delivered,
+                "dropped": sub.dropped,
+                "coalesced": sub.coalesced,
+            }
+            for sub in self._subscriptions
+        }
@@ -7,9 +7,18 @@ from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Any, Callable
 from pathlib import Path
 import json
-import re
 from itertools import product
 
+from ..utils.param_path import compile_path
+from ..utils.serialization import (
+    decode,
+    encode,
+    pack_snapshot,
+    read_payload,
+    save_document,
+    unpack_snapshot,
+)
+
 from .prog_step import ProgStep, StepType
 
 
@@ -284,12 +293,53 @@ class ExpProgram:
         
         for path, value in values.items():
             try:
-                self._set_value_by_path(path, value)
+                compile_path(path).set(self, value)
             except Exception:
                 pass  # 忽略设置失败的参数
         
         return True
     
+    def apply_param_values(self, values: Dict[str, Any]) -> None:
+        """按 {参数路径: 值} 直接设置参数（自适应采样使用，不经过参数矩阵）
+        
+        首次调用前保存原始值，便于 restore_original_values 恢复。
+        """
+        if not self._original_values:
+            self._save_original_values()
+        for path, value in values.items():
+            try:
+                compile_path(path).set(self, value)
+            except Exception:
+                pass  # 忽略设置失败的参数
+    
+    def get_variant(self, combo_index: int) -> Optional["ExpProgram"]:
+        """生成指定组合的程序变体（写时复制，不修改本程序）
+        
+        只浅拷贝组合参数路径上的对象，未涉及的步骤与本程序共享。
+        
+        Args:
+            combo_index: 组合索引
+            
+        Returns:
+            程序变体，索引越界时返回 None
+        """
+        if self._param_matrix is None:
+            self.fill_param_matrix()
+        
+        if not self.combo_params:
+            return self
+        
+        if combo_index >= self.combo_count:
+            return None
+        
+        variant = self
+        for path, value in self.get_param_values(combo_index).items():
+            try:
+                variant = compile_path(path).replace(variant, value)
+            except Exception:
+                pass  # 忽略设置失败的参数
+        return variant
+    
     def _set_value_by_path(self, path: str, value: Any) -> None:
         """通过路径设置值
         
@@ -297,35 +347,11 @@ class ExpProgram:
             path: 参数路径（如 "steps[0].ec_config.scan_rate"）
             value: 值
         """
-        parts = re.split(r'\.|\[|\]', path)
-        parts = [p for p in parts if p]  # 移除空字符串
-        
-        obj: Any = self
-        for i, part in enumerate(parts[:-1]):
-            if part.isdigit():
-                obj = obj[int(part)]
-            else:
-                obj = getattr(obj, part)
-        
-        last_part = parts[-1]
-        if isinstance(obj, dict):
-            obj[last_part] = value
-        else:
-            setattr(obj, last_part, value)
+        compile_path(path).set(self, value)
     
     def _get_value_by_path(self, path: str) -> Any:
         """通过路径获取值"""
-        parts = re.split(r'\.|\[|\]', path)
-        parts = [p for p in parts if p]
-        
-        obj: Any = self
-        for part in parts:
-            if part.isdigit():
-                obj = obj[int(part)]
-            else:
-                obj = getattr(obj, part)
-        
-        return obj
+        return compile_path(path).get(self)
     
     def _save_original_values(self) -> None:
         """保存原始参数值"""
@@ -452,37 +478,85 @@ class ExpProgram:
         
         return program
     
-    def to_json(self, indent: int = 2) -> str:
-        """转换为 JSON 字符串"""
-        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+    def _document(self) -> "_ProgramDocument":
+        return _ProgramDocument(
+            name=self.name,
+            description=self.description,
+            version=self.version,
+            created_at=self.created_at,
+            modified_at=self.modified_at,
+            steps=self.steps,
+            combo_params=self.combo_params,
+        )
+    
+    @classmethod
+    def _from_document(cls, doc: "_ProgramDocument") -> "ExpProgram":
+        program = cls(name=doc.name, description=doc.description)
+        program.version = doc.version
+        program.created_at = doc.created_at
+        program.modified_at = doc.modified_at
+        program.steps = doc.steps
+        program.combo_params = doc.combo_params
+        return program
+    
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """转换为 JSON 字符串（预编译模式序列化，省略空配置）"""
+        return encode(self._document(), _ProgramDocument, indent=indent,
+                      exclude_none=True).decode("utf-8")
     
     @classmethod
-    def from_json(cls, json_str: str) -> "ExpProgram":
-        """从 JSON 字符串创建"""
+    def from_json(cls, json_str: str | bytes) -> "ExpProgram":
+        """从 JSON 字符串创建
+        
+        优先按预编译模式直接解析；未知步骤类型等不符合模式的数据
+        回退到 from_dict 的宽松解析。
+        """
+        doc = decode(json_str, _ProgramDocument)
+        if doc is not None:
+            return cls._from_document(doc)
         data = json.loads(json_str)
         return cls.from_dict(data)
     
-    def save(self, file_path: str | Path) -> None:
-        """保存到文件"""
+    def to_snapshot(self) -> bytes:
+        """紧凑二进制快照（zlib 压缩的紧凑 JSON）"""
+        return pack_snapshot(encode(self._document(), _ProgramDocument, exclude_none=True))
+    
+    @classmethod
+    def from_snapshot(cls, data: bytes) -> "ExpProgram":
+        """从二进制快照创建"""
+        return cls.from_json(unpack_snapshot(data))
+    
+    def save(self, file_path: str | Path, force: bool = False) -> bool:
+        """原子保存到文件（扩展名 .mhsnap 时为二进制快照）
+        
+        Returns:
+            是否实际写入
+        """
         from datetime import datetime
         self.modified_at = datetime.now().isoformat()
         if not self.created_at:
             self.created_at = self.modified_at
-        
-        path = Path(file_path)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(self.to_json(), encoding="utf-8")
+        return save_document(file_path, self._document(), _ProgramDocument,
+                             exclude_none=True, force=force)
     
     @classmethod
     def load(cls, file_path: str | Path) -> "ExpProgram":
-        """从文件加载"""
-        path = Path(file_path)
-        json_str = path.read_text(encoding="utf-8")
-        return cls.from_json(json_str)
+        """从 JSON 或二进制快照文件加载"""
+        return cls.from_json(read_payload(file_path))
     
     def copy(self) -> "ExpProgram":
-        """创建副本"""
-        return ExpProgram.from_dict(self.to_dict())
+        """创建副本（逐步骤结构化复制，不经过字典往返）"""
+        program = ExpProgram(name=self.name, description=self.description)
+        program.version = self.version
+        program.created_at = self.created_at
+        program.modified_at = self.modified_at
+        program.steps = [step.copy() for step in self.steps]
+        program.combo_params = [
+            ComboParameter(name=p.name, target_path=p.target_path,
+                           values=list(p.values), unit=p.unit)
+            for p in self.combo_params
+        ]
+        return program
     
     # ========================
     # 兼容前端接口
@@ -596,3 +670,15 @@ class ExpProgram:
             )
         
         return step
+
+
+@dataclass
+class _ProgramDocument:
+    """ExpProgram 的文件格式（字段顺序与 to_dict 一致，供预编译模式使用）"""
+    name: str = ""
+    description: str = ""
+    version: str = "1.0"
+    created_at: str = ""
+    modified_at: str = ""
+    steps: List[ProgStep] = field(default_factory=list)
+    combo_params: List[ComboParameter] = field(default_factory=list)
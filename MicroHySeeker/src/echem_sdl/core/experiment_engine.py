@@ -13,6 +13,8 @@ from datetime import datetime
 
 from .prog_step import ProgStep, StepType
 from .exp_program import ExpProgram
+from .event_bus import EventBus, OverflowPolicy, Subscription
+from .echem_features import FeatureExtractor
 
 if TYPE_CHECKING:
     from ..lib_context import LibContext
@@ -50,6 +52,9 @@ EVENT_COMBO_ADVANCED = "combo_advanced"
 EVENT_ECHEM_DATA = "echem_data"
 EVENT_STATE_CHANGED = "state_changed"
 
+# 高频事件：订阅队列满时可丢弃/合并，其余控制事件永不丢弃
+LOSSY_EVENTS = (EVENT_ECHEM_DATA, EVENT_STEP_PROGRESS, EVENT_STATE_CHANGED)
+
 
 @dataclass
 class EngineStatus:
@@ -91,6 +96,7 @@ class ExperimentResult:
     combo_params: Dict[str, Any] = field(default_factory=dict)
     step_results: List[Dict[str, Any]] = field(default_factory=list)
     ec_data_sets: List[Any] = field(default_factory=list)
+    telemetry: Dict[str, Any] = field(default_factory=dict)  # 名称 → 遥测数组 (如步骤时间线)
     success: bool = False
     error_message: str = ""
     
@@ -164,13 +170,20 @@ class ExperimentEngine:
         self._pause_event = threading.Event()
         self._pause_event.set()  # 初始非暂停
         
-        # 事件回调
-        self._event_callbacks: List[Callable[[str, Dict], None]] = []
-        self._specific_callbacks: Dict[str, List[Callable]] = {}
+        # 事件总线（回调在各订阅者线程上执行，引擎线程只入队）
+        self._event_bus = EventBus(
+            lossy_events=LOSSY_EVENTS,
+            error_handler=lambda e: self._log(f"事件回调错误: {e}", "error"),
+        )
+        self._event_callbacks: Dict[Callable, Subscription] = {}
+        self._specific_callbacks: Dict[str, Dict[Callable, Subscription]] = {}
         
         # 结果
         self._current_result: Optional[ExperimentResult] = None
         self._results: List[ExperimentResult] = []
+        self._result_store = None  # CampaignStore, 每次运行结束时追加
+        self._sampler = None  # AdaptiveSampler, 设置后组合模式改为序贯自适应采样
+        self._sampler_params: Dict[str, Any] = {}
         
         # 硬件引用（延迟获取）
         self._pump_manager: Optional["PumpManager"] = None
@@ -364,7 +377,13 @@ class ExperimentEngine:
             self._pause_requested = False
             self._pause_event.set()
             
-            if combo_mode:
+            if combo_mode and self._sampler is not None:
+                # 自适应采样: 按预算逐个生成组合
+                self._total_combos = self._sampler.budget
+                self._current_combo_index = 0
+                self._sampler_params = self._sampler.ask()
+                self._program.apply_param_values(self._sampler_params)
+            elif combo_mode:
                 # 生成组合参数矩阵
                 self._program.fill_param_matrix()
                 self._total_combos = self._program.combo_count
@@ -412,6 +431,22 @@ class ExperimentEngine:
             self._log("停止请求已发送")
             return True
     
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """停止实验并释放引擎资源
+        
+        等待执行线程退出、投递剩余事件后关闭事件总线（结束各订阅者的投递线程）。
+        关闭后引擎不可再使用。
+        """
+        self.stop()
+        thread = self._run_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._event_bus.flush(timeout)
+        self._event_bus.close()
+        self._event_callbacks.clear()
+        self._specific_callbacks.clear()
+        self._log("引擎已关闭")
+    
     def pause(self) -> bool:
         """暂停实验"""
         with self._lock:
@@ -460,41 +495,71 @@ class ExperimentEngine:
     # 事件系统
     # ========================
     
+    @property
+    def event_bus(self) -> EventBus:
+        """事件总线"""
+        return self._event_bus
+    
     def on_event(self, callback: Callable[[str, Dict], None]) -> None:
         """订阅所有事件"""
-        self._event_callbacks.append(callback)
+        if callback not in self._event_callbacks:
+            self._event_callbacks[callback] = self._event_bus.subscribe(callback)
     
     def on(self, event_type: str, callback: Callable) -> None:
         """订阅特定事件"""
-        if event_type not in self._specific_callbacks:
-            self._specific_callbacks[event_type] = []
-        self._specific_callbacks[event_type].append(callback)
+        callbacks = self._specific_callbacks.setdefault(event_type, {})
+        if callback not in callbacks:
+            callbacks[callback] = self._event_bus.subscribe(
+                lambda _, data: callback(data), event_types={event_type}
+            )
     
     def off(self, event_type: str, callback: Callable) -> None:
         """取消订阅"""
-        if event_type in self._specific_callbacks:
-            if callback in self._specific_callbacks[event_type]:
-                self._specific_callbacks[event_type].remove(callback)
+        sub = self._specific_callbacks.get(event_type, {}).pop(callback, None)
+        if sub is not None:
+            self._event_bus.unsubscribe(sub)
+    
+    def off_event(self, callback: Callable[[str, Dict], None]) -> None:
+        """取消订阅所有事件"""
+        sub = self._event_callbacks.pop(callback, None)
+        if sub is not None:
+            self._event_bus.unsubscribe(sub)
+    
+    def subscribe(
+        self,
+        callback: Callable[[str, Any], None],
+        event_types: Optional[List[str]] = None,
+        maxsize: int = 1024,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        batch: bool = False,
+        max_batch: int = 256,
+    ) -> Subscription:
+        """以指定队列策略订阅事件
+        
+        batch=True 时回调一次收到同类事件的数据列表，适合逐点电化学数据等高频事件。
+        
+        Returns:
+            Subscription: 用于 unsubscribe 和读取丢弃统计
+        """
+        return self._event_bus.subscribe(
+            callback, event_types=event_types, maxsize=maxsize,
+            policy=policy, batch=batch, max_batch=max_batch,
+        )
+    
+    def unsubscribe(self, sub: Subscription) -> None:
+        """取消 subscribe() 的订阅"""
+        self._event_bus.unsubscribe(sub)
+    
+    def flush_events(self, timeout: Optional[float] = None) -> bool:
+        """等待已发出的事件投递完毕"""
+        return self._event_bus.flush(timeout)
     
     def _emit_event(self, event_type: str, data: Dict = None) -> None:
-        """发出事件"""
+        """发出事件（只入队，不在引擎线程上执行回调）"""
         data = data or {}
         data["timestamp"] = time.time()
         data["state"] = self._state.value
-        
-        # 通用回调
-        for cb in self._event_callbacks:
-            try:
-                cb(event_type, data)
-            except Exception as e:
-                self._log(f"事件回调错误: {e}", "error")
-        
-        # 特定回调
-        for cb in self._specific_callbacks.get(event_type, []):
-            try:
-                cb(data)
-            except Exception as e:
-                self._log(f"事件回调错误: {e}", "error")
+        self._event_bus.publish(event_type, data)
     
     # ========================
     # 执行循环
@@ -600,6 +665,7 @@ class ExperimentEngine:
                 "name": step.name,
                 "type": step.step_type.value,
                 "success": success,
+                "start": self._step_start_time - self._current_result.start_time.timestamp(),
                 "duration": self._step_elapsed_time,
             })
     
@@ -614,19 +680,28 @@ class ExperimentEngine:
         Returns:
             bool: 是否有下一个组合
         """
-        # 保存当前结果
-        if self._current_result:
-            self._current_result.end_time = datetime.now()
-            self._current_result.success = True
-            self._results.append(self._current_result)
-        
         next_index = self._current_combo_index + 1
         
+        # 没有下一组合时由 _complete 保存最后结果
         if next_index >= self._total_combos:
             return False
         
+        # 保存当前结果
+        if self._current_result:
+            self._current_result.end_time = datetime.now()
+            self._current_result.success = True
+            self._save_result(self._current_result)
+            self._tell_sampler(self._current_result)
+        
+        if self._sampler is not None:
+            if self._sampler.done:
+                self._current_result = None
+                return False
+            self._sampler_params = self._sampler.ask()
+            self._program.apply_param_values(self._sampler_params)
+        else:
+            self._program.load_param_values(next_index)
         self._current_combo_index = next_index
-        self._program.load_param_values(next_index)
         self._current_step_index = 0
         
         # 新建结果
@@ -653,7 +728,9 @@ class ExperimentEngine:
         if self._current_result:
             self._current_result.end_time = datetime.now()
             self._current_result.success = True
-            self._results.append(self._current_result)
+            self._save_result(self._current_result)
+            if self._combo_mode:
+                self._tell_sampler(self._current_result)
         
         self._elapsed_time = time.time() - self._start_time
         self._state = EngineState.COMPLETED
@@ -924,6 +1001,10 @@ class ExperimentEngine:
             
             chi.on_data(on_data)
             
+            # 随数据流增量提取特征
+            extractor = FeatureExtractor(config.technique)
+            chi.on_data_batch(extractor.update)
+            
             # 运行
             chi.run()
             
@@ -942,6 +1023,7 @@ class ExperimentEngine:
             
             # 保存数据
             data_set = chi.get_data_set()
+            data_set.metadata["features"] = extractor.features()
             if self._current_result:
                 self._current_result.ec_data_sets.append(data_set)
             
@@ -1045,6 +1127,41 @@ class ExperimentEngine:
     # 结果获取
     # ========================
     
+    def set_result_store(self, store) -> None:
+        """设置实验活动结果库 (CampaignStore)，每次运行结束时自动追加"""
+        self._result_store = store
+    
+    def _save_result(self, result: ExperimentResult) -> None:
+        from ..services.result_store import step_timeline
+        result.telemetry.setdefault("step_timeline", step_timeline(result.step_results))
+        self._results.append(result)
+        if self._result_store is not None:
+            try:
+                self._result_store.append_run(result)
+            except Exception as e:
+                self._log(f"结果入库失败: {e}", "error")
+    
+    def set_adaptive_sampler(self, sampler) -> None:
+        """设置自适应采样器 (AdaptiveSampler)
+        
+        设置后 start(combo_mode=True) 不再遍历全笛卡尔积，而是每完成一个组合
+        就用采样器的目标函数评估结果并询问下一个组合，直到预算用完。
+        传入 None 恢复网格模式。
+        """
+        self._sampler = sampler
+    
+    def _tell_sampler(self, result: ExperimentResult) -> None:
+        """把当前组合的结果反馈给自适应采样器"""
+        if self._sampler is None:
+            return
+        value = None
+        if self._sampler.objective is not None:
+            try:
+                value = self._sampler.objective(result)
+            except Exception as e:
+                self._log(f"目标函数计算失败: {e}", "error")
+        self._sampler.tell(self._sampler_params, value)
+    
     def get_results(self) -> List[ExperimentResult]:
         """获取所有实验结果"""
         return self._results.copy()
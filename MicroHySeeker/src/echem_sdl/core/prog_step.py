@@ -6,8 +6,11 @@ ProgStep - 程序步骤模块
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from typing import Optional, List, Dict, Any
+import copy
 import json
 
+from ..utils.echem_timing import estimate_echem_seconds
+
 
 class StepType(str, Enum):
     """步骤类型枚举"""
@@ -326,15 +329,18 @@ class ProgStep:
             config = self.ec_config
             if config is None:
                 return 0.0
-            if config.technique in ["CV", "LSV"]:
-                # 基于电位范围和扫描速率
-                e_range = config.e_high - config.e_low
-                return config.quiet_time + (e_range * config.segments / config.scan_rate)
-            elif config.technique in ["i-t", "CA", "IT"]:
-                return config.quiet_time + config.run_time
-            elif config.technique == "OCPT":
-                return config.run_time
-            return 60.0
+            # 与执行计划共用同一时长模型
+            return estimate_echem_seconds(
+                config.technique,
+                e_init=config.e_init,
+                e_high=config.e_high,
+                e_low=config.e_low,
+                e_final=config.e_final,
+                scan_rate=config.scan_rate,
+                segments=config.segments,
+                quiet_time=config.quiet_time,
+                run_time=config.run_time,
+            )
         
         elif self.step_type == StepType.BLANK:
             config = self.blank_config
@@ -449,8 +455,8 @@ class ProgStep:
         return cls.from_dict(data)
     
     def copy(self) -> "ProgStep":
-        """创建副本"""
-        return ProgStep.from_dict(self.to_dict())
+        """创建副本（结构化深拷贝，不经过字典往返）"""
+        return copy.deepcopy(self)
 
 
 # ========================
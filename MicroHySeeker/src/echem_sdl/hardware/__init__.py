@@ -1,3 +1,6 @@
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from ..utils.constants import (
     CMD_ENABLE,
     CMD_READ_ENABLE,
@@ -7,16 +10,31 @@ from ..utils.constants import (
     RX_HEADER,
     TX_HEADER,
 )
-from .pump_manager import PumpManager, PumpState
-from .rs485_driver import RS485Driver
-from .rs485_protocol import (
-    FrameStreamParser,
-    ParsedFrame,
-    build_frame,
-    checksum,
-    parse_frame,
-    verify_frame,
-)
+
+# Driver classes are imported from their submodules on first access (PEP 562).
+_EXPORTS = {
+    "FrameStreamParser": ".rs485_protocol",
+    "ParsedFrame": ".rs485_protocol",
+    "PumpManager": ".pump_manager",
+    "PumpState": ".pump_manager",
+    "RS485Driver": ".rs485_driver",
+    "build_frame": ".rs485_protocol",
+    "checksum": ".rs485_protocol",
+    "parse_frame": ".rs485_protocol",
+    "verify_frame": ".rs485_protocol",
+}
+
+if TYPE_CHECKING:
+    from .pump_manager import PumpManager, PumpState
+    from .rs485_driver import RS485Driver
+    from .rs485_protocol import (
+        FrameStreamParser,
+        ParsedFrame,
+        build_frame,
+        checksum,
+        parse_frame,
+        verify_frame,
+    )
 
 __all__ = [
     "CMD_ENABLE",
@@ -36,3 +54,16 @@ __all__ = [
     "parse_frame",
     "verify_frame",
 ]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -6,12 +6,16 @@ CHIInstrument - CHI 电化学工作站驱动模块
 """
 from dataclasses import dataclass, field
 from enum import IntEnum, Enum
-from typing import Optional, List, Callable, Any
+from typing import Optional, List, Callable, Any, Iterable, Tuple
 import threading
 import time
 import math
 import random
 
+import numpy as np
+
+from .chi_output import reversal_segment_starts
+
 
 class ECTechnique(IntEnum):
     """电化学技术代码（与 CHI 仪器兼容）
@@ -148,32 +152,281 @@ class ECDataPoint:
         }
 
 
-@dataclass
 class ECDataSet:
-    """电化学数据集"""
-    name: str = ""
-    technique: str = "CV"
-    timestamp: str = ""
-    points: List[ECDataPoint] = field(default_factory=list)
-    metadata: dict = field(default_factory=dict)
+    """电化学数据集（列式存储）
+    
+    time / potential / current 三列存放在一块可增长的 float64 数组中
+    （按行 [t, E, I] 排列），追加为均摊 O(1)，列访问返回零拷贝视图。
+    相比逐点 ECDataPoint 对象列表，长时间 i-t 测量内存占用约降为 1/6。
+    
+    写入 (append/extend/clear/mark_segment) 与 copy() 共用同一把锁，
+    采集线程追加数据时在其他线程取快照也能得到各列等长的一致副本。
+    
+    Attributes:
+        name: 数据集名称
+        technique: 技术名称
+        timestamp: 时间戳
+        metadata: 附加信息
+    """
+    
+    _MIN_CAPACITY = 1024
+    
+    def __init__(
+        self,
+        name: str = "",
+        technique: str = "CV",
+        timestamp: str = "",
+        points: Optional[Iterable[ECDataPoint]] = None,
+        metadata: Optional[dict] = None,
+        capacity: int = 0,
+    ) -> None:
+        self.name = name
+        self.technique = technique
+        self.timestamp = timestamp
+        self.metadata = metadata if metadata is not None else {}
+        self._lock = threading.Lock()
+        self._buf = np.empty((max(capacity, self._MIN_CAPACITY), 3), dtype=np.float64)
+        self._n = 0
+        self._segment_starts: List[int] = [0]
+        if points is not None:
+            if isinstance(points, ECDataSet):
+                self.extend(points.times, points.potentials, points.currents)
+            else:
+                for p in points:
+                    self.append(p.time, p.potential, p.current)
+    
+    @classmethod
+    def from_arrays(cls, times, potentials, currents, **kwargs) -> "ECDataSet":
+        """由列数组创建"""
+        data_set = cls(capacity=len(times), **kwargs)
+        data_set.extend(times, potentials, currents)
+        return data_set
+    
+    # ========================
+    # 列视图
+    # ========================
+    
+    @property
+    def times(self) -> np.ndarray:
+        return self._buf[:self._n, 0]
     
     @property
-    def times(self) -> List[float]:
-        return [p.time for p in self.points]
+    def potentials(self) -> np.ndarray:
+        return self._buf[:self._n, 1]
     
     @property
-    def potentials(self) -> List[float]:
-        return [p.potential for p in self.points]
+    def currents(self) -> np.ndarray:
+        return self._buf[:self._n, 2]
+    
+    def as_array(self) -> np.ndarray:
+        """(n, 3) 视图，列依次为 time, potential, current"""
+        return self._buf[:self._n]
     
     @property
-    def currents(self) -> List[float]:
-        return [p.current for p in self.points]
+    def points(self) -> List[ECDataPoint]:
+        """逐点对象列表（兼容旧接口，按需生成）"""
+        return [ECDataPoint(t, e, i) for t, e, i in self._buf[:self._n].tolist()]
+    
+    def __len__(self) -> int:
+        return self._n
+    
+    def __getitem__(self, index: int) -> ECDataPoint:
+        t, e, i = self._buf[:self._n][index].tolist()
+        return ECDataPoint(t, e, i)
+    
+    # ========================
+    # 写入
+    # ========================
+    
+    def _reserve(self, extra: int) -> None:
+        needed = self._n + extra
+        if needed > len(self._buf):
+            capacity = max(needed, len(self._buf) * 2)
+            buf = np.empty((capacity, 3), dtype=np.float64)
+            buf[:self._n] = self._buf[:self._n]
+            self._buf = buf
+    
+    def append(self, time: float, potential: float, current: float) -> None:
+        """追加一个数据点"""
+        with self._lock:
+            if self._n == len(self._buf):
+                self._reserve(1)
+            self._buf[self._n] = (time, potential, current)
+            self._n += 1
     
     def add_point(self, point: ECDataPoint):
-        self.points.append(point)
+        self.append(point.time, point.potential, point.current)
+    
+    def extend(self, times, potentials, currents) -> None:
+        """批量追加（各列等长，可为标量广播）"""
+        times = np.asarray(times, dtype=np.float64)
+        count = len(times)
+        if count == 0:
+            return
+        with self._lock:
+            self._reserve(count)
+            block = self._buf[self._n:self._n + count]
+            block[:, 0] = times
+            block[:, 1] = potentials
+            block[:, 2] = currents
+            self._n += count
     
     def clear(self):
-        self.points.clear()
+        with self._lock:
+            self._n = 0
+            self._segment_starts = [0]
+    
+    def copy(self) -> "ECDataSet":
+        """深拷贝（紧凑容量）；与写入互斥，得到一致快照"""
+        with self._lock:
+            rows = self._buf[:self._n].copy()
+            starts = list(self._segment_starts)
+        data_set = ECDataSet(self.name, self.technique, self.timestamp,
+                             metadata=dict(self.metadata), capacity=len(rows))
+        data_set._buf[:len(rows)] = rows
+        data_set._n = len(rows)
+        data_set._segment_starts = starts
+        return data_set
+    
+    def __deepcopy__(self, memo) -> "ECDataSet":
+        return self.copy()
+    
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+    
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    # ========================
+    # 分段
+    # ========================
+    
+    def mark_segment(self) -> None:
+        """从下一个数据点开始新的一段"""
+        with self._lock:
+            if self._n > self._segment_starts[-1]:
+                self._segment_starts.append(self._n)
+    
+    def detect_segments(self) -> int:
+        """按电位扫描方向反转自动分段（CV），返回段数"""
+        self._segment_starts = reversal_segment_starts(self.potentials)
+        return self.segment_count
+    
+    @property
+    def segment_count(self) -> int:
+        return len(self._segment_starts) if self._n else 0
+    
+    def segment_bounds(self, index: int) -> Tuple[int, int]:
+        starts = self._segment_starts
+        if index < 0:
+            index += len(starts)
+        start = starts[index]
+        stop = starts[index + 1] if index + 1 < len(starts) else self._n
+        return start, stop
+    
+    def segment(self, index: int) -> np.ndarray:
+        """第 index 段的 (m, 3) 视图"""
+        start, stop = self.segment_bounds(index)
+        return self._buf[start:stop]
+
+
+# ========================
+# DLL 数据增量读取
+# ========================
+
+class DllDataReader:
+    """CHI_getExperimentData 缓冲区的增量读取器
+    
+    ctypes 缓冲区通过 np.frombuffer 映射为 float32 视图，每次轮询只在
+    新增区间内向量化查找数据末尾，不再逐点 ctypes 索引。
+    
+    末尾标记: 缓冲区预填 NaN，DLL 未写入的位置保持 NaN；
+    若 DLL 以 0 填充未用区域，则以连续的 (0, 0) 作为末尾（零电流数据点不算）。
+    缓冲区写满时自动扩容并重新读取，支持超过 65536 点的长时间测量。
+    """
+    
+    DEFAULT_CAPACITY = 65536
+    
+    def __init__(
+        self,
+        fetch: Callable[[Any, Any, int], None],
+        capacity: int = DEFAULT_CAPACITY,
+    ) -> None:
+        """初始化读取器
+        
+        Args:
+            fetch: fetch(x_buf, y_buf, n)，即 CHI_getExperimentData
+            capacity: 初始缓冲区点数
+        """
+        self._fetch = fetch
+        self._count = 0
+        self._allocate(capacity)
+    
+    @property
+    def count(self) -> int:
+        """已读取的点数"""
+        return self._count
+    
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+    
+    def _allocate(self, capacity: int) -> None:
+        import ctypes
+        self._capacity = capacity
+        self.x_buf = (ctypes.c_float * capacity)()
+        self.y_buf = (ctypes.c_float * capacity)()
+        self._x = np.frombuffer(self.x_buf, dtype=np.float32)
+        self._y = np.frombuffer(self.y_buf, dtype=np.float32)
+        self._x.fill(np.nan)
+        self._y.fill(np.nan)
+    
+    def _find_end(self) -> int:
+        """从已读位置起查找数据末尾（窗口逐步放大，开销与新增点数成正比）"""
+        pos = self._count
+        window = 1024
+        while pos < self._capacity:
+            hi = min(pos + window, self._capacity)
+            # 多取一个元素用于判断 "连续两个零点"
+            x = self._x[pos:hi + 1]
+            y = self._y[pos:hi + 1]
+            unused = np.isnan(y)
+            zero = (y == 0.0) & (x == 0.0)
+            # 单个 (0, 0) 可能是真实数据点，后面紧跟未写入/零点时才视为末尾
+            zero[:-1] &= zero[1:] | unused[1:]
+            if hi == self._capacity:
+                zero[-1] = False
+            end_mask = (unused | zero)[:hi - pos]
+            if end_mask.any():
+                return pos + int(end_mask.argmax())
+            pos = hi
+            window *= 4
+        return self._capacity
+    
+    def poll(self) -> Tuple[np.ndarray, np.ndarray]:
+        """读取新增数据
+        
+        Returns:
+            (x, y) 新增点的 float64 数组（可能为空）
+        """
+        start = self._count
+        while True:
+            self._fetch(self.x_buf, self.y_buf, self._capacity)
+            end = self._find_end()
+            if end < self._capacity:
+                break
+            # 缓冲区已满: 扩容后重新读取，已读部分保留
+            old_x, old_y = self._x[:end].copy(), self._y[:end].copy()
+            self._allocate(self._capacity * 2)
+            self._x[:end] = old_x
+            self._y[:end] = old_y
+            self._count = end
+        self._count = end
+        return (self._x[start:end].astype(np.float64),
+                self._y[start:end].astype(np.float64))
 
 
 # ========================
@@ -190,7 +443,7 @@ class MockCHI:
         self._data_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         self._pause_event = threading.Event()
-        self._data_points: List[ECDataPoint] = []
+        self._data = ECDataSet()
     
     def set_parameters(self, params: ECParameters) -> bool:
         self._params = params
@@ -204,7 +457,7 @@ class MockCHI:
         self._running = True
         self._stop_event.clear()
         self._pause_event.set()  # 初始非暂停
-        self._data_points.clear()
+        self._data.clear()
         
         self._data_thread = threading.Thread(
             target=self._generate_mock_data,
@@ -232,7 +485,10 @@ class MockCHI:
         return True
     
     def get_data(self) -> List[ECDataPoint]:
-        return self._data_points.copy()
+        return self._data.points
+    
+    def get_data_set(self) -> ECDataSet:
+        return self._data
     
     def _generate_mock_data(self, callback: Callable = None,
                             complete_callback: Callable = None) -> None:
@@ -271,6 +527,7 @@ class MockCHI:
         
         e_range = params.e_high - params.e_low
         total_time = e_range * params.segments / params.scan_rate
+        last_segment = 0
         
         while t < total_time and not self._stop_event.is_set():
             # 等待暂停结束
@@ -280,6 +537,9 @@ class MockCHI:
             cycle_time = e_range / params.scan_rate
             segment = int(t / cycle_time) % params.segments
             t_in_segment = t % cycle_time
+            if segment != last_segment:
+                self._data.mark_segment()
+                last_segment = segment
             
             if segment % 2 == 0:
                 # 正向扫描
@@ -300,11 +560,10 @@ class MockCHI:
             # 添加噪声
             i += random.gauss(0, 1e-8)
             
-            point = ECDataPoint(time=t, potential=e, current=i)
-            self._data_points.append(point)
+            self._data.append(t, e, i)
             
             if callback:
-                callback(point)
+                callback(ECDataPoint(time=t, potential=e, current=i))
             
             t += dt
             time.sleep(dt)
@@ -331,11 +590,10 @@ class MockCHI:
             # 模拟扩散控制电流
             i = 1e-6 * (1 - math.exp(-t / 5)) + random.gauss(0, 1e-8)
             
-            point = ECDataPoint(time=t, potential=e, current=i)
-            self._data_points.append(point)
+            self._data.append(t, e, i)
             
             if callback:
-                callback(point)
+                callback(ECDataPoint(time=t, potential=e, current=i))
             
             t += dt
             time.sleep(dt)
@@ -361,11 +619,10 @@ class MockCHI:
             else:
                 i = 1e-4
             
-            point = ECDataPoint(time=t, potential=e, current=i)
-            self._data_points.append(point)
+            self._data.append(t, e, i)
             
             if callback:
-                callback(point)
+                callback(ECDataPoint(time=t, potential=e, current=i))
             
             t += dt
             time.sleep(dt)
@@ -390,11 +647,10 @@ class MockCHI:
             
             i = 0.0  # 开路电位时电流为零
             
-            point = ECDataPoint(time=t, potential=e, current=i)
-            self._data_points.append(point)
+            self._data.append(t, e, i)
             
             if callback:
-                callback(point)
+                callback(ECDataPoint(time=t, potential=e, current=i))
             
             t += dt
             time.sleep(dt)
@@ -449,10 +705,11 @@ class CHIInstrument:
         
         self._state = CHIState.DISCONNECTED
         self._params: Optional[ECParameters] = None
-        self._data_points: List[ECDataPoint] = []
+        self._data = ECDataSet()
         
         # 回调
         self._data_callback: Optional[Callable[[ECDataPoint], None]] = None
+        self._batch_callback: Optional[Callable[[np.ndarray, np.ndarray, np.ndarray], None]] = None
         self._complete_callback: Optional[Callable[[], None]] = None
         self._error_callback: Optional[Callable[[Exception], None]] = None
         
@@ -702,14 +959,17 @@ class CHIInstrument:
             if self._state != CHIState.IDLE:
                 return False
             
-            self._data_points.clear()
+            self._data.clear()
             self._state = CHIState.RUNNING
             
             if self._mock_mode and self._mock:
+                # 数据由 MockCHI 列式保存，这里只转发回调
                 def on_data(point: ECDataPoint):
-                    self._data_points.append(point)
                     if self._data_callback:
                         self._data_callback(point)
+                    if self._batch_callback:
+                        self._batch_callback(np.array([point.time]), np.array([point.potential]),
+                                             np.array([point.current]))
                 
                 def on_complete():
                     self._state = CHIState.IDLE
@@ -788,36 +1048,65 @@ class CHIInstrument:
                 return self._mock.get_data()
             if self._use_macro and self._macro_driver:
                 return self._macro_driver.get_data()
-            return self._data_points.copy()
+            return self._data.points
+    
+    def _current_data(self) -> ECDataSet:
+        """当前数据源的列式数据集（不复制）"""
+        if self._mock_mode and self._mock:
+            return self._mock.get_data_set()
+        if self._use_macro and self._macro_driver:
+            return self._macro_driver.get_data_set()
+        return self._data
     
     def get_data_set(self) -> ECDataSet:
-        """获取数据集对象"""
+        """获取数据集对象（列式快照）"""
         from datetime import datetime
         
         technique_name = "CV"
         if self._params:
             technique_name = self._params.technique.name
         
-        data_set = ECDataSet(
-            name=f"EC_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            technique=technique_name,
-            timestamp=datetime.now().isoformat(),
-            points=self.get_data(),
-            metadata={
-                "params": {
-                    "e_init": self._params.e_init if self._params else 0,
-                    "e_high": self._params.e_high if self._params else 0.5,
-                    "e_low": self._params.e_low if self._params else -0.5,
-                    "scan_rate": self._params.scan_rate if self._params else 0.1,
-                }
+        with self._lock:
+            data_set = self._current_data().copy()
+        data_set.name = f"EC_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        data_set.technique = technique_name
+        data_set.timestamp = datetime.now().isoformat()
+        data_set.metadata = {
+            "params": {
+                "e_init": self._params.e_init if self._params else 0,
+                "e_high": self._params.e_high if self._params else 0.5,
+                "e_low": self._params.e_low if self._params else -0.5,
+                "scan_rate": self._params.scan_rate if self._params else 0.1,
             }
-        )
+        }
         return data_set
     
     def on_data(self, callback: Callable[[ECDataPoint], None]) -> None:
-        """注册实时数据回调"""
+        """注册实时数据回调（逐点）"""
         self._data_callback = callback
     
+    def on_data_batch(self, callback: Callable[[np.ndarray, np.ndarray, np.ndarray], None]) -> None:
+        """注册批量数据回调 callback(times, potentials, currents)，每次轮询调用一次"""
+        self._batch_callback = callback
+    
+    def _deliver_batch(self, times: np.ndarray, potentials: np.ndarray,
+                       currents: np.ndarray) -> None:
+        """保存一批新数据并通知回调"""
+        if len(times) == 0:
+            return
+        self._data.extend(times, potentials, currents)
+        if self._batch_callback:
+            try:
+                self._batch_callback(times, potentials, currents)
+            except Exception:
+                pass
+        if self._data_callback:
+            for t, e, i in zip(times.tolist(), potentials.tolist(), currents.tolist()):
+                try:
+                    self._data_callback(ECDataPoint(time=t, potential=e, current=i))
+                except Exception:
+                    pass
+    
     def on_complete(self, callback: Callable[[], None]) -> None:
         """注册测量完成回调"""
         self._complete_callback = callback
@@ -1031,10 +1320,8 @@ class CHIInstrument:
         import ctypes
         
         try:
-            # 预分配数据缓冲区 (与 C# 项目一致, n=65536)
-            n = 65536
-            x_buf = (ctypes.c_float * n)()
-            y_buf = (ctypes.c_float * n)()
+            # 增量读取器 (初始 65536 点, 写满自动扩容)
+            reader = DllDataReader(self._dll.CHI_getExperimentData)
             
             # 启动实验
             success = self._dll.CHI_runExperiment()
@@ -1054,30 +1341,13 @@ class CHIInstrument:
             self._stop_event = threading.Event()
             
             def _poll_data():
-                last_point = 0
                 while not self._stop_event.is_set():
                     # 检查实验是否仍在运行
                     running = self._dll.CHI_experimentIsRunning()
                     
-                    # 读取数据
-                    self._dll.CHI_getExperimentData(x_buf, y_buf, n)
-                    
-                    # 提取新增数据点
-                    i = last_point
-                    while i < n and y_buf[i] != 0.0:
-                        point = ECDataPoint(
-                            time=float(x_buf[i]),
-                            potential=float(x_buf[i]),
-                            current=float(y_buf[i])
-                        )
-                        self._data_points.append(point)
-                        if self._data_callback:
-                            try:
-                                self._data_callback(point)
-                            except Exception:
-                                pass
-                        i += 1
-                    last_point = i
+                    # 读取新增区间并整批投递 (x 同时作为时间和电位)
+                    x, y = reader.poll()
+                    self._deliver_batch(x, x, y)
                     
                     if running != 1:
                         break
@@ -1307,26 +1577,12 @@ class CHIInstrument:
             
             def _poll_bridge_data():
                 while not self._stop_event.is_set():
-                    running = self._bridge.experiment_is_running()
-                    
-                    # 读取数据
-                    data = self._bridge.get_experiment_data(65536)
-                    
-                    # 提取新数据点
-                    new_start = len(self._data_points)
-                    for i in range(new_start, len(data)):
-                        x, y = data[i]
-                        point = ECDataPoint(
-                            time=float(x),
-                            potential=float(x),
-                            current=float(y)
-                        )
-                        self._data_points.append(point)
-                        if self._data_callback:
-                            try:
-                                self._data_callback(point)
-                            except Exception:
-                                pass
+                    # 只取索引 new_start 之后的新数据点
+                    new_start = len(self._data)
+                    running, block = self._bridge.poll_experiment(new_start)
+                    if len(block):
+                        x = block.x.astype(np.float64)
+                        self._deliver_batch(x, x, block.y.astype(np.float64))
                     
                     if not running:
                         break
@@ -1378,8 +1634,8 @@ class CHIInstrument:
         # 注册回调
         def _on_macro_complete():
             self._state = CHIState.IDLE
-            self._data_points = self._macro_driver.get_data()
-            self._log(f"宏实验完成, 获得 {len(self._data_points)} 个数据点")
+            self._data = self._macro_driver.get_data_set()
+            self._log(f"宏实验完成, 获得 {len(self._data)} 个数据点")
             if self._complete_callback:
                 try:
                     self._complete_callback()
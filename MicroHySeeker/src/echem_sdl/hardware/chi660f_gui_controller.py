@@ -32,9 +32,13 @@ import ctypes
 import ctypes.wintypes as wintypes
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable
 from enum import IntEnum
 
+from .chi_tail import ChiOutputTailer
+from ..utils.echem_timing import IMP_MIN_CYCLES, IMP_POINT_OVERHEAD_S
+from ..utils.win32 import LazyDLL, lazy_winfunctype
+
 logger = logging.getLogger(__name__)
 
 
@@ -91,6 +95,11 @@ MACRO_SAVE_BTN_ID = 310     # Save 按钮
 MACRO_TEST_BTN_ID = 1450    # Test 按钮
 MACRO_RUN_ON_OK_ID = 1713   # Run on OK 复选框
 
+# 等待实验完成
+WINDOW_CHECK_INTERVAL = 1.0  # 窗口标题/错误对话框检查间隔 (秒)
+FILE_QUIET_SECONDS = 3.0     # 输出文件停止增长视为写入完成的最短时间 (秒)
+QUIET_POINT_FACTOR = 5.0     # 停止增长判定 = 预期最长点间隔 × 此倍数 (不低于 FILE_QUIET_SECONDS)
+
 
 # ============================================================
 # 数据模型
@@ -219,6 +228,29 @@ class OCPTParams:
     e_low: float = -10.0
 
 
+def quiet_window_seconds(technique: Technique, params) -> Optional[float]:
+    """输出文件停止增长多久可视为测量结束
+    
+    按技术参数估计相邻两个数据点的最长间隔 (CV/LSV: 采样电位间隔 / 扫速,
+    i-t/OCPT: 采样间隔, IMP: 最低频率点的测量时间)，乘以 QUIET_POINT_FACTOR。
+    低频 EIS、慢扫速 CV 等点间隔较长的测量不会因短暂无输出被提前判为完成。
+    
+    Returns:
+        秒数；参数未知时返回 None (不按文件停止增长判定完成)
+    """
+    if params is None:
+        return None
+    if technique in (Technique.CV, Technique.LSV):
+        gap = params.sample_interval / max(params.scan_rate, 1e-9)
+    elif technique in (Technique.IT, Technique.OCPT):
+        gap = params.sample_interval
+    elif technique == Technique.IMP:
+        gap = IMP_MIN_CYCLES / max(params.freq_low, 1e-9) + IMP_POINT_OVERHEAD_S
+    else:
+        return None
+    return max(FILE_QUIET_SECONDS, QUIET_POINT_FACTOR * gap)
+
+
 @dataclass
 class ExperimentConfig:
     """实验配置
@@ -269,8 +301,8 @@ class ExperimentResult:
 # Win32 辅助函数
 # ============================================================
 
-_user32 = ctypes.windll.user32
-_WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
+_user32 = LazyDLL("user32")
+_WNDENUMPROC = lazy_winfunctype(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
 
 
 def _get_window_text(hwnd: int) -> str:
@@ -369,6 +401,36 @@ class MacroBuilder:
         Returns:
             宏命令文本
         """
+        lines = MacroBuilder._header(config)
+        lines.extend(MacroBuilder._block(technique, params, config, output_name))
+        lines.extend(MacroBuilder._footer(config))
+        return "\n".join(lines)
+    
+    @staticmethod
+    def build_batch(items: List[Tuple[Technique, Any]], config: ExperimentConfig,
+                    output_names: Optional[List[str]] = None) -> str:
+        """把多个测量编译进同一段宏命令 (多个 tech/run/save 块)
+        
+        Args:
+            items: [(技术, 参数), ...] 按执行顺序
+            config: 实验配置
+            output_names: 各测量的输出文件名 (留空自动生成, 带序号)
+            
+        Returns:
+            宏命令文本
+        """
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        lines = MacroBuilder._header(config)
+        for k, (technique, params) in enumerate(items):
+            name = output_names[k] if output_names and k < len(output_names) else ""
+            if not name:
+                name = f"{TECHNIQUE_NAMES[technique]}_{stamp}_{k + 1:02d}"
+            lines.extend(MacroBuilder._block(technique, params, config, name))
+        lines.extend(MacroBuilder._footer(config))
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _header(config: ExperimentConfig) -> List[str]:
         lines = []
         
         # 输出目录
@@ -382,10 +444,14 @@ class MacroBuilder:
         # Dummy cell
         if config.use_dummy_cell:
             lines.append("dummyon")
-        
+        return lines
+    
+    @staticmethod
+    def _block(technique: Technique, params, config: ExperimentConfig,
+               output_name: str = "") -> List[str]:
         # 选择技术
         tech_str = TECHNIQUE_NAMES[technique]
-        lines.append(f"tech: {tech_str}")
+        lines = [f"tech: {tech_str}"]
         
         # 技术参数
         if technique == Technique.CV:
@@ -410,12 +476,14 @@ class MacroBuilder:
             lines.append(f"csvsave: {output_name}")
         else:
             lines.append(f"tsave: {output_name}")
-        
+        return lines
+    
+    @staticmethod
+    def _footer(config: ExperimentConfig) -> List[str]:
         # 关闭 dummy cell
         if config.use_dummy_cell:
-            lines.append("dummyoff")
-        
-        return "\n".join(lines)
+            return ["dummyoff"]
+        return []
     
     @staticmethod
     def _cv_params(p: CVParams) -> List[str]:
@@ -517,6 +585,7 @@ class CHI660FController:
         self._main_hwnd: Optional[int] = None
         self._process: Optional[subprocess.Popen] = None
         self._is_running = False
+        self._row_callbacks: List[Callable] = []
         
         # 确保输出目录
         if not self._config.output_dir:
@@ -608,6 +677,17 @@ class CHI660FController:
         self._main_hwnd = None
         logger.info("CHI660F 已关闭")
     
+    def is_healthy(self) -> bool:
+        """已连接且无残留异常对话框（会话池复用前的健康检查）"""
+        return self.is_connected() and self._is_app_healthy()
+    
+    def on_data_rows(self, callback: Callable) -> None:
+        """注册数据行回调 callback(rows)
+        
+        实验进行中输出文件每追加一批数据行回调一次, rows 为 (k, ncols) numpy 数组。
+        """
+        self._row_callbacks.append(callback)
+    
     def is_connected(self) -> bool:
         """检查是否已连接"""
         if not self._main_hwnd:
@@ -638,6 +718,55 @@ class CHI660FController:
         """执行开路电位-时间 (OCPT) 实验"""
         return self._run_experiment(Technique.OCPT, params, output_name)
     
+    def run_batch(self, items: List[Tuple[Technique, Any]],
+                  output_names: Optional[List[str]] = None,
+                  on_item: Optional[Callable[[int, Optional[ExperimentResult]], None]] = None
+                  ) -> List[ExperimentResult]:
+        """批量执行多个测量: 一段宏、一次 Macro 对话框操作
+        
+        同一电池上连续的测量 (如 OCPT → CV → EIS) 或同一技术的多组参数
+        编译为多个 tech/run/save 块，运行中依次跟踪各输出文件 (见 _wait_for_batch)。
+        
+        Args:
+            items: [(技术, 参数), ...] 按执行顺序
+            output_names: 各测量的输出文件名 (留空自动生成)
+            on_item: 第 k 个测量开始时回调 on_item(k, None)，完成时回调 on_item(k, result)
+            
+        Returns:
+            与 items 顺序一致的 ExperimentResult 列表 (elapsed_time 为各测量自身耗时)
+        """
+        if not self.is_connected():
+            return [ExperimentResult(success=False,
+                                     technique=TECHNIQUE_NAMES[t],
+                                     error_message="未连接到 CHI660F，请先调用 launch()")
+                    for t, _ in items]
+        if not items:
+            return []
+        
+        macro_text = MacroBuilder.build_batch(items, self._config, output_names)
+        logger.info(f"生成批量宏命令 ({len(items)} 个测量):\n{macro_text}")
+        
+        results = [ExperimentResult(technique=TECHNIQUE_NAMES[t]) for t, _ in items]
+        files = self._extract_output_files(macro_text)
+        if len(files) != len(items):
+            for result in results:
+                result.error_message = "批量宏输出文件与测量个数不符"
+            return results
+        
+        # 运行前开始跟踪各输出文件 (忽略上次遗留的同名文件)
+        tailers = [ChiOutputTailer(path) for path in files]
+        timeout = self._config.timeout * len(items)
+        
+        # 执行宏: 超时按测量个数放宽，依次等待各输出文件写完 (不依据窗口标题，
+        # 标题在第一个测量结束时就可能变化)
+        batch = self._execute_macro_text(
+            macro_text, timeout=timeout, use_title=False,
+            wait=lambda: self._wait_for_batch(items, tailers, results, timeout, on_item))
+        for result in results:
+            if not result.success and not result.error_message:
+                result.error_message = batch.error_message or "未生成数据文件"
+        return results
+    
     def run_custom_macro(self, macro_text: str) -> ExperimentResult:
         """执行自定义宏命令
         
@@ -670,14 +799,26 @@ class CHI660FController:
         logger.info(f"生成宏命令 ({TECHNIQUE_NAMES[technique]}):\n{macro_text}")
         
         # 执行宏
-        result = self._execute_macro_text(macro_text)
+        result = self._execute_macro_text(macro_text, quiet_window_seconds(technique, params))
         result.technique = TECHNIQUE_NAMES[technique]
         
         return result
     
-    def _execute_macro_text(self, macro_text: str) -> ExperimentResult:
+    def _execute_macro_text(self, macro_text: str,
+                            quiet_seconds: Optional[float] = None,
+                            timeout: Optional[float] = None,
+                            use_title: bool = True,
+                            wait: Optional[Callable[[], bool]] = None) -> ExperimentResult:
         """通过 Macro Command 对话框执行宏命令
         
+        Args:
+            macro_text: 宏命令文本
+            quiet_seconds: 输出文件停止增长多久视为完成 (见 quiet_window_seconds)，
+                None 时只按文件尾/窗口标题判定
+            timeout: 最长等待时间 (秒)，默认 config.timeout
+            use_title: 是否以主窗口标题变化判定完成 (批量宏关闭)
+            wait: 自定义完成等待 (批量宏逐个跟踪输出文件)，给出时不再跟踪单一输出文件
+        
         工作流:
             1. WM_COMMAND 32799 → 打开对话框
             2. 查找 Edit(308) → 填入宏文本
@@ -719,8 +860,13 @@ class CHI660FController:
             
             logger.info(f"宏命令已填写 ({len(filled)} 字符)")
             
-            # 3. 推算预期输出文件
-            expected_file = self._extract_output_file(macro_text)
+            # 3. 推算预期输出文件，运行前开始跟踪 (忽略上次遗留的同名文件)
+            output_files = self._extract_output_files(macro_text) if wait is None else []
+            expected_file = output_files[-1] if output_files else None
+            tailer = ChiOutputTailer(expected_file) if expected_file else None
+            if tailer is not None:
+                for callback in self._row_callbacks:
+                    tailer.subscribe(callback)
             
             # 4. 点击 Run Macro
             run_btn = _find_child_by_id(macro_hwnd, MACRO_RUN_BTN_ID)
@@ -734,15 +880,24 @@ class CHI660FController:
             
             # 5. 等待实验完成
             self._is_running = True
-            success = self._wait_for_completion(expected_file)
+            if wait is not None:
+                success = wait()
+            else:
+                success = self._wait_for_completion(expected_file, tailer, quiet_seconds,
+                                                    timeout, use_title)
             self._is_running = False
             
             if success:
                 result.success = True
                 result.data_file = expected_file or ""
                 
-                # 6. 读取数据
-                if expected_file and os.path.isfile(expected_file):
+                # 6. 读取数据 (运行中已增量解析)
+                if tailer is not None and tailer.count:
+                    parsed = tailer.output
+                    result.headers = parsed.headers
+                    result.data_points = parsed.rows
+                    logger.info(f"数据读取完成: {len(parsed)} 点, 列={parsed.headers}")
+                elif expected_file and os.path.isfile(expected_file):
                     headers, data = self._parse_csv(expected_file)
                     result.headers = headers
                     result.data_points = data
@@ -827,49 +982,51 @@ class CHI660FController:
     # 等待实验完成
     # ----------------------------------------------------------
     
-    def _wait_for_completion(self, expected_file: Optional[str]) -> bool:
+    def _wait_for_completion(self, expected_file: Optional[str],
+                             tailer: Optional[ChiOutputTailer] = None,
+                             quiet_seconds: Optional[float] = None,
+                             timeout: Optional[float] = None,
+                             use_title: bool = True) -> bool:
         """等待实验完成
         
         检测方式:
-            1. 如果有预期输出文件，检测文件是否生成
-            2. 检测主窗口标题变化 (Data 出现)
-            3. 超时退出
+            1. 增量解析预期输出文件，出现文件尾或数据停止增长 quiet_seconds 即完成
+            2. 检测主窗口标题变化 (Data 出现)；use_title=False 时不采用
+            3. 超时退出 (timeout 默认 config.timeout)
         """
-        timeout = self._config.timeout
+        timeout = timeout or self._config.timeout
         start = time.time()
-        last_size = -1
-        stable_count = 0
+        if tailer is None and expected_file:
+            tailer = ChiOutputTailer(expected_file)
         
         logger.info(f"等待实验完成 (超时={timeout}s)...")
         
         while time.time() - start < timeout:
-            time.sleep(1.0)
+            # 方式1: 跟踪输出文件 (两次窗口检查之间按短间隔轮询文件)
+            if tailer is not None:
+                if tailer.follow(timeout=WINDOW_CHECK_INTERVAL,
+                                 quiet_seconds=quiet_seconds):
+                    logger.info(f"输出文件已完成: {expected_file} ({tailer.count} 点)")
+                    return True
+            else:
+                time.sleep(WINDOW_CHECK_INTERVAL)
             
             # 检查错误对话框
             self._dismiss_error_dialogs()
             
-            # 方式1: 检查输出文件
-            if expected_file:
-                if os.path.isfile(expected_file):
-                    size = os.path.getsize(expected_file)
-                    if size > 0:
-                        if size == last_size:
-                            stable_count += 1
-                            if stable_count >= 3:
-                                # 文件大小稳定3秒，表示写入完成
-                                logger.info(f"输出文件已生成: {expected_file} ({size} bytes)")
-                                return True
-                        else:
-                            stable_count = 0
-                        last_size = size
-            
             # 方式2: 检查窗口标题 (实验完成后标题可能变化)
-            if self._main_hwnd:
+            if use_title and self._main_hwnd:
                 title = _get_window_text(self._main_hwnd)
                 # 有些技术完成后标题会包含数据文件信息
                 if 'Data' in title or '.bin' in title:
                     logger.info(f"检测到标题变化: {title}")
-                    time.sleep(2)  # 额外等待数据写入
+                    if tailer is not None:
+                        # 读完剩余数据 (文件短暂不再增长即止)
+                        tailer.follow(timeout=2.0 * FILE_QUIET_SECONDS,
+                                      quiet_seconds=FILE_QUIET_SECONDS)
+                        tailer.poll(final=True)
+                    else:
+                        time.sleep(2)  # 额外等待数据写入
                     return True
             
             elapsed = time.time() - start
@@ -879,6 +1036,62 @@ class CHI660FController:
         logger.warning(f"实验等待超时 ({timeout}s)")
         return False
     
+    def _wait_for_batch(self, items: List[Tuple[Technique, Any]],
+                        tailers: List[ChiOutputTailer],
+                        results: List[ExperimentResult],
+                        timeout: float,
+                        on_item: Optional[Callable[[int, Optional[ExperimentResult]], None]] = None
+                        ) -> bool:
+        """依次跟踪批量宏各测量的输出文件
+        
+        第 k 个输出文件出现文件尾、停止增长 quiet_window_seconds，或第 k+1 个输出文件
+        开始写入时，视第 k 个测量完成: 填入 results[k] (数据、自身耗时) 后回调
+        on_item(k, result)，随即回调 on_item(k+1, None)。实时数据行回调只订阅
+        正在执行的测量的文件。
+        
+        Returns:
+            是否全部测量在超时前完成
+        """
+        deadline = time.time() + timeout
+        for k, ((technique, params), tailer) in enumerate(zip(items, tailers)):
+            following = tailers[k + 1] if k + 1 < len(tailers) else None
+            is_done = (lambda nxt=following: nxt.written) if following is not None else None
+            quiet = quiet_window_seconds(technique, params)
+            for callback in self._row_callbacks:
+                tailer.subscribe(callback)
+            if on_item is not None:
+                on_item(k, None)
+            
+            item_start = time.time()
+            done = False
+            try:
+                while not done and time.time() < deadline:
+                    done = tailer.follow(is_done=is_done, timeout=WINDOW_CHECK_INTERVAL,
+                                         quiet_seconds=quiet)
+                    if not done:
+                        self._dismiss_error_dialogs()
+            finally:
+                for callback in self._row_callbacks:
+                    tailer.unsubscribe(callback)
+            
+            result = results[k]
+            result.elapsed_time = time.time() - item_start
+            if done and tailer.count:
+                parsed = tailer.output
+                result.success = True
+                result.data_file = tailer.path
+                result.headers = parsed.headers
+                result.data_points = parsed.rows
+                logger.info(f"批量测量 {k + 1}/{len(items)} 完成: {tailer.path} ({tailer.count} 点)")
+            else:
+                result.error_message = "数据文件为空" if done else "实验执行超时或失败"
+            if on_item is not None:
+                on_item(k, result)
+            if not done:
+                logger.warning(f"批量测量 {k + 1}/{len(items)} 等待超时 ({timeout}s)")
+                return False
+        return True
+    
     # ----------------------------------------------------------
     # 辅助方法
     # ----------------------------------------------------------
@@ -976,9 +1189,15 @@ class CHI660FController:
                     time.sleep(0.3)
     
     def _extract_output_file(self, macro_text: str) -> Optional[str]:
-        """从宏命令文本中提取预期输出文件路径"""
+        """从宏命令文本中提取预期输出文件路径 (多个时取第一个)"""
+        files = self._extract_output_files(macro_text)
+        return files[0] if files else None
+    
+    def _extract_output_files(self, macro_text: str) -> List[str]:
+        """从宏命令文本中按顺序提取全部预期输出文件路径"""
         import re
         
+        files = []
         # 查找 csvsave: 或 tsave: 命令
         for line in macro_text.split('\n'):
             line = line.strip()
@@ -987,16 +1206,17 @@ class CHI660FController:
                 name = m.group(1).strip()
                 if not name.endswith('.csv'):
                     name += '.csv'
-                return os.path.join(self._config.output_dir, name)
+                files.append(os.path.join(self._config.output_dir, name))
+                continue
             
             m = re.match(r'tsave:\s*(.+)', line, re.IGNORECASE)
             if m:
                 name = m.group(1).strip()
                 if not name.endswith('.txt'):
                     name += '.txt'
-                return os.path.join(self._config.output_dir, name)
+                files.append(os.path.join(self._config.output_dir, name))
         
-        return None
+        return files
     
     def _parse_csv(self, filepath: str) -> Tuple[List[str], List[List[float]]]:
         """解析 CHI 660F CSV 输出文件
@@ -1007,47 +1227,18 @@ class CHI660FController:
             3. 列名行 (如 "Potential/V, Current/A")
             4. 空行 (可能有)
             5. 数据行 (数值, 数值, ...)
+        
+        数值块由共用解析器批量转换 (见 chi_output)。
         """
-        headers = []
-        data = []
-        metadata = {}
+        from .chi_output import parse_chi_output
         
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-                in_data = False
-                prev_line = ""
-                
-                for line in f:
-                    line = line.strip()
-                    
-                    if not in_data:
-                        # 检测列名行 (包含 "/" 和 ","，如 "Potential/V, Current/A")
-                        if '/' in line and ',' in line:
-                            parts = [h.strip() for h in line.split(',')]
-                            if any('/' in p for p in parts):
-                                headers = parts
-                                in_data = True
-                                continue
-                        
-                        # 提取元数据
-                        if '=' in line:
-                            k, _, v = line.partition('=')
-                            metadata[k.strip()] = v.strip()
-                        continue
-                    
-                    if not line:
-                        continue
-                    
-                    # 解析数据行
-                    parts = line.split(',')
-                    try:
-                        row = [float(x.strip()) for x in parts if x.strip()]
-                        if row:
-                            data.append(row)
-                    except ValueError:
-                        # 可能遇到 Segment 分隔行等
-                        continue
+        headers: List[str] = []
+        data: List[List[float]] = []
+        metadata: Dict[str, str] = {}
         
+        try:
+            parsed = parse_chi_output(filepath)
+            headers, data, metadata = parsed.headers, parsed.rows, parsed.metadata
         except Exception as e:
             logger.error(f"CSV 解析失败: {e}")
         
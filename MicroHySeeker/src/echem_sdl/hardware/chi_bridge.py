@@ -3,14 +3,23 @@
 由于 libec.dll 是32位DLL，在64位Python中无法直接加载，
 本模块通过启动一个32位 .NET 进程来桥接通信。
 
-通信协议：
+通信协议（启动时为文本协议）：
 - Python 通过 stdin 发送命令行
 - 32位进程通过 stdout 返回结果
 - 命令格式: COMMAND [args...]
 - 响应格式: OK [data...] 或 ERROR [message]
 
+二进制帧协议（PROTOCOL BINARY1 → OK BINARY1 后双方切换）：
+- 请求帧: <uint32 seq><uint32 len> + UTF-8 命令文本
+- 响应帧: <uint8 kind><uint32 seq><uint32 len> + 负载
+    kind=0 文本: 负载为 "OK ..." / "ERROR ..."
+    kind=1 数据: <uint32 start><uint32 total> + n×(x, y) float32 小端
+- 响应带 seq，可连续提交多个请求（流水线），由常驻读线程分派
+- 旧版桥接不认识 PROTOCOL 命令时自动保持文本协议
+
 支持的桥接命令:
 - PING → PONG
+- PROTOCOL BINARY1 → OK BINARY1
 - HAS_TECHNIQUE <id> → OK 0|1
 - SET_TECHNIQUE <id> → OK
 - SET_PARAMETER <name> <value> → OK
@@ -19,6 +28,7 @@
 - IS_RUNNING → OK 0|1
 - GET_ERROR → OK <error_string>
 - GET_DATA <n> → OK <count> <x1,y1> <x2,y2> ...
+- GET_DATA_SINCE <start> <max> → 数据帧 (仅二进制协议)
 - CLOSE_COM → OK COM_CLOSED
 - RESET → OK RESET
 - INIT_SYSTEM → OK INITIALIZED
@@ -27,19 +37,102 @@
 - EXIT → BRIDGE_EXIT
 """
 
+import io
 import subprocess
 import os
+import struct
 import sys
 import threading
 import time
 import logging
-from typing import Optional, Tuple, List
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, List, Union
 from pathlib import Path
 
+import numpy as np
+
 
 logger = logging.getLogger(__name__)
 
 
+# ========================
+# 二进制帧协议
+# ========================
+
+PROTOCOL_BINARY = "BINARY1"
+
+REQUEST_HEADER = struct.Struct("<II")     # seq, len
+RESPONSE_HEADER = struct.Struct("<BII")   # kind, seq, len
+DATA_HEADER = struct.Struct("<II")        # start, total
+
+FRAME_TEXT = 0
+FRAME_DATA = 1
+
+# 文本协议中有效响应行的前缀（其余为 Qt 警告等噪声）
+_TEXT_RESPONSES = ("OK", "ERROR", "PONG", "BRIDGE_EXIT")
+
+
+@dataclass
+class DataBlock:
+    """GET_DATA_SINCE 返回的数据块
+    
+    Attributes:
+        start: 首点在整个实验数据中的索引
+        total: 桥接端当前已采集的总点数
+        xy: (n, 2) float32 数组，列为 x, y
+    """
+    start: int
+    total: int
+    xy: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.xy)
+    
+    @property
+    def x(self) -> np.ndarray:
+        return self.xy[:, 0]
+    
+    @property
+    def y(self) -> np.ndarray:
+        return self.xy[:, 1]
+
+
+class BridgeRequest:
+    """已提交、等待响应的桥接请求"""
+    
+    __slots__ = ("seq", "command", "_event", "_response", "_error")
+    
+    def __init__(self, seq: int, command: str):
+        self.seq = seq
+        self.command = command
+        self._event = threading.Event()
+        self._response: Union[str, DataBlock, None] = None
+        self._error: Optional[Exception] = None
+    
+    def _resolve(self, response) -> None:
+        self._response = response
+        self._event.set()
+    
+    def _fail(self, error: Exception) -> None:
+        self._error = error
+        self._event.set()
+    
+    def done(self) -> bool:
+        return self._event.is_set()
+    
+    def result(self, timeout: Optional[float] = None) -> Union[str, DataBlock]:
+        """等待并返回响应
+        
+        Raises:
+            RuntimeError: 超时或桥接断开
+        """
+        if not self._event.wait(timeout):
+            raise RuntimeError(f"桥接响应超时 (命令: {self.command})")
+        if self._error is not None:
+            raise self._error
+        return self._response
+
+
 class CHIBridge32:
     """通过 32 位子进程桥接 libec.dll 调用
     
@@ -64,6 +157,7 @@ class CHIBridge32:
         dll_dir: Optional[str] = None,
         qt_dll_dir: Optional[str] = None,
         timeout: float = 30.0,
+        interpreter: Optional[str] = None,
     ):
         """初始化桥接器
         
@@ -72,15 +166,27 @@ class CHIBridge32:
             dll_dir: libec.dll 所在目录
             qt_dll_dir: Qt4 DLL 所在目录（QtCore4.dll 等）
             timeout: 命令超时时间（秒）
+            interpreter: 桥接为脚本时的解释器路径（如测试用的 Python 假桥接）
         """
         self._bridge_exe = bridge_exe_path
         self._dll_dir = dll_dir
         self._qt_dll_dir = qt_dll_dir
         self._timeout = timeout
+        self._interpreter = interpreter
         self._process: Optional[subprocess.Popen] = None
         self._lock = threading.Lock()
         self._started = False
         
+        # 会话: 常驻读线程 + 按 seq 等待的请求
+        self._framed = False
+        self._seq = 0
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: Dict[int, BridgeRequest] = {}
+        self._ready = threading.Event()
+        self._stdout: Optional[io.BufferedReader] = None
+        self._reader: Optional[threading.Thread] = None
+        
         # 自动查找路径
         if not self._bridge_exe:
             self._bridge_exe = self._find_bridge_exe()
@@ -144,6 +250,11 @@ class CHIBridge32:
         """桥接进程是否运行中"""
         return self._started and self._process is not None and self._process.poll() is None
     
+    @property
+    def framed(self) -> bool:
+        """是否已切换到二进制帧协议"""
+        return self._framed
+    
     def start(self) -> bool:
         """启动32位桥接进程
         
@@ -163,7 +274,7 @@ class CHIBridge32:
                 if self._qt_dll_dir and self._qt_dll_dir != self._dll_dir:
                     path_dirs.append(self._qt_dll_dir)
                 if path_dirs:
-                    env["PATH"] = ";".join(path_dirs) + ";" + env.get("PATH", "")
+                    env["PATH"] = os.pathsep.join(path_dirs) + os.pathsep + env.get("PATH", "")
                 
                 # 工作目录设为 DLL 所在目录
                 cwd = self._dll_dir or os.path.dirname(self._bridge_exe)
@@ -171,8 +282,11 @@ class CHIBridge32:
                 logger.info(f"启动 CHI 桥接: {self._bridge_exe} bridge")
                 logger.info(f"工作目录: {cwd}")
                 
+                args = [self._bridge_exe, "bridge"]
+                if self._interpreter:
+                    args.insert(0, self._interpreter)
                 self._process = subprocess.Popen(
-                    [self._bridge_exe, "bridge"],
+                    args,
                     stdin=subprocess.PIPE,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
@@ -182,22 +296,41 @@ class CHIBridge32:
                     creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0,
                 )
                 
+                # 常驻读线程: 整个会话只有这一个线程读 stdout
+                self._framed = False
+                self._seq = 0
+                self._pending.clear()
+                self._ready.clear()
+                self._stdout = io.BufferedReader(self._process.stdout)
+                self._reader = threading.Thread(
+                    target=self._reader_loop, name="CHIBridge32-reader", daemon=True
+                )
+                self._reader.start()
+                threading.Thread(
+                    target=self._drain_stderr, name="CHIBridge32-stderr", daemon=True
+                ).start()
+                
                 # 等待 BRIDGE_READY（跳过Qt警告等非协议输出）
-                max_attempts = 10
-                for _ in range(max_attempts):
-                    ready_line = self._read_line(timeout=15.0)
-                    if ready_line and "BRIDGE_READY" in ready_line:
-                        self._started = True
-                        logger.info("CHI 桥接已就绪")
-                        return True
-                    elif ready_line:
-                        logger.debug(f"桥接启动时跳过: {ready_line}")
-                    else:
-                        break
+                if not self._ready.wait(timeout=15.0):
+                    logger.error(f"桥接启动失败: 未收到 BRIDGE_READY")
+                    self._kill_process()
+                    return False
+                self._started = True
+                logger.info("CHI 桥接已就绪")
                 
-                logger.error(f"桥接启动失败: 未收到 BRIDGE_READY")
-                self._kill_process()
-                return False
+                # 协商二进制帧协议；旧版桥接不支持时保持文本协议
+                request = self.submit(f"PROTOCOL {PROTOCOL_BINARY}")
+                try:
+                    ok, data = self._parse_response(request.result(min(self._timeout, 5.0)))
+                except RuntimeError:
+                    ok, data = False, ""
+                    with self._pending_lock:
+                        self._pending.pop(request.seq, None)
+                if ok and data == PROTOCOL_BINARY:
+                    logger.info("CHI 桥接使用二进制帧协议")
+                else:
+                    logger.info("CHI 桥接不支持二进制帧协议，使用文本协议")
+                return True
                     
             except FileNotFoundError:
                 logger.error(f"找不到桥接程序: {self._bridge_exe}")
@@ -229,6 +362,42 @@ class CHIBridge32:
                 pass
             self._process = None
     
+    # ========================
+    # 请求 / 响应
+    # ========================
+    
+    def submit(self, command: str) -> "BridgeRequest":
+        """发送命令但不等待响应（流水线）
+        
+        可连续提交多个命令，再依次调用 BridgeRequest.result() 取回响应；
+        桥接按提交顺序处理，往返延迟只付一次。
+        
+        Raises:
+            RuntimeError: 桥接未启动或通信失败
+        """
+        if not self.is_running:
+            raise RuntimeError("CHI 桥接未启动")
+        
+        with self._write_lock:
+            self._seq = (self._seq + 1) & 0xFFFFFFFF
+            request = BridgeRequest(self._seq, command)
+            if self._framed:
+                body = command.encode("utf-8")
+                data = REQUEST_HEADER.pack(request.seq, len(body)) + body
+            else:
+                data = (command + "\n").encode("utf-8")
+            with self._pending_lock:
+                self._pending[request.seq] = request
+            try:
+                self._process.stdin.write(data)
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                with self._pending_lock:
+                    self._pending.pop(request.seq, None)
+                self._started = False
+                raise RuntimeError(f"桥接通信断开: {e}")
+        return request
+    
     def _send_command(self, command: str) -> str:
         """发送命令并读取响应
         
@@ -241,51 +410,82 @@ class CHIBridge32:
         Raises:
             RuntimeError: 桥接未启动或通信失败
         """
-        if not self.is_running:
-            raise RuntimeError("CHI 桥接未启动")
-        
-        try:
-            cmd_bytes = (command + "\n").encode("utf-8")
-            self._process.stdin.write(cmd_bytes)
-            self._process.stdin.flush()
-            
-            response = self._read_line(timeout=self._timeout)
-            if response is None:
-                raise RuntimeError(f"桥接响应超时 (命令: {command})")
-            return response
-            
-        except (BrokenPipeError, OSError) as e:
-            self._started = False
-            raise RuntimeError(f"桥接通信断开: {e}")
+        response = self.submit(command).result(self._timeout)
+        if not isinstance(response, str):
+            raise RuntimeError(f"桥接响应类型错误 (命令: {command})")
+        return response
     
-    def _read_line(self, timeout: float = None) -> Optional[str]:
-        """从子进程读取一行（带超时）"""
-        timeout = timeout or self._timeout
-        
-        import select
-        if sys.platform == "win32":
-            # Windows: 使用线程读取（无 select）
-            result = [None]
-            
-            def _read():
-                try:
-                    line = self._process.stdout.readline()
+    def _reader_loop(self):
+        """常驻读线程: 解析文本行或二进制帧并分派给等待中的请求"""
+        try:
+            while True:
+                if self._framed:
+                    header = self._read_exact(RESPONSE_HEADER.size)
+                    if header is None:
+                        break
+                    kind, seq, length = RESPONSE_HEADER.unpack(header)
+                    payload = self._read_exact(length)
+                    if payload is None:
+                        break
+                    if kind == FRAME_DATA:
+                        start, total = DATA_HEADER.unpack_from(payload)
+                        # 整块 float32 直接映射 (x, y) 两列，无文本解析
+                        xy = np.frombuffer(payload, dtype="<f4", offset=DATA_HEADER.size)
+                        response = DataBlock(start, total, xy.reshape(-1, 2))
+                    else:
+                        response = payload.decode("utf-8", errors="replace").strip()
+                    with self._pending_lock:
+                        request = self._pending.pop(seq, None)
+                    if request is not None:
+                        request._resolve(response)
+                    continue
+                
+                raw = self._stdout.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace").strip()
+                if "BRIDGE_READY" in line:
+                    self._ready.set()
+                    continue
+                if not line.startswith(_TEXT_RESPONSES):
                     if line:
-                        result[0] = line.decode("utf-8", errors="replace").strip()
-                except Exception:
-                    pass
-            
-            reader = threading.Thread(target=_read, daemon=True)
-            reader.start()
-            reader.join(timeout=timeout)
-            return result[0]
-        else:
-            # Unix: 使用 select
-            ready, _, _ = select.select([self._process.stdout], [], [], timeout)
-            if ready:
-                line = self._process.stdout.readline()
-                return line.decode("utf-8", errors="replace").strip()
+                        logger.debug(f"桥接输出跳过: {line}")
+                    continue
+                # 文本协议按提交顺序一问一答
+                with self._pending_lock:
+                    request = self._pending.pop(next(iter(self._pending)), None) if self._pending else None
+                if request is None:
+                    logger.debug(f"桥接多余响应: {line}")
+                    continue
+                if request.command == f"PROTOCOL {PROTOCOL_BINARY}" and line == f"OK {PROTOCOL_BINARY}":
+                    # 之后的字节均为帧，必须在读下一行之前切换
+                    self._framed = True
+                request._resolve(line)
+        except Exception as e:
+            logger.error(f"桥接读线程异常: {e}")
+        finally:
+            self._started = False
+            with self._pending_lock:
+                pending = list(self._pending.values())
+                self._pending.clear()
+            for request in pending:
+                request._fail(RuntimeError("桥接进程已退出"))
+    
+    def _read_exact(self, size: int) -> Optional[bytes]:
+        """读取恰好 size 字节，EOF 返回 None"""
+        data = self._stdout.read(size) if size else b""
+        if data is None or len(data) < size:
             return None
+        return data
+    
+    def _drain_stderr(self):
+        """持续读取 stderr，防止管道写满阻塞桥接进程"""
+        process = self._process
+        try:
+            for raw in iter(process.stderr.readline, b""):
+                logger.debug(f"桥接 stderr: {raw.decode('utf-8', errors='replace').strip()}")
+        except Exception:
+            pass
     
     def _parse_response(self, response: str) -> Tuple[bool, str]:
         """解析响应
@@ -369,22 +569,54 @@ class CHIBridge32:
         Returns:
             list of (x, y) tuples
         """
-        response = self._send_command(f"GET_DATA {n}")
+        block = self.get_data_since(0, n)
+        return [tuple(p) for p in block.xy.tolist()]
+    
+    def get_data_since(self, start: int, max_points: int = 65536) -> DataBlock:
+        """增量获取实验数据: 只返回索引 start 之后的新点
+        
+        二进制协议下桥接直接发送 float32 数据帧；文本协议下退化为
+        GET_DATA 全量读取后切片。
+        """
+        return self.finish_data_since(self.submit_data_since(start, max_points), start)
+    
+    def submit_data_since(self, start: int, max_points: int = 65536) -> BridgeRequest:
+        """提交增量数据请求（流水线用，配合 finish_data_since）"""
+        if self._framed:
+            return self.submit(f"GET_DATA_SINCE {start} {max_points}")
+        return self.submit(f"GET_DATA {start + max_points}")
+    
+    def finish_data_since(self, request: BridgeRequest, start: int) -> DataBlock:
+        """等待增量数据请求并返回 DataBlock"""
+        response = request.result(self._timeout)
+        if isinstance(response, DataBlock):
+            return response
+        
+        # 文本协议: "OK <count> x1,y1 x2,y2 ..."
         ok, data = self._parse_response(response)
+        empty = DataBlock(start, start, np.empty((0, 2), dtype=np.float32))
         if not ok:
-            return []
+            return empty
+        head, _, body = data.partition(" ")
+        if not head:
+            return empty
+        count = int(head)
+        values = np.array(body.replace(",", " ").split(), dtype=np.float64)
+        xy = values[:2 * (len(values) // 2)].reshape(-1, 2)[:count]
+        return DataBlock(start, count, xy[start:])
+    
+    def poll_experiment(self, start: int, max_points: int = 65536) -> Tuple[bool, DataBlock]:
+        """查询运行状态并增量获取数据
         
-        parts = data.split()
-        if not parts:
-            return []
+        两个请求流水线提交，只等待一次往返。
         
-        count = int(parts[0])
-        points = []
-        for i in range(1, min(len(parts), count + 1)):
-            xy = parts[i].split(",")
-            if len(xy) == 2:
-                points.append((float(xy[0]), float(xy[1])))
-        return points
+        Returns:
+            (是否仍在运行, 索引 start 之后的新数据)
+        """
+        status = self.submit("IS_RUNNING")
+        request = self.submit_data_since(start, max_points)
+        ok, data = self._parse_response(status.result(self._timeout))
+        return ok and data.strip() == "1", self.finish_data_since(request, start)
     
     def close_com(self):
         """关闭串口（重要！防止端口冲突）"""
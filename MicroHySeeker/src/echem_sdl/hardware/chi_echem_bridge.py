@@ -17,14 +17,23 @@ CHI 660F 电化学桥接层 —— ECSettings ↔ CHI660FController
     r1 = bridge.run(ECSettings(technique=ECTechnique.CV, ...))
     r2 = bridge.run(ECSettings(technique=ECTechnique.LSV, ...))
     bridge.disconnect()
+
+    # 方式3: 会话池（跨步骤 / 跨组合保持 CHI 660F 常驻）
+    bridge = acquire_bridge(CHIBridgeConfig(...))
+    result = bridge.run(ec)
+    release_bridge(bridge, healthy=result.success)
 """
 
 import logging
-from typing import Optional, Tuple, Any
+from typing import Optional, Tuple, Any, List, Callable
 from dataclasses import dataclass
 
+import numpy as np
+
 from src.models import ECSettings, ECTechnique
 
+from .chi_output import technique_columns
+from .chi_session import get_session_pool
 from .chi660f_gui_controller import (
     CHI660FController,
     ExperimentConfig,
@@ -35,6 +44,7 @@ from .chi660f_gui_controller import (
     IMPParams,
     OCPTParams,
     Technique,
+    TECHNIQUE_NAMES,
 )
 
 logger = logging.getLogger(__name__)
@@ -171,6 +181,9 @@ class CHIBridge:
         self._config = config or CHIBridgeConfig()
         self._controller: Optional[CHI660FController] = None
         self._connected = False
+        # 实时数据: (宏技术名, 回调)，仅在 run()/run_batch() 期间有效
+        self._live: Optional[Tuple[str, Callable]] = None
+        self._live_rows = 0
 
     @property
     def is_connected(self) -> bool:
@@ -178,6 +191,10 @@ class CHIBridge:
                 and self._controller is not None
                 and self._controller.is_connected())
 
+    def is_healthy(self) -> bool:
+        """已连接且 CHI 660F 无残留异常对话框"""
+        return self.is_connected and self._controller.is_healthy()
+
     def connect(self) -> bool:
         """启动并连接 CHI 660F
 
@@ -191,6 +208,7 @@ class CHIBridge:
             timeout=self._config.timeout,
         )
         self._controller = CHI660FController(exp_config)
+        self._controller.on_data_rows(self._on_rows)
 
         ok = self._controller.launch(force_restart=self._config.force_restart)
         self._connected = ok
@@ -208,12 +226,32 @@ class CHIBridge:
         self._connected = False
         logger.info("CHIBridge: 已断开")
 
-    def run(self, ec_settings: ECSettings, output_name: str = "") -> ExperimentResult:
+    def _on_rows(self, rows: np.ndarray):
+        """控制器数据行回调 → (time, potential, current) 块转发给实时回调"""
+        live = self._live
+        if live is None:
+            return
+        tech, callback = live
+        t, e, i = technique_columns(tech, rows, self._live_rows)
+        self._live_rows += len(rows)
+        try:
+            callback(np.column_stack((t, e, i)))
+        except Exception as ex:
+            logger.warning(f"CHIBridge: 实时数据回调异常: {ex}")
+
+    def _begin_live(self, technique: Technique, on_data: Optional[Callable]):
+        self._live = (TECHNIQUE_NAMES[technique], on_data) if on_data else None
+        self._live_rows = 0
+
+    def run(self, ec_settings: ECSettings, output_name: str = "",
+            on_data: Optional[Callable] = None) -> ExperimentResult:
         """根据 ECSettings 运行电化学实验
 
         Args:
             ec_settings: UI 层的 ECSettings
             output_name: 输出文件名 (不含后缀, 留空自动生成)
+            on_data: 实时数据回调 on_data(block)，block 为新增的
+                (k, 3) 数组 (time, potential, current)，在控制器线程中调用
 
         Returns:
             ExperimentResult
@@ -252,7 +290,11 @@ class CHIBridge:
         if hasattr(ec_settings, 'use_dummy_cell'):
             self._controller._config.use_dummy_cell = ec_settings.use_dummy_cell
         
-        result = run_fn(params, output_name)
+        self._begin_live(technique, on_data)
+        try:
+            result = run_fn(params, output_name)
+        finally:
+            self._live = None
 
         if result.success:
             logger.info(
@@ -264,6 +306,51 @@ class CHIBridge:
 
         return result
 
+    def run_batch(self, ec_list: List[ECSettings],
+                  output_names: Optional[List[str]] = None,
+                  on_data: Optional[Callable] = None,
+                  on_item: Optional[Callable[[int, Optional[ExperimentResult]], None]] = None
+                  ) -> List[ExperimentResult]:
+        """把多个 ECSettings 编译进同一段宏依次执行
+
+        省去每个测量单独打开 Macro 对话框、等待完成的开销。
+        on_data 同 run()，实时数据依次来自批次中正在执行的测量的输出文件；
+        on_item(k, None) / on_item(k, result) 在第 k 个测量开始 / 完成时回调。
+
+        Returns:
+            与 ec_list 顺序一致的 ExperimentResult 列表
+        """
+        if not self.is_connected:
+            return [ExperimentResult(success=False,
+                                     error_message="未连接到 CHI 660F，请先调用 connect()")
+                    for _ in ec_list]
+
+        items = []
+        for ec in ec_list:
+            try:
+                items.append(convert_ec_settings(ec))
+            except ValueError as e:
+                return [ExperimentResult(success=False, error_message=str(e)) for _ in ec_list]
+
+        # 批次共用同一 dummy cell 设置
+        if ec_list and hasattr(ec_list[0], 'use_dummy_cell'):
+            self._controller._config.use_dummy_cell = ec_list[0].use_dummy_cell
+
+        def item_event(k: int, result: Optional[ExperimentResult]):
+            if result is None:
+                self._begin_live(items[k][0], on_data)
+            if on_item is not None:
+                on_item(k, result)
+
+        logger.info(f"CHIBridge: 批量执行 {len(items)} 个测量")
+        try:
+            results = self._controller.run_batch(items, output_names, on_item=item_event)
+        finally:
+            self._live = None
+        ok = sum(1 for r in results if r.success)
+        logger.info(f"CHIBridge: 批量完成 {ok}/{len(results)}")
+        return results
+
     def stop(self):
         """停止当前实验"""
         if self._controller:
@@ -271,11 +358,36 @@ class CHIBridge:
 
 
 # ============================================================
-# 便捷函数 (一次性调用)
+# 会话池 (跨步骤复用)
 # ============================================================
 
-# 模块级单例，避免每次调用都重新启动 CHI
-_global_bridge: Optional[CHIBridge] = None
+def _session_key(config: CHIBridgeConfig) -> Tuple[str, str, float]:
+    return (config.chi_exe_path, config.output_dir, config.timeout)
+
+
+def acquire_bridge(config: CHIBridgeConfig) -> Optional[CHIBridge]:
+    """从全局会话池取用 CHIBridge
+
+    CHI 660F 已在运行且状态健康时直接复用，否则 (重新) 启动。
+
+    Returns:
+        已连接的 CHIBridge；连接失败返回 None
+    """
+    return get_session_pool().acquire(_session_key(config), lambda: CHIBridge(config))
+
+
+def release_bridge(bridge: CHIBridge, healthy: bool = True):
+    """归还 CHIBridge，保持 CHI 660F 运行
+
+    Args:
+        healthy: False 表示本次实验失败，下次取用时重启 CHI 660F
+    """
+    get_session_pool().release(bridge, healthy)
+
+
+# ============================================================
+# 便捷函数 (一次性调用)
+# ============================================================
 
 
 def run_echem(
@@ -288,7 +400,7 @@ def run_echem(
 ) -> ExperimentResult:
     """一次性运行电化学实验 (自动管理控制器生命周期)
 
-    首次调用时连接 CHI 660F，后续调用复用连接。
+    首次调用时连接 CHI 660F，后续调用经会话池复用连接。
 
     Args:
         ec_settings: UI 层的 ECSettings
@@ -301,28 +413,26 @@ def run_echem(
     Returns:
         ExperimentResult
     """
-    global _global_bridge
-
-    if _global_bridge is None or not _global_bridge.is_connected:
-        bridge_config = CHIBridgeConfig(
-            chi_exe_path=chi_exe,
-            output_dir=output_dir,
-            use_dummy_cell=dummy,
-            force_restart=force_restart,
-        )
-        _global_bridge = CHIBridge(bridge_config)
-        if not _global_bridge.connect():
-            return ExperimentResult(success=False, error_message="CHI 660F 连接失败")
+    bridge_config = CHIBridgeConfig(
+        chi_exe_path=chi_exe,
+        output_dir=output_dir,
+        use_dummy_cell=dummy,
+        force_restart=force_restart,
+    )
+    if force_restart:
+        get_session_pool().discard(_session_key(bridge_config))
+    bridge = acquire_bridge(bridge_config)
+    if bridge is None:
+        return ExperimentResult(success=False, error_message="CHI 660F 连接失败")
 
-    return _global_bridge.run(ec_settings, output_name)
+    result = bridge.run(ec_settings, output_name)
+    release_bridge(bridge, healthy=result.success)
+    return result
 
 
 def close_echem():
-    """关闭全局 CHI 连接"""
-    global _global_bridge
-    if _global_bridge:
-        _global_bridge.disconnect()
-        _global_bridge = None
+    """关闭全局会话池中的 CHI 连接"""
+    get_session_pool().close()
 
 
 # ============================================================
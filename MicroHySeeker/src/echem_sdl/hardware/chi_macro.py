@@ -7,15 +7,14 @@ libec.dll 不支持 660F 系列，因此使用 .mcr 宏文件 + 进程自动化
 工作流程:
   1. 根据 ECParameters 动态生成 .mcr 宏文件
   2. 启动 chi660f.exe /runmacro:"<path>.mcr"
-  3. 监控 chi660f.exe 进程完成
-  4. 解析输出的 CSV 数据文件
+  3. 监控 chi660f.exe 进程，同时增量解析追加到输出文件的数据行
+  4. 检测到文件尾或进程退出即完成
   5. 返回 ECDataPoint 列表
 
 参考文档: chi660f.chm -> hid_control_macro.htm (完整宏命令参考)
 """
 
 import os
-import re
 import csv
 import time
 import signal
@@ -28,8 +27,14 @@ from pathlib import Path
 from typing import Optional, List, Callable, Dict, Any, Tuple
 from dataclasses import dataclass, field
 
+from .chi_output import technique_columns
+from .chi_tail import ChiOutputTailer, DEFAULT_POLL_INTERVAL
+
 logger = logging.getLogger(__name__)
 
+# 输出文件已完成后等待 chi660f.exe 自行退出的时间 (秒)，超时则强制结束
+PROCESS_EXIT_TIMEOUT = 30.0
+
 
 # ============================================================
 # ECTechnique -> 宏 tech: 字符串映射
@@ -121,11 +126,15 @@ class CHI660FMacroDriver:
         # 输出
         self._output_dir: str = ""
         self._output_file: str = ""
-        self._data_points: list = []  # List[ECDataPoint]
+        from .chi import ECDataSet  # 延迟导入避免循环
+        self._data = ECDataSet()
+        self._batch_outputs: List[Tuple[str, str]] = []  # [(tech, 输出文件)]
+        self._batch_data: list = []                       # [ECDataSet]
         
         # 回调
         self._complete_callback: Optional[Callable] = None
         self._error_callback: Optional[Callable[[Exception], None]] = None
+        self._batch_callback: Optional[Callable] = None
         
         # 确保工作目录存在
         if not self._config.work_dir:
@@ -214,7 +223,7 @@ class CHI660FMacroDriver:
         # 2. 启动 chi660f.exe
         self._running = True
         self._stop_event.clear()
-        self._data_points.clear()
+        self._data.clear()
         
         if blocking:
             return self._run_blocking(mcr_path)
@@ -227,6 +236,58 @@ class CHI660FMacroDriver:
             thread.start()
             return True
     
+    def run_batch(self, params_list: List[Any], blocking: bool = True) -> bool:
+        """批量执行: 多组参数编译进同一个宏，只启动一次 chi660f.exe
+        
+        适用于同一电池上连续的测量 (如 OCPT → CV → EIS)，或同一技术的多组参数。
+        各测量的输出在进程结束后统一解析，见 get_batch_data()。
+        
+        Args:
+            params_list: ECParameters 列表 (按执行顺序)
+            blocking: 是否阻塞等待完成
+            
+        Returns:
+            阻塞模式: 是否全部测量都生成了数据; 非阻塞模式: 是否成功启动
+        """
+        if not self._connected:
+            self._log("未连接，无法执行实验", level="error")
+            return False
+        
+        if self._running:
+            self._log("已有实验在运行中", level="warning")
+            return False
+        
+        if not params_list:
+            self._log("批量参数为空", level="error")
+            return False
+        
+        mcr_path = self._generate_batch_macro_file(params_list)
+        if not mcr_path:
+            return False
+        
+        self._log(f"批量宏文件已生成: {mcr_path} ({len(params_list)} 个测量)")
+        
+        self._running = True
+        self._stop_event.clear()
+        self._batch_data = []
+        
+        if blocking:
+            return self._run_batch_blocking(mcr_path)
+        thread = threading.Thread(
+            target=self._run_batch_blocking,
+            args=(mcr_path,),
+            daemon=True
+        )
+        thread.start()
+        return True
+    
+    def get_batch_data(self) -> list:
+        """批量执行的结果: 与 run_batch 参数顺序一致的 ECDataSet 列表
+        
+        未生成输出文件的测量对应空数据集。
+        """
+        return list(self._batch_data)
+    
     def stop_experiment(self) -> bool:
         """停止正在进行的实验"""
         self._stop_event.set()
@@ -248,9 +309,13 @@ class CHI660FMacroDriver:
         Returns:
             ECDataPoint 列表
         """
-        if not self._data_points and self._output_file:
+        return self.get_data_set().points
+    
+    def get_data_set(self):
+        """获取列式数据集 (ECDataSet，不复制)"""
+        if not len(self._data) and self._output_file:
             self._parse_output_file()
-        return self._data_points.copy()
+        return self._data
     
     def get_raw_data_path(self) -> str:
         """获取原始数据文件路径"""
@@ -272,6 +337,13 @@ class CHI660FMacroDriver:
         """注册错误回调"""
         self._error_callback = callback
     
+    def on_data_batch(self, callback: Callable):
+        """注册批量数据回调 callback(times, potentials, currents)
+        
+        实验进行中输出文件每追加一批数据行就回调一次 (numpy 数组)。
+        """
+        self._batch_callback = callback
+    
     # ----------------------------------------------------------
     # 宏文件生成
     # ----------------------------------------------------------
@@ -285,13 +357,50 @@ class CHI660FMacroDriver:
         if not self._params:
             return None
         
-        params = self._params
+        tech = self._technique_str
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        
+        lines = self._macro_header(tech)
+        block, self._output_file = self._technique_block(
+            tech, self._params, f"{tech}_{timestamp}"
+        )
+        lines.extend(block)
+        lines.extend(self._macro_footer())
+        
+        return self._write_macro(lines, f"auto_{tech}_{timestamp}.mcr")
+    
+    def _generate_batch_macro_file(self, params_list: List[Any]) -> Optional[str]:
+        """把多组参数编译进同一个 .mcr: 一次启动，多个 tech/run/save 块
+        
+        输出文件按顺序记录在 self._batch_outputs。
+        """
+        if not params_list:
+            return None
+        
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        techs = [TECHNIQUE_MACRO_MAP.get(int(p.technique), "cv") for p in params_list]
+        
+        lines = self._macro_header("+".join(techs))
+        self._batch_outputs = []
+        for k, (tech, params) in enumerate(zip(techs, params_list)):
+            lines.append(f"; --- 批次 {k + 1}/{len(params_list)}: {tech} ---")
+            block, output_file = self._technique_block(
+                tech, params, f"{tech}_{timestamp}_{k + 1:02d}"
+            )
+            lines.extend(block)
+            self._batch_outputs.append((tech, output_file))
+        lines.extend(self._macro_footer())
+        
+        return self._write_macro(lines, f"auto_batch_{timestamp}.mcr")
+    
+    def _macro_header(self, technique_label: str) -> List[str]:
+        """文件头注释 + 输出目录 / 覆盖 / dummy cell 设置"""
         lines: List[str] = []
         
         # 文件头注释
         lines.append("; ====================================")
         lines.append("; CHI 660F Auto-Generated Macro")
-        lines.append(f"; Technique: {self._technique_str}")
+        lines.append(f"; Technique: {technique_label}")
         lines.append(f"; Generated by MicroHySeeker")
         lines.append("; ====================================")
         lines.append("")
@@ -309,13 +418,18 @@ class CHI660FMacroDriver:
         if self._config.dummy_cell:
             lines.append("dummyon")
         
+        return lines
+    
+    def _technique_block(self, tech: str, params, output_name: str) -> Tuple[List[str], str]:
+        """单个测量块: tech + 参数 + run + save
+        
+        Returns:
+            (宏命令行, 输出文件路径)
+        """
         # 选择技术
-        lines.append(f"tech: {self._technique_str}")
-        lines.append("")
+        lines = [f"tech: {tech}", ""]
         
         # 根据技术类型生成参数命令
-        tech = self._technique_str
-        
         if tech == "cv":
             lines.extend(self._gen_cv_params(params))
         elif tech in ("lsv", "lssv"):
@@ -360,24 +474,22 @@ class CHI660FMacroDriver:
         lines.append("")
         
         # 保存数据
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        output_name = f"{tech}_{timestamp}"
-        
         if self._config.output_format == "csv":
             lines.append(f"csvsave: {output_name}")
-            self._output_file = os.path.join(
-                self._output_dir, f"{output_name}.csv"
-            )
+            output_file = os.path.join(self._output_dir, f"{output_name}.csv")
         elif self._config.output_format == "text":
             lines.append(f"tsave: {output_name}")
-            self._output_file = os.path.join(
-                self._output_dir, f"{output_name}.txt"
-            )
+            output_file = os.path.join(self._output_dir, f"{output_name}.txt")
         else:
             lines.append(f"save: {output_name}")
-            self._output_file = os.path.join(
-                self._output_dir, f"{output_name}.bin"
-            )
+            output_file = os.path.join(self._output_dir, f"{output_name}.bin")
+        lines.append("")
+        
+        return lines, output_file
+    
+    def _macro_footer(self) -> List[str]:
+        """dummy cell 关闭 + 自动退出 + end"""
+        lines: List[str] = []
         
         # Dummy cell 关闭
         if self._config.dummy_cell:
@@ -390,12 +502,11 @@ class CHI660FMacroDriver:
         
         lines.append("")
         lines.append("end")
-        
-        # 写入文件
-        mcr_path = os.path.join(
-            self._config.work_dir,
-            f"auto_{tech}_{timestamp}.mcr"
-        )
+        return lines
+    
+    def _write_macro(self, lines: List[str], filename: str) -> Optional[str]:
+        """写入 .mcr 文件"""
+        mcr_path = os.path.join(self._config.work_dir, filename)
         
         try:
             with open(mcr_path, 'w', encoding='ascii', errors='replace') as f:
@@ -677,26 +788,47 @@ class CHI660FMacroDriver:
             
             self._log(f"chi660f.exe PID={self._process.pid}, 等待完成...")
             
-            # 等待进程完成或超时
-            start_time = time.time()
-            while not self._stop_event.is_set():
-                retcode = self._process.poll()
-                if retcode is not None:
-                    self._log(f"chi660f.exe 已退出, code={retcode}")
-                    break
-                
-                elapsed = time.time() - start_time
-                if elapsed > self._config.timeout:
-                    self._log(f"实验超时 ({self._config.timeout}s), 终止进程",
-                              level="warning")
-                    self._process.terminate()
-                    self._running = False
-                    return False
-                
-                time.sleep(0.5)
+            # 边运行边解析输出文件，检测到文件尾或进程退出即完成
+            tailer = ChiOutputTailer(self._output_file) if self._output_file else None
+            process = self._process
+            if tailer is not None:
+                tailer.subscribe(self._on_tail_rows)
+                completed = tailer.follow(
+                    is_done=lambda: process.poll() is not None,
+                    stop_event=self._stop_event,
+                    timeout=self._config.timeout,
+                )
+            else:
+                completed = self._wait_process(process)
+            
+            if not completed and not self._stop_event.is_set():
+                self._log(f"实验超时 ({self._config.timeout}s), 终止进程",
+                          level="warning")
+                self._reap_process(process, terminate=True, timeout=5.0)
+                self._running = False
+                return False
+            
+            # 文件尾出现时进程可能仍在保存/退出: 等待其结束，超时强制结束
+            if not self._stop_event.is_set():
+                retcode = self._reap_process(process)
+                self._log(f"chi660f.exe 已退出, code={retcode}")
             
             self._running = False
             
+            # 已增量解析: 用完整结果重建分段
+            if tailer is not None and tailer.count:
+                self._log(f"数据文件已生成: {self._output_file}")
+                self._data = tailer.output.to_data_set(self._technique_str)
+                self._log(f"解析完成: {len(self._data)} 个数据点")
+                
+                if self._complete_callback:
+                    try:
+                        self._complete_callback()
+                    except Exception as e:
+                        self._log(f"完成回调异常: {e}", level="error")
+                
+                return True
+            
             # 检查输出文件是否生成
             if self._output_file and os.path.exists(self._output_file):
                 self._log(f"数据文件已生成: {self._output_file}")
@@ -738,6 +870,104 @@ class CHI660FMacroDriver:
                 self._error_callback(e)
             return False
     
+    def _run_batch_blocking(self, mcr_path: str) -> bool:
+        """阻塞执行批量宏，结束后按顺序解析全部输出文件"""
+        from .chi import ECDataSet  # 延迟导入避免循环
+        from .chi_output import parse_chi_output
+        
+        exe_path = self._config.chi_exe_path
+        cmd = f'"{exe_path}" /runmacro:"{mcr_path}"'
+        self._log(f"启动 chi660f.exe: {cmd}")
+        
+        try:
+            # 超时按测量个数放宽
+            timeout = self._config.timeout * len(self._batch_outputs)
+            self._process = subprocess.Popen(cmd, shell=True)
+            completed = self._wait_process(self._process, timeout)
+            if not completed and not self._stop_event.is_set():
+                self._log(f"实验超时 ({timeout}s), 终止进程",
+                          level="warning")
+                self._reap_process(self._process, terminate=True, timeout=5.0)
+        except Exception as e:
+            self._log(f"执行批量宏失败: {e}", level="error")
+            self._running = False
+            if self._error_callback:
+                self._error_callback(e)
+            return False
+        
+        self._running = False
+        
+        all_ok = True
+        self._batch_data = []
+        for tech, output_file in self._batch_outputs:
+            data_set = ECDataSet(technique=tech)
+            if output_file.endswith(('.csv', '.txt')) and os.path.exists(output_file):
+                try:
+                    data_set = parse_chi_output(output_file).to_data_set(tech)
+                except Exception as e:
+                    self._log(f"解析数据文件失败: {output_file}: {e}", level="error")
+            if not len(data_set):
+                self._log(f"未得到数据: {output_file}", level="warning")
+                all_ok = False
+            self._batch_data.append(data_set)
+        
+        # 单测量接口指向最后一个测量
+        if self._batch_outputs:
+            self._output_file = self._batch_outputs[-1][1]
+            self._data = self._batch_data[-1]
+        
+        self._log(f"批量解析完成: {[len(d) for d in self._batch_data]} 个数据点")
+        if all_ok and self._complete_callback:
+            try:
+                self._complete_callback()
+            except Exception as e:
+                self._log(f"完成回调异常: {e}", level="error")
+        return all_ok
+    
+    def _wait_process(self, process: subprocess.Popen,
+                      timeout: Optional[float] = None) -> bool:
+        """仅等待进程退出 (无预期输出文件或批量模式)"""
+        timeout = timeout or self._config.timeout
+        start_time = time.time()
+        while not self._stop_event.is_set():
+            if process.poll() is not None:
+                return True
+            if time.time() - start_time > timeout:
+                return False
+            self._stop_event.wait(DEFAULT_POLL_INTERVAL)
+        return False
+    
+    def _reap_process(self, process: subprocess.Popen, terminate: bool = False,
+                      timeout: float = PROCESS_EXIT_TIMEOUT) -> Optional[int]:
+        """等待进程退出，超时则强制结束，避免残留 chi660f.exe
+        
+        Args:
+            process: chi660f.exe 进程
+            terminate: 先请求终止 (超时路径)
+            timeout: 等待退出的时间 (秒)
+            
+        Returns:
+            进程退出码
+        """
+        if terminate and process.poll() is None:
+            process.terminate()
+        try:
+            return process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._log(f"chi660f.exe 未在 {timeout:.0f}s 内退出，强制结束", level="warning")
+            process.kill()
+            return process.wait()
+    
+    def _on_tail_rows(self, rows) -> None:
+        """输出文件新增数据行: 追加到数据集并回调"""
+        columns = technique_columns(self._technique_str, rows, start=len(self._data))
+        self._data.extend(*columns)
+        if self._batch_callback:
+            try:
+                self._batch_callback(*columns)
+            except Exception as e:
+                self._log(f"数据回调异常: {e}", level="error")
+    
     def _find_output_file(self) -> Optional[str]:
         """搜索输出目录中最新的数据文件"""
         if not self._output_dir or not os.path.isdir(self._output_dir):
@@ -762,7 +992,7 @@ class CHI660FMacroDriver:
     # ----------------------------------------------------------
     
     def _parse_output_file(self) -> bool:
-        """解析输出文件到 ECDataPoint 列表
+        """解析输出文件到列式数据集
         
         CHI 660F CSV/Text 格式:
         - 文件头包含实验参数信息 (以文本行开头)
@@ -775,178 +1005,23 @@ class CHI660FMacroDriver:
         if not self._output_file or not os.path.exists(self._output_file):
             return False
         
-        self._data_points.clear()
+        self._data.clear()
         
         ext = os.path.splitext(self._output_file)[1].lower()
+        if ext not in ('.csv', '.txt'):
+            self._log(f"不支持的文件格式: {ext}", level="warning")
+            return False
         
         try:
-            if ext == '.csv':
-                return self._parse_csv_file(self._output_file)
-            elif ext == '.txt':
-                return self._parse_text_file(self._output_file)
-            else:
-                self._log(f"不支持的文件格式: {ext}", level="warning")
-                return False
+            from .chi_output import parse_chi_output
+            parsed = parse_chi_output(self._output_file)
+            self._data = parsed.to_data_set(self._technique_str)
         except Exception as e:
             self._log(f"解析数据文件失败: {e}", level="error")
             return False
-    
-    def _parse_csv_file(self, filepath: str) -> bool:
-        """解析 CHI CSV 数据文件
-        
-        CHI CSV 文件格式:
-        - 前若干行为文本头 (技术名、参数等)
-        - 数据行: 逗号分隔的浮点数
-        - 可能有多段数据 (CV segments)
-        """
-        from . import chi  # 延迟导入避免循环
-        
-        data_started = False
-        col_headers = []
-        row_index = 0
-        
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 尝试检测数据行 (全部是数字和逗号)
-                parts = line.split(',')
-                
-                if not data_started:
-                    # 检查是否是列标题行或数据行
-                    try:
-                        vals = [float(x.strip()) for x in parts if x.strip()]
-                        if len(vals) >= 2:
-                            data_started = True
-                            # 处理这一行数据
-                            self._add_data_point(vals, row_index)
-                            row_index += 1
-                    except ValueError:
-                        # 可能是标题行
-                        if any(kw in line.lower() for kw in 
-                               ['potential', 'current', 'time', 'freq', 
-                                'impedance', 'zre', 'zim']):
-                            col_headers = [h.strip().lower() for h in parts]
-                        continue
-                else:
-                    try:
-                        vals = [float(x.strip()) for x in parts if x.strip()]
-                        if len(vals) >= 2:
-                            self._add_data_point(vals, row_index)
-                            row_index += 1
-                    except ValueError:
-                        # 可能是段分隔符
-                        continue
-        
-        self._log(f"解析完成: {len(self._data_points)} 个数据点")
-        return len(self._data_points) > 0
-    
-    def _parse_text_file(self, filepath: str) -> bool:
-        """解析 CHI 文本数据文件
-        
-        CHI 文本格式 (tsave):
-        - 标题/参数行
-        - 空行
-        - 数据列 (制表符或空格分隔)
-        """
-        data_started = False
-        row_index = 0
-        
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    if row_index > 0:
-                        # 数据段结束（可能有多段）
-                        pass
-                    continue
-                
-                # 尝试解析为数值（使用多种分隔符）
-                parts = re.split(r'[,\t\s]+', line)
-                
-                if not data_started:
-                    try:
-                        vals = [float(x) for x in parts if x]
-                        if len(vals) >= 2:
-                            data_started = True
-                            self._add_data_point(vals, row_index)
-                            row_index += 1
-                    except ValueError:
-                        continue
-                else:
-                    try:
-                        vals = [float(x) for x in parts if x]
-                        if len(vals) >= 2:
-                            self._add_data_point(vals, row_index)
-                            row_index += 1
-                    except ValueError:
-                        continue
-        
-        self._log(f"解析完成: {len(self._data_points)} 个数据点")
-        return len(self._data_points) > 0
-    
-    def _add_data_point(self, vals: List[float], index: int):
-        """添加数据点
-        
-        根据技术类型解释列含义:
-        - CV/LSV: [Potential(V), Current(A)]
-        - i-t/CA: [Time(s), Current(A)]
-        - OCPT:   [Time(s), Potential(V)]
-        - IMP:    [Freq(Hz), Zre(ohm), Zim(ohm)]
-        """
-        from . import chi as chi_module
-        
-        tech = self._technique_str
-        
-        if tech in ("cv", "lsv", "lssv", "scv", "scp", "scsv",
-                     "dpv", "dpp", "dpsv", "npv", "npp", "npsv",
-                     "swv", "swsv", "acv", "acp", "acsv",
-                     "shacv", "shacp", "shacsv", "tafel"):
-            # 电位 vs 电流
-            point = chi_module.ECDataPoint(
-                time=float(index) * 0.01,  # 近似时间戳
-                potential=vals[0],
-                current=vals[1] if len(vals) > 1 else 0.0,
-            )
-        elif tech in ("i-t", "ca", "cc", "be"):
-            # 时间 vs 电流
-            point = chi_module.ECDataPoint(
-                time=vals[0],
-                potential=0.0,
-                current=vals[1] if len(vals) > 1 else 0.0,
-            )
-        elif tech == "ocpt":
-            # 时间 vs 电位
-            point = chi_module.ECDataPoint(
-                time=vals[0],
-                potential=vals[1] if len(vals) > 1 else 0.0,
-                current=0.0,
-            )
-        elif tech in ("imp", "impe", "impt"):
-            # 阻抗数据: Freq, Zre, Zim
-            point = chi_module.ECDataPoint(
-                time=vals[0],  # 存频率
-                potential=vals[1] if len(vals) > 1 else 0.0,  # Zre
-                current=vals[2] if len(vals) > 2 else 0.0,    # Zim
-            )
-        elif tech in ("cp", "cpcr"):
-            # 时间 vs 电位
-            point = chi_module.ECDataPoint(
-                time=vals[0],
-                potential=vals[1] if len(vals) > 1 else 0.0,
-                current=0.0,
-            )
-        else:
-            # 默认: 第一列 = x, 第二列 = y
-            point = chi_module.ECDataPoint(
-                time=vals[0],
-                potential=vals[0],
-                current=vals[1] if len(vals) > 1 else 0.0,
-            )
         
-        self._data_points.append(point)
+        self._log(f"解析完成: {len(self._data)} 个数据点")
+        return len(self._data) > 0
     
     # ----------------------------------------------------------
     # 辅助方法
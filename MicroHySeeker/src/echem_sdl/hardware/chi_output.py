@@ -0,0 +1,259 @@
+"""
+CHI 输出文件解析 - 宏驱动和 GUI 控制器共用
+
+CHI 660F 的 CSV / 文本输出由 "文本头 + 列名行 + 数值块" 组成。
+解析时只逐行扫描一次文本头找到数据边界，数值块按块交给 numpy.loadtxt
+批量转换（C 实现），不再逐行 float() / re.split，也不逐点创建对象。
+
+- parse_chi_output(): 解析文件，返回列式 ChiOutput
+- reversal_segment_starts(): 按电位扫描方向反转向量化分段（CV）
+- technique_columns(): 按技术类型把数值块映射为 (time, potential, current)
+- ChiOutput.to_data_set(): 按技术类型映射为 ECDataSet (time, potential, current)
+"""
+
+import io
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .chi import ECDataSet
+
+
+# 列名行关键字（小写）
+HEADER_KEYWORDS = ('potential', 'current', 'time', 'freq', 'impedance', 'zre', 'zim', "z'")
+
+# 数值行首字符
+_NUMERIC_START = frozenset('0123456789+-.')
+
+# 每块读取的字节数（控制超大文件的文本内存占用）
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+
+# 技术 → 列映射类别（与宏驱动的列含义一致）
+_POTENTIAL_CURRENT = frozenset((
+    "cv", "lsv", "lssv", "scv", "scp", "scsv", "dpv", "dpp", "dpsv",
+    "npv", "npp", "npsv", "swv", "swsv", "acv", "acp", "acsv",
+    "shacv", "shacp", "shacsv", "tafel",
+))
+_TIME_CURRENT = frozenset(("i-t", "it", "ca", "cc", "be"))
+_TIME_POTENTIAL = frozenset(("ocpt", "cp", "cpcr"))
+_IMPEDANCE = frozenset(("imp", "impe", "impt", "eis", "acim"))
+
+
+@dataclass
+class ChiOutput:
+    """解析后的 CHI 输出
+
+    Attributes:
+        headers: 列名
+        values: (n, k) float64 数值块
+        metadata: 文本头中的 "键 = 值" 项
+        segment_starts: 各数据段起始行（文件中的段分隔行）
+    """
+    headers: List[str] = field(default_factory=list)
+    values: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+    metadata: Dict[str, str] = field(default_factory=dict)
+    segment_starts: List[int] = field(default_factory=lambda: [0])
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def rows(self) -> List[List[float]]:
+        """行列表（兼容旧接口）"""
+        return self.values.tolist()
+
+    def column(self, index: int, default: float = 0.0) -> np.ndarray:
+        """第 index 列；不存在时返回常数列"""
+        if self.values.ndim == 2 and index < self.values.shape[1]:
+            return self.values[:, index]
+        return np.full(len(self.values), default)
+
+    def to_data_set(self, technique: str, **kwargs) -> "ECDataSet":
+        """按技术类型映射为 ECDataSet
+
+        - CV/LSV 等: [Potential, Current]，时间为近似行时间戳
+        - i-t/CA:   [Time, Current]
+        - OCPT/CP:  [Time, Potential]
+        - IMP:      [Freq, Zre, Zim]，time 列存频率
+        - 其他:     第一列 = x，第二列 = y
+        """
+        from .chi import ECDataSet  # 延迟导入避免循环
+
+        tech = technique.lower()
+        kwargs.setdefault("technique", technique)
+        data_set = ECDataSet.from_arrays(*technique_columns(tech, self.values), **kwargs)
+        data_set.metadata.setdefault("headers", list(self.headers))
+        if len(self.segment_starts) > 1:
+            for start in self.segment_starts[1:]:
+                data_set._segment_starts.append(int(start))
+        elif tech in _POTENTIAL_CURRENT:
+            data_set.detect_segments()
+        return data_set
+
+
+def technique_columns(technique: str, values: np.ndarray,
+                      start: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """按技术类型把数值块映射为 (time, potential, current) 三列
+
+    Args:
+        technique: 宏技术名（小写）
+        values: (n, k) 数值块
+        start: 块首行在整个文件中的行号（用于近似时间戳）
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    k = values.shape[1] if values.ndim == 2 else 0
+
+    def col(i: int) -> np.ndarray:
+        return values[:, i] if i < k else np.zeros(n)
+
+    x, y = col(0), col(1)
+    if technique in _POTENTIAL_CURRENT:
+        return np.arange(start, start + n) * 0.01, x, y
+    if technique in _TIME_CURRENT:
+        return x, np.zeros(n), y
+    if technique in _TIME_POTENTIAL:
+        return x, y, np.zeros(n)
+    if technique in _IMPEDANCE:
+        return x, y, col(2)
+    return x, x, y
+
+
+def reversal_segment_starts(potentials: np.ndarray) -> List[int]:
+    """按扫描方向反转计算各段起始索引（忽略停滞点）"""
+    starts = [0]
+    e = np.asarray(potentials)
+    if len(e) > 2:
+        direction = np.sign(np.diff(e))
+        nonzero = np.flatnonzero(direction)
+        if len(nonzero) > 1:
+            d = direction[nonzero]
+            flips = nonzero[1:][d[1:] != d[:-1]]
+            starts.extend((flips + 1).tolist())
+    return starts
+
+
+def _is_numeric_row(line: str, delimiter: Optional[str]) -> bool:
+    if not line or line[0] not in _NUMERIC_START:
+        return False
+    parts = _split(line, delimiter)
+    if len(parts) < 2:
+        return False
+    try:
+        for p in parts:
+            float(p)
+    except ValueError:
+        return False
+    return True
+
+
+def scan_header_line(result: ChiOutput, line: str) -> Tuple[bool, Optional[str]]:
+    """处理文本头中的一行（已 strip）
+
+    列名行写入 result.headers，"键 = 值" 行写入 result.metadata。
+
+    Returns:
+        (是否为第一行数值行, 数值行分隔符)
+    """
+    if not line:
+        return False, None
+    candidate = line.rstrip(',')
+    delimiter = ',' if ',' in candidate else None
+    if _is_numeric_row(candidate, delimiter):
+        return True, delimiter
+    lower = line.lower()
+    if any(kw in lower for kw in HEADER_KEYWORDS) and ('/' in line or ',' in line):
+        result.headers = [h.strip() for h in (line.split(',') if ',' in line else line.split('\t'))]
+    elif '=' in line:
+        k, _, v = line.partition('=')
+        result.metadata[k.strip()] = v.strip()
+    return False, None
+
+
+def _split(line: str, delimiter: Optional[str]) -> List[str]:
+    return [p for p in (line.split(delimiter) if delimiter else line.split()) if p.strip()]
+
+
+def _load_rows(lines: List[str], delimiter: Optional[str], ncols: int) -> np.ndarray:
+    """逐行兜底转换（含段分隔行或列数不一致的块）"""
+    rows = []
+    for line in lines:
+        try:
+            rows.append([float(p) for p in _split(line, delimiter)][:ncols])
+        except ValueError:
+            continue
+    block = np.zeros((len(rows), ncols))
+    for k, r in enumerate(rows):
+        block[k, :len(r)] = r
+    return block
+
+
+def parse_chi_output(filepath: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> ChiOutput:
+    """解析 CHI CSV / 文本输出文件
+
+    Args:
+        filepath: 数据文件路径
+        chunk_bytes: 每块读取的字节数（整行）
+
+    Returns:
+        ChiOutput（无数据时 values 为空）
+    """
+    result = ChiOutput()
+    with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
+        # 1. 文本头: 找到第一行数值行
+        delimiter: Optional[str] = None
+        first_row = None
+        for raw in f:
+            line = raw.strip()
+            is_data, delimiter = scan_header_line(result, line)
+            if is_data:
+                first_row = line
+                break
+
+        if first_row is None:
+            return result
+
+        # 2. 数值块: 整块交给 loadtxt；块内有段分隔行时才逐行处理
+        ncols = len(_split(first_row.rstrip(','), delimiter))
+        usecols = tuple(range(ncols))
+        blocks: List[np.ndarray] = []
+        count = 0
+        pending_segment = False
+        chunk = [first_row + "\n"] + f.readlines(chunk_bytes)
+        while chunk:
+            try:
+                block = np.loadtxt(io.StringIO("".join(chunk)), delimiter=delimiter,
+                                   usecols=usecols, ndmin=2, dtype=np.float64)
+                if pending_segment and len(block):
+                    result.segment_starts.append(count)
+                    pending_segment = False
+                blocks.append(block)
+                count += len(block)
+                chunk = f.readlines(chunk_bytes)
+                continue
+            except ValueError:
+                pass
+            numeric: List[str] = []
+            for raw in chunk:
+                line = raw.strip().rstrip(',')
+                if not line:
+                    continue
+                if line[0] in _NUMERIC_START:
+                    if pending_segment:
+                        if count + len(numeric) > result.segment_starts[-1]:
+                            result.segment_starts.append(count + len(numeric))
+                        pending_segment = False
+                    numeric.append(line if delimiter else line.replace(',', ' '))
+                else:
+                    pending_segment = True
+            if numeric:
+                block = _load_rows(numeric, delimiter, ncols)
+                blocks.append(block)
+                count += len(block)
+            chunk = f.readlines(chunk_bytes)
+
+    if blocks:
+        result.values = np.concatenate(blocks)
+    return result
@@ -0,0 +1,234 @@
+"""
+CHI 会话池 - 跨步骤 / 跨组合保持 CHI 660F 应用或 DLL 链路常驻
+
+电化学步骤结束后不再关闭 chi660f.exe（关闭 + 重新启动每次要数秒），
+会话留在池中，下一次取用时只做一次轻量健康检查:
+- 健康: 直接复用，无启动开销
+- 异常 (残留错误对话框、窗口消失、链路断开) 或上次失败: 断开并重新连接
+
+会话对象只需实现 connect() / disconnect()，健康检查依次使用
+is_healthy() / check_connection() / is_connected。
+
+用法:
+    pool = get_session_pool()
+    bridge = pool.acquire(key, lambda: CHIBridge(config))
+    try:
+        result = bridge.run(ec)
+    finally:
+        pool.release(bridge, healthy=result.success)
+    ...
+    pool.close()    # 程序退出时
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionPoolStats:
+    """会话池统计
+
+    Attributes:
+        launches: 新建并连接的次数
+        reuses: 直接复用常驻会话的次数
+        restarts: 因健康检查失败或上次失败而重连的次数
+        failures: 连接失败次数
+    """
+    launches: int = 0
+    reuses: int = 0
+    restarts: int = 0
+    failures: int = 0
+
+
+def _session_healthy(session: Any) -> bool:
+    """按会话类型选择健康检查方式"""
+    try:
+        for name in ("is_healthy", "check_connection"):
+            check = getattr(session, name, None)
+            if callable(check):
+                return bool(check())
+        connected = getattr(session, "is_connected", True)
+        return bool(connected() if callable(connected) else connected)
+    except Exception as e:
+        logger.warning(f"会话健康检查异常: {e}")
+        return False
+
+
+class CHISessionPool:
+    """按键保存常驻 CHI 会话
+
+    每个键（如 chi660f.exe 路径 + 输出目录）最多一个会话；
+    同一会话同时只借给一个调用方。
+    启动 / 连接 / 健康检查 / 断开可能耗时数秒，都在锁外进行，
+    界面定时器调用 connected_count() 不会因此卡住。
+    """
+
+    def __init__(self, health_check: Optional[Callable[[Any], bool]] = None):
+        """
+        Args:
+            health_check: 自定义健康检查，默认见 _session_healthy
+        """
+        self._health_check = health_check or _session_healthy
+        self._sessions: Dict[Hashable, Any] = {}
+        self._keys: Dict[int, Hashable] = {}
+        self._in_use: Dict[Hashable, bool] = {}
+        self._unhealthy: Dict[Hashable, bool] = {}
+        self._lock = threading.RLock()
+        self.stats = SessionPoolStats()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def connected_count(self) -> int:
+        """处于连接状态的常驻会话数
+
+        只读取 is_connected（单个窗口句柄 / 进程状态），
+        不做完整健康检查，可供界面定时查询。
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+        count = 0
+        for session in sessions:
+            try:
+                connected = getattr(session, "is_connected", True)
+                if connected() if callable(connected) else connected:
+                    count += 1
+            except Exception:
+                pass
+        return count
+
+    def acquire(self, key: Hashable, create: Callable[[], Any]) -> Optional[Any]:
+        """取用会话，必要时创建并连接
+
+        Args:
+            key: 会话键
+            create: 创建（未连接的）会话对象
+
+        Returns:
+            已连接的会话；连接失败或会话正被占用时返回 None
+        """
+        # 先在锁内占用该键，耗时操作在锁外进行
+        with self._lock:
+            if self._in_use.get(key):
+                logger.warning(f"CHI 会话正在使用中: {key}")
+                return None
+            self._in_use[key] = True
+            session = self._sessions.get(key)
+            suspect = self._unhealthy.get(key, False)
+
+        try:
+            if session is not None:
+                if not suspect and self._health_check(session):
+                    with self._lock:
+                        self.stats.reuses += 1
+                    return session
+                logger.info(f"CHI 会话状态异常，重新连接: {key}")
+                with self._lock:
+                    self.stats.restarts += 1
+                    self._detach(key)
+                self._disconnect(session)
+
+            session = create()
+            try:
+                ok = session.connect()
+            except Exception as e:
+                logger.error(f"CHI 会话连接异常: {e}")
+                ok = False
+        except BaseException:
+            with self._lock:
+                self._in_use.pop(key, None)
+            raise
+
+        if not ok:
+            with self._lock:
+                self.stats.failures += 1
+                self._in_use.pop(key, None)
+            self._disconnect(session)
+            return None
+
+        # 连接成功后再发布到池中
+        with self._lock:
+            self.stats.launches += 1
+            self._sessions[key] = session
+            self._keys[id(session)] = key
+            self._unhealthy[key] = False
+        return session
+
+    def release(self, session: Any, healthy: bool = True) -> None:
+        """归还会话（保持连接）
+
+        Args:
+            session: acquire() 返回的会话
+            healthy: False 表示本次使用失败，下次取用时重连
+        """
+        with self._lock:
+            key = self._keys.get(id(session))
+            if key is None:
+                return
+            self._in_use[key] = False
+            if not healthy:
+                self._unhealthy[key] = True
+
+    def discard(self, key: Hashable) -> None:
+        """立即断开并移除会话"""
+        with self._lock:
+            self._in_use.pop(key, None)
+            session = self._detach(key)
+        if session is not None:
+            self._disconnect(session)
+
+    def close(self) -> None:
+        """断开全部会话（程序退出时调用）"""
+        with self._lock:
+            sessions = [self._detach(key) for key in list(self._sessions)]
+            self._in_use.clear()
+        for session in sessions:
+            self._disconnect(session)
+
+    @contextmanager
+    def session(self, key: Hashable, create: Callable[[], Any]) -> Iterator[Optional[Any]]:
+        """上下文管理器形式；块内抛异常时标记为需重连"""
+        session = self.acquire(key, create)
+        healthy = True
+        try:
+            yield session
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if session is not None:
+                self.release(session, healthy)
+
+    def _detach(self, key: Hashable) -> Optional[Any]:
+        """从池中移除会话 (调用方持锁)，返回待断开的会话；占用标记保持不变"""
+        session = self._sessions.pop(key, None)
+        self._unhealthy.pop(key, None)
+        if session is not None:
+            self._keys.pop(id(session), None)
+        return session
+
+    @staticmethod
+    def _disconnect(session: Any) -> None:
+        try:
+            session.disconnect()
+        except Exception as e:
+            logger.warning(f"CHI 会话断开异常: {e}")
+
+
+# 全局会话池
+_session_pool: Optional[CHISessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> CHISessionPool:
+    """获取全局 CHI 会话池"""
+    global _session_pool
+    with _pool_lock:
+        if _session_pool is None:
+            _session_pool = CHISessionPool()
+        return _session_pool
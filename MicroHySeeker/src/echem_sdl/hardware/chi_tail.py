@@ -0,0 +1,280 @@
+"""
+CHI 输出文件增量跟踪 - 实验进行中逐块解析新追加的数据行
+
+CHI 660F 在实验过程中持续向输出文件追加数据。ChiOutputTailer 记录已读字节偏移，
+每次 poll() 只读取新追加的完整行：文本头部分逐行扫描一次，数值行按块交给
+numpy.loadtxt 批量转换，新行以 (k, ncols) 数组推送给订阅者。
+
+完成判定（任一满足即结束，不再等待文件大小稳定数秒）:
+- 数据之后出现非数值、非 "Segment" 的尾部文本行（文件尾）
+- 外部条件成立（如 chi660f.exe 进程退出），此时补读最后一行不完整数据
+- 数据出现后文件在 quiet_seconds 内不再增长（兜底）
+
+用法:
+    tailer = ChiOutputTailer(path)
+    tailer.subscribe(lambda rows: ...)
+    ok = tailer.follow(is_done=lambda: proc.poll() is not None, timeout=600)
+    output = tailer.output          # ChiOutput
+"""
+
+import io
+import os
+import time
+import logging
+import threading
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from .chi_output import (
+    ChiOutput, _NUMERIC_START, _load_rows, _split, scan_header_line,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# 默认轮询间隔 (秒)
+DEFAULT_POLL_INTERVAL = 0.1
+
+# 段分隔行前缀（小写）
+_SEGMENT_PREFIX = "segment"
+
+
+class ChiOutputTailer:
+    """CHI 输出文件增量解析器
+
+    Attributes:
+        path: 跟踪的文件路径
+        finished: 是否已检测到文件尾
+    """
+
+    def __init__(self, path: str, ignore_existing: bool = True):
+        """
+        Args:
+            path: 输出文件路径（可尚未生成）
+            ignore_existing: 已存在的旧文件在被改写前不读取（CHI 覆盖同名文件时避免读到上次结果）
+        """
+        self.path = path
+        self._stale = self._stat() if ignore_existing else None
+        self._subscribers: List[Callable[[np.ndarray], None]] = []
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._offset = 0
+        self._partial = b""
+        self._header = ChiOutput()
+        self._delimiter: Optional[str] = None
+        self._ncols = 0
+        self._blocks: List[np.ndarray] = []
+        self._count = 0
+        self._segment_starts = [0]
+        self._pending_segment = False
+        self._output: Optional[ChiOutput] = None
+        self._last_growth = time.monotonic()
+        self.finished = False
+
+    # ----------------------------------------------------------
+    # 订阅
+    # ----------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[np.ndarray], None]) -> None:
+        """注册新行回调 callback(rows)，rows 为 (k, ncols) float64 数组"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[np.ndarray], None]) -> None:
+        """移除新行回调"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    # ----------------------------------------------------------
+    # 状态
+    # ----------------------------------------------------------
+
+    @property
+    def count(self) -> int:
+        """已解析的数据行数"""
+        return self._count
+
+    @property
+    def started(self) -> bool:
+        """是否已读到数据行"""
+        return self._ncols > 0
+
+    @property
+    def written(self) -> bool:
+        """输出文件是否已生成（旧文件须被改写后才算）"""
+        if self._stale is None:
+            return self._stat() is not None
+        stat = self._stat()
+        return stat is not None and stat != self._stale
+
+    @property
+    def idle_seconds(self) -> float:
+        """文件上次增长至今的秒数"""
+        return time.monotonic() - self._last_growth
+
+    @property
+    def output(self) -> ChiOutput:
+        """截至目前的解析结果（列名、元数据、数值块、分段）"""
+        with self._lock:
+            if self._output is None:
+                if len(self._blocks) > 1:
+                    self._blocks = [np.concatenate(self._blocks)]
+                self._output = ChiOutput(
+                    headers=list(self._header.headers),
+                    values=self._blocks[0] if self._blocks else np.empty((0, 0)),
+                    metadata=dict(self._header.metadata),
+                    segment_starts=list(self._segment_starts),
+                )
+            return self._output
+
+    # ----------------------------------------------------------
+    # 读取
+    # ----------------------------------------------------------
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def poll(self, final: bool = False) -> np.ndarray:
+        """读取并解析新追加的完整行
+
+        Args:
+            final: 写入已结束，末尾不完整的一行也一并解析
+
+        Returns:
+            新数据行 (k, ncols)，无新行时 k = 0
+        """
+        stat = self._stat()
+        if stat is None:
+            return np.empty((0, self._ncols))
+        if self._stale is not None:
+            if stat == self._stale:
+                return np.empty((0, self._ncols))
+            self._stale = None
+        if stat[0] < self._offset:
+            logger.warning(f"输出文件被截断，重新解析: {self.path}")
+            self._reset()
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        if chunk:
+            self._offset += len(chunk)
+            self._last_growth = time.monotonic()
+        chunk = self._partial + chunk
+        if final:
+            self._partial = b""
+        else:
+            cut = chunk.rfind(b"\n") + 1
+            chunk, self._partial = chunk[:cut], chunk[cut:]
+        if not chunk:
+            return np.empty((0, self._ncols))
+
+        lines = chunk.decode('utf-8', errors='replace').splitlines()
+        rows = self._feed(lines)
+        if len(rows):
+            with self._lock:
+                self._blocks.append(rows)
+                self._count += len(rows)
+                self._output = None
+            for callback in list(self._subscribers):
+                try:
+                    callback(rows)
+                except Exception as e:
+                    logger.error(f"数据行回调异常: {e}")
+        return rows
+
+    def _feed(self, lines: List[str]) -> np.ndarray:
+        """解析一批完整行，返回其中的数值行"""
+        start = 0
+        if not self.started:
+            for start, raw in enumerate(lines):
+                is_data, delimiter = scan_header_line(self._header, raw.strip())
+                if is_data:
+                    self._delimiter = delimiter
+                    self._ncols = len(_split(raw.strip().rstrip(','), delimiter))
+                    break
+            else:
+                return np.empty((0, 0))
+        lines = lines[start:]
+        text = "\n".join(lines)
+        if not text.strip():
+            return np.empty((0, self._ncols))
+
+        if not self._pending_segment:
+            # 快速路径: 整块都是数值行
+            try:
+                return np.loadtxt(io.StringIO(text), delimiter=self._delimiter,
+                                  usecols=tuple(range(self._ncols)), ndmin=2,
+                                  dtype=np.float64)
+            except ValueError:
+                pass
+
+        numeric: List[str] = []
+        for raw in lines:
+            line = raw.strip().rstrip(',')
+            if not line:
+                continue
+            if line[0] in _NUMERIC_START:
+                if self._pending_segment:
+                    index = self._count + len(numeric)
+                    if index > self._segment_starts[-1]:
+                        self._segment_starts.append(index)
+                    self._pending_segment = False
+                    self.finished = False
+                numeric.append(line if self._delimiter else line.replace(',', ' '))
+            else:
+                self._pending_segment = True
+                if not line.lower().startswith(_SEGMENT_PREFIX):
+                    self.finished = True
+        if not numeric:
+            return np.empty((0, self._ncols))
+        return _load_rows(numeric, self._delimiter, self._ncols)
+
+    # ----------------------------------------------------------
+    # 跟踪直到完成
+    # ----------------------------------------------------------
+
+    def follow(self, is_done: Optional[Callable[[], bool]] = None,
+               stop_event: Optional[threading.Event] = None,
+               timeout: Optional[float] = None,
+               poll_interval: float = DEFAULT_POLL_INTERVAL,
+               quiet_seconds: Optional[float] = None) -> bool:
+        """轮询直到检测到完成
+
+        Args:
+            is_done: 外部完成条件（如进程已退出），成立后补读剩余数据
+            stop_event: 置位时放弃等待
+            timeout: 总超时 (秒)
+            poll_interval: 轮询间隔 (秒)
+            quiet_seconds: 有数据后文件持续不增长多久即视为完成（None 不启用）
+
+        Returns:
+            是否正常完成（超时或中止返回 False）
+        """
+        start = time.monotonic()
+        while True:
+            self.poll()
+            if self.finished:
+                return True
+            if is_done is not None and is_done():
+                self.poll(final=True)
+                return True
+
+            if (quiet_seconds is not None and self.started
+                    and self.idle_seconds >= quiet_seconds):
+                self.poll(final=True)
+                return True
+
+            if timeout is not None and time.monotonic() - start >= timeout:
+                return False
+            if stop_event is not None:
+                if stop_event.wait(poll_interval):
+                    return False
+            else:
+                time.sleep(poll_interval)
@@ -1,13 +1,48 @@
-from .data_exporter import DataExporter
-from .kafka_client import KafkaClient
-from .logger import LoggerService
-from .settings_service import SettingsService
-from .translator import TranslatorService
-
-__all__ = [
-    "DataExporter",
-    "KafkaClient",
-    "LoggerService",
-    "SettingsService",
-    "TranslatorService",
-]
+"""Service exports, resolved lazily (PEP 562).
+
+Importing one service (e.g. ``services.logger`` from the hardware layer) no
+longer pulls in numpy, sqlite3 or the Kafka client at startup; each name is
+imported from its submodule on first access.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
+    "DataExporter": ".data_exporter",
+    "KafkaClient": ".kafka_client",
+    "AsyncLogPipeline": ".log_pipeline",
+    "LoggerService": ".logger",
+    "CampaignStore": ".result_store",
+    "EchemRecord": ".result_store",
+    "Page": ".result_store",
+    "SettingsService": ".settings_service",
+    "TelemetryRecorder": ".telemetry",
+    "analyse_telemetry": ".telemetry",
+    "TranslatorService": ".translator",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .data_exporter import DataExporter
+    from .kafka_client import KafkaClient
+    from .log_pipeline import AsyncLogPipeline
+    from .logger import LoggerService
+    from .result_store import CampaignStore, EchemRecord, Page
+    from .settings_service import SettingsService
+    from .telemetry import TelemetryRecorder, analyse_telemetry
+    from .translator import TranslatorService
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,14 +1,50 @@
-"""CSV/Excel export helper with optional async execution."""
+"""CSV/Excel/NPZ/Parquet/Feather export helper with optional async execution.
+
+The ``*_stream`` / ``export_chunks`` variants take iterables of rows or 2-D
+array chunks and write them incrementally, so memory stays bounded by one
+chunk regardless of how many points are exported.
+"""
 
 from __future__ import annotations
 
 import csv
+import itertools
+import os
+import shutil
+import tempfile
+import zipfile
 from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+import numpy as np
 
 from .logger import LoggerService
 
+# Rows are grouped into blocks of this size before writing.
+CHUNK_ROWS = 65536
+
+
+def iter_blocks(chunks: Iterable[Any], chunk_rows: int = CHUNK_ROWS) -> Iterator[np.ndarray]:
+    """Normalise an iterable of rows and/or 2-D chunks into float64 2-D blocks."""
+    pending: list = []
+    for item in chunks:
+        if isinstance(item, np.ndarray) and item.ndim == 2 or (
+                isinstance(item, list) and item and isinstance(item[0], (tuple, list, np.ndarray))):
+            if pending:
+                yield np.asarray(pending, dtype=np.float64)
+                pending = []
+            block = np.asarray(item, dtype=np.float64)
+            if len(block):
+                yield block
+            continue
+        pending.append(item)
+        if len(pending) >= chunk_rows:
+            yield np.asarray(pending, dtype=np.float64)
+            pending = []
+    if pending:
+        yield np.asarray(pending, dtype=np.float64)
+
 
 class DataExporter:
     def __init__(
@@ -26,46 +62,193 @@ class DataExporter:
     def ensure_dir(self) -> None:
         self.export_dir.mkdir(parents=True, exist_ok=True)
 
-    def export_csv(self, data: list[tuple[float, float]], filename: str) -> Path:
+    def _log(self, message: str) -> None:
+        if self._logger:
+            self._logger.info(message)
+
+    def _warn(self, message: str) -> None:
+        if self._logger:
+            self._logger.warning(message)
+
+    def export_csv(self, data: Iterable[tuple[float, float]], filename: str) -> Path:
         self.ensure_dir()
         path = self.export_dir / filename
         with path.open("w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
             writer.writerow(["x", "y"])
-            for x, y in data:
-                writer.writerow([x, y])
-        if self._logger:
-            self._logger.info(f"exported CSV: {path}")
+            writer.writerows(data)
+        self._log(f"exported CSV: {path}")
         return path
 
     def export_excel(self, data: list[tuple[float, float]], filename: str) -> Path:
         try:
             import pandas as pd  # type: ignore
         except Exception:
-            if self._logger:
-                self._logger.warning("pandas not available, falling back to CSV")
+            self._warn("pandas not available, falling back to CSV")
             return self.export_csv(data, filename.replace(".xlsx", ".csv"))
         self.ensure_dir()
         path = self.export_dir / filename
         df = pd.DataFrame(data, columns=["x", "y"])
         df.to_excel(path, index=False)
-        if self._logger:
-            self._logger.info(f"exported Excel: {path}")
+        self._log(f"exported Excel: {path}")
         return path
 
-    def export_dict_list(self, rows: list[dict], filename: str) -> Path:
+    def export_dict_list(self, rows: Iterable[dict], filename: str) -> Path:
         self.ensure_dir()
         path = self.export_dir / filename
-        headers = list(rows[0].keys()) if rows else []
+        rows = iter(rows)
+        first = next(rows, None)
+        headers = list(first.keys()) if first else []
         with path.open("w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=headers)
             writer.writeheader()
-            for row in rows:
-                writer.writerow(row)
-        if self._logger:
-            self._logger.info(f"exported rows: {path}")
+            if first is not None:
+                writer.writerows(itertools.chain([first], rows))
+        self._log(f"exported rows: {path}")
         return path
 
+    # ------------------------------------------------------------------
+    # Chunked exports
+    # ------------------------------------------------------------------
+
+    def export_csv_stream(
+        self,
+        chunks: Iterable[Any],
+        filename: str,
+        headers: Sequence[str] = ("x", "y"),
+        float_format: str = "%.12g",
+    ) -> Path:
+        self.ensure_dir()
+        path = self.export_dir / filename
+        rows = 0
+        with path.open("w", newline="", encoding="utf-8") as f:
+            f.write(",".join(headers) + "\n")
+            for block in iter_blocks(chunks):
+                np.savetxt(f, block, delimiter=",", fmt=float_format)
+                rows += len(block)
+        self._log(f"exported CSV ({rows} rows): {path}")
+        return path
+
+    def export_npz(
+        self,
+        chunks: Iterable[Any],
+        filename: str,
+        headers: Sequence[str] = ("x", "y"),
+        compress: bool = False,
+    ) -> Path:
+        """Write chunks as ``data`` (n, k) plus ``columns`` in an NPZ archive.
+
+        Chunks are spooled to a temporary raw file first because the .npy
+        header needs the final shape; the spool is then copied into the zip
+        member block by block.
+        """
+        self.ensure_dir()
+        path = self.export_dir / filename
+        rows, ncols = 0, len(headers)
+        fd, spool = tempfile.mkstemp(suffix=".f64", dir=self.export_dir)
+        try:
+            with os.fdopen(fd, "wb") as raw:
+                for block in iter_blocks(chunks):
+                    if block.shape[1] != ncols:
+                        raise ValueError(f"chunk has {block.shape[1]} columns, expected {ncols}")
+                    raw.write(np.ascontiguousarray(block, dtype="<f8").tobytes())
+                    rows += len(block)
+
+            mode = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            with zipfile.ZipFile(path, "w", compression=mode, allowZip64=True) as zf:
+                with zf.open("data.npy", "w", force_zip64=True) as member:
+                    header = {"descr": "<f8", "fortran_order": False, "shape": (rows, ncols)}
+                    np.lib.format.write_array_header_1_0(member, header)
+                    with open(spool, "rb") as raw:
+                        shutil.copyfileobj(raw, member, 1 << 20)
+                with zf.open("columns.npy", "w") as member:
+                    np.lib.format.write_array(member, np.array(list(headers)))
+        finally:
+            os.unlink(spool)
+        self._log(f"exported NPZ ({rows} rows): {path}")
+        return path
+
+    def _arrow_writer(self, path: Path, fmt: str, headers: Sequence[str]):
+        import pyarrow as pa  # type: ignore
+
+        schema = pa.schema([(name, pa.float64()) for name in headers])
+        if fmt == "parquet":
+            import pyarrow.parquet as pq  # type: ignore
+            return pa, pq.ParquetWriter(str(path), schema)
+        import pyarrow.ipc as ipc  # type: ignore
+        return pa, ipc.new_file(str(path), schema)
+
+    def _export_arrow(self, chunks: Iterable[Any], filename: str,
+                      headers: Sequence[str], fmt: str) -> Path:
+        try:
+            import pyarrow  # type: ignore  # noqa: F401
+        except Exception:
+            self._warn(f"pyarrow not available, falling back to CSV for {fmt}")
+            return self.export_csv_stream(chunks, str(Path(filename).with_suffix(".csv")), headers)
+        self.ensure_dir()
+        path = self.export_dir / filename
+        rows = 0
+        pa, writer = self._arrow_writer(path, fmt, headers)
+        try:
+            for block in iter_blocks(chunks):
+                batch = pa.record_batch([pa.array(block[:, k]) for k in range(len(headers))],
+                                        names=list(headers))
+                if fmt == "parquet":
+                    writer.write_batch(batch)
+                else:
+                    writer.write(batch)
+                rows += len(block)
+        finally:
+            writer.close()
+        self._log(f"exported {fmt} ({rows} rows): {path}")
+        return path
+
+    def export_parquet(self, chunks: Iterable[Any], filename: str,
+                       headers: Sequence[str] = ("x", "y")) -> Path:
+        return self._export_arrow(chunks, filename, headers, "parquet")
+
+    def export_feather(self, chunks: Iterable[Any], filename: str,
+                       headers: Sequence[str] = ("x", "y")) -> Path:
+        return self._export_arrow(chunks, filename, headers, "feather")
+
+    def export_chunks(self, chunks: Iterable[Any], filename: str,
+                      headers: Sequence[str] = ("x", "y")) -> Path:
+        """Dispatch on the file extension (.csv / .npz / .parquet / .feather)."""
+        suffix = Path(filename).suffix.lower()
+        writers = {
+            ".csv": self.export_csv_stream,
+            ".npz": self.export_npz,
+            ".parquet": self.export_parquet,
+            ".feather": self.export_feather,
+            ".arrow": self.export_feather,
+        }
+        if suffix not in writers:
+            raise ValueError(f"unsupported export format: {suffix}")
+        return writers[suffix](chunks, filename, headers)
+
+    def export_campaign(self, store: Any, filename: str, technique: str | None = None,
+                        where: dict | None = None) -> Future | Path:
+        """Export all echem arrays of a CampaignStore into one long table.
+
+        Columns: run_id, array_id, time, potential, current. Arrays stored
+        with fewer than three columns are NaN-padded on the right. Runs through
+        ``run_async`` so with ``async_mode`` the whole export happens on the
+        executor; arrays are read one memory-mapped record at a time.
+        """
+        headers = ("run_id", "array_id", "time", "potential", "current")
+
+        def chunks() -> Iterator[np.ndarray]:
+            for record in store.query_echem(technique, where):
+                data = store.load_array(record.array_id)
+                n = min(record.cols, 3)
+                block = np.full((record.rows, 5), np.nan)
+                block[:, 0] = record.run_id
+                block[:, 1] = record.array_id
+                block[:, 2:2 + n] = data[:, :n]
+                yield block
+
+        return self.run_async(self.export_chunks, chunks(), filename, headers)
+
     def run_async(self, func: Callable[..., Path], *args, **kwargs) -> Future | Path:
         if not self.async_mode:
             return func(*args, **kwargs)
@@ -1,14 +1,76 @@
-"""Optional Kafka client wrapper with safe-disable behavior."""
+"""Optional Kafka client wrapper with safe-disable behavior.
+
+``produce`` only appends ``(topic, msg, t)`` to a bounded queue and never
+blocks: when the queue is full the message is dropped and counted. A sender
+thread drains the queue with linger/batch-size semantics, encodes on its own
+thread and hands each batch to the producer. Encoding uses orjson when it is
+installed (optional, see requirements.txt; non-str dict keys and numpy
+values are accepted) and falls back to compact json for anything orjson
+rejects or when it is missing. Messages are encoded later, so callers must not mutate a
+dict after producing it. The producer/consumer can be injected, e.g. an
+in-process fake broker in tests.
+
+Config keys (besides ``bootstrap.servers`` and ``topics``):
+``linger.ms`` (default 20), ``batch.size`` in messages (default 500),
+``queue.buffering.max.messages`` (default 100000).
+"""
 
 from __future__ import annotations
 
 import json
+import queue
 import threading
 import time
-from typing import Callable
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
 
 from .logger import LoggerService
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+DEFAULT_LINGER_MS = 20
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_QUEUE_SIZE = 100_000
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # e.g. unsupported types; json may still handle them
+    return json.dumps(obj, ensure_ascii=True, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+@dataclass
+class KafkaMetrics:
+    enqueued: int = 0
+    dropped: int = 0
+    sent: int = 0
+    failed: int = 0
+    batches: int = 0
+    latency_total: float = 0.0     # enqueue -> handed to producer, seconds
+    latency_max: float = 0.0
+    queue_depth: int = 0
+
+    @property
+    def latency_mean(self) -> float:
+        return self.latency_total / self.sent if self.sent else 0.0
+
+    def to_dict(self) -> dict:
+        out = asdict(self)
+        out["latency_mean"] = self.latency_mean
+        return out
+
 
 class KafkaClient:
     def __init__(
@@ -17,32 +79,51 @@ class KafkaClient:
         logger: LoggerService | None = None,
         enabled: bool = True,
         consumer_group: str | None = None,
+        producer: Any = None,
+        consumer: Any = None,
     ) -> None:
         self.config = config or {}
         self._logger = logger
-        self.enabled = enabled and bool(self.config)
+        self.enabled = enabled and (bool(self.config) or producer is not None)
         self.consumer_group = consumer_group
-        self.producer = None
-        self.consumer = None
+        self.producer = producer
+        self.consumer = consumer
         self.mock = True
-        self._lock = threading.RLock()
         self.running = False
         self.worker: threading.Thread | None = None
         self.topics = self.config.get("topics", {})
 
+        self.linger = float(self.config.get("linger.ms", DEFAULT_LINGER_MS)) / 1000.0
+        self.batch_size = max(1, int(self.config.get("batch.size", DEFAULT_BATCH_SIZE)))
+        self._queue: queue.Queue = queue.Queue(
+            maxsize=int(self.config.get("queue.buffering.max.messages", DEFAULT_QUEUE_SIZE))
+        )
+        self._metrics = KafkaMetrics()
+        # Guards the metrics: producers and the sender thread update them concurrently.
+        self._lock = threading.Lock()
+        self._sender: threading.Thread | None = None
+        self._sending = False
+
     def initialize(self) -> None:
         if not self.enabled:
             return
+        if self.producer is not None:
+            # Injected producer/consumer (e.g. a fake broker).
+            self.mock = False
+            self._start_sender()
+            return
         try:
             from kafka import KafkaProducer, KafkaConsumer  # type: ignore
 
             self.producer = KafkaProducer(
-                bootstrap_servers=self.config.get("bootstrap.servers")
+                bootstrap_servers=self.config.get("bootstrap.servers"),
+                linger_ms=int(self.linger * 1000),
             )
             self.consumer = KafkaConsumer(
                 bootstrap_servers=self.config.get("bootstrap.servers")
             )
             self.mock = False
+            self._start_sender()
             if self._logger:
                 self._logger.info("kafka client initialized")
         except Exception as exc:
@@ -55,28 +136,123 @@ class KafkaClient:
     def is_enabled(self) -> bool:
         return self.enabled and not self.mock
 
-    def produce(self, topic: str, msg: dict | str | bytes) -> None:
-        if not self.is_enabled() or self.producer is None:
-            return
+    # ------------------------------------------------------------------
+    # Producer
+    # ------------------------------------------------------------------
+
+    def produce(self, topic: str, msg: dict | str | bytes) -> bool:
+        """Enqueue without blocking; returns False if disabled or dropped."""
+        if not self._sending:
+            return False
+        try:
+            self._queue.put_nowait((topic, msg, time.monotonic()))
+        except queue.Full:
+            with self._lock:
+                self._metrics.dropped += 1
+            return False
         with self._lock:
-            payload = self._safe_encode(msg)
-            if payload is None:
-                return
+            self._metrics.enqueued += 1
+        return True
+
+    def metrics(self) -> dict:
+        with self._lock:
+            self._metrics.queue_depth = self._queue.qsize()
+            return self._metrics.to_dict()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until the queue is drained and the producer has flushed."""
+        deadline = time.monotonic() + timeout
+        while self._sending and (self._queue.unfinished_tasks > 0):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        flush = getattr(self.producer, "flush", None)
+        if flush is not None:
             try:
-                self.producer.send(topic, payload)
-            except Exception as exc:
-                if self._logger:
-                    self._logger.warning("kafka produce failed")
-                    self._logger.exception("kafka produce error", exc=exc)
+                flush(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                return False
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        self._sending = False
+        if self._sender:
+            self._sender.join(timeout)
+            self._sender = None
+        self.stop_consumer()
 
-    def start_consumer(self, callback: Callable[[dict], None]) -> None:
+    def _start_sender(self) -> None:
+        if self._sender is not None:
+            return
+        self._sending = True
+        self._sender = threading.Thread(target=self._sender_loop, name="KafkaSender", daemon=True)
+        self._sender.start()
+
+    def _sender_loop(self) -> None:
+        while self._sending:
+            try:
+                first = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            batch = [first]
+            # Linger: wait up to ``linger`` after the first message for a fuller batch.
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._send_batch(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _send_batch(self, batch: list[tuple[str, Any, float]]) -> None:
+        m = self._metrics
+        send_batch = getattr(self.producer, "send_batch", None)
+        encoded = []
+        for topic, msg, _ in batch:
+            payload = self._safe_encode(msg)
+            if payload is not None:
+                encoded.append((topic, payload))
+        with self._lock:
+            m.batches += 1
+            m.failed += len(batch) - len(encoded)
+        try:
+            if send_batch is not None:
+                send_batch(encoded)
+            else:
+                for topic, payload in encoded:
+                    self.producer.send(topic, payload)
+        except Exception as exc:
+            with self._lock:
+                m.failed += len(encoded)
+            if self._logger:
+                self._logger.warning("kafka produce failed")
+                self._logger.exception("kafka produce error", exc=exc)
+            return
+        now = time.monotonic()
+        latencies = [now - t for _, _, t in batch]
+        with self._lock:
+            m.sent += len(encoded)
+            m.latency_total += sum(latencies)
+            m.latency_max = max(m.latency_max, *latencies)
+
+    # ------------------------------------------------------------------
+    # Consumer
+    # ------------------------------------------------------------------
+
+    def start_consumer(self, callback: Callable[[Any], None], batch: bool = False) -> None:
+        """Start polling; ``batch=True`` passes each poll's decoded records as a list."""
         if not self.is_enabled() or self.consumer is None:
             return
         if self.running:
             return
         self.running = True
         self.worker = threading.Thread(
-            target=self._consumer_loop, args=(callback,), daemon=True
+            target=self._consumer_loop, args=(callback, batch), daemon=True
         )
         self.worker.start()
 
@@ -86,18 +262,30 @@ class KafkaClient:
             self.worker.join(timeout=1.0)
             self.worker = None
 
-    def _consumer_loop(self, callback: Callable[[dict], None]) -> None:
+    def _consumer_loop(self, callback: Callable[[Any], None], batch: bool = False) -> None:
         while self.running:
             try:
-                for msg in self.consumer.poll(timeout_ms=200).values():
-                    for record in msg:
-                        try:
-                            data = json.loads(record.value.decode("utf-8"))
-                        except Exception:
-                            data = {"raw": record.value}
-                        callback(data)
+                polled = self.consumer.poll(timeout_ms=200)
             except Exception:
                 time.sleep(0.2)
+                continue
+            for records in polled.values():
+                decoded = [self._safe_decode(record.value) for record in records]
+                try:
+                    if batch:
+                        callback(decoded)
+                    else:
+                        for data in decoded:
+                            callback(data)
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _safe_decode(value: bytes) -> Any:
+        try:
+            return _loads(value)
+        except Exception:
+            return {"raw": value}
 
     def _safe_encode(self, msg: dict | str | bytes) -> bytes | None:
         if isinstance(msg, bytes):
@@ -105,6 +293,6 @@ class KafkaClient:
         if isinstance(msg, str):
             return msg.encode("utf-8")
         try:
-            return json.dumps(msg, ensure_ascii=True).encode("utf-8")
+            return _dumps(msg)
         except Exception:
             return None
@@ -0,0 +1,366 @@
+"""Asynchronous batched logging pipeline.
+
+Callers (RS485 reader, engine thread, UI) only enqueue a lightly prepared
+``LogRecord``; a single listener thread formats, writes files in batches,
+rotates them by size/time and fans records out to UI callbacks at a bounded
+rate. The queue is bounded and never blocks: when it is full the record is
+dropped and counted, so disk stalls can never delay pump commands.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler
+from pathlib import Path
+from typing import Callable
+
+DEFAULT_QUEUE_SIZE = 100_000
+DEFAULT_BATCH_SIZE = 1000
+# Listener wakes at least this often to deliver pending UI records.
+DEFAULT_FLUSH_INTERVAL = 0.2
+# Minimum interval between UI deliveries (≈ 4 updates per second).
+DEFAULT_UI_INTERVAL = 0.25
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+_EXC_FORMATTER = logging.Formatter()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks and does no formatting on the caller thread."""
+
+    def __init__(self, q: queue.Queue) -> None:
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may be mutated later); timestamps/layout are
+        # formatted on the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StdoutHandler(logging.StreamHandler):
+    """StreamHandler bound to the *current* ``sys.stdout`` at emit time."""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    @property
+    def stream(self):  # type: ignore[override]
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value) -> None:
+        pass
+
+
+class RotatingBatchFile:
+    """Append-only text file with size- and time-based rotation.
+
+    ``path`` is rotated to ``path.1`` … ``path.<backup_count>`` when the next
+    write would exceed ``max_bytes`` or ``rotate_seconds`` have elapsed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        rotate_seconds: float | None = None,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        encoding: str = "utf-8",
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.encoding = encoding
+        self._file = None
+        self._size = 0
+        self._next_rollover = self._compute_next()
+
+    def _compute_next(self) -> float | None:
+        return time.time() + self.rotate_seconds if self.rotate_seconds else None
+
+    def _open(self) -> None:
+        self._file = self.path.open("a", encoding=self.encoding)
+        self._size = self._file.tell()
+
+    def _should_rollover(self, incoming: int) -> bool:
+        if self._size and self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        return self._next_rollover is not None and time.time() >= self._next_rollover
+
+    def _rollover(self) -> None:
+        self.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{i}")
+                if src.exists():
+                    src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+            if self.path.exists():
+                self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._next_rollover = self._compute_next()
+        self._open()
+
+    def write(self, text: str) -> None:
+        if self._file is None:
+            self._open()
+        data_len = len(text.encode(self.encoding))
+        if self._should_rollover(data_len):
+            self._rollover()
+        self._file.write(text)
+        self._file.flush()
+        self._size += data_len
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _FileSink:
+    def __init__(self, target: RotatingBatchFile, formatter: logging.Formatter, level: int) -> None:
+        self.target = target
+        self.formatter = formatter
+        self.level = level
+
+
+class _UISink:
+    def __init__(self, callback: Callable, level: int, batch: bool) -> None:
+        self.callback = callback
+        self.level = level
+        self.batch = batch
+        self.pending: list[logging.LogRecord] = []
+
+
+class _Flush:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class AsyncLogPipeline:
+    """Bounded queue + single listener thread with batched sinks."""
+
+    def __init__(
+        self,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        ui_interval: float = DEFAULT_UI_INTERVAL,
+    ) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = DroppingQueueHandler(self._queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ui_interval = ui_interval
+        self._handlers: list[logging.Handler] = []
+        self._files: list[_FileSink] = []
+        self._ui: list[_UISink] = []
+        self._sink_lock = threading.Lock()
+        self._last_ui = 0.0
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self.batches = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped
+
+    # ---- sinks -------------------------------------------------------
+
+    def add_handler(self, handler: logging.Handler) -> None:
+        """Run an ordinary handler (console etc.) on the listener thread."""
+        with self._sink_lock:
+            self._handlers.append(handler)
+
+    def add_file(
+        self,
+        path: Path,
+        formatter: logging.Formatter,
+        level: int = logging.INFO,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        rotate_seconds: float | None = None,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+    ) -> RotatingBatchFile:
+        target = RotatingBatchFile(path, max_bytes, rotate_seconds, backup_count)
+        with self._sink_lock:
+            self._files.append(_FileSink(target, formatter, level))
+        return target
+
+    def add_ui_callback(self, callback: Callable, level: int = logging.DEBUG,
+                        batch: bool = True) -> None:
+        """Coalesced UI fan-out.
+
+        ``batch=True``: ``callback(records)`` at most once per ``ui_interval``.
+        ``batch=False``: ``callback(record)`` per record, but delivered in the
+        same coalesced bursts from the listener thread.
+        """
+        with self._sink_lock:
+            self._ui.append(_UISink(callback, level, batch))
+
+    def remove(self, sink) -> None:
+        """Detach a handler, file target or UI callback added earlier.
+
+        A removed file target is closed; call :meth:`flush` first so records
+        already queued still reach it.
+        """
+        with self._sink_lock:
+            if sink in self._handlers:
+                self._handlers.remove(sink)
+            for entry in [s for s in self._files if s.target is sink]:
+                self._files.remove(entry)
+                entry.target.close()
+            self._ui = [s for s in self._ui if s.callback is not sink]
+
+    # ---- lifecycle ---------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="LogPipeline", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything enqueued so far is written and delivered."""
+        if self._thread is None:
+            return True
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._stopping = True
+        self._thread.join(timeout)
+        self._thread = None
+        with self._sink_lock:
+            for sink in self._files:
+                sink.target.close()
+
+    # ---- listener ----------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._deliver_ui(force=True)
+                continue
+            batch, markers = [], []
+            item = first
+            while True:
+                if isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._process(batch)
+            if markers:
+                self._deliver_ui(force=True)
+                for marker in markers:
+                    marker.done.set()
+            else:
+                self._deliver_ui(force=False)
+
+    def _process(self, batch: list[logging.LogRecord]) -> None:
+        self.batches += 1
+        with self._sink_lock:
+            handlers, ui = list(self._handlers), list(self._ui)
+            # Written under the lock so remove() never closes a file mid-batch.
+            for sink in self._files:
+                lines = [sink.formatter.format(r) for r in batch if r.levelno >= sink.level]
+                if lines:
+                    try:
+                        sink.target.write("\n".join(lines) + "\n")
+                    except Exception:
+                        # Disk errors must not kill the listener.
+                        pass
+        for handler in handlers:
+            for record in batch:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        for sink in ui:
+            sink.pending.extend(r for r in batch if r.levelno >= sink.level)
+
+    def _deliver_ui(self, force: bool) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_ui < self.ui_interval:
+            return
+        self._last_ui = now
+        with self._sink_lock:
+            ui = list(self._ui)
+        for sink in ui:
+            if not sink.pending:
+                continue
+            records, sink.pending = sink.pending, []
+            try:
+                if sink.batch:
+                    sink.callback(records)
+                else:
+                    for record in records:
+                        sink.callback(record)
+            except Exception:
+                # UI thread safety is the caller's responsibility.
+                pass
+
+
+_console_pipeline: AsyncLogPipeline | None = None
+_console_lock = threading.Lock()
+
+
+def get_console_pipeline() -> AsyncLogPipeline:
+    """Shared pipeline that prints to stdout (used by the print-style loggers).
+
+    Records carry the pre-rendered ``[LEVEL] ...`` text; only the timestamp
+    is added when the listener prints them.
+    """
+    global _console_pipeline
+    with _console_lock:
+        if _console_pipeline is None:
+            _console_pipeline = AsyncLogPipeline()
+            handler = StdoutHandler()
+            handler.setFormatter(logging.Formatter(
+                "[%(asctime)s.%(msecs)03d] %(message)s", "%Y-%m-%d %H:%M:%S"))
+            _console_pipeline.add_handler(handler)
+            _console_pipeline.start()
+        return _console_pipeline
+
+
+def console_logger(name: str) -> logging.Logger:
+    """Unregistered stdlib logger that feeds the shared console pipeline."""
+    logger = logging.Logger(name, logging.DEBUG)
+    logger.propagate = False
+    logger.addHandler(get_console_pipeline().handler)
+    return logger
@@ -1,10 +1,25 @@
-"""Thread-safe logging service with optional UI callback."""
+"""Thread-safe logging service with optional UI callback.
+
+With ``async_mode`` (the default) the logger only enqueues records; console,
+rotating file and UI sinks run on the listener thread of an
+:class:`AsyncLogPipeline`, so callers such as the RS485 reader never wait on
+formatting or disk I/O. All services share one process-wide pipeline attached
+once to the ``echem_sdl`` logger; each service only adds and removes its own
+sinks.
+"""
 
 from __future__ import annotations
 
 import logging
+import threading
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable
+
+from .log_pipeline import (
+    DEFAULT_BACKUP_COUNT,
+    DEFAULT_MAX_BYTES,
+    AsyncLogPipeline,
+)
 
 DEFAULT_LOG_FORMAT = "[%(asctime)s] [%(levelname)s] %(name)s - %(message)s"
 DEFAULT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
@@ -18,6 +33,21 @@ LEVELS: dict[str, int] = {
 }
 
 
+_pipeline: AsyncLogPipeline | None = None
+_pipeline_lock = threading.Lock()
+
+
+def shared_pipeline() -> AsyncLogPipeline:
+    """Process-wide pipeline behind the ``echem_sdl`` logger, started on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = AsyncLogPipeline()
+            logging.getLogger("echem_sdl").addHandler(_pipeline.handler)
+            _pipeline.start()
+        return _pipeline
+
+
 class _UICallbackHandler(logging.Handler):
     def __init__(self, callback: Callable[[logging.LogRecord], None]) -> None:
         super().__init__()
@@ -39,6 +69,7 @@ class LoggerService:
         datefmt: str | None = None,
         handlers: list[logging.Handler] | None = None,
         ui_callback: Callable[[logging.LogRecord], None] | None = None,
+        async_mode: bool = True,
     ) -> None:
         self._logger = logging.getLogger("echem_sdl")
         self._logger.setLevel(LEVELS.get(level.upper(), logging.INFO))
@@ -46,35 +77,88 @@ class LoggerService:
         self._formatter = logging.Formatter(
             fmt or DEFAULT_LOG_FORMAT, datefmt or DEFAULT_DATE_FORMAT
         )
+        self._pipeline: AsyncLogPipeline | None = shared_pipeline() if async_mode else None
+        # Sinks added by this service (removed again by close()).
+        self._sinks: list[Any] = []
 
         if handlers:
             for handler in handlers:
                 handler.setFormatter(self._formatter)
-                self._logger.addHandler(handler)
+                self._attach(handler)
         else:
             self.add_console_handler(level)
 
         if ui_callback is not None:
             self.bind_ui_callback(ui_callback)
 
+    def _attach(self, handler: logging.Handler) -> None:
+        if self._pipeline is not None:
+            self._pipeline.add_handler(handler)
+        else:
+            self._logger.addHandler(handler)
+        self._sinks.append(handler)
+
     def add_console_handler(self, level: str | None = None) -> None:
         handler = logging.StreamHandler()
         handler.setLevel(LEVELS.get((level or "INFO").upper(), logging.INFO))
         handler.setFormatter(self._formatter)
-        self._logger.addHandler(handler)
+        self._attach(handler)
 
-    def add_file_handler(self, path: Path, level: str | None = None) -> None:
+    def add_file_handler(
+        self,
+        path: Path,
+        level: str | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        rotate_seconds: float | None = None,
+    ) -> None:
+        """Log to ``path``; in async mode writes are batched and rotated."""
+        levelno = LEVELS.get((level or "INFO").upper(), logging.INFO)
+        if self._pipeline is not None:
+            self._sinks.append(self._pipeline.add_file(path, self._formatter, levelno,
+                                                       max_bytes, rotate_seconds, backup_count))
+            return
         path.parent.mkdir(parents=True, exist_ok=True)
         handler = logging.FileHandler(path, encoding="utf-8")
-        handler.setLevel(LEVELS.get((level or "INFO").upper(), logging.INFO))
+        handler.setLevel(levelno)
         handler.setFormatter(self._formatter)
-        self._logger.addHandler(handler)
+        self._attach(handler)
 
     def bind_ui_callback(self, callback: Callable[[logging.LogRecord], None]) -> None:
+        """Per-record callback; in async mode delivered in coalesced bursts."""
+        if self._pipeline is not None:
+            self._pipeline.add_ui_callback(callback, logging.DEBUG, batch=False)
+            self._sinks.append(callback)
+            return
         handler = _UICallbackHandler(callback)
         handler.setLevel(logging.DEBUG)
         handler.setFormatter(self._formatter)
-        self._logger.addHandler(handler)
+        self._attach(handler)
+
+    def bind_ui_batch_callback(
+        self, callback: Callable[[list[logging.LogRecord]], None]
+    ) -> None:
+        """``callback(records)`` at most a few times per second (async mode only)."""
+        if self._pipeline is None:
+            raise RuntimeError("batch UI callbacks require async_mode")
+        self._pipeline.add_ui_callback(callback, logging.DEBUG, batch=True)
+        self._sinks.append(callback)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued records have reached every sink."""
+        return self._pipeline.flush(timeout) if self._pipeline is not None else True
+
+    def close(self) -> None:
+        """Flush and detach this service's sinks; the shared pipeline keeps running."""
+        sinks, self._sinks = self._sinks, []
+        if self._pipeline is not None:
+            self._pipeline.flush()
+            for sink in sinks:
+                self._pipeline.remove(sink)
+        else:
+            for sink in sinks:
+                self._logger.removeHandler(sink)
+                sink.close()
 
     def log(self, level: str, msg: str, **kwargs) -> None:
         self._logger.log(LEVELS.get(level.upper(), logging.INFO), msg, extra=kwargs)
@@ -100,3 +184,7 @@ class LoggerService:
     @property
     def logger(self) -> logging.Logger:
         return self._logger
+
+    @property
+    def pipeline(self) -> AsyncLogPipeline | None:
+        return self._pipeline
@@ -2,11 +2,14 @@
 LoggerService - 统一日志服务（基础版）
 
 提供简单的日志记录功能，满足阶段3的基本需求。
+控制台输出经共享的异步日志管线 (log_pipeline) 在后台线程完成，
+RS485 读线程等调用方只做入队，不会被终端 I/O 阻塞。
 """
-from datetime import datetime
 from enum import IntEnum
 from typing import Optional
 
+from .log_pipeline import console_logger
+
 
 class LogLevel(IntEnum):
     """日志级别"""
@@ -40,22 +43,14 @@ class LoggerService:
         """
         self.name = name
         self.level = level
-    
-    def _format_message(self, level: str, message: str, module: Optional[str] = None) -> str:
-        """格式化日志消息
-        
-        Args:
-            level: 日志级别名称
-            message: 日志消息
-            module: 模块名称
-            
-        Returns:
-            格式化后的日志字符串
-        """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        self._out = console_logger(name)
+
+    def _emit(self, level: str, message: str, module: Optional[str] = None) -> None:
+        """入队一条日志 (时间戳由后台线程按记录创建时间格式化)"""
         if module:
-            return f"[{timestamp}] [{level}] [{module}] {message}"
-        return f"[{timestamp}] [{level}] {message}"
+            self._out.log(LogLevel[level], "[%s] [%s] %s", level, module, message)
+        else:
+            self._out.log(LogLevel[level], "[%s] %s", level, message)
     
     def debug(self, message: str, module: Optional[str] = None) -> None:
         """记录DEBUG级别日志
@@ -65,7 +60,7 @@ class LoggerService:
             module: 模块名称
         """
         if self.level <= LogLevel.DEBUG:
-            print(self._format_message("DEBUG", message, module))
+            self._emit("DEBUG", message, module)
     
     def info(self, message: str, module: Optional[str] = None) -> None:
         """记录INFO级别日志
@@ -75,7 +70,7 @@ class LoggerService:
             module: 模块名称
         """
         if self.level <= LogLevel.INFO:
-            print(self._format_message("INFO", message, module))
+            self._emit("INFO", message, module)
     
     def warning(self, message: str, module: Optional[str] = None) -> None:
         """记录WARNING级别日志
@@ -85,7 +80,7 @@ class LoggerService:
             module: 模块名称
         """
         if self.level <= LogLevel.WARNING:
-            print(self._format_message("WARNING", message, module))
+            self._emit("WARNING", message, module)
     
     def error(self, message: str, module: Optional[str] = None) -> None:
         """记录ERROR级别日志
@@ -95,7 +90,7 @@ class LoggerService:
             module: 模块名称
         """
         if self.level <= LogLevel.ERROR:
-            print(self._format_message("ERROR", message, module))
+            self._emit("ERROR", message, module)
     
     def critical(self, message: str, module: Optional[str] = None) -> None:
         """记录CRITICAL级别日志
@@ -105,7 +100,7 @@ class LoggerService:
             module: 模块名称
         """
         if self.level <= LogLevel.CRITICAL:
-            print(self._format_message("CRITICAL", message, module))
+            self._emit("CRITICAL", message, module)
     
     def set_level(self, level: LogLevel) -> None:
         """设置日志级别
@@ -0,0 +1,546 @@
+"""Local campaign result store: SQLite index + append-only float64 array file.
+
+一个目录保存整个实验活动 (campaign) 的结果:
+
+    <root>/index.sqlite   运行、组合参数、步骤耗时、数组索引、电化学参数与特征
+    <root>/arrays.f64     所有数组 (电化学 (n, 3) 数据、泵遥测等) 依次追加的 float64 原始数据
+
+- 追加: 每次运行一次顺序写 + 一个 SQLite 事务，与已有数据量无关
+- 读取: 通过 np.memmap 映射 arrays.f64，按偏移切片，零拷贝、按需分页
+- 查询: 参数与特征按 (name, value) 建索引，
+  "scan_rate = 0.1 且 H2SO4 > 0.5 的全部 CV" 只是一条 SQL，不必遍历 CHI 文件
+- 下游 (优化器 / notebook): 分页查询 (page_runs / page_echem)、
+  列式取数 (echem_columns) 与库内聚合 (aggregate_echem)，一次调用取回上千次运行
+
+HDF5 / Parquet 依赖未列入 requirements，这里只用标准库 sqlite3 与 NumPy。
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+INDEX_NAME = "index.sqlite"
+ARRAYS_NAME = "arrays.f64"
+_ITEM = np.dtype("<f8")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign TEXT,
+    experiment_name TEXT,
+    program_name TEXT,
+    combo_index INTEGER,
+    start_time TEXT,
+    end_time TEXT,
+    duration REAL,
+    success INTEGER,
+    error_message TEXT
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_params ON params (name, value, run_id);
+CREATE INDEX IF NOT EXISTS idx_params_run ON params (run_id, name);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL,
+    step_index INTEGER,
+    name TEXT,
+    type TEXT,
+    success INTEGER,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS idx_steps ON steps (run_id);
+CREATE TABLE IF NOT EXISTS arrays (
+    array_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL,
+    seq INTEGER,
+    kind TEXT,
+    name TEXT,
+    technique TEXT,
+    offset INTEGER,
+    rows INTEGER,
+    cols INTEGER,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_arrays ON arrays (kind, technique);
+CREATE INDEX IF NOT EXISTS idx_arrays_run ON arrays (run_id);
+CREATE TABLE IF NOT EXISTS array_values (
+    array_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_array_values ON array_values (name, value, array_id);
+CREATE INDEX IF NOT EXISTS idx_array_values_id ON array_values (array_id, name);
+"""
+
+_OPS = {"=", "==", "!=", "<", "<=", ">", ">="}
+
+# 可直接过滤 / 取列的运行与数组字段 (其余名称按组合参数、电化学参数与特征解析)
+_FIELDS = {
+    "run_id": "a.run_id",
+    "array_id": "a.array_id",
+    "seq": "a.seq",
+    "rows": "a.rows",
+    "technique": "a.technique",
+    "combo_index": "r.combo_index",
+    "duration": "r.duration",
+    "success": "r.success",
+}
+_RUN_COLUMNS = ("run_id", "campaign", "experiment_name", "program_name", "combo_index",
+                "start_time", "end_time", "duration", "success", "error_message")
+
+
+def step_timeline(step_results: Iterable[Mapping[str, Any]]) -> np.ndarray:
+    """由步骤结果生成时间线遥测 (n, 4): 步骤序号、起始时刻 (相对运行开始, s)、耗时 s、是否成功"""
+    rows = [(s.get("index", k), s.get("start", math.nan), s.get("duration") or 0.0,
+             float(bool(s.get("success"))))
+            for k, s in enumerate(step_results)]
+    return np.array(rows, dtype=_ITEM).reshape(-1, 4)
+
+
+@dataclass
+class EchemRecord:
+    """一条电化学数据的索引记录 (数据本身通过 CampaignStore.load_array 读取)"""
+    array_id: int
+    run_id: int
+    seq: int
+    technique: str
+    name: str
+    rows: int
+    cols: int
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def features(self) -> Dict[str, float]:
+        return self.metadata.get("features", {})
+
+
+@dataclass
+class Page:
+    """分页查询结果"""
+    items: List[Any]
+    total: int          # 满足条件的总条数
+    offset: int
+    limit: Optional[int]
+
+    @property
+    def next_offset(self) -> Optional[int]:
+        """下一页起点，已到末页时为 None"""
+        end = self.offset + len(self.items)
+        return end if end < self.total else None
+
+
+def _split_value(value: Any) -> Tuple[Optional[float], Optional[str]]:
+    """参数值拆为 (数值, 文本)，数值列用于范围查询"""
+    if isinstance(value, bool):
+        return float(value), None
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        value = float(value)
+        return (value, None) if math.isfinite(value) else (None, str(value))
+    if value is None:
+        return None, None
+    try:
+        return float(value), None
+    except (TypeError, ValueError):
+        return None, json.dumps(value, ensure_ascii=False, default=str) if not isinstance(value, str) else value
+
+
+def _flatten(prefix: str, values: Mapping[str, Any]) -> Iterable[Tuple[str, Any]]:
+    for key, value in values.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, Mapping):
+            yield from _flatten(f"{name}.", value)
+        else:
+            yield name, value
+
+
+def _parse_spec(spec: Any) -> Tuple[str, Any]:
+    op, value = spec if isinstance(spec, tuple) else ("=", spec)
+    if op not in _OPS:
+        raise ValueError(f"不支持的比较运算: {op}")
+    return op, value
+
+
+def _field_condition(expr: str, spec: Any) -> Tuple[str, list]:
+    """运行 / 数组字段的过滤条件"""
+    op, value = _parse_spec(spec)
+    if isinstance(value, bool):
+        value = int(value)
+    return f"{expr} {'=' if op == '==' else op} ?", [value]
+
+
+def _value_expr(name: str) -> Tuple[str, list]:
+    """取值表达式: 字段，或组合参数 → 电化学参数 / 特征 (数值优先，否则文本)"""
+    if name in _FIELDS:
+        return _FIELDS[name], []
+    sql = ("COALESCE("
+           "(SELECT COALESCE(p.value, p.text) FROM params p WHERE p.run_id = a.run_id AND p.name = ?),"
+           " (SELECT COALESCE(v.value, v.text) FROM array_values v"
+           " WHERE v.array_id = a.array_id AND v.name = ?))")
+    return sql, [name, name]
+
+
+def _column(values: List[Any]) -> np.ndarray:
+    """数值列 → float64 (缺失为 NaN)，含文本时为 object 数组"""
+    try:
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array(values, dtype=object)
+
+
+def _condition(name: str, spec: Any, table: str, id_col: str, ref: str) -> Tuple[str, list]:
+    """单个过滤条件 → EXISTS 子查询"""
+    op, value = _parse_spec(spec)
+    if isinstance(value, str):
+        expr, args = "v.text = ?", [value]
+    elif op in ("=", "=="):
+        # 浮点相等按相对容差比较
+        tol = 1e-9 * max(1.0, abs(float(value)))
+        expr, args = "v.value BETWEEN ? AND ?", [float(value) - tol, float(value) + tol]
+    else:
+        expr, args = f"v.value {op} ?", [float(value)]
+    sql = f"EXISTS (SELECT 1 FROM {table} v WHERE v.{id_col} = {ref} AND v.name = ? AND {expr})"
+    return sql, [name] + args
+
+
+class CampaignStore:
+    """实验活动结果库
+
+    Example:
+        >>> store = CampaignStore("./data/campaign_01")
+        >>> store.append_run(result)                 # ExperimentResult
+        >>> cvs = store.query_echem("CV", {"scan_rate": 0.1, "H2SO4": (">", 0.5)})
+        >>> data = store.load_array(cvs[0].array_id)  # (n, 3) memmap 视图
+        >>> cols = store.echem_columns(["H2SO4", "anodic_peak_current"], "CV")
+        >>> store.aggregate_echem("anodic_peak_current", by="H2SO4", technique="CV")
+    """
+
+    def __init__(self, root: Path | str, campaign: str = "") -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.campaign = campaign or self.root.name
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(str(self.root / INDEX_NAME), check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._arrays_path = self.root / ARRAYS_NAME
+        self._arrays_path.touch(exist_ok=True)
+        self._mmap: Optional[np.memmap] = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._mmap = None
+            self._db.close()
+
+    def __enter__(self) -> "CampaignStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ========================
+    # 写入
+    # ========================
+
+    def _append_blob(self, arr: np.ndarray) -> int:
+        """追加到 arrays.f64，返回起始偏移 (以 float64 个数计)"""
+        with self._arrays_path.open("ab") as f:
+            offset = f.tell() // _ITEM.itemsize
+            f.write(np.ascontiguousarray(arr, dtype=_ITEM).tobytes())
+        return offset
+
+    def _insert_array(self, run_id: int, seq: int, kind: str, name: str, technique: str,
+                      arr: np.ndarray, metadata: Mapping[str, Any]) -> int:
+        arr = np.asarray(arr, dtype=_ITEM)
+        if arr.ndim == 1:
+            arr = arr.reshape(-1, 1)
+        offset = self._append_blob(arr)
+        cur = self._db.execute(
+            "INSERT INTO arrays (run_id, seq, kind, name, technique, offset, rows, cols, metadata)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, seq, kind, name, technique, offset, arr.shape[0], arr.shape[1],
+             json.dumps(dict(metadata), ensure_ascii=False, default=str)),
+        )
+        array_id = cur.lastrowid
+        values = []
+        for key in ("params", "features"):
+            for pname, value in _flatten("", metadata.get(key, {}) or {}):
+                values.append((array_id, pname) + _split_value(value))
+        if values:
+            self._db.executemany(
+                "INSERT INTO array_values (array_id, name, value, text) VALUES (?, ?, ?, ?)", values)
+        return array_id
+
+    def append_run(self, result: Any, telemetry: Optional[Mapping[str, Any]] = None) -> int:
+        """保存一次运行 (ExperimentResult 或同字段对象)
+
+        Args:
+            result: 含 combo_params / step_results / ec_data_sets 的运行结果
+            telemetry: 额外的遥测数组 {名称: 数组}，与 result.telemetry 合并
+
+        Returns:
+            run_id
+        """
+        start = getattr(result, "start_time", None)
+        end = getattr(result, "end_time", None)
+        duration = (end - start).total_seconds() if isinstance(start, datetime) and isinstance(end, datetime) else None
+        telemetry = {**(getattr(result, "telemetry", None) or {}), **(telemetry or {})}
+
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT INTO runs (campaign, experiment_name, program_name, combo_index,"
+                " start_time, end_time, duration, success, error_message)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.campaign, getattr(result, "experiment_name", ""),
+                 getattr(result, "program_name", ""), getattr(result, "combo_index", 0),
+                 start.isoformat() if isinstance(start, datetime) else start,
+                 end.isoformat() if isinstance(end, datetime) else end,
+                 duration, int(bool(getattr(result, "success", False))),
+                 getattr(result, "error_message", "")),
+            )
+            run_id = cur.lastrowid
+
+            params = [(run_id, name) + _split_value(value)
+                      for name, value in _flatten("", getattr(result, "combo_params", {}) or {})]
+            self._db.executemany(
+                "INSERT INTO params (run_id, name, value, text) VALUES (?, ?, ?, ?)", params)
+
+            steps = [(run_id, s.get("index"), s.get("name"), s.get("type"),
+                      int(bool(s.get("success"))), s.get("duration"))
+                     for s in getattr(result, "step_results", []) or []]
+            self._db.executemany(
+                "INSERT INTO steps (run_id, step_index, name, type, success, duration)"
+                " VALUES (?, ?, ?, ?, ?, ?)", steps)
+
+            for seq, data_set in enumerate(getattr(result, "ec_data_sets", []) or []):
+                arr = data_set.as_array() if hasattr(data_set, "as_array") else np.asarray(data_set)
+                self._insert_array(
+                    run_id, seq, "echem", getattr(data_set, "name", ""),
+                    str(getattr(data_set, "technique", "")).upper(), arr,
+                    getattr(data_set, "metadata", {}) or {})
+
+            for seq, (name, values) in enumerate(telemetry.items()):
+                self._insert_array(run_id, seq, "telemetry", name, "", np.asarray(values), {})
+        return run_id
+
+    # ========================
+    # 读取
+    # ========================
+
+    def _view(self) -> np.memmap:
+        """arrays.f64 的只读映射，文件增长后重新映射"""
+        size = self._arrays_path.stat().st_size // _ITEM.itemsize
+        if self._mmap is None or len(self._mmap) < size:
+            self._mmap = np.memmap(self._arrays_path, dtype=_ITEM, mode="r", shape=(size,)) if size else None
+        return self._mmap
+
+    def load_array(self, array_id: int) -> np.ndarray:
+        """按 array_id 读取数组 (rows, cols) 只读 memmap 视图"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT offset, rows, cols FROM arrays WHERE array_id = ?", (array_id,)).fetchone()
+            if row is None:
+                raise KeyError(array_id)
+            offset, rows, cols = row
+            if rows == 0:
+                return np.empty((0, cols), dtype=_ITEM)
+            return self._view()[offset:offset + rows * cols].reshape(rows, cols)
+
+    def run_count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def run_params(self, run_id: int) -> Dict[str, Any]:
+        """某次运行的组合参数"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, value, text FROM params WHERE run_id = ?", (run_id,)).fetchall()
+        return {name: (text if value is None else value) for name, value, text in rows}
+
+    def step_timings(self, run_id: int) -> List[Dict[str, Any]]:
+        """某次运行的步骤耗时"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT step_index, name, type, success, duration FROM steps"
+                " WHERE run_id = ? ORDER BY step_index", (run_id,)).fetchall()
+        return [{"index": i, "name": n, "type": t, "success": bool(s), "duration": d}
+                for i, n, t, s, d in rows]
+
+    def telemetry(self, run_id: int) -> Dict[str, np.ndarray]:
+        """某次运行的遥测数组"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT array_id, name FROM arrays WHERE run_id = ? AND kind = 'telemetry'"
+                " ORDER BY seq", (run_id,)).fetchall()
+        return {name: self.load_array(array_id) for array_id, name in rows}
+
+    @staticmethod
+    def _echem_where(technique: Optional[str],
+                     where: Optional[Mapping[str, Any]]) -> Tuple[str, list]:
+        """电化学数据过滤条件 (FROM arrays a JOIN runs r)"""
+        clauses, args = ["a.kind = 'echem'"], []
+        if technique:
+            clauses.append("a.technique = ?")
+            args.append(technique.upper())
+        for name, spec in (where or {}).items():
+            if name in _FIELDS:
+                sql, field_args = _field_condition(_FIELDS[name], spec)
+                clauses.append(sql)
+                args += field_args
+                continue
+            run_sql, run_args = _condition(name, spec, "params", "run_id", "a.run_id")
+            arr_sql, arr_args = _condition(name, spec, "array_values", "array_id", "a.array_id")
+            clauses.append(f"({run_sql} OR {arr_sql})")
+            args += run_args + arr_args
+        return " AND ".join(clauses), args
+
+    def query_echem(self, technique: Optional[str] = None,
+                    where: Optional[Mapping[str, Any]] = None,
+                    limit: Optional[int] = None, offset: int = 0) -> List[EchemRecord]:
+        """按技术与参数 / 特征过滤电化学数据
+
+        Args:
+            technique: 技术名 (CV / LSV / I-T ...)，None 表示全部
+            where: {名称: 值 或 (运算符, 值)}；名称先在运行的组合参数中匹配，
+                再在该条数据的电化学参数与特征中匹配，如
+                {"scan_rate": 0.1, "H2SO4": (">", 0.5), "anodic_peak_current": (">=", 1e-5)}；
+                run_id / combo_index / duration / success 等字段直接比较
+            limit, offset: 分页 (limit 为 None 表示不限)
+
+        Returns:
+            EchemRecord 列表 (按 array_id 升序)
+        """
+        cond, args = self._echem_where(technique, where)
+        sql = ("SELECT a.array_id, a.run_id, a.seq, a.technique, a.name, a.rows, a.cols, a.metadata"
+               " FROM arrays a JOIN runs r ON r.run_id = a.run_id WHERE " + cond +
+               " ORDER BY a.array_id LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self._db.execute(sql, args + [-1 if limit is None else limit, offset]).fetchall()
+        return [EchemRecord(array_id, run_id, seq, technique, name, n, m, json.loads(meta or "{}"))
+                for array_id, run_id, seq, technique, name, n, m, meta in rows]
+
+    def count_echem(self, technique: Optional[str] = None,
+                    where: Optional[Mapping[str, Any]] = None) -> int:
+        cond, args = self._echem_where(technique, where)
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM arrays a JOIN runs r ON r.run_id = a.run_id WHERE " + cond,
+                args).fetchone()[0]
+
+    def page_echem(self, technique: Optional[str] = None,
+                   where: Optional[Mapping[str, Any]] = None,
+                   limit: int = 100, offset: int = 0) -> Page:
+        """query_echem 的分页版本 (附总条数)"""
+        return Page(self.query_echem(technique, where, limit, offset),
+                    self.count_echem(technique, where), offset, limit)
+
+    def page_runs(self, where: Optional[Mapping[str, Any]] = None,
+                  limit: Optional[int] = 100, offset: int = 0) -> Page:
+        """分页查询运行记录 (含组合参数)
+
+        Args:
+            where: {名称: 值 或 (运算符, 值)}；runs 表字段直接比较，其余按组合参数匹配
+        """
+        clauses, args = ["1"], []
+        for name, spec in (where or {}).items():
+            if name in _RUN_COLUMNS:
+                sql, field_args = _field_condition(f"r.{name}", spec)
+            else:
+                sql, field_args = _condition(name, spec, "params", "run_id", "r.run_id")
+            clauses.append(sql)
+            args += field_args
+        cond = " AND ".join(clauses)
+        with self._lock:
+            total = self._db.execute(f"SELECT COUNT(*) FROM runs r WHERE {cond}", args).fetchone()[0]
+            rows = self._db.execute(
+                f"SELECT {', '.join('r.' + c for c in _RUN_COLUMNS)} FROM runs r WHERE {cond}"
+                " ORDER BY r.run_id LIMIT ? OFFSET ?",
+                args + [-1 if limit is None else limit, offset]).fetchall()
+            items = [dict(zip(_RUN_COLUMNS, row)) for row in rows]
+            if items:
+                ids = [item["run_id"] for item in items]
+                params: Dict[int, Dict[str, Any]] = {i: {} for i in ids}
+                marks = ", ".join("?" * len(ids))
+                for run_id, name, value, text in self._db.execute(
+                        f"SELECT run_id, name, value, text FROM params WHERE run_id IN ({marks})", ids):
+                    params[run_id][name] = text if value is None else value
+                for item in items:
+                    item["success"] = bool(item["success"])
+                    item["params"] = params[item["run_id"]]
+        return Page(items, total, offset, limit)
+
+    def echem_columns(self, names: Iterable[str], technique: Optional[str] = None,
+                      where: Optional[Mapping[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """列式取数: 每个名称一列，每条电化学数据一行 (一条 SQL)
+
+        名称可为字段 (run_id / array_id / combo_index / duration ...)、
+        组合参数或电化学参数 / 特征；缺失值为 NaN。
+
+        Example:
+            >>> cols = store.echem_columns(["H2SO4", "scan_rate", "anodic_peak_current"], "CV")
+        """
+        names = list(names)
+        select, args = [], []
+        for name in names:
+            expr, expr_args = _value_expr(name)
+            select.append(expr)
+            args += expr_args
+        cond, cond_args = self._echem_where(technique, where)
+        sql = (f"SELECT {', '.join(select) or '1'} FROM arrays a JOIN runs r ON r.run_id = a.run_id"
+               f" WHERE {cond} ORDER BY a.array_id")
+        with self._lock:
+            rows = self._db.execute(sql, args + cond_args).fetchall()
+        return {name: _column([row[k] for row in rows]) for k, name in enumerate(names)}
+
+    def aggregate_echem(self, value: str, by: str | List[str], technique: Optional[str] = None,
+                        where: Optional[Mapping[str, Any]] = None) -> List[Dict[str, Any]]:
+        """库内分组聚合，如各 scan_rate 下 CV 阳极峰电流的均值
+
+        Args:
+            value: 被聚合的量 (特征 / 参数名)
+            by: 分组名称 (一个或多个)
+            technique, where: 同 query_echem
+
+        Returns:
+            [{<by...>, "count", "mean", "std", "min", "max"}]，按分组键升序；
+            value 缺失的数据不计入
+        """
+        keys = [by] if isinstance(by, str) else list(by)
+        inner, args = [], []
+        for k, name in enumerate(keys):
+            expr, expr_args = _value_expr(name)
+            inner.append(f"{expr} AS k{k}")
+            args += expr_args
+        expr, expr_args = _value_expr(value)
+        inner.append(f"{expr} AS x")
+        args += expr_args
+        cond, cond_args = self._echem_where(technique, where)
+        key_cols = ", ".join(f"k{k}" for k in range(len(keys)))
+        sql = (f"SELECT {key_cols}, COUNT(x), AVG(x), AVG(x * x), MIN(x), MAX(x) FROM ("
+               f"SELECT {', '.join(inner)} FROM arrays a JOIN runs r ON r.run_id = a.run_id"
+               f" WHERE {cond}) WHERE x IS NOT NULL GROUP BY {key_cols} ORDER BY {key_cols}")
+        with self._lock:
+            rows = self._db.execute(sql, args + cond_args).fetchall()
+        out = []
+        n_keys = len(keys)
+        for row in rows:
+            count, mean, mean_sq, lo, hi = row[n_keys:]
+            item = dict(zip(keys, row[:n_keys]))
+            item.update(count=count, mean=mean, min=lo, max=hi,
+                        std=math.sqrt(max(0.0, mean_sq - mean * mean)))
+            out.append(item)
+        return out
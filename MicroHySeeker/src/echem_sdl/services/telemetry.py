@@ -0,0 +1,286 @@
+"""Structured JSONL telemetry with monotonic timestamps.
+
+Each line is one compact JSON object ``{"t": <time.monotonic()>, "ev": <kind>,
+...}``. A recorder session starts with an ``ev="session"`` line carrying the
+wall-clock time, so ``t`` can be mapped back to dates. Emitting only builds a
+dict and enqueues it; JSON encoding and batched, rotated file writes happen on
+the listener thread of an :class:`AsyncLogPipeline`.
+
+Event kinds:
+
+- ``run_start`` / ``run_end``: ``steps``, ``est_s`` / ``ok``, ``dur``
+- ``step_start`` / ``step_end``: ``step``, ``type`` / ``ok``, ``dur``
+- ``pump_cmd``: ``pump``, ``cmd`` (start/stop/position), ``ok``, ``rtt``
+- ``batch``: one prep-solution injection batch, ``pumps``, ``volumes_ul``, ``dur``
+- ``chi_phase``: ``phase`` (acquire/measure/batch), ``technique``, ``dur``, ``ok``
+- ``error``: ``where``, ``msg``
+
+:func:`analyse_telemetry` turns an event stream into utilisation, idle gaps
+and per-pump throughput for a whole campaign.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .log_pipeline import AsyncLogPipeline
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+
+class _JsonlFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.event, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class TelemetryRecorder:
+    """Non-blocking JSONL event writer (drops events rather than block callers)."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        queue_size: int = 100_000,
+    ) -> None:
+        self.path = Path(path)
+        self._pipeline = AsyncLogPipeline(queue_size=queue_size)
+        self._pipeline.add_file(self.path, _JsonlFormatter(), logging.DEBUG,
+                                max_bytes, None, backup_count)
+        self._pipeline.start()
+        self.emit("session", wall=time.time(), pid=os.getpid())
+
+    @property
+    def dropped(self) -> int:
+        return self._pipeline.dropped
+
+    def emit(self, ev: str, **fields: Any) -> None:
+        record = logging.LogRecord("telemetry", logging.INFO, "", 0, ev, None, None)
+        record.event = {"t": round(time.monotonic(), 6), "ev": ev, **fields}
+        self._pipeline.handler.handle(record)
+
+    @contextmanager
+    def span(self, ev: str, **fields: Any) -> Iterator[dict]:
+        """Emit ``ev`` with ``dur`` when the block exits.
+
+        The yielded dict can be updated inside the block (e.g. ``ok``).
+        """
+        extra: dict = {}
+        t0 = time.monotonic()
+        try:
+            yield extra
+        finally:
+            self.emit(ev, **fields, **extra, dur=round(time.monotonic() - t0, 6))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        return self._pipeline.flush(timeout)
+
+    def close(self) -> None:
+        self._pipeline.stop()
+
+
+class NullTelemetry:
+    """Recorder stand-in used when telemetry is disabled."""
+
+    dropped = 0
+
+    def emit(self, ev: str, **fields: Any) -> None:
+        pass
+
+    @contextmanager
+    def span(self, ev: str, **fields: Any) -> Iterator[dict]:
+        yield {}
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+NULL_TELEMETRY = NullTelemetry()
+
+
+def read_events(*paths: Path) -> Iterator[dict]:
+    """Yield events from JSONL files in the given order (skips torn lines)."""
+    for path in paths:
+        with Path(path).open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class PumpStats:
+    commands: int = 0
+    failures: int = 0
+    rtt_total: float = 0.0
+    rtt_max: float = 0.0
+    run_s: float = 0.0
+    volume_ul: float = 0.0
+
+    @property
+    def rtt_mean(self) -> float:
+        return self.rtt_total / self.commands if self.commands else 0.0
+
+
+@dataclass
+class TelemetryReport:
+    span_s: float = 0.0
+    busy_s: float = 0.0
+    runs: int = 0
+    steps: int = 0
+    errors: int = 0
+    idle_gaps: list[tuple[float, float]] = field(default_factory=list)
+    step_time: dict[str, float] = field(default_factory=dict)
+    chi_time: dict[str, float] = field(default_factory=dict)
+    pumps: dict[int, PumpStats] = field(default_factory=dict)
+
+    @property
+    def utilisation(self) -> float:
+        return self.busy_s / self.span_s if self.span_s > 0 else 0.0
+
+    @property
+    def idle_s(self) -> float:
+        return sum(end - start for start, end in self.idle_gaps)
+
+    def throughput_ul_per_h(self, pump: int) -> float:
+        stats = self.pumps.get(pump)
+        if stats is None or self.span_s <= 0:
+            return 0.0
+        return stats.volume_ul * 3600.0 / self.span_s
+
+
+def _merge(intervals: list[tuple[float, float]]) -> list[tuple[float, float]]:
+    merged: list[list[float]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(a, b) for a, b in merged]
+
+
+def analyse_telemetry(events: Iterable[dict], idle_threshold: float = 1.0) -> TelemetryReport:
+    """Campaign utilisation, idle gaps and per-pump throughput.
+
+    Busy time is the union of step intervals; gaps between them longer than
+    ``idle_threshold`` seconds are reported as idle. Pump run time pairs
+    start/stop commands (position moves use their ``est_s``); volumes come
+    from ``batch`` events.
+
+    Monotonic clocks restart with every process, so when several sessions are
+    concatenated (``read_events(*paths)``) each session's ``t`` is shifted
+    onto the time base of the first session using their ``wall`` anchors.
+    """
+    report = TelemetryReport()
+    busy: list[tuple[float, float]] = []
+    running: dict[int, float] = {}
+    first = last = None
+    anchor: tuple[float, float] | None = None  # (t, wall) of the first session
+    offset = 0.0
+
+    for event in events:
+        ev, t = event.get("ev"), event.get("t")
+        if ev == "session":
+            wall = event.get("wall")
+            if t is not None and wall is not None:
+                if anchor is None:
+                    anchor = (t, wall)
+                offset = (wall - anchor[1]) - (t - anchor[0])
+            # pump starts cannot be paired with stops across sessions
+            running.clear()
+            continue
+        if t is None:
+            continue
+        t += offset
+        first = t if first is None else min(first, t)
+        last = t if last is None else max(last, t)
+
+        if ev == "run_start":
+            report.runs += 1
+        elif ev == "step_end":
+            dur = float(event.get("dur", 0.0))
+            busy.append((t - dur, t))
+            report.steps += 1
+            kind = str(event.get("type", ""))
+            report.step_time[kind] = report.step_time.get(kind, 0.0) + dur
+            first = min(first, t - dur)
+        elif ev == "chi_phase":
+            phase = str(event.get("phase", ""))
+            report.chi_time[phase] = report.chi_time.get(phase, 0.0) + float(event.get("dur", 0.0))
+        elif ev == "error":
+            report.errors += 1
+        elif ev == "pump_cmd":
+            pump = int(event.get("pump", 0))
+            stats = report.pumps.setdefault(pump, PumpStats())
+            rtt = float(event.get("rtt", 0.0))
+            stats.commands += 1
+            stats.rtt_total += rtt
+            stats.rtt_max = max(stats.rtt_max, rtt)
+            if not event.get("ok", True):
+                stats.failures += 1
+                continue
+            cmd = event.get("cmd")
+            if cmd == "start":
+                running.setdefault(pump, t)
+            elif cmd == "stop" and pump in running:
+                stats.run_s += t - running.pop(pump)
+            elif cmd == "position":
+                stats.run_s += float(event.get("est_s", 0.0))
+        elif ev == "batch":
+            for pump, volume in zip(event.get("pumps", ()), event.get("volumes_ul", ())):
+                report.pumps.setdefault(int(pump), PumpStats()).volume_ul += float(volume)
+
+    if first is None:
+        return report
+    report.span_s = last - first
+
+    merged = _merge(busy)
+    report.busy_s = sum(end - start for start, end in merged)
+    edges = [first] + [x for interval in merged for x in interval] + [last]
+    for start, end in zip(edges[0::2], edges[1::2]):
+        if end - start >= idle_threshold:
+            report.idle_gaps.append((start, end))
+    return report
+
+
+def format_report(report: TelemetryReport) -> str:
+    lines = [
+        f"span {report.span_s:.1f}s, busy {report.busy_s:.1f}s, "
+        f"utilisation {report.utilisation:.1%}",
+        f"runs {report.runs}, steps {report.steps}, errors {report.errors}",
+        f"idle {report.idle_s:.1f}s in {len(report.idle_gaps)} gaps",
+    ]
+    for kind, seconds in sorted(report.step_time.items()):
+        lines.append(f"  step {kind}: {seconds:.1f}s")
+    for phase, seconds in sorted(report.chi_time.items()):
+        lines.append(f"  chi {phase}: {seconds:.1f}s")
+    for pump, stats in sorted(report.pumps.items()):
+        lines.append(
+            f"  pump {pump}: {stats.commands} cmds ({stats.failures} failed), "
+            f"rtt mean {stats.rtt_mean * 1000:.1f}ms max {stats.rtt_max * 1000:.1f}ms, "
+            f"run {stats.run_s:.1f}s, {stats.volume_ul:.1f}uL, "
+            f"{report.throughput_ul_per_h(pump):.1f}uL/h"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_report(analyse_telemetry(read_events(*sys.argv[1:]))))
@@ -0,0 +1,92 @@
+"""
+电化学时长模型 - 按技术参数预测 CHI 实际运行时长
+
+ProgStep (echem_sdl) 与应用层执行计划 (src.core.execution_plan) 共用，
+只依赖标准库，不反向依赖应用层模块。
+"""
+
+import math
+from typing import Optional
+
+IMP_POINTS_PER_DECADE = 12          # CHI IMP 默认每十倍频点数
+IMP_MIN_CYCLES = 2                  # 每个频率点至少采集的周期数
+IMP_POINT_OVERHEAD_S = 0.2          # 每个频率点的建立时间
+
+
+def estimate_echem_seconds(
+    technique: str,
+    e_init: Optional[float] = None,
+    e_high: Optional[float] = None,
+    e_low: Optional[float] = None,
+    e_final: Optional[float] = None,
+    scan_rate: Optional[float] = None,
+    segments: Optional[int] = None,
+    quiet_time: Optional[float] = None,
+    run_time: Optional[float] = None,
+    freq_low: Optional[float] = None,
+    freq_high: Optional[float] = None,
+    scan_dir: str = "FWD",
+) -> float:
+    """根据技术参数预测 CHI 实际运行时长（秒，不含宏开销）
+
+    缺省值与 chi_echem_bridge 中 ECSettings → CHI 参数的转换保持一致。
+
+    Args:
+        technique: 技术名称 (CV, LSV, i-t, EIS, OCPT)
+        e_init: 初始电位 (V)
+        e_high: 上限电位 (V)
+        e_low: 下限电位 (V)
+        e_final: 终止电位 (V)
+        scan_rate: 扫描速率 (V/s)
+        segments: 扫描段数
+        quiet_time: 静置时间 (s)
+        run_time: 运行时间 (s)
+        freq_low: EIS 最低频率 (Hz)
+        freq_high: EIS 最高频率 (Hz)
+        scan_dir: 初始扫描方向 (FWD / REV)
+
+    Returns:
+        预测时长（秒）
+    """
+    tech = str(getattr(technique, 'value', technique)).upper()
+    quiet = quiet_time or 0.0
+
+    if tech == "CV":
+        e0 = e_init if e_init is not None else 0.0
+        eh = e_high if e_high is not None else 0.5
+        el = e_low if e_low is not None else -0.5
+        rate = scan_rate or 0.1
+        segs = segments or 2
+        span = abs(eh - el)
+        # 第一段从初始电位扫到首个顶点，其余每段跨越完整电位窗口
+        first_vertex = eh if scan_dir != "REV" else el
+        sweep = abs(first_vertex - e0) + span * max(segs - 1, 0)
+        return quiet + sweep / rate
+
+    if tech == "LSV":
+        e0 = e_init if e_init is not None else 0.0
+        ef = e_final if e_final is not None else (e_high if e_high is not None else 0.5)
+        rate = scan_rate or 0.1
+        return quiet + abs(ef - e0) / rate
+
+    if tech in ("I-T", "IT", "CA"):
+        return quiet + (run_time or 60.0)
+
+    if tech == "OCPT":
+        return run_time or 60.0
+
+    if tech in ("EIS", "IMP"):
+        f_lo = freq_low or 1.0
+        f_hi = freq_high or 100000.0
+        if f_lo <= 0 or f_hi <= f_lo:
+            return quiet
+        decades = math.log10(f_hi / f_lo)
+        n_points = max(int(math.ceil(decades * IMP_POINTS_PER_DECADE)) + 1, 2)
+        ratio = (f_hi / f_lo) ** (1.0 / (n_points - 1))
+        total = 0.0
+        for i in range(n_points):
+            freq = f_lo * ratio ** i
+            total += IMP_MIN_CYCLES / freq + IMP_POINT_OVERHEAD_S
+        return quiet + total
+
+    return 60.0
@@ -0,0 +1,120 @@
+"""
+参数路径编译 - 将 "steps[0].ec_config.scan_rate" 这类路径解析一次，
+生成缓存的 getter/setter/replace 闭包
+
+ExpProgram (echem_sdl) 与应用层组合参数 (src.core.param_access) 共用。
+"""
+
+import copy
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, List, Tuple
+
+
+# ========================
+# 路径编译
+# ========================
+
+# 路径片段: name / [index] / [key]
+_TOKEN_RE = re.compile(r'([^.\[\]]+)|\[([^\]]*)\]')
+
+
+@dataclass(frozen=True)
+class ParamAccessor:
+    """编译后的参数路径访问器
+
+    Attributes:
+        path: 原始路径
+        get: get(root) -> value
+        set: set(root, value)
+        replace: replace(root, value) -> 新根对象；写时复制，只浅拷贝路径上的对象，
+                 原对象保持不变
+    """
+    path: str
+    get: Callable[[Any], Any]
+    set: Callable[[Any, Any], None]
+    replace: Callable[[Any, Any], Any]
+
+
+def _parse_path(path: str) -> List[Tuple[str, Any]]:
+    """解析路径为 [(kind, key)]，kind: attr / index / item"""
+    tokens: List[Tuple[str, Any]] = []
+    for name, bracket in _TOKEN_RE.findall(path):
+        if name:
+            tokens.append(("index", int(name)) if name.isdigit() else ("attr", name))
+        elif bracket.lstrip("-").isdigit():
+            tokens.append(("index", int(bracket)))
+        else:
+            tokens.append(("item", bracket.strip("'\"")))
+    if not tokens:
+        raise ValueError(f"无效的参数路径: {path!r}")
+    return tokens
+
+
+def _make_getter(kind: str, key: Any) -> Callable[[Any], Any]:
+    if kind == "attr":
+        # 兼容以 "." 访问字典键的旧路径写法
+        return lambda obj: obj[key] if isinstance(obj, dict) else getattr(obj, key)
+    return lambda obj: obj[key]
+
+
+def _make_setter(kind: str, key: Any) -> Callable[[Any, Any], None]:
+    if kind == "attr":
+        def set_attr(obj: Any, value: Any) -> None:
+            if isinstance(obj, dict):
+                obj[key] = value
+            else:
+                setattr(obj, key, value)
+        return set_attr
+
+    def set_item(obj: Any, value: Any) -> None:
+        obj[key] = value
+    return set_item
+
+
+@lru_cache(maxsize=4096)
+def compile_path(path: str) -> ParamAccessor:
+    """编译参数路径（结果缓存，同一路径只解析一次）
+
+    Args:
+        path: 参数路径，如 "steps[0].ec_config.scan_rate"、
+              "prep_sol_params.target_concentrations[CuSO4]"
+
+    Returns:
+        ParamAccessor
+
+    Raises:
+        ValueError: 路径为空或无法解析
+    """
+    tokens = _parse_path(path)
+    walk = tuple(_make_getter(kind, key) for kind, key in tokens[:-1])
+    walk_set = tuple(_make_setter(kind, key) for kind, key in tokens[:-1])
+    last_get = _make_getter(*tokens[-1])
+    last_set = _make_setter(*tokens[-1])
+
+    def resolve(root: Any) -> Any:
+        obj = root
+        for step in walk:
+            obj = step(obj)
+        return obj
+
+    def get(root: Any) -> Any:
+        return last_get(resolve(root))
+
+    def set_(root: Any, value: Any) -> None:
+        last_set(resolve(root), value)
+
+    def replace(root: Any, value: Any) -> Any:
+        chain = [root]
+        for step in walk:
+            chain.append(step(chain[-1]))
+        new = copy.copy(chain[-1])
+        last_set(new, value)
+        for i in range(len(walk) - 1, -1, -1):
+            parent = copy.copy(chain[i])
+            walk_set[i](parent, new)
+            new = parent
+        return new
+
+    return ParamAccessor(path=path, get=get, set=set_, replace=replace)
@@ -0,0 +1,141 @@
+"""
+程序/配置序列化 - 缓存的 pydantic 模式 + 二进制快照 + 原子写入
+
+- schema(): 按类型缓存 pydantic TypeAdapter，数据类的校验/序列化模式只编译一次，
+  之后 JSON 编解码直接在 pydantic-core 中完成，不再逐层手写 to_dict/from_dict
+- decode(): 快速解码；遇到需要换算的旧字段名或校验失败时返回 None，
+  由调用方回退到原有的逐字段兼容路径
+- pack_snapshot() / unpack_snapshot(): 紧凑二进制快照 (魔数 + zlib 压缩的紧凑 JSON)，
+  大型组合程序的文件体积通常只有 JSON 的几十分之一
+- atomic_write(): 写临时文件后 os.replace 替换，内容与上次写入相同时跳过
+- save_document() / read_payload(): 按扩展名 (.mhsnap) 写快照或缩进 JSON；读取时自动识别
+
+pydantic 在首次调用时才导入，不影响程序启动时间。
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# 快照文件: 魔数 + 版本 (1 字节) + zlib(紧凑 JSON)
+SNAPSHOT_MAGIC = b"MHSNAP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".mhsnap"
+
+# 已写入文件的内容摘要 {绝对路径: digest}
+_written: Dict[str, bytes] = {}
+_written_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def schema(tp: Any):
+    """类型 tp 的预编译 TypeAdapter (缓存)"""
+    from pydantic import TypeAdapter
+    return TypeAdapter(tp)
+
+
+def encode(obj: Any, tp: Any, indent: Optional[int] = None, exclude_none: bool = False) -> bytes:
+    """按缓存模式序列化为 UTF-8 JSON"""
+    return schema(tp).dump_json(obj, indent=indent, exclude_none=exclude_none, warnings=False)
+
+
+def decode(data: bytes | str, tp: Any, legacy_keys: Iterable[str] = ()) -> Any:
+    """按缓存模式解析 JSON；含旧字段名或校验失败时返回 None
+
+    Args:
+        data: JSON 文本
+        tp: 目标类型
+        legacy_keys: 需要兼容换算的旧字段名，出现时不走快速路径
+    """
+    from pydantic import ValidationError
+
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    for key in legacy_keys:
+        if f'"{key}"'.encode("utf-8") in raw:
+            return None
+    try:
+        return schema(tp).validate_json(raw)
+    except ValidationError:
+        return None
+
+
+def is_snapshot(data: bytes) -> bool:
+    return data[:len(SNAPSHOT_MAGIC)] == SNAPSHOT_MAGIC
+
+
+def pack_snapshot(payload: bytes, level: int = 1) -> bytes:
+    """把紧凑 JSON 打包为二进制快照"""
+    return SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION]) + zlib.compress(payload, level)
+
+
+def unpack_snapshot(data: bytes) -> bytes:
+    """解包二进制快照，返回其中的 JSON"""
+    if not is_snapshot(data):
+        raise ValueError("不是快照文件")
+    version = data[len(SNAPSHOT_MAGIC)]
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"不支持的快照版本: {version}")
+    return zlib.decompress(data[len(SNAPSHOT_MAGIC) + 1:])
+
+
+def read_payload(path: str | Path) -> bytes:
+    """读取 JSON 或快照文件，统一返回 JSON 字节"""
+    data = Path(path).read_bytes()
+    return unpack_snapshot(data) if is_snapshot(data) else data
+
+
+def atomic_write(path: str | Path, data: bytes | str, force: bool = False) -> bool:
+    """原子写入文件
+
+    先写同目录下的临时文件并 fsync，再 os.replace 替换目标文件，
+    中途崩溃或断电不会留下半截文件。内容与本进程上次写入该文件的相同
+    且文件仍存在时直接跳过。
+
+    Returns:
+        是否实际写入
+    """
+    path = Path(path)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    key = str(path.resolve())
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    with _written_lock:
+        if not force and _written.get(key) == digest and path.exists():
+            return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    with _written_lock:
+        _written[key] = digest
+    return True
+
+
+def save_document(path: str | Path, obj: Any, tp: Any, exclude_none: bool = False,
+                  force: bool = False) -> bool:
+    """保存对象: 扩展名为 SNAPSHOT_SUFFIX 时写二进制快照，否则写缩进 JSON (原子写入)
+
+    Returns:
+        是否实际写入 (内容未变时跳过)
+    """
+    if Path(path).suffix == SNAPSHOT_SUFFIX:
+        data = pack_snapshot(encode(obj, tp, exclude_none=exclude_none))
+    else:
+        data = encode(obj, tp, indent=2, exclude_none=exclude_none)
+    return atomic_write(path, data, force)
@@ -0,0 +1,45 @@
+"""Lazily bound Win32 DLL handles.
+
+``ctypes.windll`` and ``ctypes.WINFUNCTYPE`` only exist on Windows, and binding
+a DLL at import time costs a loader call even when the CHI driver is never
+used.  The helpers here defer both to the first actual Win32 call, so the CHI
+controller and window-capture modules stay cheap (and importable) elsewhere.
+"""
+
+from __future__ import annotations
+
+import ctypes
+from functools import lru_cache
+from typing import Any, Callable
+
+
+class LazyDLL:
+    """Proxy for ``ctypes.windll.<name>``, loaded on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._dll = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        if self._dll is None:
+            self._dll = getattr(ctypes.windll, self._name)
+        return getattr(self._dll, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._dll is not None else "not loaded"
+        return f"<LazyDLL {self._name} ({state})>"
+
+
+@lru_cache(maxsize=None)
+def winfunctype(restype: Any, *argtypes: Any):
+    """Cached ``ctypes.WINFUNCTYPE`` prototype, created on first use."""
+    return ctypes.WINFUNCTYPE(restype, *argtypes)
+
+
+def lazy_winfunctype(restype: Any, *argtypes: Any) -> Callable[[Callable], Any]:
+    """Decorator equivalent of ``ctypes.WINFUNCTYPE(restype, *argtypes)``."""
+    def wrap(fn: Callable) -> Any:
+        return winfunctype(restype, *argtypes)(fn)
+    return wrap
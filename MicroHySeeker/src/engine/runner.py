@@ -3,11 +3,38 @@
 """
 import time
 import threading
-from typing import List, Optional, Callable, Dict
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, List, Optional, Callable, Dict
 from PySide6.QtCore import QObject, Signal, QThread
 
 from src.models import Experiment, ProgStep, ProgramStepType, ECSettings, SystemConfig
 from src.services.rs485_wrapper import get_rs485_instance
+from src.core.execution_plan import (
+    CalibrationTable,
+    ExecutionPlan,
+    StepPlan,
+    compile_execution_plan,
+    estimate_ec_settings_seconds,
+    format_duration,
+)
+from src.echem_sdl.services.telemetry import NULL_TELEMETRY
+
+if TYPE_CHECKING:
+    from src.core.precheck import ComboColumns
+
+
+def _as_data_set(technique: str, data_points):
+    """把 CHI 原始数据行转换为 (time, potential, current) 列式 ECDataSet (已是数据集时原样返回)"""
+    if hasattr(data_points, 'as_array'):
+        return data_points
+    import numpy as np
+    from src.echem_sdl.hardware.chi import ECDataSet
+    from src.echem_sdl.hardware.chi_output import technique_columns
+    rows = np.asarray(data_points, dtype=float)
+    if rows.ndim != 2:
+        rows = rows.reshape(-1, 1) if rows.size else np.empty((0, 2))
+    t, e, i = technique_columns(technique.lower(), rows)
+    return ECDataSet.from_arrays(t, e, i, technique=technique)
 
 
 class ExperimentWorker(QObject):
@@ -17,64 +44,41 @@ class ExperimentWorker(QObject):
     step_finished = Signal(int, str, bool)  # step_index, step_id, success
     log_message = Signal(str)
     experiment_finished = Signal(bool)  # success
-    echem_result = Signal(str, list, list)  # technique, data_points, headers
+    echem_result = Signal(str, object, list)  # technique, data_points (ECDataSet 或行列表), headers
+    echem_data = Signal(str, object)  # technique, 新增数据块 (k, 3) ndarray: time, potential, current
     pump_batch_update = Signal(list, list)  # running_pump_addrs, waiting_pump_addrs
     
     # 默认流速配置 (未校准时使用)
     # 假设管径 1.6mm，100 RPM 约 50 uL/s (基于常见蠕动泵规格)
     DEFAULT_UL_PER_SEC_AT_100RPM = 50.0  
     
-    def __init__(self, experiment: Experiment, rs485, config: Optional[SystemConfig] = None):
+    def __init__(self, experiment: Experiment, rs485, config: Optional[SystemConfig] = None,
+                 telemetry=None, result_store=None, combo_index: int = 0,
+                 combo_params: Optional[Dict[str, Any]] = None):
         super().__init__()
         self.experiment = experiment
         self.rs485 = rs485
         self.config = config
+        self.telemetry = telemetry or NULL_TELEMETRY  # 结构化遥测 (TelemetryRecorder)
+        self.result_store = result_store  # 实验活动结果库 (CampaignStore)，运行结束时追加
+        self._combo_index = combo_index
+        self._combo_params = combo_params or {}
+        self._result = None  # ExperimentResult, 仅设置了结果库时收集
+        self._run_t0 = 0.0
         self._stop_flag = False
         
-        # 构建通道查找表
-        self._dilution_channels: Dict[str, dict] = {}
-        self._pump_calibration: Dict[int, float] = {}  # pump_address -> ul_per_sec_at_100rpm
-        self._position_calibration: Dict[int, dict] = {}  # pump_address -> {slope_k, intercept_b, ul_per_encoder_count}
-        
-        if config:
-            # 加载泵校准数据
-            for pump in config.pumps:
-                if pump.calibration and "ul_per_sec" in pump.calibration:
-                    # 校准数据存的是 100 RPM 下的流速
-                    self._pump_calibration[pump.address] = pump.calibration["ul_per_sec"]
-            
-            # 也从全局校准数据加载
-            for addr_str, cal_data in config.calibration_data.items():
-                addr = int(addr_str) if isinstance(addr_str, str) else addr_str
-                if "ul_per_sec" in cal_data:
-                    self._pump_calibration[addr] = cal_data["ul_per_sec"]
-                # 加载位置校准数据 (线性回归: Volume = k * revolutions + b)
-                if "slope_k" in cal_data:
-                    self._position_calibration[addr] = {
-                        "slope_k": cal_data["slope_k"],
-                        "intercept_b": cal_data.get("intercept_b", 0.0),
-                        "ul_per_encoder_count": cal_data.get("ul_per_encoder_count", 0.0),
-                    }
-            
-            # 构建配液通道信息
-            for ch in config.dilution_channels:
-                self._dilution_channels[ch.solution_name] = {
-                    "pump_address": ch.pump_address,
-                    "direction": ch.direction,
-                    "stock_concentration": ch.stock_concentration,
-                    "default_rpm": ch.default_rpm,
-                }
-            
-            # 将 Inlet 泵作为 H2O 溶剂通道加入
-            for ch in config.flush_channels:
-                if ch.work_type == "Inlet":
-                    self._dilution_channels["H2O"] = {
-                        "pump_address": ch.pump_address,
-                        "direction": ch.direction,
-                        "stock_concentration": 0.0,
-                        "default_rpm": ch.rpm,
-                    }
-                    break
+        # 构建通道查找表 (与执行计划共用同一份校准表)
+        cal = CalibrationTable.from_config(config)
+        self._dilution_channels: Dict[str, dict] = dict(cal.dilution_channels)
+        self._pump_calibration: Dict[int, float] = dict(cal.pump_calibration)  # pump_address -> ul_per_sec_at_100rpm
+        self._position_calibration: Dict[int, dict] = dict(cal.position_calibration)  # pump_address -> {slope_k, intercept_b, ul_per_encoder_count}
+        self._plan: Optional[ExecutionPlan] = None
+    
+    def get_plan(self) -> ExecutionPlan:
+        """获取 (缓存的) 执行计划"""
+        if self._plan is None:
+            self._plan = compile_execution_plan(self.experiment, self.config)
+        return self._plan
     
     def stop(self):
         self._stop_flag = True
@@ -89,14 +93,6 @@ class ExperimentWorker(QObject):
         except Exception as e:
             self.log_message.emit(f"[安全] 停止泵异常: {e}")
     
-    def _get_flush_pump_addresses(self) -> set:
-        """获取 Inlet/Transfer/Outlet 泵的地址集合（这些泵不需要流速校准）"""
-        addrs = set()
-        if self.config:
-            for ch in self.config.flush_channels:
-                addrs.add(ch.pump_address)
-        return addrs
-    
     def pre_check(self) -> list:
         """运行前预检查，返回错误消息列表（空列表表示通过）
         
@@ -106,123 +102,13 @@ class ExperimentWorker(QObject):
         3. 配液泵是否已校准（Inlet/Transfer/Outlet 泵不需要）
         4. 配液参数完整性（浓度、体积、泵地址）
         5. 泵地址有效性
-        """
-        errors = []
-        warnings = []
-        
-        if not self.experiment or not self.experiment.steps:
-            errors.append("实验没有任何步骤")
-            return errors
         
-        # --- 检查 RS485 连接 ---
+        各步骤检查结果按 (步骤内容, 配置版本) 缓存，只重新检查变化的步骤。
+        """
         is_mock = self.config.mock_mode if self.config else True
-        if not is_mock and not self.rs485.is_connected():
-            errors.append("RS485 端口未连接。请先在配置中打开串口连接，或切换到 Mock 模式")
-        
-        # --- 获取不需要校准的泵地址 (Inlet/Transfer/Outlet) ---
-        flush_pump_addrs = self._get_flush_pump_addresses()
-        
-        for i, step in enumerate(self.experiment.steps):
-            step_num = i + 1
-            stype = step.step_type
-            
-            # --- 配液步骤检查 ---
-            if stype == ProgramStepType.PREP_SOL:
-                if not step.prep_sol_params:
-                    errors.append(f"步骤 {step_num} [配液]: 缺少配液参数")
-                    continue
-                
-                params = step.prep_sol_params
-                if params.total_volume_ul <= 0:
-                    errors.append(f"步骤 {step_num} [配液]: 总体积必须大于 0")
-                
-                has_any_selected = False
-                total_solute_vol = 0
-                
-                for sol_name in params.injection_order:
-                    if not params.selected_solutions.get(sol_name, False):
-                        continue
-                    has_any_selected = True
-                    is_solvent = params.solvent_flags.get(sol_name, False)
-                    
-                    # 检查泵配置
-                    ch_info = self._dilution_channels.get(sol_name, {})
-                    pump_addr = ch_info.get("pump_address", 0)
-                    if pump_addr <= 0:
-                        errors.append(f"步骤 {step_num} [配液]: 溶液 '{sol_name}' 没有对应的泵配置")
-                        continue
-                    
-                    # 配液泵必须校准（不是 Inlet/Transfer/Outlet 泵）
-                    if pump_addr not in flush_pump_addrs:
-                        if pump_addr not in self._pump_calibration:
-                            errors.append(
-                                f"步骤 {step_num} [配液]: 泵 {pump_addr} ({sol_name}) 未校准流速。"
-                                f"请先在配置中完成泵流速校准，否则无法准确控制注液量"
-                            )
-                    
-                    if not is_solvent:
-                        target_conc = params.target_concentrations.get(sol_name, 0)
-                        stock_conc = ch_info.get("stock_concentration", 0)
-                        
-                        if target_conc > 0 and stock_conc > 0:
-                            if target_conc > stock_conc:
-                                errors.append(
-                                    f"步骤 {step_num} [配液]: {sol_name} 目标浓度 "
-                                    f"({target_conc}M) 超过母液浓度 ({stock_conc}M)"
-                                )
-                            else:
-                                vol = (target_conc * params.total_volume_ul) / stock_conc
-                                total_solute_vol += vol
-                
-                if not has_any_selected:
-                    errors.append(f"步骤 {step_num} [配液]: 没有选择任何溶液")
-                elif total_solute_vol > params.total_volume_ul:
-                    errors.append(
-                        f"步骤 {step_num} [配液]: 溶质总体积 ({total_solute_vol:,.0f}μL) "
-                        f"超过总体积 ({params.total_volume_ul:,.0f}μL)"
-                    )
-            
-            # --- 移液/冲洗/排空 步骤检查 ---
-            elif stype in [ProgramStepType.TRANSFER, ProgramStepType.FLUSH, ProgramStepType.EVACUATE]:
-                type_name = {ProgramStepType.TRANSFER: "移液", 
-                             ProgramStepType.FLUSH: "冲洗", 
-                             ProgramStepType.EVACUATE: "排空"}.get(stype, "")
-                if not step.pump_address:
-                    errors.append(f"步骤 {step_num} [{type_name}]: 未指定泵地址")
-                elif step.pump_address < 1 or step.pump_address > 12:
-                    errors.append(f"步骤 {step_num} [{type_name}]: 泵地址 {step.pump_address} 超出有效范围 (1-12)")
-                
-                if stype == ProgramStepType.TRANSFER:
-                    if not step.transfer_duration or step.transfer_duration <= 0:
-                        errors.append(f"步骤 {step_num} [移液]: 持续时间必须大于 0")
-                elif stype == ProgramStepType.FLUSH:
-                    if not step.flush_cycle_duration_s or step.flush_cycle_duration_s <= 0:
-                        errors.append(f"步骤 {step_num} [冲洗]: 单次冲洗时长必须大于 0")
-                    if not step.flush_cycles or step.flush_cycles <= 0:
-                        errors.append(f"步骤 {step_num} [冲洗]: 循环次数必须大于 0")
-            
-            # --- 电化学步骤检查 ---
-            elif stype == ProgramStepType.ECHEM:
-                if not step.ec_settings:
-                    errors.append(f"步骤 {step_num} [电化学]: 缺少电化学参数")
-                else:
-                    ec = step.ec_settings
-                    tech = ec.technique
-                    if hasattr(tech, 'value'):
-                        tech_val = tech.value
-                    else:
-                        tech_val = str(tech)
-                    
-                    if tech_val in ["CV", "LSV"]:
-                        if ec.eh is not None and ec.el is not None and ec.eh <= ec.el:
-                            errors.append(
-                                f"步骤 {step_num} [电化学 {tech_val}]: "
-                                f"上限电位 ({ec.eh}V) 必须大于下限电位 ({ec.el}V)"
-                            )
-                        if not ec.scan_rate or ec.scan_rate <= 0:
-                            errors.append(f"步骤 {step_num} [电化学 {tech_val}]: 扫描速率必须大于 0")
-        
-        return errors
+        rs485_ok = is_mock or self.rs485.is_connected()
+        from src.core.precheck import get_precheck_engine
+        return get_precheck_engine().check_experiment(self.experiment, self.config, rs485_ok)
     
     def _check_pump_connection(self, pump_addr: int, context: str) -> bool:
         """泵操作前检查连接状态
@@ -260,25 +146,56 @@ class ExperimentWorker(QObject):
             self.experiment_finished.emit(False)
             return
         
-        self.log_message.emit(f"[实验] 预检查通过，开始执行 {len(self.experiment.steps)} 个步骤")
+        plan = self.get_plan()
+        self.log_message.emit(
+            f"[实验] 预检查通过，开始执行 {len(self.experiment.steps)} 个步骤，"
+            f"预计耗时 {format_duration(plan.total_seconds)}"
+        )
+        run_t0 = self._run_t0 = time.monotonic()
+        self.telemetry.emit("run_start", exp=self.experiment.exp_id,
+                            steps=len(self.experiment.steps), est_s=round(plan.total_seconds, 3))
+        if self.result_store is not None:
+            from src.echem_sdl.core.experiment_engine import ExperimentResult
+            self._result = ExperimentResult(
+                experiment_name=self.experiment.exp_name,
+                program_name=self.experiment.exp_id,
+                start_time=datetime.now(),
+                combo_index=self._combo_index,
+                combo_params=dict(self._combo_params),
+            )
         
         all_success = True
-        for i, step in enumerate(self.experiment.steps):
+        steps = self.experiment.steps
+        i = 0
+        while i < len(steps):
+            step = steps[i]
             if self._stop_flag:
                 self.log_message.emit(f"[实验] 实验已停止")
                 all_success = False
                 break
             
+            # 连续的电化学步骤合并为一个宏批量执行
+            group = self._echem_batch_group(i)
+            if len(group) > 1:
+                if not self._run_echem_batch(group):
+                    all_success = False
+                    break
+                i += len(group)
+                time.sleep(0.1)
+                continue
+            
             self.step_started.emit(i, step.step_id)
             step_type_str = step.step_type.value if hasattr(step.step_type, 'value') else str(step.step_type)
             self.log_message.emit(f"[步骤{i}] 开始执行: {step_type_str}")
             
             success = False
+            step_t0 = time.monotonic()
+            self.telemetry.emit("step_start", step=i, type=step_type_str)
             try:
                 if step.step_type == ProgramStepType.TRANSFER:
                     success = self._execute_transfer(step)
                 elif step.step_type == ProgramStepType.PREP_SOL:
-                    success = self._execute_prep_sol(step)
+                    success = self._execute_prep_sol(step, plan.step(i))
                 elif step.step_type == ProgramStepType.FLUSH:
                     success = self._execute_flush(step)
                 elif step.step_type == ProgramStepType.ECHEM:
@@ -289,8 +206,12 @@ class ExperimentWorker(QObject):
                     success = self._execute_evacuate(step)
             except Exception as e:
                 self.log_message.emit(f"[错误] {str(e)}")
+                self.telemetry.emit("error", where=f"step{i}", msg=str(e))
                 success = False
             
+            self.telemetry.emit("step_end", step=i, type=step_type_str, ok=success,
+                                dur=round(time.monotonic() - step_t0, 6))
+            self._record_step(i, step, success, step_t0 - run_t0, time.monotonic() - step_t0)
             self.step_finished.emit(i, step.step_id, success)
             
             if not success:
@@ -298,8 +219,12 @@ class ExperimentWorker(QObject):
                 all_success = False
                 break
             
+            i += 1
             time.sleep(0.1)
         
+        self.telemetry.emit("run_end", exp=self.experiment.exp_id, ok=all_success,
+                            dur=round(time.monotonic() - run_t0, 6))
+        self._save_result(all_success)
         self.experiment_finished.emit(all_success)
         status_text = "成功完成" if all_success else "执行失败"
         self.log_message.emit(f"[实验] {status_text}")
@@ -308,6 +233,62 @@ class ExperimentWorker(QObject):
         if not all_success:
             self._emergency_stop_all_pumps()
     
+    def _record_step(self, index: int, step: ProgStep, success: bool,
+                     start: float, duration: float):
+        """记录步骤结果 (运行结束时随结果入库)"""
+        if self._result is None:
+            return
+        self._result.step_results.append({
+            "index": index,
+            "name": step.step_id,
+            "type": step.step_type.value if hasattr(step.step_type, 'value') else str(step.step_type),
+            "success": success,
+            "start": start,
+            "duration": duration,
+        })
+    
+    def _emit_echem_result(self, technique: str, data_points, headers: list,
+                           ec: Optional[ECSettings] = None,
+                           features: Optional[Dict[str, float]] = None):
+        """发出电化学结果信号，并收集数据集供结果入库
+        
+        CHI 控制器返回的是原始数据行 (列含义随技术而定)，先按技术映射为
+        (time, potential, current) 的 ECDataSet，并把测量参数写入 metadata["params"]，
+        结果库才能按技术与参数 (如 scan_rate) 查询。
+        每个数据集都按自身技术带上 metadata["features"]；实时提取的 features
+        点数与数据集一致时直接采用，否则对完整数据重新计算。
+        """
+        data_set = _as_data_set(technique, data_points)
+        if ec is not None:
+            data_set.metadata["params"] = {k: v for k, v in ec.to_dict().items() if v is not None}
+        if "features" not in data_set.metadata:
+            if features is not None and features.get("n_points") == len(data_set):
+                data_set.metadata["features"] = features
+            else:
+                from src.echem_sdl.core.echem_features import attach_features
+                attach_features(data_set, technique)
+        self._log_echem_features(data_set.metadata["features"])
+        if self._result is not None:
+            self._result.ec_data_sets.append(data_set)
+        self.echem_result.emit(technique, data_set, headers)
+    
+    def _save_result(self, success: bool):
+        """运行结束: 填写步骤时间线遥测并追加到结果库"""
+        result, self._result = self._result, None
+        if result is None:
+            return
+        from src.echem_sdl.services.result_store import step_timeline
+        result.end_time = datetime.now()
+        result.success = success
+        if not success:
+            result.error_message = "已停止" if self._stop_flag else "执行失败"
+        result.telemetry["step_timeline"] = step_timeline(result.step_results)
+        try:
+            run_id = self.result_store.append_run(result)
+            self.log_message.emit(f"[实验] 结果已入库 (run {run_id})")
+        except Exception as e:
+            self.log_message.emit(f"[实验] 结果入库失败: {e}")
+    
     def _execute_transfer(self, step: ProgStep) -> bool:
         """执行移液"""
         pump_addr = step.pump_address
@@ -350,16 +331,19 @@ class ExperimentWorker(QObject):
             waited += step_wait
         return True
     
-    def _execute_prep_sol(self, step: ProgStep) -> bool:
+    def _execute_prep_sol(self, step: ProgStep, step_plan: Optional[StepPlan] = None) -> bool:
         """执行配液 - 根据目标浓度计算各溶液体积，按注液顺序号分批注入
         
         相同注液顺序号的泵同时启动（同批次），不同顺序号按升序依次执行。
+        
+        Args:
+            step: 配液步骤
+            step_plan: 该步骤的执行计划（为空时现场编译）
         """
         if not step.prep_sol_params:
             return False
         
         params = step.prep_sol_params
-        total_volume_ul = params.total_volume_ul
         
         # 构建浓度信息用于日志
         conc_info = []
@@ -380,142 +364,28 @@ class ExperimentWorker(QObject):
             f"注液顺序{params.injection_order}, 总体积{vol_formatted}"
         )
         
-        # 计算各溶液需要的体积
-        volumes_to_inject = {}  # {溶液名: 体积(uL)}
-        remaining_volume = total_volume_ul
-        
-        for sol_name in params.injection_order:
-            if self._stop_flag:
-                return False
-            
-            if not params.selected_solutions.get(sol_name, False):
-                continue
-            
-            is_solvent = params.solvent_flags.get(sol_name, False)
-            
-            if is_solvent:
-                # 溶剂：剩余体积
-                volumes_to_inject[sol_name] = remaining_volume
-            else:
-                # 计算稀释体积: C1*V1 = C2*V2 => V1 = C2*V2/C1
-                target_conc = params.target_concentrations.get(sol_name, 0.0)
-                if target_conc <= 0:
-                    continue
-                
-                # 获取母液浓度
-                channel_info = self._dilution_channels.get(sol_name, {})
-                stock_conc = channel_info.get("stock_concentration", target_conc)
-                
-                if stock_conc <= 0:
-                    self.log_message.emit(f"    警告: {sol_name} 母液浓度为0，跳过")
-                    continue
-                
-                # 计算需要的体积
-                vol_needed = (target_conc * total_volume_ul) / stock_conc
-                volumes_to_inject[sol_name] = vol_needed
-                remaining_volume -= vol_needed
-        
-        # 编码器常量
-        ENCODER_DIVISIONS_PER_REV = 16384
-        
-        # 构建注入任务列表
-        inject_tasks = []
+        # 泵命令、编码器计数与预计时长来自预编译的执行计划
+        if step_plan is None:
+            step_plan = compile_execution_plan(
+                Experiment(exp_id="", exp_name="", steps=[step]), self.config
+            ).steps[0]
+        for note in step_plan.notes:
+            self.log_message.emit(f"    {note}")
         
-        for sol_name in params.injection_order:
+        for cmd in step_plan.commands:
             if self._stop_flag:
                 return False
-            
-            if sol_name not in volumes_to_inject:
-                continue
-            
-            vol = volumes_to_inject[sol_name]
-            if vol <= 0:
-                continue
-            
-            # 获取泵信息
-            channel_info = self._dilution_channels.get(sol_name, {})
-            pump_addr = channel_info.get("pump_address", 0)
-            direction = channel_info.get("direction", "FWD")
-            rpm = channel_info.get("default_rpm", 100)
-            
-            if pump_addr <= 0:
-                self.log_message.emit(f"    ❌ {sol_name} 无对应泵配置，跳过")
-                continue
-            
-            # 连接检查
-            if not self._check_pump_connection(pump_addr, f"配液-{sol_name}"):
+            if not self._check_pump_connection(cmd.pump_address, f"配液-{cmd.sol_name}"):
                 return False
-            
-            # 位置校准检查 - 优先使用位置模式，无校准时回退RPM时间模式
-            pos_cal = self._position_calibration.get(pump_addr)
-            use_position_mode = pos_cal and pos_cal.get("slope_k", 0) > 0
-            
-            encoder_counts = 0
-            revolutions = 0.0
-            estimated_seconds = 0.0
-            
-            if use_position_mode:
-                # 使用位置校准计算编码器计数: Volume = k * revolutions + b
-                # => revolutions = (Volume - b) / k
-                slope_k = pos_cal["slope_k"]
-                intercept_b = pos_cal.get("intercept_b", 0.0)
-                
-                revolutions = (vol - intercept_b) / slope_k
-                if revolutions < 0:
-                    revolutions = 0
-                encoder_counts = int(revolutions * ENCODER_DIVISIONS_PER_REV)
-                
-                # 反向泵使用负编码器值
-                if direction == "REV":
-                    encoder_counts = -encoder_counts
-                
-                # 估算运行时间 (用于同步等待)
-                estimated_seconds = (abs(revolutions) / (rpm / 60.0)) + 2.0
-            else:
-                # 回退: RPM 时间模式
-                ul_per_sec = self._pump_calibration.get(pump_addr, 0)
-                if ul_per_sec > 0:
-                    run_seconds = vol / ul_per_sec
-                else:
-                    # 无任何校准数据，使用保守的估算 (100RPM约1.5uL/s)
-                    run_seconds = vol / 1.5
-                estimated_seconds = run_seconds + 2.0
-                self.log_message.emit(
-                    f"    ⚠ 泵 {pump_addr} ({sol_name}) 无位置校准，"
-                    f"回退 RPM 时间模式 ({run_seconds:.1f}s @ {rpm}RPM)"
-                )
-            
-            # 获取注液顺序号
-            order_num = params.injection_order_numbers.get(sol_name, 1)
-            
-            inject_tasks.append({
-                "sol_name": sol_name,
-                "vol": vol,
-                "pump_addr": pump_addr,
-                "direction": direction,
-                "rpm": rpm,
-                "encoder_counts": encoder_counts,
-                "revolutions": revolutions,
-                "estimated_seconds": estimated_seconds,
-                "order_num": order_num,
-                "is_solvent": params.solvent_flags.get(sol_name, False),
-                "use_position_mode": use_position_mode,
-            })
         
         # 按注液顺序号分批
-        batches = {}  # {order_num: [task, ...]}
-        for task in inject_tasks:
-            order = task["order_num"]
-            if order not in batches:
-                batches[order] = []
-            batches[order].append(task)
-        
+        batches = {batch[0].order_num: batch for batch in step_plan.batches}
         sorted_orders = sorted(batches.keys())
         
         # 日志：显示分批信息
         if len(sorted_orders) > 1:
             for order in sorted_orders:
-                names = [t["sol_name"] for t in batches[order]]
+                names = [t.sol_name for t in batches[order]]
                 self.log_message.emit(f"    批次 {order}: {', '.join(names)} (同时注入)")
         
         # 逐批次执行 - 使用位置模式(位移控制)
@@ -524,13 +394,14 @@ class ExperimentWorker(QObject):
                 return False
             
             batch = batches[order_num]
+            batch_t0 = time.monotonic()
             
             # 计算当前运行和等待中的泵地址
-            running_addrs = [t["pump_addr"] for t in batch]
+            running_addrs = [t.pump_address for t in batch]
             waiting_addrs = []
             for future_order in sorted_orders[batch_idx + 1:]:
                 for t in batches[future_order]:
-                    waiting_addrs.append(t["pump_addr"])
+                    waiting_addrs.append(t.pump_address)
             
             # 发送泵状态更新信号（运行中=绿色，等待中=黄色）
             self.pump_batch_update.emit(running_addrs, waiting_addrs)
@@ -539,50 +410,50 @@ class ExperimentWorker(QObject):
             max_wait = 0.0
             rpm_tasks = []  # 需要手动停止的RPM任务
             for task in batch:
-                role = "(溶剂)" if task["is_solvent"] else ""
+                role = "(溶剂)" if task.is_solvent else ""
                 
-                if task.get("use_position_mode", True):
+                if task.use_position_mode:
                     # 位置模式 (run_position_rel)
                     self.log_message.emit(
-                        f"    注入 {task['sol_name']}{role}: "
-                        f"{task['vol']:,.2f}uL, 泵{task['pump_addr']} 位移模式, "
-                        f"{task['revolutions']:.2f}圈, 编码器={task['encoder_counts']}, "
-                        f"{task['rpm']}RPM, 预计{task['estimated_seconds']:.1f}s"
+                        f"    注入 {task.sol_name}{role}: "
+                        f"{task.volume_ul:,.2f}uL, 泵{task.pump_address} 位移模式, "
+                        f"{task.revolutions:.2f}圈, 编码器={task.encoder_counts}, "
+                        f"{task.rpm}RPM, 预计{task.estimated_seconds:.1f}s"
                     )
                     
                     result = self.rs485.run_position_rel(
-                        task["pump_addr"],
-                        task["encoder_counts"],
-                        task["rpm"],
+                        task.pump_address,
+                        task.encoder_counts,
+                        task.rpm,
                         acceleration=2
                     )
                     if not result:
                         self.log_message.emit(
-                            f"    ❌ 泵 {task['pump_addr']} ({task['sol_name']}) 位置命令发送失败"
+                            f"    ❌ 泵 {task.pump_address} ({task.sol_name}) 位置命令发送失败"
                         )
                         return False
                 else:
                     # RPM 时间模式回退
                     self.log_message.emit(
-                        f"    注入 {task['sol_name']}{role}: "
-                        f"{task['vol']:,.2f}uL, 泵{task['pump_addr']} RPM时间模式, "
-                        f"{task['rpm']}RPM, 预计{task['estimated_seconds']:.1f}s"
+                        f"    注入 {task.sol_name}{role}: "
+                        f"{task.volume_ul:,.2f}uL, 泵{task.pump_address} RPM时间模式, "
+                        f"{task.rpm}RPM, 预计{task.estimated_seconds:.1f}s"
                     )
                     
                     result = self.rs485.start_pump(
-                        task["pump_addr"],
-                        task["direction"],
-                        task["rpm"]
+                        task.pump_address,
+                        task.direction,
+                        task.rpm
                     )
                     if not result:
                         self.log_message.emit(
-                            f"    ❌ 泵 {task['pump_addr']} ({task['sol_name']}) 启动失败"
+                            f"    ❌ 泵 {task.pump_address} ({task.sol_name}) 启动失败"
                         )
                         return False
                     rpm_tasks.append(task)
                 
-                if task["estimated_seconds"] > max_wait:
-                    max_wait = task["estimated_seconds"]
+                if task.estimated_seconds > max_wait:
+                    max_wait = task.estimated_seconds
             
             # 等待本批次中最长的泵完成
             if max_wait > 0:
@@ -592,7 +463,7 @@ class ExperimentWorker(QObject):
                 while waited < max_wait:
                     if self._stop_flag:
                         for t in batch:
-                            self.rs485.stop_pump(t["pump_addr"])
+                            self.rs485.stop_pump(t.pump_address)
                         return False
                     step_wait = min(0.5, max_wait - waited)
                     time.sleep(step_wait)
@@ -600,13 +471,19 @@ class ExperimentWorker(QObject):
             
             # 停止RPM时间模式的泵
             for t in rpm_tasks:
-                self.rs485.stop_pump(t["pump_addr"])
+                self.rs485.stop_pump(t.pump_address)
                 time.sleep(0.2)
             
             for task in batch:
                 self.log_message.emit(
-                    f"    ✓ {task['sol_name']} 注入完成 ({task['vol']:,.2f}uL)"
+                    f"    ✓ {task.sol_name} 注入完成 ({task.volume_ul:,.2f}uL)"
                 )
+            self.telemetry.emit(
+                "batch", order=order_num,
+                pumps=[t.pump_address for t in batch],
+                volumes_ul=[round(t.volume_ul, 3) for t in batch],
+                est_s=round(max_wait, 3), dur=round(time.monotonic() - batch_t0, 6),
+            )
             
             # 批次间间隔
             time.sleep(0.5)
@@ -692,7 +569,9 @@ class ExperimentWorker(QObject):
         
         # 通过 CHIBridge 调用真实 CHI 660F 仪器
         try:
-            from src.echem_sdl.hardware.chi_echem_bridge import CHIBridge, CHIBridgeConfig
+            from src.echem_sdl.hardware.chi_echem_bridge import (
+                CHIBridgeConfig, acquire_bridge, release_bridge,
+            )
             
             # 从系统配置获取 CHI 路径（如有），否则使用默认
             chi_exe = r"D:\CHI660F\chi660f.exe"
@@ -705,29 +584,36 @@ class ExperimentWorker(QObject):
             import os
             os.makedirs(output_dir, exist_ok=True)
             
-            # 创建或复用 Bridge
-            if not hasattr(self, '_chi_bridge') or self._chi_bridge is None:
-                bridge_config = CHIBridgeConfig(
-                    chi_exe_path=chi_exe,
-                    output_dir=output_dir,
-                    use_dummy_cell=getattr(ec, 'use_dummy_cell', True),
-                )
-                self._chi_bridge = CHIBridge(bridge_config)
+            # 从会话池取用 Bridge: CHI 660F 跨步骤/跨组合常驻，健康时直接复用
+            bridge_config = CHIBridgeConfig(
+                chi_exe_path=chi_exe,
+                output_dir=output_dir,
+                use_dummy_cell=getattr(ec, 'use_dummy_cell', True),
+            )
+            with self.telemetry.span("chi_phase", phase="acquire", technique=technique) as tel:
+                bridge = acquire_bridge(bridge_config)
+                tel["ok"] = bridge is not None
+            if bridge is None:
+                self.log_message.emit("    ❌ CHI 660F 连接失败")
+                return False
             
-            if not self._chi_bridge.is_connected:
-                self.log_message.emit("    正在连接 CHI 660F...")
-                if not self._chi_bridge.connect():
-                    self.log_message.emit("    ❌ CHI 660F 连接失败")
+            healthy = False
+            try:
+                self.log_message.emit(f"    开始 {technique.upper()} 测量...")
+                sink, extractor = self._echem_data_sink(technique)
+                with self.telemetry.span("chi_phase", phase="measure", technique=technique) as tel:
+                    result = bridge.run(ec, on_data=sink)
+                    tel.update(ok=result.success, points=len(result.data_points))
+                
+                if self._stop_flag:
+                    bridge.stop()
+                    self.log_message.emit("    测量被中止")
                     return False
-                self.log_message.emit("    ✅ CHI 660F 已连接")
-            
-            self.log_message.emit(f"    开始 {technique.upper()} 测量...")
-            result = self._chi_bridge.run(ec)
-            
-            if self._stop_flag:
-                self._chi_bridge.stop()
-                self.log_message.emit("    测量被中止")
-                return False
+                
+                healthy = result.success
+            finally:
+                # 保持 CHI 660F 运行；失败时下次取用会重启
+                release_bridge(bridge, healthy=healthy)
             
             if result.success:
                 self.log_message.emit(
@@ -737,17 +623,8 @@ class ExperimentWorker(QObject):
                 if result.data_file:
                     self.log_message.emit(f"    数据文件: {result.data_file}")
                 # 发射电化学结果信号，供UI显示图像
-                self.echem_result.emit(
-                    technique, result.data_points, result.headers
-                )
-                # 关闭 CHI 660F 窗口，释放资源
-                try:
-                    if self._chi_bridge:
-                        self._chi_bridge.disconnect()
-                        self._chi_bridge = None
-                        self.log_message.emit("    CHI 660F 已关闭")
-                except Exception as e:
-                    self.log_message.emit(f"    ⚠ 关闭 CHI 660F 时出错: {e}")
+                self._emit_echem_result(technique, result.data_points, result.headers, ec,
+                                        extractor.features())
                 return True
             else:
                 self.log_message.emit(f"    ❌ 电化学测量失败: {result.error_message}")
@@ -758,23 +635,210 @@ class ExperimentWorker(QObject):
             return self._execute_echem_mock(ec, technique)
         except Exception as e:
             self.log_message.emit(f"    ❌ 电化学异常: {e}")
+            self.telemetry.emit("error", where="chi", msg=str(e))
             return False
     
+    def _echem_batch_group(self, start: int) -> List[int]:
+        """从 start 起可合并进同一个宏的连续电化学步骤序号
+        
+        需开启 OCPT 监控的步骤要逐个执行，不参与合并；
+        同一批次共用 dummy cell 设置。
+        """
+        if self.config is not None and not self.config.chi_batch_macros:
+            return [start]
+        
+        steps = self.experiment.steps
+        group: List[int] = []
+        dummy = None
+        for k in range(start, len(steps)):
+            step = steps[k]
+            ec = step.ec_settings
+            if step.step_type != ProgramStepType.ECHEM or not ec or ec.ocpt_enabled:
+                break
+            step_dummy = getattr(ec, 'use_dummy_cell', True)
+            if dummy is not None and step_dummy != dummy:
+                break
+            dummy = step_dummy
+            group.append(k)
+        return group or [start]
+    
+    def _run_echem_batch(self, indices: List[int]) -> bool:
+        """批量执行连续的电化学步骤: 一段宏、一次 CHI 操作
+        
+        宏内各测量开始/完成时逐个发出 step_started/step_finished，
+        步骤耗时按各测量输出文件的实际完成时刻计。
+        
+        Returns:
+            是否全部成功
+        """
+        steps = [self.experiment.steps[k] for k in indices]
+        self.log_message.emit(
+            f"[步骤{indices[0]}-{indices[-1]}] 批量执行电化学: "
+            + " → ".join(str(getattr(s.ec_settings.technique, 'value', s.ec_settings.technique)).upper()
+                         for s in steps)
+        )
+        
+        starts: Dict[int, float] = {}
+        finished: List[bool] = []
+        
+        def on_item(n: int, success: Optional[bool]):
+            k, step = indices[n], steps[n]
+            now = time.monotonic()
+            if success is None:
+                starts[n] = now
+                self.step_started.emit(k, step.step_id)
+                self.telemetry.emit("step_start", step=k, type=ProgramStepType.ECHEM.value)
+                return
+            t0 = starts.get(n, now)
+            self.telemetry.emit("step_end", step=k, type=ProgramStepType.ECHEM.value, ok=success,
+                                dur=round(now - t0, 6))
+            self._record_step(k, step, success, t0 - self._run_t0, now - t0)
+            self.step_finished.emit(k, step.step_id, success)
+            finished.append(success)
+            if not success:
+                self.log_message.emit(f"[步骤{k}] 执行失败")
+        
+        try:
+            self._execute_echem_batch(steps, on_item)
+        except Exception as e:
+            self.log_message.emit(f"[错误] {str(e)}")
+            self.telemetry.emit("error", where=f"step{indices[0]}-{indices[-1]}", msg=str(e))
+        
+        if len(finished) == len(indices) and all(finished):
+            return True
+        # 批次中断 (连接失败、超时、异常): 第一个未完成的测量记为失败
+        if all(finished):
+            n = len(finished)
+            if n not in starts:
+                on_item(n, None)
+            on_item(n, False)
+        return False
+    
+    def _execute_echem_batch(self, steps: List[ProgStep],
+                             on_item: Callable[[int, Optional[bool]], None]):
+        """通过 CHIBridge 批量执行
+        
+        第 n 个测量开始时回调 on_item(n, None)，完成时回调 on_item(n, 是否成功)；
+        出现失败后不再回调后续测量。
+        """
+        try:
+            from src.echem_sdl.hardware.chi_echem_bridge import (
+                CHIBridgeConfig, acquire_bridge, release_bridge,
+            )
+        except ImportError:
+            # 不可批量时逐步执行 (遇到失败即停止)
+            for n, step in enumerate(steps):
+                on_item(n, None)
+                success = self._execute_echem(step)
+                on_item(n, success)
+                if not success:
+                    break
+            return
+        
+        chi_exe = r"D:\CHI660F\chi660f.exe"
+        output_dir = r"D:\CHI660F\data"
+        if self.config:
+            chi_exe = getattr(self.config, 'chi_exe_path', chi_exe)
+            output_dir = getattr(self.config, 'chi_output_dir', output_dir)
+        import os
+        os.makedirs(output_dir, exist_ok=True)
+        
+        ec_list = [step.ec_settings for step in steps]
+        with self.telemetry.span("chi_phase", phase="acquire", technique="batch") as tel:
+            bridge = acquire_bridge(CHIBridgeConfig(
+                chi_exe_path=chi_exe,
+                output_dir=output_dir,
+                use_dummy_cell=getattr(ec_list[0], 'use_dummy_cell', True),
+            ))
+            tel["ok"] = bridge is not None
+        if bridge is None:
+            self.log_message.emit("    ❌ CHI 660F 连接失败")
+            return
+        
+        techniques = [ec.technique.value if hasattr(ec.technique, 'value') else str(ec.technique)
+                      for ec in ec_list]
+        live = {}  # 正在执行的测量的实时数据回调与特征提取器
+        failed = []
+        
+        def sink(block):
+            if "sink" in live:
+                live["sink"](block)
+        
+        def item_event(n, result):
+            if failed:
+                return
+            technique = techniques[n]
+            if result is None:
+                live["sink"], live["extractor"] = self._echem_data_sink(technique)
+                on_item(n, None)
+                return
+            if not result.success:
+                self.log_message.emit(f"    ❌ {technique.upper()} 测量失败: {result.error_message}")
+                failed.append(n)
+                on_item(n, False)
+                return
+            self.log_message.emit(
+                f"  电化学完成 ({technique.upper()}): 采集 {len(result.data_points)} 个数据点, "
+                f"耗时 {result.elapsed_time:.1f}s"
+            )
+            if result.data_file:
+                self.log_message.emit(f"    数据文件: {result.data_file}")
+            self._emit_echem_result(technique, result.data_points, result.headers, ec_list[n],
+                                    live["extractor"].features())
+            on_item(n, True)
+        
+        healthy = False
+        try:
+            with self.telemetry.span("chi_phase", phase="batch", technique=techniques[-1],
+                                     count=len(ec_list)) as tel:
+                results = bridge.run_batch(ec_list, on_data=sink, on_item=item_event)
+                tel["ok"] = bool(results) and all(r.success for r in results)
+            if self._stop_flag:
+                bridge.stop()
+                self.log_message.emit("    测量被中止")
+                return
+            healthy = all(r.success for r in results)
+        finally:
+            release_bridge(bridge, healthy=healthy)
+    
+    
+    def _echem_data_sink(self, technique: str):
+        """实时数据块回调: 转发 echem_data 信号并增量提取特征
+        
+        Returns:
+            (sink(block), FeatureExtractor)
+        """
+        from src.echem_sdl.core.echem_features import FeatureExtractor
+        extractor = FeatureExtractor(technique)
+        
+        def sink(block):
+            extractor.update(block[:, 0], block[:, 1], block[:, 2])
+            self.echem_data.emit(technique, block)
+        
+        return sink, extractor
+    
+    def _log_echem_features(self, features: Dict[str, float]):
+        """输出单次测量的特征摘要"""
+        items = [f"{k}={v:.4g}" for k, v in features.items() if k != "n_points"]
+        if items:
+            self.log_message.emit("    特征: " + ", ".join(items))
+    
     def _execute_echem_mock(self, ec: ECSettings, technique: str) -> bool:
         """电化学 Mock 模式 (CHI 不可用时的模拟数据采集)"""
-        # 计算运行时间
-        if technique in ["CV", "LSV"]:
-            e_range = abs(ec.eh - ec.el) if ec.eh and ec.el else 1.0
-            run_time = (e_range * (ec.seg_num or 2)) / (ec.scan_rate or 0.1)
-        else:
-            run_time = ec.run_time_s or 60
+        # 计算运行时间 (与执行计划使用同一时长模型)
+        run_time = estimate_ec_settings_seconds(ec)
         
         actual_run_time = min(run_time, 10)  # Mock 模式最多运行10秒
         self.log_message.emit(f"    [Mock] 开始模拟 (预计 {run_time:.1f}s, 模拟 {actual_run_time:.1f}s)...")
+        mock_t0 = time.monotonic()
+        
+        from src.echem_sdl.hardware.chi import ECDataSet
         
         sample_interval = (ec.sample_interval_ms or 100) / 1000.0
         start_time = time.time()
-        data_points = []
+        data_points = ECDataSet(technique=technique,
+                                capacity=int(actual_run_time / sample_interval) + 1)
+        emitted = 0  # 已通过 echem_data 发出的点数
         
         while time.time() - start_time < actual_run_time:
             if self._stop_flag:
@@ -800,7 +864,12 @@ class ExperimentWorker(QObject):
                 potential = ec.e0 or 0
                 current = 1e-6 * (1 - 2.718 ** (-elapsed / 5))
             
-            data_points.append((elapsed, potential, current))
+            data_points.append(elapsed, potential, current)
+            
+            # 每 5 点发出一个实时数据块
+            if len(data_points) - emitted >= 5:
+                self.echem_data.emit(technique, data_points.as_array()[emitted:].copy())
+                emitted = len(data_points)
             
             if len(data_points) % 20 == 0:
                 progress = (elapsed / actual_run_time) * 100
@@ -808,10 +877,15 @@ class ExperimentWorker(QObject):
             
             time.sleep(sample_interval)
         
+        if len(data_points) > emitted:
+            self.echem_data.emit(technique, data_points.as_array()[emitted:].copy())
         self.log_message.emit(f"  [Mock] 电化学完成: 采集 {len(data_points)} 个数据点")
+        self.telemetry.emit("chi_phase", phase="measure", technique=technique, ok=True,
+                            points=len(data_points), mock=True,
+                            dur=round(time.monotonic() - mock_t0, 6))
         # 发射结果信号供UI显示
         headers = ["Time/s", "Potential/V", "Current/A"]
-        self.echem_result.emit(technique, data_points, headers)
+        self._emit_echem_result(technique, data_points, headers, ec)
         return True
     
     def _execute_blank(self, step: ProgStep) -> bool:
@@ -874,7 +948,8 @@ class ExperimentRunner(QObject):
     step_finished = Signal(int, str, bool)  # step_index, step_id, success
     log_message = Signal(str)
     experiment_finished = Signal(bool)  # success
-    echem_result = Signal(str, list, list)  # technique, data_points, headers
+    echem_result = Signal(str, object, list)  # technique, data_points (ECDataSet 或行列表), headers
+    echem_data = Signal(str, object)  # technique, 新增数据块 (k, 3) ndarray: time, potential, current
     pump_batch_update = Signal(list, list)  # running_pump_addrs, waiting_pump_addrs
     paused = Signal()
     resumed = Signal()
@@ -892,18 +967,60 @@ class ExperimentRunner(QObject):
         self._ocpt_triggered = False
         self._thread: Optional[QThread] = None
         self._worker: Optional[ExperimentWorker] = None
+        self.telemetry = NULL_TELEMETRY
+        self.result_store = None
+    
+    def set_result_store(self, store):
+        """设置实验活动结果库 (CampaignStore)，每次运行结束时追加结果"""
+        self.result_store = store
+    
+    def set_telemetry(self, telemetry):
+        """设置结构化遥测记录器 (步骤/泵命令/批次/CHI 阶段事件)"""
+        self.telemetry = telemetry or NULL_TELEMETRY
+        if hasattr(self.rs485, 'set_telemetry'):
+            self.rs485.set_telemetry(telemetry)
     
     def set_config(self, config: SystemConfig):
         """设置系统配置"""
         self.config = config
     
+    def _rs485_available(self) -> bool:
+        is_mock = self.config.mock_mode if self.config else True
+        return is_mock or self.rs485.is_connected()
+    
     def pre_check_experiment(self, experiment: Experiment) -> list:
         """在 UI 线程中运行预检查（不启动线程），返回错误列表"""
-        worker = ExperimentWorker(experiment, self.rs485, self.config)
-        return worker.pre_check()
+        from src.core.precheck import get_precheck_engine
+        return get_precheck_engine().check_experiment(
+            experiment, self.config, self._rs485_available()
+        )
+    
+    def pre_check_combos(self, experiment: Experiment, columns: "ComboColumns") -> Dict[int, list]:
+        """一次性预检查组合实验的全部组合
+        
+        Args:
+            experiment: 基础实验
+            columns: {(步骤序号 0-based, 属性路径): 各组合取值}
+        
+        Returns:
+            {组合序号: 错误列表}，仅包含未通过的组合
+        """
+        from src.core.precheck import get_precheck_engine
+        return get_precheck_engine().check_combos(
+            experiment, self.config, columns, self._rs485_available()
+        )
+    
+    def get_execution_plan(self, experiment: Experiment) -> ExecutionPlan:
+        """获取实验的执行计划（按输入哈希缓存，供预检查/ETA/调度共用）"""
+        return compile_execution_plan(experiment, self.config)
     
-    def run_experiment(self, experiment: Experiment):
-        """在后台线程运行实验"""
+    def run_experiment(self, experiment: Experiment, combo_index: int = 0,
+                       combo_params: Optional[Dict[str, Any]] = None):
+        """在后台线程运行实验
+        
+        Args:
+            combo_index, combo_params: 组合实验的序号与参数 (随结果入库)
+        """
         # 如果有正在运行的线程，先停止
         if self._thread and self._thread.isRunning():
             self.stop()
@@ -916,7 +1033,8 @@ class ExperimentRunner(QObject):
         
         # 创建线程和worker (传入配置)
         self._thread = QThread()
-        self._worker = ExperimentWorker(experiment, self.rs485, self.config)
+        self._worker = ExperimentWorker(experiment, self.rs485, self.config, self.telemetry,
+                                        self.result_store, combo_index, combo_params)
         self._worker.moveToThread(self._thread)
         
         # 连接信号
@@ -926,6 +1044,7 @@ class ExperimentRunner(QObject):
         self._worker.log_message.connect(self._on_log_message)
         self._worker.experiment_finished.connect(self._on_experiment_finished)
         self._worker.echem_result.connect(self.echem_result.emit)
+        self._worker.echem_data.connect(self.echem_data.emit)
         self._worker.pump_batch_update.connect(self.pump_batch_update.emit)
         
         # 启动线程
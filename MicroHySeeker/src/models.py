@@ -8,6 +8,10 @@ import json
 from pathlib import Path
 
 
+# 需要换算的旧字段名 (出现时 from_json_str 走 from_dict 兼容路径)
+_LEGACY_KEYS = ("sample_interval",)
+
+
 class ProgramStepType(str, Enum):
     """程序步骤类型"""
     TRANSFER = "transfer"
@@ -278,7 +282,8 @@ class Experiment:
         }
 
     def to_json_str(self) -> str:
-        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+        from src.echem_sdl.utils.serialization import encode
+        return encode(self, Experiment, indent=2).decode('utf-8')
 
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> 'Experiment':
@@ -291,10 +296,26 @@ class Experiment:
         return exp
 
     @staticmethod
-    def from_json_str(json_str: str) -> 'Experiment':
+    def from_json_str(json_str: str | bytes) -> 'Experiment':
+        # 快速路径: 预编译模式直接解析；旧字段名或格式不符时走逐字段兼容路径
+        from src.echem_sdl.utils.serialization import decode
+        exp = decode(json_str, Experiment, legacy_keys=_LEGACY_KEYS)
+        if exp is not None:
+            return exp
         data = json.loads(json_str)
         return Experiment.from_dict(data)
 
+    def save(self, file_path: str | Path, force: bool = False) -> bool:
+        """原子保存 (扩展名 .mhsnap 时为二进制快照)，内容未变时跳过，返回是否写入"""
+        from src.echem_sdl.utils.serialization import save_document
+        return save_document(file_path, self, Experiment, force=force)
+
+    @staticmethod
+    def load(file_path: str | Path) -> 'Experiment':
+        """从 JSON 或二进制快照文件加载"""
+        from src.echem_sdl.utils.serialization import read_payload
+        return Experiment.from_json_str(read_payload(file_path))
+
 
 @dataclass
 class SystemConfig:
@@ -310,6 +331,18 @@ class SystemConfig:
     calibration_data: Dict[int, Dict[str, float]] = field(default_factory=dict)  # pump_address -> calibration
     
     data_dir: str = "./data"
+    
+    # 电化学实时显示: 除数据驱动的实时曲线外，另起后台线程截取 CHI660F 窗口 (可选回退)
+    chi_screen_capture: bool = False
+    # 连续的电化学步骤合并进同一段 CHI 宏批量执行
+    chi_batch_macros: bool = True
+    # 实验活动结果库目录 (相对 data_dir，也可为绝对路径)；为空时不入库
+    result_store_dir: str = "campaign"
+    # 结构化遥测 JSONL 文件 (步骤/泵命令/批次/CHI 阶段)；为空时关闭
+    telemetry_path: str = "./logs/telemetry.jsonl"
+    # 运行日志: 会话归档目录 (为空时不归档) 与界面环形缓冲容量 (行)
+    ui_log_dir: str = "./logs/ui"
+    ui_log_capacity: int = 20000
 
     def initialize_default_pumps(self):
         """初始化 12 台泵（仅一次）"""
@@ -333,10 +366,17 @@ class SystemConfig:
             'flush_channels': [c.to_dict() for c in self.flush_channels],
             'calibration_data': {str(k): v for k, v in self.calibration_data.items()},
             'data_dir': self.data_dir,
+            'chi_screen_capture': self.chi_screen_capture,
+            'chi_batch_macros': self.chi_batch_macros,
+            'result_store_dir': self.result_store_dir,
+            'telemetry_path': self.telemetry_path,
+            'ui_log_dir': self.ui_log_dir,
+            'ui_log_capacity': self.ui_log_capacity,
         }
 
     def to_json_str(self) -> str:
-        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+        from src.echem_sdl.utils.serialization import encode
+        return encode(self, SystemConfig, indent=2).decode('utf-8')
 
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> 'SystemConfig':
@@ -355,6 +395,12 @@ class SystemConfig:
             mock_mode=data.get('mock_mode', True),
             calibration_data=calibration_data,
             data_dir=data.get('data_dir', './data'),
+            chi_screen_capture=data.get('chi_screen_capture', False),
+            chi_batch_macros=data.get('chi_batch_macros', True),
+            result_store_dir=data.get('result_store_dir', 'campaign'),
+            telemetry_path=data.get('telemetry_path', './logs/telemetry.jsonl'),
+            ui_log_dir=data.get('ui_log_dir', './logs/ui'),
+            ui_log_capacity=data.get('ui_log_capacity', 20000),
         )
         config.pumps = [PumpConfig.from_dict(p) for p in data.get('pumps', [])]
         config.dilution_channels = [DilutionChannel.from_dict(c) for c in data.get('dilution_channels', [])]
@@ -362,20 +408,22 @@ class SystemConfig:
         return config
 
     @staticmethod
-    def from_json_str(json_str: str) -> 'SystemConfig':
+    def from_json_str(json_str: str | bytes) -> 'SystemConfig':
+        from src.echem_sdl.utils.serialization import decode
+        config = decode(json_str, SystemConfig, legacy_keys=_LEGACY_KEYS)
+        if config is not None:
+            return config
         data = json.loads(json_str)
         return SystemConfig.from_dict(data)
 
     def save_to_file(self, file_path: str):
-        """保存配置到 JSON 文件"""
-        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(self.to_json_str())
+        """保存配置到 JSON 文件 (原子写入，内容未变时跳过)"""
+        from src.echem_sdl.utils.serialization import atomic_write
+        atomic_write(file_path, self.to_json_str())
 
     @staticmethod
     def load_from_file(file_path: str) -> 'SystemConfig':
         """从 JSON 文件加载配置"""
         if not Path(file_path).exists():
             return SystemConfig()
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return SystemConfig.from_json_str(f.read())
+        return SystemConfig.from_json_str(Path(file_path).read_bytes())
@@ -3,6 +3,7 @@
 from PySide6.QtCore import QObject, Signal
 from datetime import datetime
 from typing import List
+import logging
 import os
 
 
@@ -16,6 +17,10 @@ class LoggerService(QObject):
         self.log_path = log_path
         self.log_messages: List[str] = []
         
+        # 控制台输出交给后台日志线程，调用方不等待终端 I/O
+        from src.echem_sdl.services.log_pipeline import console_logger
+        self._out = console_logger("app")
+
         # 创建日志目录
         os.makedirs(log_path, exist_ok=True)
     
@@ -29,28 +34,28 @@ class LoggerService(QObject):
         formatted = self._format_message("INFO", message)
         self.log_messages.append(formatted)
         self.message_logged.emit("INFO", message)
-        print(formatted)
+        self._out.log(logging.INFO, "[INFO] %s", message)
     
     def warning(self, message: str) -> None:
         """记录警告级日志。"""
         formatted = self._format_message("WARNING", message)
         self.log_messages.append(formatted)
         self.message_logged.emit("WARNING", message)
-        print(formatted)
+        self._out.log(logging.WARNING, "[WARNING] %s", message)
     
     def error(self, message: str) -> None:
         """记录错误级日志。"""
         formatted = self._format_message("ERROR", message)
         self.log_messages.append(formatted)
         self.message_logged.emit("ERROR", message)
-        print(formatted)
+        self._out.log(logging.ERROR, "[ERROR] %s", message)
     
     def debug(self, message: str) -> None:
         """记录调试级日志。"""
         formatted = self._format_message("DEBUG", message)
         self.log_messages.append(formatted)
         self.message_logged.emit("DEBUG", message)
-        print(formatted)
+        self._out.log(logging.DEBUG, "[DEBUG] %s", message)
     
     def get_messages(self, level: str = None) -> List[str]:
         """获取日志消息。"""
@@ -47,6 +47,18 @@ class RS485Wrapper:
         # 冲洗功能
         self._flusher: Optional["Flusher"] = None  # Flusher实例
         
+        # 遥测记录器 (TelemetryRecorder)，为 None 时不记录
+        self._telemetry = None
+    
+    def set_telemetry(self, telemetry) -> None:
+        """设置遥测记录器，泵命令及往返时间写入 pump_cmd 事件"""
+        self._telemetry = telemetry
+    
+    def _record_cmd(self, address: int, cmd: str, ok: bool, t0: float, **fields) -> None:
+        if self._telemetry is not None:
+            self._telemetry.emit("pump_cmd", pump=address, cmd=cmd, ok=bool(ok),
+                                 rtt=round(time.perf_counter() - t0, 6), **fields)
+        
     def set_mock_mode(self, mock_mode: bool):
         """设置模拟模式
         
@@ -188,10 +200,12 @@ class RS485Wrapper:
             
         try:
             # 使用 PumpManager 的便捷方法
+            t0 = time.perf_counter()
             success = self._pump_manager.start_pump(
                 address, direction, rpm, 
                 fire_and_forget=use_fire_and_forget
             )
+            self._record_cmd(address, "start", success, t0, rpm=rpm, ff=use_fire_and_forget)
             
             # 更新状态缓存
             self._pump_states[address] = {
@@ -233,7 +247,10 @@ class RS485Wrapper:
             
         try:
             # 使用 PumpManager 的便捷方法
+            t0 = time.perf_counter()
             success = self._pump_manager.stop_pump(address, fire_and_forget=use_fire_and_forget)
+            self._record_cmd(address, "stop", success or use_fire_and_forget, t0,
+                             ff=use_fire_and_forget)
             
             # 更新状态
             if address in self._pump_states:
@@ -280,6 +297,7 @@ class RS485Wrapper:
         
         try:
             # 使用 PumpManager 的位置模式方法
+            t0 = time.perf_counter()
             success = self._pump_manager.move_position_rel(
                 address, 
                 encoder_counts,
@@ -287,6 +305,11 @@ class RS485Wrapper:
                 acceleration,
                 fire_and_forget=use_fire_and_forget
             )
+            # 预计运行时长: 16384 counts = 1 圈
+            est_s = abs(encoder_counts) / 16384.0 / speed * 60.0 if speed else 0.0
+            self._record_cmd(address, "position", success or use_fire_and_forget, t0,
+                             rpm=speed, counts=encoder_counts, est_s=round(est_s, 3),
+                             ff=use_fire_and_forget)
             
             # 更新状态缓存
             dir_str = "正向" if encoder_counts >= 0 else "反向"
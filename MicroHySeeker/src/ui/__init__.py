@@ -1,19 +1,41 @@
-"""UI module initialization."""
-
-from .main_window import MainWindow
-from .dialogs.program_editor import ProgramEditorDialog
-from .dialogs.combo_editor import ComboEditorDialog
-from .dialogs.config_dialog import ConfigDialog
-from .dialogs.manual_dialog import ManualDialog
-from .dialogs.rs485_test import RS485TestDialog
-from .dialogs.echem_view import EChemView
-
-__all__ = [
-    "MainWindow",
-    "ProgramEditorDialog",
-    "ComboEditorDialog",
-    "ConfigDialog",
-    "ManualDialog",
-    "RS485TestDialog",
-    "EChemView",
-]
+"""UI module initialization.
+
+主窗口与各对话框按名称在首次访问时才导入 (PEP 562)。
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
+    "MainWindow": ".main_window",
+    "ProgramEditorDialog": ".dialogs.program_editor",
+    "ComboEditorDialog": ".dialogs.combo_editor",
+    "ConfigDialog": ".dialogs.config_dialog",
+    "ManualDialog": ".dialogs.manual_dialog",
+    "RS485TestDialog": ".dialogs.rs485_test",
+    "EChemView": ".dialogs.echem_view",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .main_window import MainWindow
+    from .dialogs.program_editor import ProgramEditorDialog
+    from .dialogs.combo_editor import ComboEditorDialog
+    from .dialogs.config_dialog import ConfigDialog
+    from .dialogs.manual_dialog import ManualDialog
+    from .dialogs.rs485_test import RS485TestDialog
+    from .dialogs.echem_view import EChemView
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,19 +1,41 @@
-"""Dialogs module initialization."""
-
-from .program_editor import ProgramEditorDialog
-from .combo_editor import ComboEditorDialog
-from .config_dialog import ConfigDialog
-from .manual_dialog import ManualDialog
-from .rs485_test import RS485TestDialog
-from .echem_view import EChemView
-from .about_dialog import AboutDialog
-
-__all__ = [
-    "ProgramEditorDialog",
-    "ComboEditorDialog",
-    "ConfigDialog",
-    "ManualDialog",
-    "RS485TestDialog",
-    "EChemView",
-    "AboutDialog",
-]
+"""Dialogs module initialization.
+
+对话框按名称在首次访问时才导入 (PEP 562)，启动主窗口时不加载任何对话框模块。
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
+    "ProgramEditorDialog": ".program_editor",
+    "ComboEditorDialog": ".combo_editor",
+    "ConfigDialog": ".config_dialog",
+    "ManualDialog": ".manual_dialog",
+    "RS485TestDialog": ".rs485_test",
+    "EChemView": ".echem_view",
+    "AboutDialog": ".about_dialog",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .program_editor import ProgramEditorDialog
+    from .combo_editor import ComboEditorDialog
+    from .config_dialog import ConfigDialog
+    from .manual_dialog import ManualDialog
+    from .rs485_test import RS485TestDialog
+    from .echem_view import EChemView
+    from .about_dialog import AboutDialog
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
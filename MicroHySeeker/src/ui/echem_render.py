@@ -0,0 +1,207 @@
+"""
+电化学结果图渲染服务 - 后台线程渲染 + 像素图缓存
+
+- 渲染前按目标像素宽度做 min/max 抽点 (每个像素列保留最小/最大两点)
+- matplotlib Agg 渲染在单线程 QThreadPool 中进行，GUI 线程不再阻塞
+- 结果以 (结果 ID, 宽, 高) 为键缓存为 QPixmap，切换结果 / 恢复尺寸时直接命中
+- 渲染完成后发出 rendered(key)，由界面按当前键换上新图
+
+用法:
+    service = EchemRenderService(parent)
+    service.rendered.connect(on_rendered)
+    pixmap = service.request(result_id, technique, arr, (w, h))
+    if pixmap is None:
+        ...  # 稍后由 rendered 信号通知
+"""
+
+from collections import OrderedDict
+from typing import Callable, Optional, Set, Tuple
+
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPixmap
+
+from src.utils.plot_buffer import decimate_minmax
+from src.utils.plot_styles import plot_style
+
+# (结果 ID, 宽 px, 高 px)
+RenderKey = Tuple[int, int, int]
+
+# 缓存的像素图数量上限
+DEFAULT_CACHE_SIZE = 32
+
+
+def render_echem_image(technique: str, arr: np.ndarray, width: int, height: int) -> QImage:
+    """用 matplotlib Agg 把结果渲染为 width × height 的 QImage (可在工作线程调用)
+
+    版式与原先 6 × 4.5 英寸 / 200 dpi 的图一致: 画布宽固定 6 英寸，
+    按目标像素宽度换算 dpi，字号随之缩放。
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    tech_upper = technique.upper()
+    style = plot_style(tech_upper)
+    ncols = arr.shape[1]
+    if style and max(style[0], style[1]) < ncols:
+        xi, yi, sign, x_label, y_label, title, color = style
+    else:
+        xi, yi, sign, x_label, y_label, title, color = (
+            0, 1 if ncols >= 2 else 0, 1.0, None, None, tech_upper, '#D32F2F')
+
+    x = arr[:, xi]
+    y = arr[:, yi] * sign
+    # 每个像素列保留 min/max 两点
+    x, y = decimate_minmax(x, y, 2 * width)
+
+    dpi = max(20.0, width / 6.0)
+    fig = Figure(figsize=(6, 6 * height / width), dpi=dpi, facecolor='white')
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.set_facecolor('white')
+
+    lw = 1.8  # 线宽
+    if tech_upper == "EIS" and style:
+        ax.plot(x, y, color=color, linewidth=lw, marker='o', markersize=3)
+    else:
+        ax.plot(x, y, color=color, linewidth=lw)
+    if x_label:
+        ax.set_xlabel(x_label, fontsize=15, fontweight='bold')
+        ax.set_ylabel(y_label, fontsize=15, fontweight='bold')
+    ax.set_title(title, fontsize=16, fontweight='bold')
+
+    ax.tick_params(labelsize=12, width=1.5)
+    ax.grid(True, alpha=0.3, color='#CCCCCC')
+    for spine in ax.spines.values():
+        spine.set_linewidth(1.5)
+    fig.tight_layout(pad=1.0)
+
+    canvas.draw()
+    buf = canvas.buffer_rgba()
+    w, h = canvas.get_width_height()
+    # copy: 脱离 matplotlib 的缓冲区
+    return QImage(bytes(buf), w, h, w * 4, QImage.Format_RGBA8888).copy()
+
+
+class PixmapCache:
+    """按 RenderKey 缓存 QPixmap 的 LRU (仅在 GUI 线程使用)"""
+
+    def __init__(self, capacity: int = DEFAULT_CACHE_SIZE):
+        self._capacity = capacity
+        self._items: "OrderedDict[RenderKey, QPixmap]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: RenderKey) -> bool:
+        return key in self._items
+
+    def get(self, key: RenderKey) -> Optional[QPixmap]:
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self._items.move_to_end(key)
+        return pixmap
+
+    def put(self, key: RenderKey, pixmap: QPixmap) -> None:
+        self._items[key] = pixmap
+        self._items.move_to_end(key)
+        while len(self._items) > self._capacity:
+            self._items.popitem(last=False)
+
+    def discard_result(self, result_id: int) -> None:
+        """移除某个结果的全部尺寸"""
+        for key in [k for k in self._items if k[0] == result_id]:
+            del self._items[key]
+
+
+class _RenderSignals(QObject):
+    done = Signal(object, object)      # key, QImage
+    failed = Signal(object, str)       # key, error
+
+
+class _RenderTask(QRunnable):
+    """单次渲染任务 (在线程池中执行)"""
+
+    def __init__(self, key: RenderKey, technique: str, arr: np.ndarray,
+                 render_fn: Callable, signals: _RenderSignals):
+        super().__init__()
+        self._key = key
+        self._technique = technique
+        self._arr = arr
+        self._render_fn = render_fn
+        self._signals = signals
+
+    def run(self):
+        try:
+            _, w, h = self._key
+            image = self._render_fn(self._technique, self._arr, w, h)
+        except Exception as e:
+            self._signals.failed.emit(self._key, str(e))
+            return
+        self._signals.done.emit(self._key, image)
+
+
+class EchemRenderService(QObject):
+    """电化学结果图的后台渲染与缓存"""
+
+    rendered = Signal(object)          # key: 像素图已进入缓存
+    failed = Signal(object, str)       # key, error
+
+    def __init__(self, parent=None, render_fn: Callable = render_echem_image,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            render_fn: render_fn(technique, arr, width, height) -> QImage，在工作线程调用
+            cache_size: 缓存的像素图数量
+        """
+        super().__init__(parent)
+        self._render_fn = render_fn
+        self._cache = PixmapCache(cache_size)
+        self._pending: Set[RenderKey] = set()
+        # matplotlib 非完全线程安全，单线程串行渲染
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _RenderSignals()
+        self._signals.done.connect(self._on_done)
+        self._signals.failed.connect(self._on_failed)
+
+    @property
+    def cache(self) -> PixmapCache:
+        return self._cache
+
+    def request(self, result_id: int, technique: str, arr: np.ndarray,
+                size: Tuple[int, int]) -> Optional[QPixmap]:
+        """取渲染结果；未缓存时提交后台渲染并返回 None
+
+        Args:
+            result_id: 结果 ID
+            technique: 技术名
+            arr: (n, k) 数据 (调用方保证之后不再修改)
+            size: 目标像素尺寸 (宽, 高)
+        """
+        w, h = max(1, int(size[0])), max(1, int(size[1]))
+        key = (result_id, w, h)
+        pixmap = self._cache.get(key)
+        if pixmap is not None:
+            return pixmap
+        if key not in self._pending:
+            self._pending.add(key)
+            self._pool.start(_RenderTask(key, technique, arr, self._render_fn, self._signals))
+        return None
+
+    def wait(self, timeout_ms: int = -1) -> bool:
+        """等待全部渲染任务结束 (关闭窗口或测试时使用)"""
+        return self._pool.waitForDone(timeout_ms)
+
+    def _on_done(self, key: RenderKey, image: QImage):
+        self._pending.discard(key)
+        if image is None or image.isNull():
+            self.failed.emit(key, "空图像")
+            return
+        # QPixmap 只能在 GUI 线程创建
+        self._cache.put(key, QPixmap.fromImage(image))
+        self.rendered.emit(key)
+
+    def _on_failed(self, key: RenderKey, error: str):
+        self._pending.discard(key)
+        self.failed.emit(key, error)
@@ -9,16 +9,20 @@
 """
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
-    QListWidget, QListWidgetItem, QTextEdit, QPushButton, QLabel, QToolBar, QStatusBar,
+    QListWidget, QListWidgetItem, QPushButton, QLabel, QToolBar, QStatusBar,
     QMenuBar, QMenu, QMessageBox, QFileDialog, QFrame, QSpinBox,
     QGroupBox, QGridLayout, QScrollArea
 )
 from PySide6.QtCore import Qt, Slot, QSize, QRectF, QTimer, QPointF
-from PySide6.QtGui import QAction, QIcon, QFont, QColor, QPainter, QPen, QBrush, QLinearGradient, QPainterPath, QPolygonF
+from PySide6.QtGui import QAction, QIcon, QFont, QColor, QPainter, QPen, QBrush, QLinearGradient, QPainterPath, QPolygonF, QImage, QPixmap
+from collections import OrderedDict
 from pathlib import Path
+from typing import Optional
 
 from src.models import SystemConfig, Experiment, ProgStep, ProgramStepType, ECSettings
 from src.engine.runner import ExperimentRunner
+from src.core.execution_plan import format_duration
+from src.core.param_access import ComboApplier
 from src.services.i18n import tr, get_lang, set_lang
 
 
@@ -201,6 +205,10 @@ class PumpDiagramWidget(QFrame):
 class ExperimentProcessWidget(QFrame):
     """实验过程区域 - Inlet/Transfer/Outlet泵 + 混合烧杯/反应烧杯 + 液位 + 指示灯"""
     
+    # 保留的最近电化学结果数
+    MAX_ECHEM_RESULTS = 20
+    RERENDER_DELAY_MS = 150
+    
     def __init__(self, config: SystemConfig, parent=None):
         super().__init__(parent)
         self.config = config
@@ -224,6 +232,20 @@ class ExperimentProcessWidget(QFrame):
         # ======== 电化学结果图像 ========
         self._echem_pixmap = None  # QPixmap, 由 set_echem_result 生成
         
+        # ======== 实时曲线 (测量期间覆盖在工作站屏幕区域) ========
+        self.live_plot = None  # LiveEchemPlot, 首次测量时创建
+        
+        # ======== 结果图: 后台渲染服务 + 最近结果 (ID → (technique, arr)) ========
+        self._render_service = None  # EchemRenderService, 首个结果时创建
+        self._echem_results: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_result_id = 0
+        self._current_result_id: Optional[int] = None
+        self._ws_screen_size = None  # 上次绘制时的工作站屏幕区域 (w, h)
+        # 尺寸变化后延迟重新渲染 (拖动缩放期间先拉伸旧图)
+        self._rerender_timer = QTimer(self)
+        self._rerender_timer.setSingleShot(True)
+        self._rerender_timer.timeout.connect(self._request_result_render)
+        
         # ======== 布局参数（每个形状独立 dx/dy/w/h, 每条管道独立偏移） ========
         self.layout_params = self._default_layout_params()
         # 尝试从文件加载已保存的参数
@@ -419,79 +441,153 @@ class ExperimentProcessWidget(QFrame):
         self.ws_measurement_status = text
         self.update()
     
-    def set_echem_result(self, technique: str, data_points: list, headers: list):
-        """接收电化学结果数据，使用 matplotlib 生成白底红线图像并显示在工作站屏幕区域"""
-        try:
-            import matplotlib
-            matplotlib.use('Agg')
-            import matplotlib.pyplot as plt
-            from matplotlib.figure import Figure
-            from matplotlib.backends.backend_agg import FigureCanvasAgg
-            import numpy as np
-            
-            if not data_points:
-                return
-            
-            arr = np.array(data_points)
-            fig = Figure(figsize=(6, 4.5), dpi=200, facecolor='white')
-            canvas = FigureCanvasAgg(fig)
-            ax = fig.add_subplot(111)
-            ax.set_facecolor('white')
-            
-            line_color = '#D32F2F'  # 红线
-            lw = 1.8  # 线宽
-            tech_upper = technique.upper()
-            if tech_upper == "CV" and arr.shape[1] >= 3:
-                ax.plot(arr[:, 1], arr[:, 2], color=line_color, linewidth=lw)
-                ax.set_xlabel('E / V', fontsize=15, fontweight='bold')
-                ax.set_ylabel('I / A', fontsize=15, fontweight='bold')
-                ax.set_title('Cyclic Voltammetry (CV)', fontsize=16, fontweight='bold')
-            elif tech_upper == "LSV" and arr.shape[1] >= 3:
-                ax.plot(arr[:, 1], arr[:, 2], color=line_color, linewidth=lw)
-                ax.set_xlabel('E / V', fontsize=15, fontweight='bold')
-                ax.set_ylabel('I / A', fontsize=15, fontweight='bold')
-                ax.set_title('Linear Sweep Voltammetry (LSV)', fontsize=16, fontweight='bold')
-            elif tech_upper in ("I-T", "IT") and arr.shape[1] >= 3:
-                ax.plot(arr[:, 0], arr[:, 2], color=line_color, linewidth=lw)
-                ax.set_xlabel('t / s', fontsize=15, fontweight='bold')
-                ax.set_ylabel('I / A', fontsize=15, fontweight='bold')
-                ax.set_title('Amperometric i-t Curve', fontsize=16, fontweight='bold')
-            elif tech_upper == "OCPT" and arr.shape[1] >= 2:
-                ax.plot(arr[:, 0], arr[:, 1], color='#1565C0', linewidth=lw)
-                ax.set_xlabel('t / s', fontsize=15, fontweight='bold')
-                ax.set_ylabel('E / V', fontsize=15, fontweight='bold')
-                ax.set_title('Open Circuit Potential (OCPT)', fontsize=16, fontweight='bold')
-            elif tech_upper == "EIS" and arr.shape[1] >= 2:
-                ax.plot(arr[:, 0], -arr[:, 1], color=line_color, linewidth=lw, marker='o', markersize=3)
-                ax.set_xlabel("Z' / Ω", fontsize=15, fontweight='bold')
-                ax.set_ylabel("-Z'' / Ω", fontsize=15, fontweight='bold')
-                ax.set_title('Nyquist Plot (EIS)', fontsize=16, fontweight='bold')
-            else:
-                ax.plot(arr[:, 0], arr[:, 1] if arr.shape[1] >= 2 else arr[:, 0],
-                        color=line_color, linewidth=lw)
-                ax.set_title(tech_upper, fontsize=16, fontweight='bold')
-            
-            ax.tick_params(labelsize=12, width=1.5)
-            ax.grid(True, alpha=0.3, color='#CCCCCC')
-            for spine in ax.spines.values():
-                spine.set_linewidth(1.5)
-            fig.tight_layout(pad=1.0)
-            
-            canvas.draw()
-            buf = canvas.buffer_rgba()
-            w, h = canvas.get_width_height()
-            
-            from PySide6.QtGui import QImage, QPixmap
-            qimg = QImage(bytes(buf), w, h, QImage.Format_RGBA8888)
-            self._echem_pixmap = QPixmap.fromImage(qimg)
-            plt.close(fig)
-            
-            self.ws_measurement_status = tr("ws_done", tech=tech_upper)
+    # ── 实时曲线 ──────────────────────────────────
+    
+    def _ensure_live_plot(self):
+        if self.live_plot is None:
+            from src.ui.widgets.live_echem_plot import LiveEchemPlot
+            self.live_plot = LiveEchemPlot(self)
+            self.live_plot.hide()
+        return self.live_plot
+    
+    def start_live(self, technique: str):
+        """测量开始: 清空实时曲线并显示在工作站屏幕区域"""
+        plot = self._ensure_live_plot()
+        plot.start(technique)
+        self._echem_pixmap = None
+        self._current_result_id = None
+        plot.show()
+        self.update()
+    
+    def append_live(self, technique: str, block):
+        """追加实时数据块 (time, potential, current)"""
+        plot = self._ensure_live_plot()
+        if plot.technique != technique.upper():
+            plot.start(technique)
+        plot.append(block)
+        if not plot.isVisible():
+            plot.show()
             self.update()
-        except Exception as e:
-            print(f"[ExperimentProcess] 生成电化学图像失败: {e}")
-            import traceback
-            traceback.print_exc()
+    
+    def stop_live(self):
+        """测量结束: 停止刷新，保留最后的曲线"""
+        if self.live_plot is not None:
+            self.live_plot.stop()
+    
+    def set_capture_frame(self, pixmap):
+        """CHI 窗口截图 (可选回退): 仅在尚无实时数据时显示"""
+        if self.live_plot is not None and len(self.live_plot):
+            return
+        if self.live_plot is not None:
+            self.live_plot.hide()
+        self._echem_pixmap = pixmap
+        self.update()
+    
+    def _place_live_plot(self, x: int, y: int, w: int, h: int):
+        """让实时曲线跟随工作站屏幕区域"""
+        if self.live_plot is None or not self.live_plot.isVisible():
+            return False
+        m = 4
+        rect = QRectF(x + m, y + m, w - m * 2, h - m * 2).toRect()
+        if self.live_plot.geometry() != rect:
+            self.live_plot.setGeometry(rect)
+        return True
+    
+    # ── 结果图 (后台渲染 + 缓存) ──────────────────────────────────
+    
+    def _ensure_render_service(self):
+        if self._render_service is None:
+            from src.ui.echem_render import EchemRenderService
+            self._render_service = EchemRenderService(self)
+            self._render_service.rendered.connect(self._on_result_rendered)
+            self._render_service.failed.connect(self._on_result_render_failed)
+        return self._render_service
+    
+    def wait_render(self, timeout_ms: int = 5000):
+        """等待后台渲染任务结束 (关闭窗口时调用)"""
+        if self._render_service is not None:
+            self._render_service.wait(timeout_ms)
+    
+    def set_echem_result(self, technique: str, data_points, headers: list,
+                         result_id: Optional[int] = None) -> int:
+        """接收电化学结果数据，后台生成白底红线图像并显示在工作站屏幕区域
+        
+        data_points 为列式 ECDataSet (time, potential, current) 或行列表。
+        渲染在工作线程进行，完成后换上新图；同一结果同一尺寸的图像会被缓存。
+        
+        Returns:
+            结果 ID，可用于 show_echem_result() 切换回该结果
+        """
+        import numpy as np
+        
+        if not len(data_points):
+            return -1
+        # 拷贝一份: 渲染在工作线程进行，源数据可能被复用
+        if hasattr(data_points, 'as_array'):
+            arr = np.array(data_points.as_array(), dtype=float)
+        else:
+            arr = np.array(data_points, dtype=float)
+        if arr.ndim != 2:
+            return -1
+        
+        if result_id is None:
+            self._next_result_id += 1
+            result_id = self._next_result_id
+        self._echem_results[result_id] = (technique, arr)
+        self._echem_results.move_to_end(result_id)
+        while len(self._echem_results) > self.MAX_ECHEM_RESULTS:
+            old_id, _ = self._echem_results.popitem(last=False)
+            if self._render_service is not None:
+                self._render_service.cache.discard_result(old_id)
+        
+        self.ws_measurement_status = tr("ws_done", tech=technique.upper())
+        self.show_echem_result(result_id)
+        return result_id
+    
+    def show_echem_result(self, result_id: int) -> bool:
+        """切换显示已保存的结果 (命中缓存时立即显示)"""
+        if result_id not in self._echem_results:
+            return False
+        self._current_result_id = result_id
+        self._request_result_render()
+        return True
+    
+    def _render_size(self):
+        """结果图的目标像素尺寸 (工作站屏幕区域，按设备像素比放大)"""
+        if not self._ws_screen_size:
+            return None
+        w, h = self._ws_screen_size
+        ratio = self.devicePixelRatioF()
+        return (int((w - 8) * ratio), int((h - 8) * ratio))
+    
+    def _request_result_render(self):
+        if self._current_result_id is None:
+            return
+        size = self._render_size()
+        if size is None or size[0] <= 0 or size[1] <= 0:
+            # 尚未绘制过，等首次 paintEvent 确定尺寸
+            self.update()
+            return
+        technique, arr = self._echem_results[self._current_result_id]
+        pixmap = self._ensure_render_service().request(
+            self._current_result_id, technique, arr, size)
+        if pixmap is not None:
+            self._show_result_pixmap(pixmap)
+    
+    def _show_result_pixmap(self, pixmap):
+        self._echem_pixmap = pixmap
+        if self.live_plot is not None:
+            self.live_plot.hide()
+        self.update()
+    
+    def _on_result_rendered(self, key):
+        result_id, w, h = key
+        if result_id == self._current_result_id and (w, h) == self._render_size():
+            self._show_result_pixmap(self._render_service.cache.get(key))
+    
+    def _on_result_render_failed(self, key, error: str):
+        # 渲染失败时保留实时曲线中的完整数据
+        print(f"[ExperimentProcess] 生成电化学图像失败: {error}")
     
     def _update_animation(self):
         # 简单的随机游走波形
@@ -770,7 +866,17 @@ class ExperimentProcessWidget(QFrame):
         screen_w = w - screen_m * 2
         screen_h = h - 40
         
-        if self._echem_pixmap:
+        if self._ws_screen_size != (screen_w, screen_h):
+            self._ws_screen_size = (screen_w, screen_h)
+            if self._current_result_id is not None:
+                self._rerender_timer.start(self.RERENDER_DELAY_MS)
+        
+        if self._place_live_plot(screen_x, screen_y, screen_w, screen_h):
+            # 实时曲线控件覆盖屏幕区域 —— 只画边框
+            painter.setPen(QPen(QColor("#BDBDBD"), 2))
+            painter.setBrush(QBrush(Qt.white))
+            painter.drawRoundedRect(screen_x, screen_y, screen_w, screen_h, 4, 4)
+        elif self._echem_pixmap:
             # 有图像时 —— 白色背景
             painter.setPen(QPen(QColor("#BDBDBD"), 2))
             painter.setBrush(QBrush(Qt.white))
@@ -957,6 +1063,8 @@ class MainWindow(QMainWindow):
         self.single_experiment: Experiment = None
         self.combo_experiments: list = []
         self.combo_params: list = []
+        self._combo_applier: Optional[ComboApplier] = None
+        self._run_plan = None  # 当前运行实验的执行计划 (启动时编译一次，供每步 ETA 索引)
         self.current_combo_index = 0
         self.total_combo_count = 0
         
@@ -967,11 +1075,34 @@ class MainWindow(QMainWindow):
         self.runner.log_message.connect(self._on_log_message)
         self.runner.experiment_finished.connect(self._on_experiment_finished)
         self.runner.echem_result.connect(self._on_echem_result)
+        self.runner.echem_data.connect(self._on_echem_data)
         self.runner.pump_batch_update.connect(self._on_pump_batch_update)
         
-        # 电化学实时截图定时器 (测量期间捕获CHI660F窗口)
-        self._echem_capture_timer = QTimer(self)
-        self._echem_capture_timer.timeout.connect(self._capture_chi_window)
+        # 结构化遥测 (JSONL: 步骤/泵命令/批次/CHI 阶段)，telemetry_path 为空时关闭
+        self._telemetry = None
+        if self.config.telemetry_path:
+            try:
+                from src.echem_sdl.services.telemetry import TelemetryRecorder
+                self._telemetry = TelemetryRecorder(Path(self.config.telemetry_path))
+                self.runner.set_telemetry(self._telemetry)
+            except Exception as e:
+                print(f"⚠️ 遥测初始化失败: {e}")
+        
+        # 实验活动结果库 (SQLite 索引 + 数组文件)，位于 data_dir 下，每次运行结束时追加；
+        # result_store_dir 为空时关闭
+        self._result_store = None
+        if self.config.result_store_dir:
+            try:
+                from src.echem_sdl.services.result_store import CampaignStore
+                self._result_store = CampaignStore(
+                    Path(self.config.data_dir) / self.config.result_store_dir)
+                self.runner.set_result_store(self._result_store)
+            except Exception as e:
+                print(f"⚠️ 结果库初始化失败: {e}")
+        
+        # 电化学实时显示: 默认为数据驱动的实时曲线；
+        # CHI660F 窗口截图为可选回退 (chi_screen_capture)，在后台线程中进行
+        self._echem_capture = None  # ChiCaptureThread
         self._echem_capturing = False
         
         self._create_menu_bar()
@@ -979,7 +1110,7 @@ class MainWindow(QMainWindow):
         self._create_central_widget()
         self._create_status_bar()
         
-        # EChem 连接状态轮询定时器 (每3秒检查 CHI660F 窗口是否存在)
+        # EChem 连接状态轮询定时器 (每3秒检查会话池中的 CHI 会话)
         self._chi_status_timer = QTimer(self)
         self._chi_status_timer.timeout.connect(self._poll_chi_status)
         self._chi_status_timer.start(3000)
@@ -1149,17 +1280,18 @@ class MainWindow(QMainWindow):
         log_group = QGroupBox(tr("run_log"))
         log_group.setFont(FONT_TITLE)
         log_layout = QVBoxLayout(log_group)
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setFont(FONT_NORMAL)
-        self.log_text.setStyleSheet("""
-            QTextEdit {
-                background-color: white;
-                color: black;
-                border: 1px solid #ccc;
-            }
-        """)
-        log_layout.addWidget(self.log_text)
+        # 环形缓冲 + 虚拟化列表，完整日志写入会话归档文件供历史搜索；ui_log_dir 为空时不归档
+        from datetime import datetime
+        from src.ui.widgets.log_view import LogView
+        archive_path = None
+        if self.config.ui_log_dir:
+            archive_path = Path(self.config.ui_log_dir) / f"ui_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        self.log_view = LogView(
+            capacity=self.config.ui_log_capacity,
+            archive_path=archive_path,
+        )
+        self.log_view.setFont(FONT_NORMAL)
+        log_layout.addWidget(self.log_view)
         right_layout.addWidget(log_group)
         
         top_splitter.addWidget(right_widget)
@@ -1302,12 +1434,11 @@ class MainWindow(QMainWindow):
     def _on_load_exp(self):
         """载入实验"""
         file_path, _ = QFileDialog.getOpenFileName(
-            self, tr("load_exp"), "./experiments", "JSON (*.json)"
+            self, tr("load_exp"), "./experiments", "JSON (*.json *.mhsnap)"
         )
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    self.single_experiment = Experiment.from_json_str(f.read())
+                self.single_experiment = Experiment.load(file_path)
                 self._refresh_step_list()
                 self.log_message(f"已载入实验: {file_path}", "info")
             except Exception as e:
@@ -1320,13 +1451,11 @@ class MainWindow(QMainWindow):
             return
         
         file_path, _ = QFileDialog.getSaveFileName(
-            self, tr("save_exp"), "./experiments", "JSON (*.json)"
+            self, tr("save_exp"), "./experiments", "JSON (*.json);;Snapshot (*.mhsnap)"
         )
         if file_path:
             try:
-                Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.single_experiment.to_json_str())
+                self.single_experiment.save(file_path, force=True)
                 self.log_message(f"实验已保存: {file_path}", "info")
             except Exception as e:
                 QMessageBox.critical(self, tr("error"), f"Save failed: {e}")
@@ -1408,9 +1537,10 @@ class MainWindow(QMainWindow):
             return
         
         self._refresh_step_list()
+        plan = self._run_plan = self.runner.get_execution_plan(self.single_experiment)
         self.runner.run_experiment(self.single_experiment)
         self.status_exp.setText(tr("status_running"))
-        self.log_message("开始运行单次实验...", "info")
+        self.log_message(f"开始运行单次实验... (预计耗时 {format_duration(plan.total_seconds)})", "info")
     
     def _on_run_combo(self):
         """运行组合实验"""
@@ -1422,8 +1552,20 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, tr("warning"), tr("no_steps_warning"))
             return
         
-        # --- 运行前预检查（用基础实验做检查） ---
-        errors = self.runner.pre_check_experiment(self.single_experiment)
+        # --- 运行前预检查（一次性检查全部组合） ---
+        self._combo_applier = ComboApplier(self.single_experiment, self._combo_keys())
+        for key in self._combo_applier.unknown_keys:
+            self.log_message(f"  ⚠ 无法识别的组合参数: {key}", "warning")
+        failures = self.runner.pre_check_combos(
+            self.single_experiment, self._combo_applier.columns(self.combo_params)
+        )
+        # 所有组合共有的错误只显示一次
+        common = []
+        if len(failures) == len(self.combo_params):
+            common = [e for e in failures[0] if all(e in errs for errs in failures.values())]
+        errors = list(common)
+        for combo_index, combo_errors in failures.items():
+            errors.extend(f"组合 {combo_index + 1}: {e}" for e in combo_errors if e not in common)
         if errors:
             error_text = "\n".join(f"• {e}" for e in errors)
             QMessageBox.critical(
@@ -1457,70 +1599,24 @@ class MainWindow(QMainWindow):
         params = self.combo_params[combo_index]
         self.log_message(f"应用组合 {combo_index + 1} 参数: {params}", "info")
         
-        # 将参数应用到实验步骤
-        import copy
-        experiment_copy = copy.deepcopy(self.single_experiment)
-        
-        for param_key, param_value in params.items():
-            # param_key 格式: "步骤序号:参数名" 或 "步骤序号:溶液/参数名"
-            if ':' in param_key:
-                parts = param_key.split(':', 1)
-                step_idx = int(parts[0]) - 1
-                param_name = parts[1]
-                
-                if 0 <= step_idx < len(experiment_copy.steps):
-                    step = experiment_copy.steps[step_idx]
-                    self._apply_param_to_step(step, param_name, param_value)
+        # 组合变体 = 基础实验 + 覆盖字段，只复制被覆盖的路径 (写时复制)
+        if self._combo_applier is None:
+            self._combo_applier = ComboApplier(self.single_experiment, self._combo_keys())
+        variant = self._combo_applier.variant(self.single_experiment, params)
         
         # 运行实验
-        self.runner.run_experiment(experiment_copy)
+        experiment = variant.materialize()
+        self._run_plan = self.runner.get_execution_plan(experiment)
+        self.runner.run_experiment(experiment, combo_index, params)
         self.status_exp.setText(f"状态: 运行中 (组合 {combo_index + 1}/{self.total_combo_count})")
     
-    def _apply_param_to_step(self, step, param_name: str, param_value: float):
-        """将参数值应用到步骤
-        
-        Args:
-            step: 步骤对象
-            param_name: 参数名
-            param_value: 参数值
-        """
-        from src.models import ProgramStepType
-        
-        # 根据步骤类型和参数名设置值
-        if step.step_type == ProgramStepType.TRANSFER:
-            if param_name == "转速(RPM)":
-                step.pump_rpm = int(param_value)
-            elif param_name == "持续时间(s)":
-                step.transfer_duration = param_value
-        elif step.step_type == ProgramStepType.FLUSH:
-            if param_name == "转速(RPM)":
-                step.flush_rpm = int(param_value)
-            elif param_name == "单次时长(s)":
-                step.flush_cycle_duration_s = param_value
-            elif param_name == "循环次数":
-                step.flush_cycles = int(param_value)
-        elif step.step_type == ProgramStepType.EVACUATE:
-            if param_name == "转速(RPM)":
-                step.pump_rpm = int(param_value)
-            elif param_name == "单次时长(s)":
-                step.transfer_duration = param_value
-            elif param_name == "循环次数":
-                step.flush_cycles = int(param_value)
-        elif step.step_type == ProgramStepType.ECHEM:
-            if step.ec_settings:
-                if param_name == "扫描速率":
-                    step.ec_settings.scan_rate = param_value
-                elif param_name == "初始电位":
-                    step.ec_settings.e0 = param_value
-                elif param_name == "上限电位":
-                    step.ec_settings.eh = param_value
-                elif param_name == "下限电位":
-                    step.ec_settings.el = param_value
-                elif param_name == "运行时间":
-                    step.ec_settings.run_time_s = param_value
-        elif step.step_type == ProgramStepType.BLANK:
-            if param_name == "持续时间(s)":
-                step.duration_s = param_value
+    def _combo_keys(self) -> list:
+        """组合参数键 (按首次出现顺序去重)"""
+        keys = {}
+        for combo in self.combo_params:
+            for key in combo:
+                keys.setdefault(key, None)
+        return list(keys)
     
     def _on_stop(self):
         """停止实验 - 设标志 + 立即停止所有硬件泵"""
@@ -1598,6 +1694,7 @@ class MainWindow(QMainWindow):
     def _on_combo_saved(self, combo_params: list):
         """组合实验保存回调"""
         self.combo_params = combo_params
+        self._combo_applier = None
         self.total_combo_count = len(combo_params)
         self.process_widget.set_combo_progress(1, self.total_combo_count)
         self.log_message(f"已生成 {len(combo_params)} 组组合实验", "info")
@@ -1697,25 +1794,8 @@ class MainWindow(QMainWindow):
         return ""
     
     def log_message(self, msg: str, msg_type: str = "info"):
-        """添加日志 - 不同类型不同颜色"""
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # 根据类型设置颜色
-        color_map = {
-            "info": "#000000",      # 黑色
-            "success": "#4CAF50",   # 绿色
-            "warning": "#FF9800",   # 橙色
-            "error": "#f44336",     # 红色
-            "transfer": "#2196F3",  # 蓝色 - 移液
-            "prep_sol": "#4CAF50",  # 绿色 - 配液
-            "flush": "#FF9800",     # 橙色 - 冲洗
-            "echem": "#9C27B0",     # 紫色 - 电化学
-            "blank": "#607D8B",     # 灰色 - 空白
-        }
-        color = color_map.get(msg_type, "#000000")
-        
-        self.log_text.append(f'<span style="color:{color};">[{timestamp}] {msg}</span>')
+        """添加日志 - 不同类型不同颜色 (环形缓冲，定时合并显示)"""
+        self.log_view.append(msg, msg_type)
     
     @Slot(str)
     def _on_log_message(self, msg: str):
@@ -1743,7 +1823,10 @@ class MainWindow(QMainWindow):
             type_name = names.get(step.step_type, str(step.step_type))
             detail = self._get_step_detail(step)
             msg_type = step.step_type.value if hasattr(step.step_type, 'value') else "info"
-            self.log_message(f"▶ 步骤 {index+1} 开始: [{type_name}] {detail or step_id}", msg_type)
+            eta = format_duration(self._run_plan.remaining_from(index)) if self._run_plan else "--"
+            self.log_message(
+                f"▶ 步骤 {index+1} 开始: [{type_name}] {detail or step_id} (预计剩余 {eta})", msg_type
+            )
             
             # 电化学步骤 - 更新工作站显示状态 + 启动实时截图
             if step.step_type == ProgramStepType.ECHEM and step.ec_settings:
@@ -1753,8 +1836,8 @@ class MainWindow(QMainWindow):
                 self.process_widget.set_ws_measurement_status(
                     tr("ws_measuring", tech=tv.upper())
                 )
-                # 启动 CHI 窗口实时截图 (每1秒捕获一次)
-                self._start_echem_capture()
+                # 启动实时曲线 (及可选的 CHI 窗口截图)
+                self._start_echem_capture(tv)
             
             # 更新泵指示灯 - 当前步骤绿色
             self._update_pump_indicators(step, running=True)
@@ -1843,7 +1926,7 @@ class MainWindow(QMainWindow):
             detail = f" [{type_name}]"
             # 关闭当前步骤的指示灯
             self._update_pump_indicators(step, running=False)
-            # 电化学步骤完成 - 停止实时截图
+            # 电化学步骤完成 - 停止实时显示
             if step.step_type == ProgramStepType.ECHEM:
                 self._stop_echem_capture()
         
@@ -1873,7 +1956,7 @@ class MainWindow(QMainWindow):
     @Slot(bool)
     def _on_experiment_finished(self, success: bool):
         """实验完成"""
-        # 确保停止 CHI 截图
+        # 确保停止实时显示 / CHI 截图
         self._stop_echem_capture()
         
         status = tr("exp_done_ok") if success else tr("exp_done_fail")
@@ -1890,52 +1973,70 @@ class MainWindow(QMainWindow):
         for i in range(self.step_list.count()):
             self.step_list.item(i).setBackground(QColor(Qt.transparent))
 
-    # ── 电化学实时截图 ──────────────────────────────────
+    # ── 电化学实时显示 ──────────────────────────────────
     
-    def _start_echem_capture(self):
-        """启动 CHI660F 窗口实时截图，每1秒捕获一次"""
-        if not self._echem_capturing:
-            self._echem_capturing = True
-            self._echem_capture_timer.start(1000)  # 每1秒
-            print("[MainWindow] EChem 实时截图已启动")
-    
-    def _stop_echem_capture(self):
-        """停止 CHI660F 窗口实时截图"""
+    def _start_echem_capture(self, technique: str = ""):
+        """启动实时曲线；配置开启 chi_screen_capture 时另起后台截图线程"""
         if self._echem_capturing:
-            self._echem_capture_timer.stop()
-            self._echem_capturing = False
-            print("[MainWindow] EChem 实时截图已停止")
+            return
+        self._echem_capturing = True
+        self.process_widget.start_live(technique)
+        if self.config.chi_screen_capture:
+            from src.ui.widgets.chi_capture import ChiCaptureThread
+            self._echem_capture = ChiCaptureThread(parent=self)
+            self._echem_capture.frame_ready.connect(self._on_chi_frame)
+            self._echem_capture.start()
+            print("[MainWindow] EChem 后台截图已启动")
     
-    def _capture_chi_window(self):
-        """定时回调: 捕获 CHI660F 窗口画面并显示在工作站区域"""
-        try:
-            from src.utils.window_capture import capture_chi_to_qpixmap
-            pixmap = capture_chi_to_qpixmap()
-            if pixmap and not pixmap.isNull():
-                self.process_widget._echem_pixmap = pixmap
-                self.process_widget.update()
-        except Exception as e:
-            # 捕获失败时静默处理，不影响测量
-            pass
+    def _stop_echem_capture(self):
+        """停止实时曲线刷新与后台截图"""
+        if not self._echem_capturing:
+            return
+        self._echem_capturing = False
+        self.process_widget.stop_live()
+        if self._echem_capture is not None:
+            self._echem_capture.stop()
+            self._echem_capture = None
+            print("[MainWindow] EChem 后台截图已停止")
+    
+    @Slot(str, object)
+    def _on_echem_data(self, technique: str, block):
+        """实时数据块 → 工作站区域曲线"""
+        self.process_widget.append_live(technique, block)
+    
+    @Slot(QImage)
+    def _on_chi_frame(self, image):
+        """后台截图线程送回的 CHI660F 窗口画面"""
+        if self._echem_capturing and not image.isNull():
+            self.process_widget.set_capture_frame(QPixmap.fromImage(image))
 
     def _poll_chi_status(self):
-        """定时轮询: 检测 CHI660F 窗口是否存在，更新状态栏"""
+        """定时轮询: 检测 CHI 连接状态，更新状态栏
+        
+        优先查询会话池中的常驻会话 (单个窗口句柄)；池中无会话时
+        (如 CHI 由用户手动打开) 回退为查找 CHI660F 窗口。
+        """
         try:
-            from src.utils.window_capture import find_chi_window
-            hwnd = find_chi_window()
-            if hwnd:
-                self.status_chi.setText("电化学仪: ✅ 已连接")
-                self.status_chi.setStyleSheet("color: #2E7D32;")
-            else:
-                self.status_chi.setText("电化学仪: 未连接")
-                self.status_chi.setStyleSheet("color: #757575;")
+            from src.echem_sdl.hardware.chi_session import get_session_pool
+            connected = get_session_pool().connected_count() > 0
         except Exception:
+            connected = False
+        if not connected:
+            try:
+                from src.utils.window_capture import find_chi_window
+                connected = bool(find_chi_window())
+            except Exception:
+                connected = False
+        if connected:
+            self.status_chi.setText("电化学仪: ✅ 已连接")
+            self.status_chi.setStyleSheet("color: #2E7D32;")
+        else:
             self.status_chi.setText("电化学仪: 未连接")
             self.status_chi.setStyleSheet("color: #757575;")
 
-    def _on_echem_result(self, technique: str, data_points: list, headers: list):
+    def _on_echem_result(self, technique: str, data_points, headers: list):
         """接收电化学测量结果，在实验过程区域显示图像"""
-        # 停止实时截图，切换为最终结果图
+        # 停止实时显示，切换为最终结果
         self._stop_echem_capture()
         self.process_widget.set_echem_result(technique, data_points, headers)
 
@@ -1944,10 +2045,8 @@ class MainWindow(QMainWindow):
         if not self.single_experiment:
             return
         try:
-            last_exp_file = Path("./config/last_experiment.json")
-            last_exp_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(last_exp_file, 'w', encoding='utf-8') as f:
-                f.write(self.single_experiment.to_json_str())
+            # 原子写入；内容与上次保存相同时 (如关闭窗口时未再修改) 跳过
+            self.single_experiment.save(Path("./config/last_experiment.json"))
         except Exception as e:
             print(f"⚠️ 保存上次实验失败: {e}")
     
@@ -1972,6 +2071,9 @@ class MainWindow(QMainWindow):
         # 停止轮询定时器
         if hasattr(self, '_chi_status_timer'):
             self._chi_status_timer.stop()
+        self._stop_echem_capture()
+        # 等待后台结果图渲染结束，避免线程池随窗口销毁时仍在运行
+        self.process_widget.wait_render()
         
         # 保存当前实验
         self._save_last_experiment()
@@ -1984,6 +2086,19 @@ class MainWindow(QMainWindow):
                 print("✅ 已自动断开RS485连接")
         except Exception as e:
             print(f"⚠️ 关闭RS485时出错: {e}")
+        
+        # 关闭跨实验常驻的 CHI 660F 会话
+        try:
+            from src.echem_sdl.hardware.chi_session import get_session_pool
+            get_session_pool().close()
+        except Exception as e:
+            print(f"⚠️ 关闭CHI 660F时出错: {e}")
+        
+        if self._telemetry is not None:
+            self._telemetry.close()
+        if self._result_store is not None:
+            self._result_store.close()
+        self.log_view.close_archive()
         super().closeEvent(event)
     
     def update_rs485_status(self):
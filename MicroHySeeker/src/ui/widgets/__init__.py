@@ -1 +1,11 @@
 """UI widgets module."""
+
+from .live_echem_plot import LiveEchemPlot
+from .chi_capture import ChiCaptureThread
+from .log_view import LogView
+
+__all__ = [
+    "LiveEchemPlot",
+    "ChiCaptureThread",
+    "LogView",
+]
@@ -0,0 +1,48 @@
+"""
+CHI 660F 窗口后台截图 (可选回退)
+
+默认关闭；配置 chi_screen_capture = True 时在电化学测量期间启用。
+截图 (EnumWindows + PrintWindow/BitBlt) 在独立线程中进行，
+结果以 QImage 通过 frame_ready 信号送回 GUI 线程。
+"""
+
+import threading
+
+from PySide6.QtCore import QThread, Signal
+from PySide6.QtGui import QImage
+
+# 截图周期 (秒)
+CAPTURE_INTERVAL = 1.0
+
+
+class ChiCaptureThread(QThread):
+    """周期性捕获 CHI660F 窗口画面"""
+
+    frame_ready = Signal(QImage)
+
+    def __init__(self, interval: float = CAPTURE_INTERVAL, parent=None):
+        super().__init__(parent)
+        self._interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            from src.utils.window_capture import capture_chi_to_qimage
+        except Exception as e:
+            # 非 Windows 平台无 Win32 截图
+            print(f"[ChiCapture] 截图不可用: {e}")
+            return
+
+        while not self._stop_event.is_set():
+            try:
+                image = capture_chi_to_qimage()
+            except Exception:
+                image = None
+            if image is not None:
+                self.frame_ready.emit(image)
+            self._stop_event.wait(self._interval)
+
+    def stop(self, timeout_ms: int = 2000):
+        """请求停止并等待线程退出"""
+        self._stop_event.set()
+        self.wait(timeout_ms)
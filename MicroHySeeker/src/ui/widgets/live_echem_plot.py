@@ -0,0 +1,93 @@
+"""
+实时电化学曲线 - 环形缓冲 + pyqtgraph
+
+数据由运行引擎的 echem_data 信号按块送入 (time, potential, current)，
+append() 只写入环形缓冲并置脏标记；绘制由定时器按固定帧率合并进行，
+每帧按绘图区宽度做 min/max 抽点，长时间测量也不会拖慢 GUI 线程。
+"""
+
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import QTimer
+
+from src.utils.plot_buffer import RingBuffer, decimate_minmax
+from src.utils.plot_styles import plot_style
+
+# 环形缓冲容量 (点)，超出后丢弃最旧的数据
+DEFAULT_CAPACITY = 200_000
+# 刷新周期 (ms)
+REFRESH_INTERVAL_MS = 100
+
+# 未知技术: 按 i-t 显示
+_DEFAULT_AXES = (0, 2, 1.0, "t / s", "I / A", "", "#D32F2F")
+
+
+class LiveEchemPlot(pg.PlotWidget):
+    """测量过程中的实时曲线"""
+
+    def __init__(self, parent=None, capacity: int = DEFAULT_CAPACITY):
+        super().__init__(parent, background="w")
+        self._buffer = RingBuffer(capacity, 3)
+        self._technique = ""
+        self._axes = _DEFAULT_AXES
+        self._dirty = False
+
+        self.showGrid(x=True, y=True, alpha=0.3)
+        self._curve = self.plot(pen=pg.mkPen("#D32F2F", width=1.5))
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def technique(self) -> str:
+        return self._technique
+
+    def start(self, technique: str):
+        """开始新的测量: 清空缓冲，按技术设置坐标轴，启动刷新定时器"""
+        self._technique = technique.upper()
+        self._axes = plot_style(self._technique) or _DEFAULT_AXES
+        _, _, _, x_label, y_label, title, color = self._axes
+        self._curve.setPen(pg.mkPen(color, width=1.5))
+        self._buffer.clear()
+        self._curve.setData([], [])
+        self._dirty = False
+        self.setLabel("bottom", x_label)
+        self.setLabel("left", y_label)
+        self.setTitle(title or self._technique)
+        self._timer.start(REFRESH_INTERVAL_MS)
+
+    def append(self, block):
+        """追加数据块 (k, 3)；不立即重绘"""
+        self._buffer.extend(block)
+        self._dirty = True
+
+    def set_data(self, technique: str, data):
+        """显示完整数据 (测量结束后的最终结果)"""
+        self.start(technique)
+        self._timer.stop()
+        self.append(data)
+        self.refresh()
+
+    def stop(self):
+        """停止定时刷新 (保留当前曲线)"""
+        self._timer.stop()
+        self.refresh()
+
+    def refresh(self):
+        """定时回调: 有新数据时抽点并重绘"""
+        if not self._dirty or not self.isVisible():
+            return
+        self._dirty = False
+        data = self._buffer.view()
+        xi, yi, sign, *_ = self._axes
+        x = data[:, xi]
+        y = data[:, yi] * sign if sign != 1.0 else data[:, yi]
+        x, y = decimate_minmax(x, y, max(400, 2 * self.width()))
+        self._curve.setData(np.ascontiguousarray(x), np.ascontiguousarray(y))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
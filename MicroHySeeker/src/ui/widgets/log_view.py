@@ -0,0 +1,287 @@
+"""
+运行日志视图 - 环形缓冲 + 虚拟化列表 + 磁盘归档搜索
+
+append() 只写入环形缓冲与归档文件缓冲，并把条目放入待显示队列；
+定时器按固定间隔把一批条目增量插入模型 (超出容量时从头部移除)。
+QListView 使用统一行高，只绘制可见行，运行 24 h 以上也不会拖慢 GUI 线程。
+
+级别下拉框与筛选框作用于内存中的最近日志；回车或“搜索历史”
+在后台线程中检索整个会话的归档文件 (见 src.utils.log_buffer.LogArchive)。
+"""
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QThread, QTimer, Signal
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (
+    QComboBox, QHBoxLayout, QLabel, QLineEdit, QListView, QPushButton, QVBoxLayout, QWidget,
+)
+
+from src.utils.log_buffer import ERROR, INFO, WARNING, LogArchive, LogEntry, LogRing
+
+# 内存中保留的日志条数
+DEFAULT_CAPACITY = 20_000
+# 刷新周期 (ms)
+REFRESH_INTERVAL_MS = 100
+# 历史搜索返回条数上限
+HISTORY_LIMIT = 2000
+
+# 消息类型颜色
+LOG_COLORS = {
+    "info": "#000000",      # 黑色
+    "success": "#4CAF50",   # 绿色
+    "warning": "#FF9800",   # 橙色
+    "error": "#f44336",     # 红色
+    "transfer": "#2196F3",  # 蓝色 - 移液
+    "prep_sol": "#4CAF50",  # 绿色 - 配液
+    "flush": "#FF9800",     # 橙色 - 冲洗
+    "echem": "#9C27B0",     # 紫色 - 电化学
+    "blank": "#607D8B",     # 灰色 - 空白
+}
+
+_LEVEL_CHOICES = [("全部", INFO), ("警告及以上", WARNING), ("仅错误", ERROR)]
+
+
+class LogListModel(QAbstractListModel):
+    """定长日志列表模型"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, parent=None):
+        super().__init__(parent)
+        self._rows: deque = deque(maxlen=capacity)
+        self._colors = {kind: QColor(color) for kind, color in LOG_COLORS.items()}
+        self._default_color = QColor("#000000")
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        entry = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"[{entry.time}] {entry.text}"
+        if role == Qt.ForegroundRole:
+            return self._colors.get(entry.kind, self._default_color)
+        return None
+
+    def entry(self, row: int) -> LogEntry:
+        return self._rows[row]
+
+    def append_rows(self, entries: List[LogEntry]) -> None:
+        """增量追加；超出容量时先移除最旧的行"""
+        if not entries:
+            return
+        capacity = self._rows.maxlen
+        if len(entries) >= capacity:
+            self.set_rows(entries)
+            return
+        overflow = len(self._rows) + len(entries) - capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._rows.popleft()
+            self.endRemoveRows()
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self._rows.extend(entries)
+        self.endInsertRows()
+
+    def set_rows(self, entries: List[LogEntry]) -> None:
+        self.beginResetModel()
+        self._rows.clear()
+        self._rows.extend(entries[-self._rows.maxlen:])
+        self.endResetModel()
+
+
+class _SearchThread(QThread):
+    """后台检索归档文件"""
+
+    done = Signal(list)
+
+    def __init__(self, archive: LogArchive, text: str, min_level: int, parent=None):
+        super().__init__(parent)
+        self._archive = archive
+        self._text = text
+        self._min_level = min_level
+
+    def run(self):
+        try:
+            results = self._archive.search(self._text, self._min_level, HISTORY_LIMIT)
+        except Exception:
+            results = []
+        self.done.emit(results)
+
+
+class LogView(QWidget):
+    """运行日志面板"""
+
+    search_finished = Signal(int)   # 历史搜索命中条数
+
+    def __init__(self, parent=None, capacity: int = DEFAULT_CAPACITY,
+                 archive_path: Optional[Path] = None):
+        super().__init__(parent)
+        self._ring = LogRing(capacity)
+        self._archive: Optional[LogArchive] = None
+        if archive_path:
+            try:
+                self._archive = LogArchive(Path(archive_path))
+            except OSError as e:
+                print(f"⚠️ 日志归档文件创建失败: {e}")
+        self._pending: List[LogEntry] = []
+        self._seq = 0
+        self._history = False
+        self._search: Optional[_SearchThread] = None
+
+        self.model = LogListModel(capacity, self)
+
+        self.level_combo = QComboBox()
+        for label, level in _LEVEL_CHOICES:
+            self.level_combo.addItem(label, level)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("筛选 (回车搜索历史)")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.btn_history = QPushButton("搜索历史")
+        self.btn_history.setEnabled(self._archive is not None)
+        self.btn_live = QPushButton("返回实时")
+        self.btn_live.setVisible(False)
+        self.status_label = QLabel("")
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setWordWrap(False)
+        self.list_view.setEditTriggers(QListView.NoEditTriggers)
+        self.list_view.setSelectionMode(QListView.ExtendedSelection)
+        self.list_view.setStyleSheet("""
+            QListView {
+                background-color: white;
+                color: black;
+                border: 1px solid #ccc;
+            }
+        """)
+
+        bar = QHBoxLayout()
+        bar.addWidget(self.level_combo)
+        bar.addWidget(self.filter_edit, stretch=1)
+        bar.addWidget(self.btn_history)
+        bar.addWidget(self.btn_live)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(bar)
+        layout.addWidget(self.list_view)
+        layout.addWidget(self.status_label)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(200)
+        self._filter_timer.timeout.connect(self.show_live)
+
+        self.level_combo.currentIndexChanged.connect(self.show_live)
+        self.filter_edit.textChanged.connect(self._filter_timer.start)
+        self.filter_edit.returnPressed.connect(self.search_history)
+        self.btn_history.clicked.connect(self.search_history)
+        self.btn_live.clicked.connect(self.show_live)
+
+    # ========================
+    # 属性
+    # ========================
+
+    @property
+    def ring(self) -> LogRing:
+        return self._ring
+
+    @property
+    def archive(self) -> Optional[LogArchive]:
+        return self._archive
+
+    @property
+    def min_level(self) -> int:
+        return self.level_combo.currentData()
+
+    @property
+    def in_history(self) -> bool:
+        return self._history
+
+    # ========================
+    # 追加与刷新
+    # ========================
+
+    def append(self, msg: str, msg_type: str = "info") -> None:
+        """追加一条日志 (仅入缓冲，由定时器合并显示)"""
+        self._seq += 1
+        entry = LogEntry(self._seq, datetime.now().strftime("%H:%M:%S"), msg_type, msg)
+        self._ring.append(entry)
+        self._pending.append(entry)
+        if self._archive is not None:
+            self._archive.append(entry)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def refresh(self) -> None:
+        """把待显示的条目一次性插入模型"""
+        self._timer.stop()
+        if not self._pending:
+            return
+        entries, self._pending = self._pending, []
+        if self._archive is not None:
+            self._archive.flush()
+        if self._history:
+            return
+        needle = self.filter_edit.text().lower()
+        level = self.min_level
+        visible = [e for e in entries if e.matches(level, needle)]
+        if not visible:
+            return
+        scrollbar = self.list_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        self.model.append_rows(visible)
+        if at_bottom:
+            self.list_view.scrollToBottom()
+
+    def show_live(self) -> None:
+        """按当前级别与筛选条件显示内存中的最近日志"""
+        self._pending.clear()
+        self._history = False
+        self.btn_live.setVisible(False)
+        self.status_label.setText("")
+        self.model.set_rows(self._ring.filtered(self.min_level, self.filter_edit.text()))
+        self.list_view.scrollToBottom()
+
+    def search_history(self) -> None:
+        """在后台线程中检索整个会话的归档"""
+        if self._archive is None or (self._search is not None and self._search.isRunning()):
+            return
+        self._filter_timer.stop()
+        self.refresh()
+        self.status_label.setText("正在搜索历史日志...")
+        self._search = _SearchThread(self._archive, self.filter_edit.text(), self.min_level, self)
+        self._search.done.connect(self._on_search_done)
+        self._search.start()
+
+    def _on_search_done(self, results: list) -> None:
+        self._history = True
+        self.btn_live.setVisible(True)
+        self.model.set_rows(results)
+        self.list_view.scrollToBottom()
+        suffix = f" (仅显示最近 {HISTORY_LIMIT} 条)" if len(results) >= HISTORY_LIMIT else ""
+        self.status_label.setText(f"历史日志: {len(results)} 条匹配{suffix}")
+        self.search_finished.emit(len(results))
+
+    def clear(self) -> None:
+        self._ring.clear()
+        self._pending.clear()
+        self.model.set_rows([])
+
+    def close_archive(self) -> None:
+        """关闭归档文件 (窗口关闭时调用)"""
+        self._timer.stop()
+        if self._search is not None:
+            self._search.wait(2000)
+        if self._archive is not None:
+            self._archive.close()
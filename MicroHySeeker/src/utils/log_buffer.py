@@ -0,0 +1,210 @@
+"""
+界面日志缓冲 - 定长环形缓冲 + 磁盘归档索引
+
+长时间运行 (24 h 以上) 时:
+- LogRing 只保留最近 capacity 条日志，界面内存与刷新开销固定
+- LogArchive 把每条日志追加写入会话文件，并按块 (stride 条) 记录
+  (文件偏移, 起始序号, 级别位图) 的稀疏索引；历史搜索只读取
+  包含目标级别的块，已被环形缓冲丢弃的日志仍可检索
+
+纯 Python 实现，不依赖 Qt，可在工作线程中执行搜索。
+"""
+
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+# 日志级别 (与 logging 数值一致)
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+# 消息类型 → 级别；未列出的类型 (success / 各步骤类型) 视为 INFO
+_TYPE_LEVELS = {"warning": WARNING, "error": ERROR}
+_LEVEL_BITS = {INFO: 1, WARNING: 2, ERROR: 4}
+
+
+def level_of(msg_type: str) -> int:
+    """消息类型对应的级别"""
+    return _TYPE_LEVELS.get(msg_type, INFO)
+
+
+def _mask_from(min_level: int) -> int:
+    return sum(bit for level, bit in _LEVEL_BITS.items() if level >= min_level)
+
+
+class LogEntry(NamedTuple):
+    """一条界面日志"""
+    seq: int
+    time: str       # HH:MM:SS
+    kind: str       # 消息类型 (info/success/warning/error/步骤类型)，决定颜色
+    text: str
+
+    @property
+    def level(self) -> int:
+        return level_of(self.kind)
+
+    def matches(self, min_level: int = INFO, needle: str = "") -> bool:
+        """级别不低于 min_level 且包含 needle (不区分大小写，needle 需已转小写)"""
+        return self.level >= min_level and (not needle or needle in self.text.lower())
+
+
+class LogRing:
+    """定长日志环形缓冲，超出容量时丢弃最旧的条目"""
+
+    def __init__(self, capacity: int = 20_000):
+        if capacity <= 0:
+            raise ValueError("capacity 必须为正数")
+        self._entries: deque = deque(maxlen=capacity)
+        self._total = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._entries.maxlen
+
+    @property
+    def total(self) -> int:
+        """累计追加的条数 (含已丢弃的)"""
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[LogEntry]:
+        return iter(self._entries)
+
+    def append(self, entry: LogEntry) -> None:
+        self._entries.append(entry)
+        self._total += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def filtered(self, min_level: int = INFO, text: str = "") -> List[LogEntry]:
+        needle = text.lower()
+        return [e for e in self._entries if e.matches(min_level, needle)]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "")
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    out, i = [], 0
+    while i < len(text):
+        c = text[i]
+        if c == "\\" and i + 1 < len(text):
+            nxt = text[i + 1]
+            out.append({"t": "\t", "n": "\n"}.get(nxt, nxt))
+            i += 2
+        else:
+            out.append(c)
+            i += 1
+    return "".join(out)
+
+
+class LogArchive:
+    """日志会话文件 + 稀疏块索引
+
+    文件每行: ``seq<TAB>time<TAB>kind<TAB>text`` (text 中的换行/制表符已转义)。
+    写入经缓冲，由调用方定期 flush；search() 可在其它线程中调用。
+    """
+
+    def __init__(self, path: Path, stride: int = 512):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._stride = max(1, int(stride))
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._count = 0
+        # 块索引: [文件偏移, 起始序号, 级别位图]
+        self._blocks: List[list] = []
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def block_count(self) -> int:
+        return len(self._blocks)
+
+    def append(self, entry: LogEntry) -> None:
+        line = f"{entry.seq}\t{entry.time}\t{entry.kind}\t{_escape(entry.text)}\n".encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                return
+            if self._count % self._stride == 0:
+                self._blocks.append([self._offset, entry.seq, 0])
+            self._blocks[-1][2] |= _LEVEL_BITS[entry.level]
+            self._file.write(line)
+            self._offset += len(line)
+            self._count += 1
+
+    def extend(self, entries: Iterable[LogEntry]) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def search(self, text: str = "", min_level: int = INFO, limit: int = 1000,
+               before_seq: Optional[int] = None) -> List[LogEntry]:
+        """检索归档，返回最新的 limit 条匹配 (按时间顺序)
+
+        Args:
+            text: 子串 (不区分大小写)，为空时只按级别过滤
+            min_level: 最低级别
+            limit: 返回条数上限
+            before_seq: 只检索序号小于该值的日志
+        """
+        self.flush()
+        with self._lock:
+            blocks = [list(b) for b in self._blocks]
+            end = self._offset
+        mask = _mask_from(min_level)
+        needle = text.lower()
+        # 从最新的块向前读，凑够 limit 条即停止
+        found: List[List[LogEntry]] = []
+        total = 0
+        with open(self.path, "rb") as f:
+            for k in range(len(blocks) - 1, -1, -1):
+                offset, first_seq, bits = blocks[k]
+                if not bits & mask:
+                    continue
+                if before_seq is not None and first_seq >= before_seq:
+                    continue
+                stop = blocks[k + 1][0] if k + 1 < len(blocks) else end
+                f.seek(offset)
+                chunk = f.read(stop - offset).decode("utf-8", errors="replace")
+                matches = []
+                for line in chunk.split("\n"):
+                    parts = line.split("\t", 3)
+                    if len(parts) != 4:
+                        continue
+                    seq, time_, kind, raw = parts
+                    if before_seq is not None and int(seq) >= before_seq:
+                        break
+                    if level_of(kind) < min_level:
+                        continue
+                    message = _unescape(raw)
+                    if needle and needle not in message.lower():
+                        continue
+                    matches.append(LogEntry(int(seq), time_, kind, message))
+                found.append(matches)
+                total += len(matches)
+                if total >= limit:
+                    break
+        result = [entry for matches in reversed(found) for entry in matches]
+        return result[-limit:] if limit > 0 else []
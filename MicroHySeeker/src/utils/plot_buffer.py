@@ -0,0 +1,118 @@
+"""
+实时曲线数据缓冲 - 定长环形缓冲 + min/max 抽点
+
+长时间测量 (数小时 i-t / OCPT) 时:
+- RingBuffer 只保留最近 capacity 行，内存固定，追加与读取都不随总点数增长
+- decimate_minmax 按索引分箱，每箱保留最小/最大值点，
+  点数压到屏幕像素量级的同时保留尖峰形状
+
+纯 numpy 实现，不依赖 Qt，可在工作线程中使用。
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+class RingBuffer:
+    """定长二维环形缓冲 (capacity, ncols)
+
+    内部按 2 × capacity 存储、每行写两份，
+    使任意时刻的有效窗口都是一段连续内存，view() 无需拷贝。
+    """
+
+    def __init__(self, capacity: int, ncols: int = 3, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity 必须为正数")
+        self._capacity = int(capacity)
+        self._buf = np.zeros((2 * self._capacity, ncols), dtype=dtype)
+        self._head = 0      # 下一行写入位置 (0..capacity-1)
+        self._size = 0
+        self._total = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def ncols(self) -> int:
+        return self._buf.shape[1]
+
+    @property
+    def total(self) -> int:
+        """累计追加的行数 (含已被覆盖的旧行)"""
+        return self._total
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+        self._total = 0
+
+    def extend(self, rows) -> None:
+        """追加一批行 (k, ncols)；超出容量时覆盖最旧的行"""
+        rows = np.asarray(rows, dtype=self._buf.dtype)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        k = len(rows)
+        if k == 0:
+            return
+        self._total += k
+        cap = self._capacity
+        if k > cap:
+            rows = rows[-cap:]
+            k = cap
+
+        first = min(k, cap - self._head)
+        for offset in (0, cap):
+            lo = self._head + offset
+            self._buf[lo:lo + first] = rows[:first]
+            if first < k:
+                self._buf[offset:offset + k - first] = rows[first:]
+        self._head = (self._head + k) % cap
+        self._size = min(cap, self._size + k)
+
+    def view(self) -> np.ndarray:
+        """按时间顺序的有效数据 (只读视图，零拷贝)"""
+        start = (self._head - self._size) % self._capacity
+        out = self._buf[start:start + self._size]
+        out.flags.writeable = False
+        return out
+
+
+def decimate_minmax(x: np.ndarray, y: np.ndarray,
+                    max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """按索引分箱的 min/max 抽点
+
+    每箱保留 y 最小与最大的两个点，并按原顺序输出，
+    因此对非单调的 x (CV 的 E-I 曲线) 同样适用。
+
+    Args:
+        x, y: 等长一维数组
+        max_points: 输出点数上限 (通常取绘图区宽度像素数的 2 倍)
+
+    Returns:
+        (x, y) 抽点后的数组；点数不超过 max_points 时原样返回
+    """
+    n = len(y)
+    if n <= max_points or max_points < 4:
+        return x, y
+
+    bins = max_points // 2
+    k = -(-n // bins)               # 每箱点数 (向上取整)
+    nb = n // k
+    head = np.asarray(y[:nb * k]).reshape(nb, k)
+    base = np.arange(nb) * k
+    imin = head.argmin(axis=1) + base
+    imax = head.argmax(axis=1) + base
+    idx = np.column_stack((np.minimum(imin, imax), np.maximum(imin, imax))).ravel()
+
+    if nb * k < n:
+        tail = np.asarray(y[nb * k:])
+        t0 = nb * k
+        lo, hi = t0 + int(tail.argmin()), t0 + int(tail.argmax())
+        idx = np.concatenate((idx, [min(lo, hi), max(lo, hi)]))
+
+    return x[idx], y[idx]
@@ -0,0 +1,25 @@
+"""
+电化学曲线的绘图版式 - 实时曲线与结果图共用
+
+数据统一为 ECDataSet 的 (time, potential, current) 三列；
+EIS 经 technique_columns 映射后为 (freq, Z', Z'')，Nyquist 图取第 1、2 列。
+"""
+
+from typing import Dict, Optional, Tuple
+
+# (x 列, y 列, y 符号, x 轴标签, y 轴标签, 标题, 线色)
+PlotStyle = Tuple[int, int, float, str, str, str, str]
+
+PLOT_STYLES: Dict[str, PlotStyle] = {
+    "CV":   (1, 2, 1.0, "E / V", "I / A", "Cyclic Voltammetry (CV)", "#D32F2F"),
+    "LSV":  (1, 2, 1.0, "E / V", "I / A", "Linear Sweep Voltammetry (LSV)", "#D32F2F"),
+    "I-T":  (0, 2, 1.0, "t / s", "I / A", "Amperometric i-t Curve", "#D32F2F"),
+    "IT":   (0, 2, 1.0, "t / s", "I / A", "Amperometric i-t Curve", "#D32F2F"),
+    "OCPT": (0, 1, 1.0, "t / s", "E / V", "Open Circuit Potential (OCPT)", "#1565C0"),
+    "EIS":  (1, 2, -1.0, "Z' / Ω", "-Z'' / Ω", "Nyquist Plot (EIS)", "#D32F2F"),
+}
+
+
+def plot_style(technique: str) -> Optional[PlotStyle]:
+    """按技术名 (不区分大小写) 取绘图版式，未知技术返回 None"""
+    return PLOT_STYLES.get(technique.upper())
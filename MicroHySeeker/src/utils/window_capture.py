@@ -1,8 +1,9 @@
 """
 CHI 660F 窗口截图捕捉工具
 
-在电化学测量期间，周期性捕获 chi660f.exe 窗口画面并转为 QPixmap，
-在主界面工作站区域实时显示 CHI 软件的测量图形。
+可选的回退显示: 主界面默认用实时数据曲线显示测量过程，
+开启 chi_screen_capture 后才由后台线程周期性捕获 chi660f.exe 窗口画面
+(QImage)，在工作站区域显示 CHI 软件自身的图形。
 
 使用 Win32 API (PrintWindow / BitBlt) 实现窗口内容捕获。
 支持捕获被遮挡的窗口，多种回退策略。
@@ -11,8 +12,11 @@ import ctypes
 import ctypes.wintypes as wintypes
 from typing import Optional, List, Tuple
 
-_user32 = ctypes.windll.user32
-_gdi32 = ctypes.windll.gdi32
+from src.echem_sdl.utils.win32 import LazyDLL, winfunctype
+
+# 首次调用 Win32 API 时才加载 DLL
+_user32 = LazyDLL("user32")
+_gdi32 = LazyDLL("gdi32")
 
 # Win32 常量
 SRCCOPY = 0x00CC0020
@@ -47,7 +51,7 @@ class BITMAPINFO(ctypes.Structure):
 
 def _enum_all_visible_windows() -> List[Tuple[int, str]]:
     """枚举所有可见窗口，返回 (hwnd, title) 列表"""
-    WNDENUMPROC = ctypes.WINFUNCTYPE(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
+    WNDENUMPROC = winfunctype(ctypes.c_bool, wintypes.HWND, wintypes.LPARAM)
     windows = []
     
     @WNDENUMPROC
@@ -172,19 +176,14 @@ def capture_window_to_bytes(hwnd: int) -> Optional[tuple]:
     return (width, height, bytes(buf))
 
 
-def _bgra_to_rgba(data: bytes, width: int, height: int) -> bytes:
-    """将 BGRA 字节序转为 RGBA (逐像素交换 B 和 R)"""
-    arr = bytearray(data)
-    for i in range(0, len(arr), 4):
-        arr[i], arr[i + 2] = arr[i + 2], arr[i]  # swap B <-> R
-    return bytes(arr)
+def capture_chi_to_qimage():
+    """捕获 CHI660F 窗口并转为 QImage
 
+    QImage 可在工作线程中创建，供后台截图线程使用
+    (QPixmap 只能在 GUI 线程创建)。
 
-def capture_chi_to_qpixmap():
-    """捕获 CHI660F 窗口并转为 QPixmap
-    
     Returns:
-        QPixmap 或 None
+        QImage 或 None
     """
     hwnd = find_chi_window()
     if not hwnd:
@@ -201,19 +200,32 @@ def capture_chi_to_qpixmap():
         return None
     
     try:
-        from PySide6.QtGui import QImage, QPixmap
-        
-        # Win32 GetDIBits 返回 BGRA 格式，转为 RGBA
-        rgba_data = _bgra_to_rgba(data, width, height)
+        from PySide6.QtGui import QImage
         
-        qimg = QImage(rgba_data, width, height, width * 4, QImage.Format_RGBA8888)
+        # GetDIBits 返回的 BGRA 字节序即小端 Format_RGB32，无需逐像素交换
+        qimg = QImage(data, width, height, width * 4, QImage.Format_RGB32)
         # 必须 copy，因为原始 data 是临时的
-        pixmap = QPixmap.fromImage(qimg.copy())
-        
-        if pixmap.isNull() or pixmap.width() == 0:
+        qimg = qimg.copy()
+        if qimg.isNull() or qimg.width() == 0:
             return None
-        
-        return pixmap
+        return qimg
     except Exception as e:
-        print(f"[WindowCapture] QPixmap 转换失败: {e}")
+        print(f"[WindowCapture] QImage 转换失败: {e}")
+        return None
+
+
+def capture_chi_to_qpixmap():
+    """捕获 CHI660F 窗口并转为 QPixmap (仅限 GUI 线程)
+    
+    Returns:
+        QPixmap 或 None
+    """
+    qimg = capture_chi_to_qimage()
+    if qimg is None:
+        return None
+    
+    from PySide6.QtGui import QPixmap
+    pixmap = QPixmap.fromImage(qimg)
+    if pixmap.isNull() or pixmap.width() == 0:
         return None
+    return pixmap
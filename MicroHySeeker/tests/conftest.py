@@ -0,0 +1,53 @@
+"""Shared test fixtures."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import (
+    Experiment, ProgStep, ProgramStepType, PrepSolStep, ECSettings, ECTechnique,
+)
+
+
+class FakeRS485:
+    """总是成功的 RS485 驱动替身"""
+
+    def is_connected(self):
+        return True
+
+    def start_pump(self, address, direction, rpm):
+        return True
+
+    def stop_pump(self, address):
+        return True
+
+
+@pytest.fixture
+def fake_rs485():
+    return FakeRS485()
+
+
+@pytest.fixture
+def transfer_blank_experiment():
+    """两步短实验: 移液 0.05 s + 空白 0.05 s"""
+    return Experiment(exp_id="e1", exp_name="t", steps=[
+        ProgStep(step_id="s1", step_type=ProgramStepType.TRANSFER,
+                 pump_address=2, transfer_duration=0.05),
+        ProgStep(step_id="s2", step_type=ProgramStepType.BLANK, duration_s=0.05),
+    ])
+
+
+@pytest.fixture
+def combo_experiment():
+    """组合实验用三步实验: 配液 (CuSO4 0.1 M) → 冲洗 → CV (0.1 V/s)"""
+    prep = PrepSolStep(injection_order=["CuSO4"], total_volume_ul=5000.0,
+                       target_concentrations={"CuSO4": 0.1})
+    return Experiment("e1", "combo", steps=[
+        ProgStep("s1", ProgramStepType.PREP_SOL, prep_sol_params=prep),
+        ProgStep("s2", ProgramStepType.FLUSH, pump_address=3, flush_cycles=1),
+        ProgStep("s3", ProgramStepType.ECHEM,
+                 ec_settings=ECSettings(technique=ECTechnique.CV, scan_rate=0.1)),
+    ])
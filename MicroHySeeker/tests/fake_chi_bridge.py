@@ -0,0 +1,128 @@
+"""Fake 32-bit CHI bridge process for tests.
+
+用法: python fake_chi_bridge.py bridge
+
+环境变量:
+    FAKE_CHI_TEXT    为 1 时模拟旧版桥接，只支持文本协议
+    FAKE_CHI_POINTS  每次实验的总点数 (默认 2000)
+    FAKE_CHI_RATE    采集速率 点/秒 (默认 20000)
+"""
+
+import os
+import struct
+import sys
+import time
+
+REQUEST_HEADER = struct.Struct("<II")
+RESPONSE_HEADER = struct.Struct("<BII")
+DATA_HEADER = struct.Struct("<II")
+
+TOTAL = int(os.environ.get("FAKE_CHI_POINTS", "2000"))
+RATE = float(os.environ.get("FAKE_CHI_RATE", "20000"))
+
+
+class FakeInstrument:
+    def __init__(self):
+        self.params = {}
+        self.technique = 0
+        self.started_at = None
+
+    def acquired(self) -> int:
+        if self.started_at is None:
+            return 0
+        return min(TOTAL, int((time.monotonic() - self.started_at) * RATE))
+
+    def point(self, k: int):
+        return k * 0.001, 1e-6 * (k % 97)
+
+    def handle(self, command: str) -> str:
+        parts = command.split()
+        name, args = parts[0], parts[1:]
+        if name == "PING":
+            return "PONG"
+        if name == "HAS_TECHNIQUE":
+            return "OK " + ("1" if int(args[0]) in (0, 1, 11) else "0")
+        if name == "SET_TECHNIQUE":
+            self.technique = int(args[0])
+            return "OK"
+        if name == "SET_PARAMETER":
+            self.params[args[0]] = float(args[1])
+            return "OK"
+        if name == "GET_PARAMETER":
+            return f"OK {self.params.get(args[0], 0.0)}"
+        if name == "RUN_EXPERIMENT":
+            self.started_at = time.monotonic()
+            return "OK True"
+        if name == "IS_RUNNING":
+            return "OK " + ("1" if self.started_at is not None and self.acquired() < TOTAL else "0")
+        if name == "GET_ERROR":
+            return "OK "
+        if name == "GET_DATA":
+            n = min(int(args[0]), self.acquired())
+            pts = " ".join("%g,%g" % self.point(k) for k in range(n))
+            return f"OK {n} {pts}".rstrip()
+        if name == "STOP":
+            self.started_at = None
+            return "OK STOPPED"
+        if name in ("CLOSE_COM", "RESET", "INIT_SYSTEM"):
+            return "OK " + {"CLOSE_COM": "COM_CLOSED", "RESET": "RESET",
+                            "INIT_SYSTEM": "INITIALIZED"}[name]
+        return f"ERROR unknown command {name}"
+
+    def data_since(self, start: int, max_points: int) -> bytes:
+        total = self.acquired()
+        end = min(total, start + max_points)
+        values = []
+        for k in range(start, end):
+            values.extend(self.point(k))
+        return DATA_HEADER.pack(start, total) + struct.pack(f"<{len(values)}f", *values)
+
+
+def main() -> None:
+    text_only = os.environ.get("FAKE_CHI_TEXT") == "1"
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    inst = FakeInstrument()
+
+    stdout.write(b"QWidget: fake Qt warning\nBRIDGE_READY\n")
+    stdout.flush()
+
+    framed = False
+    while True:
+        if not framed:
+            raw = stdin.readline()
+            if not raw:
+                return
+            command = raw.decode().strip()
+            if command == "EXIT":
+                stdout.write(b"BRIDGE_EXIT\n")
+                stdout.flush()
+                return
+            if command.startswith("PROTOCOL") and not text_only:
+                stdout.write(b"OK BINARY1\n")
+                stdout.flush()
+                framed = True
+                continue
+            stdout.write((inst.handle(command) + "\n").encode())
+            stdout.flush()
+            continue
+
+        header = stdin.read(REQUEST_HEADER.size)
+        if len(header) < REQUEST_HEADER.size:
+            return
+        seq, length = REQUEST_HEADER.unpack(header)
+        command = stdin.read(length).decode()
+        if command.startswith("GET_DATA_SINCE"):
+            _, start, max_points = command.split()
+            kind, payload = 1, inst.data_since(int(start), int(max_points))
+        elif command == "EXIT":
+            kind, payload = 0, b"BRIDGE_EXIT"
+        else:
+            kind, payload = 0, inst.handle(command).encode()
+        stdout.write(RESPONSE_HEADER.pack(kind, seq, len(payload)) + payload)
+        stdout.flush()
+        if command == "EXIT":
+            return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""In-process fake Kafka broker for tests.
+
+FakeBroker.producer() / consumer() 提供与 kafka-python 相同的
+send / flush / poll 接口，消息保存在内存中。
+"""
+
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+Record = namedtuple("Record", "topic value")
+
+
+class FakeBroker:
+    def __init__(self, send_delay: float = 0.0):
+        self.send_delay = send_delay       # 每次 send 的模拟网络延迟
+        self.topics = defaultdict(list)
+        self.send_calls = 0
+        self._lock = threading.Lock()
+
+    def producer(self):
+        return FakeProducer(self)
+
+    def consumer(self, *topics):
+        return FakeConsumer(self, topics)
+
+    def messages(self, topic):
+        with self._lock:
+            return [r.value for r in self.topics[topic]]
+
+
+class FakeProducer:
+    def __init__(self, broker: FakeBroker):
+        self.broker = broker
+
+    def send(self, topic, value):
+        if self.broker.send_delay:
+            time.sleep(self.broker.send_delay)
+        with self.broker._lock:
+            self.broker.send_calls += 1
+            self.broker.topics[topic].append(Record(topic, value))
+
+    def flush(self, timeout=None):
+        pass
+
+
+class FakeConsumer:
+    def __init__(self, broker: FakeBroker, topics):
+        self.broker = broker
+        self.topics = topics
+        self.offsets = defaultdict(int)
+
+    def poll(self, timeout_ms=0):
+        out = {}
+        with self.broker._lock:
+            for topic in self.topics:
+                records = self.broker.topics[topic][self.offsets[topic]:]
+                if records:
+                    self.offsets[topic] += len(records)
+                    out[topic] = records
+        if not out:
+            time.sleep(timeout_ms / 1000.0)
+        return out
@@ -0,0 +1,112 @@
+"""Adaptive sampling tests."""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.core.adaptive import (
+    AdaptiveSampler,
+    FeatureObjective,
+    ParamRange,
+    latin_hypercube,
+)
+from src.echem_sdl.core.exp_program import ComboParameter, ExpProgram
+from src.echem_sdl.core.experiment_engine import EngineState, ExperimentEngine, ExperimentResult
+from src.echem_sdl.core.prog_step import ProgStepFactory
+
+
+def test_latin_hypercube_is_stratified():
+    """每维每个分段恰有一个点"""
+    u = latin_hypercube(10, 3, np.random.default_rng(0))
+    assert u.shape == (10, 3)
+    for k in range(3):
+        assert sorted(np.floor(u[:, k] * 10).astype(int)) == list(range(10))
+
+
+def _quadratic(params):
+    x, y = params["x"], params["y"]
+    return -((x - 0.62) ** 2) - 2.0 * (y - 0.31) ** 2
+
+
+def test_adaptive_beats_grid_on_synthetic_surface():
+    """合成曲面上用更少实验达到网格最优附近"""
+    grid = np.linspace(0.0, 1.0, 5)
+    grid_best = max(_quadratic({"x": x, "y": y}) for x in grid for y in grid)
+
+    sampler = AdaptiveSampler(
+        [ParamRange("x", "x", 0.0, 1.0), ParamRange("y", "y", 0.0, 1.0)],
+        budget=15, seed=1,
+    )
+    while not sampler.done:
+        params = sampler.ask()
+        sampler.tell(params, _quadratic(params))
+
+    assert len(sampler.history) == 15 < 25
+    _, best = sampler.best
+    assert best >= grid_best
+    assert best > -0.01
+
+
+def test_discrete_space_is_snapped_and_not_repeated():
+    """离散候选值吸附且不重复评估"""
+    space = [ParamRange("a", "a", 1.0, 3.0, choices=[1.0, 2.0, 3.0]),
+             ParamRange("b", "b", 0.0, 1.0, choices=[0.0, 1.0])]
+    sampler = AdaptiveSampler(space, budget=20, seed=0)
+    seen = []
+    while not sampler.done:
+        params = sampler.ask()
+        seen.append((params["a"], params["b"]))
+        sampler.tell(params, params["a"] - params["b"])
+    assert len(seen) == 6 == len(set(seen))
+    assert sampler.best[0] == {"a": 3.0, "b": 0.0}
+
+
+def test_feature_objective():
+    """从电化学特征取目标值"""
+    from src.echem_sdl.core.experiment_engine import ExperimentResult as Result
+
+    class _Data:
+        technique = "CV"
+        metadata = {"features": {"anodic_peak_current": 2e-5}}
+
+    result = Result(ec_data_sets=[_Data()])
+    assert FeatureObjective("anodic_peak_current")(result) == 2e-5
+    assert FeatureObjective("anodic_peak_current", target=1e-5)(result) == -1e-5
+    assert FeatureObjective("missing")(result) is None
+    assert FeatureObjective("anodic_peak_current", technique="LSV")(result) is None
+
+
+def test_engine_runs_adaptive_campaign():
+    """引擎按采样器预算逐个运行组合"""
+    program = ExpProgram(name="adaptive")
+    program.add_step(ProgStepFactory.create_blank("wait", wait_time=0.0))
+    program.add_combo_param(ComboParameter(
+        name="wait", target_path="steps[0].blank_config.wait_time",
+        values=[0.0, 0.005, 0.01, 0.015, 0.02, 0.025, 0.03],
+    ))
+
+    def objective(result: ExperimentResult):
+        return -abs(result.combo_params["wait"] - 0.02)
+
+    sampler = AdaptiveSampler.from_program(program, objective, budget=5, seed=0)
+    engine = ExperimentEngine(tick_interval=0.05)
+    assert engine.load_program(program)
+    engine.set_adaptive_sampler(sampler)
+    assert engine.start(combo_mode=True)
+
+    deadline = time.time() + 10
+    while engine.state != EngineState.COMPLETED and time.time() < deadline:
+        time.sleep(0.02)
+    assert engine.state == EngineState.COMPLETED
+
+    results = engine.get_results()
+    assert len(results) == 5 == len(sampler.history)
+    waits = [r.combo_params["wait"] for r in results]
+    assert [p["steps[0].blank_config.wait_time"] for p, _ in sampler.history] == waits
+    assert all(y is not None for _, y in sampler.history)
+    assert len(set(waits)) == 5
+    engine.shutdown()
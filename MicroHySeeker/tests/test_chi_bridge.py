@@ -0,0 +1,72 @@
+"""CHI 32-bit bridge protocol tests (fake bridge process)."""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.hardware.chi_bridge import CHIBridge32, DataBlock
+
+FAKE_BRIDGE = str(Path(__file__).parent / "fake_chi_bridge.py")
+
+
+def _bridge(tmp_path, monkeypatch, text_only=False):
+    monkeypatch.setenv("FAKE_CHI_POINTS", "3000")
+    monkeypatch.setenv("FAKE_CHI_TEXT", "1" if text_only else "0")
+    bridge = CHIBridge32(bridge_exe_path=FAKE_BRIDGE, dll_dir=str(tmp_path),
+                         qt_dll_dir=str(tmp_path), timeout=10.0,
+                         interpreter=sys.executable)
+    assert bridge.start()
+    return bridge
+
+
+def _run_and_collect(bridge):
+    bridge.set_technique(11)
+    assert bridge.run_experiment()
+    xs, ys = [], []
+    start = 0
+    while True:
+        running, block = bridge.poll_experiment(start)
+        assert isinstance(block, DataBlock) and block.start == start
+        xs.append(block.x)
+        ys.append(block.y)
+        start += len(block)
+        if not running and start >= block.total:
+            break
+        time.sleep(0.01)
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+@pytest.mark.parametrize("text_only", [False, True])
+def test_incremental_fetch(tmp_path, monkeypatch, text_only):
+    """二进制帧与旧版文本协议下增量取数结果一致"""
+    bridge = _bridge(tmp_path, monkeypatch, text_only)
+    try:
+        assert bridge.framed == (not text_only)
+        assert bridge.ping()
+        assert bridge.has_technique(0) and not bridge.has_technique(5)
+        x, y = _run_and_collect(bridge)
+        assert len(x) == 3000
+        assert np.allclose(x, np.arange(3000) * 0.001, atol=1e-6)
+        assert np.allclose(y, 1e-6 * (np.arange(3000) % 97), rtol=1e-6)
+        assert len(bridge.get_experiment_data(10)) == 10
+    finally:
+        bridge.stop()
+    assert not bridge.is_running
+
+
+def test_pipelined_requests(tmp_path, monkeypatch):
+    """流水线提交的请求按 seq 各自取回响应"""
+    bridge = _bridge(tmp_path, monkeypatch)
+    try:
+        requests = [bridge.submit(f"SET_PARAMETER p{k} {k}") for k in range(50)]
+        requests += [bridge.submit(f"GET_PARAMETER p{k}") for k in range(50)]
+        responses = [r.result(5.0) for r in requests]
+        assert responses[:50] == ["OK"] * 50
+        assert [float(r.split()[1]) for r in responses[50:]] == list(range(50))
+    finally:
+        bridge.stop()
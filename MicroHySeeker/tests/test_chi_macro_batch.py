@@ -0,0 +1,162 @@
+"""Batched CHI macro tests."""
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import Experiment, ProgStep, ProgramStepType, ECSettings, SystemConfig
+from src.models import ECTechnique as UITechnique
+from src.engine.runner import ExperimentWorker
+from src.echem_sdl.hardware.chi import ECParameters, ECTechnique
+from src.echem_sdl.hardware.chi_macro import CHI660FMacroDriver, MacroConfig
+
+
+def _params():
+    return [
+        ECParameters(technique=ECTechnique.OCPT, run_time=10.0),
+        ECParameters(technique=ECTechnique.CV, scan_rate=0.05),
+        ECParameters(technique=ECTechnique.CV, scan_rate=0.1),
+    ]
+
+
+def test_batch_macro_has_one_block_per_measurement(tmp_path):
+    """一个宏文件，多个 tech/run/save 块，只在末尾退出"""
+    driver = CHI660FMacroDriver(MacroConfig(work_dir=str(tmp_path), dummy_cell=True))
+    mcr = driver._generate_batch_macro_file(_params())
+    text = Path(mcr).read_text()
+    lines = [line.strip() for line in text.splitlines()]
+
+    assert [l for l in lines if l.startswith("tech:")] == ["tech: ocpt", "tech: cv", "tech: cv"]
+    assert lines.count("run") == 3
+    assert sum(l.startswith("csvsave:") for l in lines) == 3
+    assert lines.count("forcequit:yesiamsure") == 1 and lines.count("dummyon") == 1
+    assert lines.index("dummyoff") > max(i for i, l in enumerate(lines) if l == "run")
+
+    outputs = [path for _, path in driver._batch_outputs]
+    assert len(set(outputs)) == 3
+    assert all(os.path.dirname(p) == str(tmp_path / "data") for p in outputs)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="使用 shell 脚本模拟 chi660f.exe")
+def test_run_batch_parses_outputs_as_a_set(tmp_path):
+    """一次进程执行完成全部测量，输出按顺序解析"""
+    driver = CHI660FMacroDriver(MacroConfig(work_dir=str(tmp_path), timeout=10.0))
+    driver._connected = True
+
+    # 假 chi660f.exe: 按宏中的 csvsave 顺序写出数据文件
+    fake_exe = tmp_path / "chi660f.sh"
+    fake_exe.write_text(
+        "#!/bin/sh\n"
+        "mcr=$(echo \"$1\" | sed 's#^/runmacro:##')\n"
+        "dir=$(grep '^folder:' \"$mcr\" | sed 's#^folder: *##')\n"
+        "n=0\n"
+        "for name in $(grep '^csvsave:' \"$mcr\" | sed 's#^csvsave: *##'); do\n"
+        "  n=$((n+1))\n"
+        "  printf 'Potential/V, Current/A,\\n' > \"$dir/$name.csv\"\n"
+        "  i=0; while [ $i -lt $((n*10)) ]; do printf '0.%02d, 1e-6,\\n' $i >> \"$dir/$name.csv\"; i=$((i+1)); done\n"
+        "done\n"
+    )
+    fake_exe.chmod(fake_exe.stat().st_mode | stat.S_IEXEC)
+    driver._config.chi_exe_path = str(fake_exe)
+
+    assert driver.run_batch(_params())
+    data = driver.get_batch_data()
+    assert [len(d) for d in data] == [10, 20, 30]
+    assert [d.technique for d in data] == ["ocpt", "cv", "cv"]
+    assert len(driver.get_data_set()) == 30
+
+
+def test_runner_groups_consecutive_echem_steps():
+    """连续电化学步骤合并；OCPT 监控步骤与其他步骤打断合并"""
+    def echem(technique, **kw):
+        return ProgStep(f"s{technique.value}", ProgramStepType.ECHEM,
+                        ec_settings=ECSettings(technique=technique, **kw))
+
+    steps = [
+        echem(UITechnique.OCPT), echem(UITechnique.CV), echem(UITechnique.EIS),
+        ProgStep("b", ProgramStepType.BLANK, duration_s=1.0),
+        echem(UITechnique.CV), echem(UITechnique.LSV, ocpt_enabled=True),
+    ]
+    worker = ExperimentWorker(Experiment("e", "batch", steps=steps), None, SystemConfig())
+    assert worker._echem_batch_group(0) == [0, 1, 2]
+    assert worker._echem_batch_group(3) == [3]
+    assert worker._echem_batch_group(4) == [4]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="使用 sleep 模拟未退出的 chi660f.exe")
+def test_reap_process_kills_on_timeout(tmp_path):
+    """输出完成后进程未退出: 等待超时即强制结束"""
+    import subprocess
+    import time
+
+    driver = CHI660FMacroDriver(MacroConfig(work_dir=str(tmp_path)))
+    proc = subprocess.Popen(["sleep", "60"])
+    t0 = time.monotonic()
+    driver._reap_process(proc, timeout=0.2)
+    assert proc.poll() is not None and time.monotonic() - t0 < 5.0
+
+
+def test_gui_batch_waits_for_last_output(tmp_path, monkeypatch):
+    """GUI 批量宏: 超时按测量个数放宽，逐个跟踪输出文件，不以窗口标题判定完成"""
+    from src.echem_sdl.hardware import chi660f_gui_controller as gui
+
+    controller = gui.CHI660FController(gui.ExperimentConfig(output_dir=str(tmp_path), timeout=7.0))
+    calls = []
+    monkeypatch.setattr(controller, "is_connected", lambda: True)
+    monkeypatch.setattr(controller, "_execute_macro_text",
+                        lambda text, **kw: calls.append(kw) or gui.ExperimentResult())
+    controller.run_batch([(gui.Technique.OCPT, gui.OCPTParams()),
+                          (gui.Technique.CV, gui.CVParams()),
+                          (gui.Technique.IT, gui.ITParams())])
+    assert len(calls) == 1 and callable(calls[0].pop("wait"))
+    assert calls == [{"timeout": 21.0, "use_title": False}]
+
+    # 第一个测量结束后标题已变化，但最后一个输出文件尚未生成
+    controller._main_hwnd = 1
+    monkeypatch.setattr(gui, "_get_window_text", lambda hwnd: "CHI660F - Data.bin")
+    monkeypatch.setattr(controller, "_dismiss_error_dialogs", lambda: None)
+    last = str(tmp_path / "last.csv")
+    assert not controller._wait_for_completion(last, timeout=1.5, use_title=False)
+
+
+def test_gui_batch_follows_each_output(tmp_path, monkeypatch):
+    """GUI 批量宏: 依次跟踪各输出文件，逐个回调测量开始/完成及各自耗时"""
+    import threading
+    import time
+    from src.echem_sdl.hardware import chi660f_gui_controller as gui
+
+    controller = gui.CHI660FController(gui.ExperimentConfig(output_dir=str(tmp_path)))
+    monkeypatch.setattr(controller, "_dismiss_error_dialogs", lambda: None)
+    live = []
+    controller._row_callbacks.append(lambda rows: live.append(len(rows)))
+    items = [(gui.Technique.CV, gui.CVParams()), (gui.Technique.CV, gui.CVParams())]
+    paths = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    tailers = [gui.ChiOutputTailer(str(p)) for p in paths]
+    results = [gui.ExperimentResult(), gui.ExperimentResult()]
+
+    def write(path, n, footer):
+        text = "Potential/V, Current/A,\n" + "".join(f"0.{k:02d}, 1e-6,\n" for k in range(n))
+        path.write_text(text + ("End of run\n" if footer else ""))
+
+    def chi():
+        # 第一个文件无文件尾: 以第二个文件开始写入判定其完成
+        write(paths[0], 10, footer=False)
+        time.sleep(0.5)
+        write(paths[1], 20, footer=True)
+
+    events = []
+    writer = threading.Thread(target=chi)
+    writer.start()
+    assert controller._wait_for_batch(items, tailers, results, 10.0,
+                                      lambda k, r: events.append((k, r is not None)))
+    writer.join()
+
+    assert events == [(0, False), (0, True), (1, False), (1, True)]
+    assert [len(r.data_points) for r in results] == [10, 20]
+    assert all(r.success for r in results) and sum(live) == 30
+    assert results[0].elapsed_time >= 0.4 and results[1].elapsed_time < 0.4
@@ -0,0 +1,67 @@
+"""CHI output parser tests."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.hardware.chi_output import parse_chi_output
+
+CV_HEADER = """Jan. 28, 2026   10:22:33
+Cyclic Voltammetry
+File: cv_test.csv
+Init E (V) = 0
+High E (V) = 0.5
+Scan Rate (V/s) = 0.1
+
+Potential/V, Current/A,
+"""
+
+
+def _cv_rows():
+    e = np.concatenate([np.linspace(0.0, 0.5, 51), np.linspace(0.49, -0.5, 100)])
+    return e, 1e-6 * e
+
+
+def test_csv_header_and_segments(tmp_path):
+    """列名、元数据和按扫描方向分段"""
+    e, i = _cv_rows()
+    path = tmp_path / "cv.csv"
+    path.write_text(CV_HEADER + "\n".join(f"{a:.3f}, {b:.3e}," for a, b in zip(e, i)))
+
+    parsed = parse_chi_output(str(path))
+    assert parsed.headers[:2] == ["Potential/V", "Current/A"]
+    assert parsed.metadata["Scan Rate (V/s)"] == "0.1"
+    assert parsed.values.shape == (151, 2)
+
+    ds = parsed.to_data_set("cv")
+    assert len(ds) == 151
+    assert ds.segment_count == 2 and ds.segment_bounds(1) == (51, 151)
+    assert np.allclose(ds.potentials, np.round(e, 3))
+
+
+def test_text_file_with_segment_markers(tmp_path):
+    """制表符文本文件，段分隔行，分块读取"""
+    lines = ["A.C. Impedance", "Freq/Hz\tZ'/ohm\tZ\"/ohm", ""]
+    lines += [f"{f}\t{10.0 + f}\t{-f}" for f in range(1, 301)]
+    lines += ["Segment 2:"]
+    lines += [f"{f}\t{20.0 + f}\t{-f}" for f in range(1, 101)]
+    path = tmp_path / "imp.txt"
+    path.write_text("\n".join(lines))
+
+    parsed = parse_chi_output(str(path), chunk_bytes=512)
+    assert parsed.values.shape == (400, 3)
+    assert parsed.segment_starts == [0, 300]
+
+    ds = parsed.to_data_set("imp")
+    assert ds.times[0] == 1.0 and ds.potentials[0] == 11.0 and ds.currents[0] == -1.0
+    assert ds.segment_bounds(1) == (300, 400)
+
+
+def test_no_data(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text("header only\nPotential/V, Current/A\n")
+    parsed = parse_chi_output(str(path))
+    assert len(parsed) == 0 and parsed.rows == []
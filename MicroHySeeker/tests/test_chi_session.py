@@ -0,0 +1,127 @@
+"""CHI session pool tests."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.hardware.chi_session import CHISessionPool
+
+
+class FakeSession:
+    """记录启动/关闭次数的假会话"""
+
+    launched = 0
+
+    def __init__(self, connect_ok=True):
+        self.connect_ok = connect_ok
+        self.connected = False
+        self.healthy = True
+
+    def connect(self):
+        FakeSession.launched += 1
+        self.connected = self.connect_ok
+        return self.connect_ok
+
+    def disconnect(self):
+        self.connected = False
+
+    def is_healthy(self):
+        return self.connected and self.healthy
+
+
+def test_reuse_across_steps():
+    """健康会话跨步骤复用，不重复启动"""
+    pool = CHISessionPool()
+    FakeSession.launched = 0
+    first = pool.acquire("chi", FakeSession)
+    pool.release(first)
+    for _ in range(100):
+        session = pool.acquire("chi", FakeSession)
+        assert session is first
+        pool.release(session)
+    assert FakeSession.launched == 1
+    assert pool.stats.reuses == 100 and pool.stats.launches == 1
+
+    pool.close()
+    assert not first.connected and len(pool) == 0
+
+
+def test_restart_on_failure_or_unhealthy():
+    """失败归还或健康检查失败时才重启"""
+    pool = CHISessionPool()
+    first = pool.acquire("chi", FakeSession)
+    pool.release(first, healthy=False)
+    second = pool.acquire("chi", FakeSession)
+    assert second is not first and not first.connected
+
+    second.healthy = False
+    pool.release(second)
+    third = pool.acquire("chi", FakeSession)
+    assert third is not second and pool.stats.restarts == 2
+
+    # 占用中的会话不会借给第二个调用方
+    assert pool.acquire("chi", FakeSession) is None
+    pool.release(third)
+    pool.close()
+
+
+def test_connect_failure_and_context():
+    """连接失败返回 None；块内异常标记为需重连"""
+    pool = CHISessionPool()
+    assert pool.acquire("chi", lambda: FakeSession(connect_ok=False)) is None
+    assert pool.stats.failures == 1 and len(pool) == 0
+
+    with pytest.raises(RuntimeError):
+        with pool.session("chi", FakeSession) as session:
+            raise RuntimeError("boom")
+    assert pool.acquire("chi", FakeSession) is not session
+    pool.close()
+
+
+def test_connected_count():
+    """状态栏查询只统计已连接的常驻会话"""
+    pool = CHISessionPool()
+    assert pool.connected_count() == 0
+    session = pool.acquire("chi", FakeSession)
+    pool.release(session)
+    session.is_connected = True
+    assert pool.connected_count() == 1
+    session.is_connected = False
+    assert pool.connected_count() == 0
+    pool.close()
+
+
+def test_slow_launch_does_not_block_status_queries():
+    """启动期间 connected_count() 立即返回，同键的并发取用被拒绝"""
+    import threading
+    import time
+
+    gate = threading.Event()
+    started = threading.Event()
+
+    class SlowSession(FakeSession):
+        def connect(self):
+            started.set()
+            gate.wait(5)
+            return super().connect()
+
+    pool = CHISessionPool()
+    acquired = []
+    worker = threading.Thread(target=lambda: acquired.append(pool.acquire("chi", SlowSession)))
+    worker.start()
+    assert started.wait(5)
+    try:
+        t0 = time.perf_counter()
+        assert pool.connected_count() == 0
+        assert time.perf_counter() - t0 < 0.5
+        assert pool.acquire("chi", FakeSession) is None
+    finally:
+        gate.set()
+        worker.join(5)
+    assert acquired[0] is not None and pool.connected_count() == 1
+    pool.release(acquired[0])
+    assert pool.acquire("chi", FakeSession) is acquired[0]
+    pool.close()
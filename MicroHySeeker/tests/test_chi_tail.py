@@ -0,0 +1,93 @@
+"""Incremental CHI output tailer tests."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.hardware.chi_tail import ChiOutputTailer
+
+HEADER = "Amperometric i-t Curve\nInit E (V) = 0.2\n\nTime/s, Current/A,\n"
+
+
+def _writer(path, rows, footer, step=0.02):
+    """模拟 CHI 边采集边追加，故意在行中间断开"""
+    with open(path, "w") as f:
+        f.write(HEADER)
+        f.flush()
+        text = "".join(f"{t:.2f}, {i:.3e},\n" for t, i in rows)
+        for k in range(0, len(text), 997):
+            f.write(text[k:k + 997])
+            f.flush()
+            time.sleep(step)
+        if footer:
+            f.write(footer)
+            f.flush()
+
+
+def test_streams_rows_and_stops_at_footer(tmp_path):
+    """增量推送新行，出现文件尾立即完成"""
+    path = tmp_path / "it.csv"
+    rows = [(0.01 * k, 1e-6 * k) for k in range(2000)]
+    tailer = ChiOutputTailer(str(path))
+    batches = []
+    tailer.subscribe(batches.append)
+
+    writer = threading.Thread(target=_writer, args=(path, rows, "Segment 2:\n5, 5,\nEnd of run\n"))
+    writer.start()
+    start = time.monotonic()
+    assert tailer.follow(timeout=10.0, poll_interval=0.01)
+    writer.join()
+    assert time.monotonic() - start < 5.0
+    assert len(batches) > 1
+
+    out = tailer.output
+    assert out.headers[:2] == ["Time/s", "Current/A"]
+    assert out.metadata["Init E (V)"] == "0.2"
+    assert out.values.shape == (2001, 2)
+    assert np.allclose(out.values[:2000, 0], np.round([t for t, _ in rows], 2))
+    assert out.segment_starts == [0, 2000]
+    assert sum(len(b) for b in batches) == 2001
+
+
+def test_stale_file_and_process_exit(tmp_path):
+    """忽略旧文件；进程退出后补读末尾不完整行"""
+    path = tmp_path / "it.csv"
+    path.write_text(HEADER + "9, 9,\n")
+    tailer = ChiOutputTailer(str(path))
+    assert len(tailer.poll()) == 0
+
+    time.sleep(0.01)
+    path.write_text(HEADER + "0.1, 1e-6,\n0.2, 2e-6")
+    assert tailer.poll().tolist() == [[0.1, 1e-6]]
+    assert tailer.follow(is_done=lambda: True)
+    assert tailer.output.values.tolist() == [[0.1, 1e-6], [0.2, 2e-6]]
+    assert not tailer.finished
+
+
+def test_quiet_fallback(tmp_path):
+    """无文件尾时，数据停止增长即完成；无数据则超时"""
+    path = tmp_path / "cv.csv"
+    tailer = ChiOutputTailer(str(path))
+    assert not tailer.follow(timeout=0.1, poll_interval=0.01, quiet_seconds=0.05)
+    path.write_text("Potential/V, Current/A\n0.1, 1e-6\n")
+    assert tailer.follow(timeout=5.0, poll_interval=0.01, quiet_seconds=0.05)
+    assert tailer.count == 1
+
+
+def test_quiet_window_follows_point_interval():
+    """停止增长判定随技术参数放宽：低频 EIS、慢扫速 CV 不会被 1 s 静默截断"""
+    from src.echem_sdl.hardware.chi660f_gui_controller import (
+        FILE_QUIET_SECONDS, CVParams, IMPParams, ITParams, Technique, quiet_window_seconds,
+    )
+
+    assert quiet_window_seconds(Technique.CV, CVParams(scan_rate=0.1)) == FILE_QUIET_SECONDS
+    assert quiet_window_seconds(Technique.CV, CVParams(scan_rate=1e-4,
+                                                       sample_interval=0.001)) >= 50.0
+    assert quiet_window_seconds(Technique.IMP, IMPParams(freq_low=0.01)) >= 1000.0
+    assert quiet_window_seconds(Technique.IT, ITParams(sample_interval=10.0)) == 50.0
+    assert quiet_window_seconds(Technique.CV, None) is None
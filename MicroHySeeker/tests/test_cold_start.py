@@ -0,0 +1,82 @@
+"""Cold-start import tests (deferred heavy modules, import-time budget)."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ROOT = Path(__file__).parent.parent
+
+# 主窗口启动时不应加载的模块 (按前缀匹配)
+DEFERRED = (
+    "numpy", "matplotlib", "pandas", "jsonschema", "pydantic", "sqlite3",
+    "src.ui.dialogs.", "src.dialogs.", "src.ui.echem_render",
+    "echem_sdl.hardware.chi660f_gui_controller", "echem_sdl.hardware.chi_echem_bridge",
+    "echem_sdl.services.data_exporter", "echem_sdl.services.kafka_client",
+    "echem_sdl.services.result_store",
+)
+
+# 累计导入时间上限 (µs)，为慢速 CI 留出余量
+BUDGET_US = 1_500_000
+
+
+def _import_times(statement):
+    """在子进程中以 -X importtime 执行导入，返回 {模块: 累计耗时 µs}"""
+    code = ("import sys; sys.path.insert(0, 'src'); sys.path.insert(0, '.'); "
+            + statement)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          env=env, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_window_import_defers_heavy_modules():
+    """导入主窗口不加载 numpy/对话框/CHI 驱动等，且在时间预算内"""
+    times = _import_times("import src.ui.main_window")
+    loaded = [name for name in times
+              if any(name == p or name.startswith(p.rstrip(".") + ".") for p in DEFERRED)]
+    assert loaded == []
+    assert times["src.ui.main_window"] < BUDGET_US
+
+
+def test_lazy_package_exports():
+    """包级导出按需解析，首次访问才导入子模块"""
+    _import_times(
+        "import src.ui, src.core; "
+        "assert 'src.ui.dialogs.program_editor' not in sys.modules; "
+        "from src.ui import ProgramEditorDialog; "
+        "assert 'src.ui.dialogs.program_editor' in sys.modules; "
+        "assert 'src.core.precheck' not in sys.modules; "
+        "from src.core import ComboColumns, ExpProgram; "
+        "assert 'src.core.precheck' in sys.modules; "
+        "from src.echem_sdl.services import CampaignStore; "
+        "assert 'sqlite3' in sys.modules"
+    )
+
+
+def test_chi_modules_import_without_win32():
+    """CHI 控制器在首次调用 Win32 API 时才绑定 DLL"""
+    from src.echem_sdl.hardware import chi660f_gui_controller
+    from src.utils import window_capture
+
+    assert "not loaded" in repr(chi660f_gui_controller._user32)
+    assert "not loaded" in repr(window_capture._gdi32)
+
+
+def test_echem_sdl_does_not_import_app_core():
+    """echem_sdl 不反向依赖应用层 src.core / src.utils"""
+    _import_times(
+        "import src.echem_sdl.core.prog_step; "
+        "import src.echem_sdl.core.exp_program; "
+        "assert not [m for m in sys.modules if m in ('src.core', 'src.utils')"
+        " or m.startswith(('src.core.', 'src.utils.'))]"
+    )
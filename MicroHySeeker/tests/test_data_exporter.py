@@ -0,0 +1,95 @@
+"""Chunked DataExporter tests."""
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.services.data_exporter import DataExporter, iter_blocks
+
+
+def _chunks(n_chunks=50, rows=20_000):
+    for k in range(n_chunks):
+        t = np.arange(k * rows, (k + 1) * rows, dtype=float)
+        yield np.column_stack((t, np.sin(t)))
+
+
+def test_npz_stream_bounded_memory(tmp_path):
+    """百万行分块写入 NPZ，峰值内存只与单块相关"""
+    exporter = DataExporter(tmp_path)
+    tracemalloc.start()
+    path = exporter.export_npz(_chunks(), "run.npz", headers=("t", "i"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 8 * 1024 * 1024      # 总数据 16 MB
+
+    with np.load(path) as npz:
+        data = npz["data"]
+        assert data.shape == (1_000_000, 2)
+        assert np.array_equal(data[:, 0], np.arange(1_000_000, dtype=float))
+        assert list(npz["columns"]) == ["t", "i"]
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_rows_and_chunks_mixed(tmp_path):
+    """逐行元组与数组块可混合；按扩展名分派；无 pyarrow 时回退 CSV"""
+    rows = [(float(k), 2.0 * k) for k in range(10)]
+    items = rows[:5] + [np.array(rows[5:8])] + rows[8:]
+    blocks = list(iter_blocks(items, chunk_rows=3))
+    assert np.array_equal(np.vstack(blocks), np.array(rows))
+
+    exporter = DataExporter(tmp_path)
+    path = exporter.export_chunks(iter(items), "rows.csv")
+    assert np.allclose(np.loadtxt(path, delimiter=",", skiprows=1), rows)
+
+    path = exporter.export_parquet(iter(items), "rows.parquet")
+    assert path.suffix in (".parquet", ".csv")
+
+    with pytest.raises(ValueError):
+        exporter.export_chunks(iter(items), "rows.xyz")
+
+
+def test_export_campaign_async(tmp_path):
+    """整个活动在线程池中导出为一张长表"""
+    from src.echem_sdl.hardware.chi import ECDataSet
+    from src.echem_sdl.services.result_store import CampaignStore
+    from src.echem_sdl.core.experiment_engine import ExperimentResult
+
+    store = CampaignStore(tmp_path / "store")
+    for k in range(5):
+        data_set = ECDataSet.from_arrays(np.arange(100.0), np.zeros(100), np.full(100, k), technique="CV")
+        store.append_run(ExperimentResult(ec_data_sets=[data_set], success=True))
+
+    exporter = DataExporter(tmp_path / "out", async_mode=True)
+    future = exporter.export_campaign(store, "campaign.npz")
+    path = future.result(timeout=30)
+    with np.load(path) as npz:
+        data = npz["data"]
+    assert data.shape == (500, 5)
+    assert np.array_equal(np.unique(data[:, 0]), np.arange(1, 6))
+    assert np.array_equal(data[data[:, 0] == 3, 4], np.full(100, 2.0))
+    exporter.executor.shutdown()
+    store.close()
+
+
+def test_export_campaign_pads_narrow_arrays(tmp_path):
+    """少于三列的数据按记录的列数导出，缺失列为 NaN"""
+    from src.echem_sdl.services.result_store import CampaignStore
+    from src.echem_sdl.core.experiment_engine import ExperimentResult
+
+    store = CampaignStore(tmp_path / "store")
+    store.append_run(ExperimentResult(ec_data_sets=[np.column_stack((np.arange(4.0), np.ones(4)))],
+                                      success=True))
+    assert store.query_echem()[0].cols == 2
+
+    path = DataExporter(tmp_path / "out").export_campaign(store, "campaign.npz")
+    with np.load(path) as npz:
+        data = npz["data"]
+    assert data.shape == (4, 5)
+    assert np.array_equal(data[:, 2], np.arange(4.0)) and np.all(data[:, 3] == 1)
+    assert np.all(np.isnan(data[:, 4]))
+    store.close()
@@ -0,0 +1,60 @@
+"""Incremental CHI DLL data reader tests."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.hardware.chi import DllDataReader
+
+
+class FakeDll:
+    """模拟 CHI_getExperimentData: 把已采集的数据复制到调用方缓冲区"""
+
+    def __init__(self, zero_fill: bool = False):
+        self.x = []
+        self.y = []
+        self.zero_fill = zero_fill
+
+    def acquire(self, count: int) -> None:
+        start = len(self.x)
+        self.x.extend(np.arange(start, start + count) * 0.01 + 0.01)
+        self.y.extend([0.0 if k % 3 == 0 else 1e-6 * k for k in range(start, start + count)])
+
+    def get_experiment_data(self, x_buf, y_buf, n):
+        x = np.frombuffer(x_buf, dtype=np.float32)
+        y = np.frombuffer(y_buf, dtype=np.float32)
+        m = min(n, len(self.x))
+        x[:m] = self.x[:m]
+        y[:m] = self.y[:m]
+        if self.zero_fill:
+            x[m:] = 0.0
+            y[m:] = 0.0
+
+
+def test_incremental_batches_keep_zero_currents():
+    """只返回新增区间，零电流点不会被当作末尾"""
+    dll = FakeDll()
+    reader = DllDataReader(dll.get_experiment_data, capacity=4096)
+    dll.acquire(100)
+    x, y = reader.poll()
+    assert len(x) == 100 and y[0] == 0.0
+    assert len(reader.poll()[0]) == 0
+    dll.acquire(50)
+    x, _ = reader.poll()
+    assert len(x) == 50 and abs(x[0] - 1.01) < 1e-6
+    assert reader.count == 150
+
+
+def test_zero_filled_buffer_and_growth():
+    """DLL 零填充未用区域；超过容量时扩容"""
+    dll = FakeDll(zero_fill=True)
+    reader = DllDataReader(dll.get_experiment_data, capacity=1000)
+    dll.acquire(400)
+    assert len(reader.poll()[0]) == 400
+    dll.acquire(2600)
+    x, _ = reader.poll()
+    assert len(x) == 2600 and reader.count == 3000
+    assert reader.capacity >= 3000
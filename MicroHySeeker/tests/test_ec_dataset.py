@@ -0,0 +1,75 @@
+"""Columnar ECDataSet tests."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.hardware.chi import ECDataPoint, ECDataSet
+
+
+def test_append_and_views():
+    """追加增长，列访问为零拷贝视图"""
+    ds = ECDataSet(technique="IT")
+    for k in range(5000):
+        ds.append(k * 0.1, 0.2, 1e-6 * k)
+    assert len(ds) == 5000
+    assert abs(ds.times[-1] - 499.9) < 1e-9
+    assert np.shares_memory(ds.times, ds.as_array())
+    assert ds[10] == ECDataPoint(1.0, 0.2, 1e-6 * 10)
+
+    ds.extend(np.arange(3.0), 0.0, [1.0, 2.0, 3.0])
+    assert len(ds) == 5003
+    assert ds.currents[-3:].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_compat_points_and_copy():
+    """兼容逐点接口；copy 为独立快照"""
+    points = [ECDataPoint(0.0, 0.1, 1.0), ECDataPoint(1.0, 0.2, 2.0)]
+    ds = ECDataSet(name="x", points=points)
+    assert ds.points == points
+    snapshot = ds.copy()
+    ds.append(2.0, 0.3, 3.0)
+    assert len(snapshot) == 2 and snapshot.name == "x"
+
+
+def test_segments():
+    """手动分段与按扫描方向自动分段"""
+    e = np.concatenate([np.linspace(-0.5, 0.5, 11), np.linspace(0.4, -0.5, 10),
+                        np.linspace(-0.4, 0.5, 10)])
+    ds = ECDataSet.from_arrays(np.arange(len(e)) * 0.1, e, np.zeros(len(e)))
+    assert ds.detect_segments() == 3
+    assert ds.segment(0)[:, 1].max() == 0.5
+    assert ds.segment_bounds(1) == (11, 21)
+    assert len(ds.segment(-1)) == 10
+
+    ds = ECDataSet()
+    ds.append(0, 0, 0)
+    ds.mark_segment()
+    ds.append(1, 1, 1)
+    assert ds.segment_count == 2 and ds.segment(1).tolist() == [[1.0, 1.0, 1.0]]
+
+
+def test_copy_consistent_during_append():
+    """采集线程追加时取快照，各列等长且数据完整"""
+    import copy
+    import threading
+
+    ds = ECDataSet(technique="IT")
+    done = threading.Event()
+
+    def produce():
+        for k in range(50_000):
+            ds.append(float(k), 0.5, float(k))
+        done.set()
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    while not done.is_set():
+        snap = ds.copy()
+        assert len(snap.times) == len(snap.potentials) == len(snap.currents) == len(snap)
+        assert np.array_equal(snap.times, np.arange(len(snap), dtype=float))
+    thread.join()
+    assert len(copy.deepcopy(ds)) == 50_000
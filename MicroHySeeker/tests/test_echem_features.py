@@ -0,0 +1,105 @@
+"""Echem feature extraction tests."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.core.echem_features import FeatureExtractor, attach_features
+from src.echem_sdl.hardware.chi import ECDataSet
+
+
+def _stream(extractor, arr, chunk=37):
+    for k in range(0, len(arr), chunk):
+        block = arr[k:k + chunk]
+        extractor.update(block[:, 0], block[:, 1], block[:, 2])
+
+
+def _cv():
+    e_up = np.linspace(-0.2, 0.8, 500)
+    e = np.concatenate((e_up, e_up[::-1]))
+    i = np.concatenate((
+        1e-5 * np.exp(-((e_up - 0.45) / 0.05) ** 2),
+        -8e-6 * np.exp(-((e_up[::-1] - 0.38) / 0.05) ** 2),
+    ))
+    t = np.arange(len(e)) * 0.01
+    return np.column_stack((t, e, i))
+
+
+def test_cv_peaks_and_onset_streaming():
+    """分块增量结果与一次性计算一致"""
+    arr = _cv()
+    extractor = FeatureExtractor("CV")
+    _stream(extractor, arr)
+    features = extractor.features()
+
+    assert features["n_points"] == len(arr)
+    assert features["anodic_peak_potential"] == pytest.approx(0.45, abs=0.005)
+    assert features["anodic_peak_current"] == pytest.approx(1e-5, rel=1e-3)
+    assert features["cathodic_peak_potential"] == pytest.approx(0.38, abs=0.005)
+    assert features["peak_separation"] == pytest.approx(0.07, abs=0.01)
+    # 10% 峰高处: 0.45 - 0.05 * sqrt(ln 10)
+    assert features["onset_potential"] == pytest.approx(0.45 - 0.05 * np.sqrt(np.log(10)), abs=0.005)
+
+    data_set = ECDataSet.from_arrays(arr[:, 0], arr[:, 1], arr[:, 2], technique="CV")
+    assert attach_features(data_set) == features
+    assert data_set.metadata["features"] is not None
+
+
+
+def test_baseline_independent_of_block_size():
+    """逐点送入 (模拟器按单点分块) 时基线与起始电位和一次性计算一致"""
+    arr = _cv()
+    arr[0, 2] += 2e-6                                   # 首点尖峰
+    extractor = FeatureExtractor("LSV")
+    _stream(extractor, arr, chunk=1)
+    whole = FeatureExtractor("LSV")
+    whole.update(arr[:, 0], arr[:, 1], arr[:, 2])
+    assert extractor._baseline == whole._baseline == pytest.approx(0.0, abs=1e-12)
+    assert extractor.features()["onset_potential"] == whole.features()["onset_potential"]
+
+
+def test_it_charge_and_ocp_drift():
+    """i-t 电荷积分；OCPT 漂移斜率"""
+    t = np.linspace(0, 10, 1001)
+    it = FeatureExtractor("i-t")
+    _stream(it, np.column_stack((t, np.zeros_like(t), 2e-6 * np.ones_like(t))))
+    features = it.features()
+    assert features["charge"] == pytest.approx(2e-5)
+    assert features["final_current"] == pytest.approx(2e-6)
+
+    ocp = FeatureExtractor("OCPT")
+    _stream(ocp, np.column_stack((t + 1e6, 0.2 + 0.003 * t, np.zeros_like(t))))
+    features = ocp.features()
+    assert features["ocp_drift"] == pytest.approx(0.003, rel=1e-6)
+    assert features["ocp_initial"] == pytest.approx(0.2)
+
+
+def test_eis_semicircle_fit():
+    """Randles 等效电路的半圆拟合得到 Rs、Rct"""
+    rs, rct, cdl = 10.0, 100.0, 1e-5
+    freq = np.logspace(5, -1, 300)
+    z = rs + rct / (1 + 1j * 2 * np.pi * freq * rct * cdl)
+    extractor = FeatureExtractor("EIS")
+    _stream(extractor, np.column_stack((freq, z.real, z.imag)))
+    features = extractor.features()
+    assert features["rs"] == pytest.approx(rs, rel=1e-6)
+    assert features["rct"] == pytest.approx(rct, rel=1e-6)
+
+
+def test_bound_data_set_processes_new_rows_only():
+    """绑定外部数据集时只处理新增行"""
+    arr = _cv()
+    data_set = ECDataSet(technique="LSV")
+    extractor = FeatureExtractor("LSV", data_set)
+    data_set.extend(arr[:300, 0], arr[:300, 1], arr[:300, 2])
+    assert extractor.update() == 300
+    assert extractor.update() == 0
+    data_set.extend(arr[300:500, 0], arr[300:500, 1], arr[300:500, 2])
+    assert extractor.update() == 200
+    assert "cathodic_peak_potential" not in extractor.features()
+    with pytest.raises(ValueError):
+        extractor.update(arr[:1, 0], arr[:1, 1], arr[:1, 2])
@@ -0,0 +1,82 @@
+"""Echem result render service tests."""
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PySide6.QtGui import QImage
+
+from src.ui.echem_render import EchemRenderService, PixmapCache
+
+
+class FakeRenderer:
+    """记录调用线程与输入点数的假渲染函数"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def __call__(self, technique, arr, width, height):
+        self.calls.append((technique, len(arr), width, height))
+        self.threads.add(threading.get_ident())
+        image = QImage(width, height, QImage.Format_RGB32)
+        image.fill(0xFFFFFF)
+        return image
+
+
+def test_render_off_thread_and_cached(qtbot):
+    """渲染在工作线程完成，同一结果同一尺寸第二次直接命中缓存"""
+    renderer = FakeRenderer()
+    service = EchemRenderService(render_fn=renderer)
+    arr = np.random.rand(1000, 3)
+
+    with qtbot.waitSignal(service.rendered, timeout=5000) as blocker:
+        assert service.request(1, "CV", arr, (400, 300)) is None
+        # 重复请求不会重复提交
+        assert service.request(1, "CV", arr, (400, 300)) is None
+    assert blocker.args == [(1, 400, 300)]
+    assert threading.get_ident() not in renderer.threads
+
+    pixmap = service.request(1, "CV", arr, (400, 300))
+    assert pixmap is not None and pixmap.width() == 400
+    assert len(renderer.calls) == 1
+
+    # 新尺寸重新渲染，旧尺寸仍在缓存中
+    with qtbot.waitSignal(service.rendered, timeout=5000):
+        service.request(1, "CV", arr, (200, 150))
+    assert service.request(1, "CV", arr, (400, 300)) is not None
+    assert len(renderer.calls) == 2
+    service.wait()
+
+
+def test_render_failure_signal(qtbot):
+    """渲染异常通过 failed 信号报告，不进入缓存"""
+    def broken(technique, arr, width, height):
+        raise RuntimeError("no backend")
+
+    service = EchemRenderService(render_fn=broken)
+    with qtbot.waitSignal(service.failed, timeout=5000) as blocker:
+        service.request(7, "OCPT", np.zeros((10, 3)), (100, 100))
+    assert blocker.args[0] == (7, 100, 100) and "no backend" in blocker.args[1]
+    assert len(service.cache) == 0
+
+
+def test_pixmap_cache_lru(qtbot):
+    """超出容量淘汰最久未用；可按结果整体移除"""
+    from PySide6.QtGui import QPixmap
+
+    cache = PixmapCache(capacity=3)
+    for k in range(3):
+        cache.put((k, 10, 10), QPixmap(10, 10))
+    cache.get((0, 10, 10))
+    cache.put((3, 10, 10), QPixmap(10, 10))
+    assert (1, 10, 10) not in cache and (0, 10, 10) in cache
+
+    cache.put((0, 20, 20), QPixmap(20, 20))
+    cache.discard_result(0)
+    assert len(cache) == 1 and (3, 10, 10) in cache
@@ -0,0 +1,88 @@
+"""Engine event bus tests."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.core.event_bus import EventBus, OverflowPolicy
+from src.echem_sdl.core.experiment_engine import (
+    ExperimentEngine, EVENT_ECHEM_DATA, EVENT_STEP_STARTED,
+)
+
+
+def test_slow_consumer_does_not_block_publisher():
+    """慢速订阅者只丢弃高频事件，不阻塞发布方"""
+    bus = EventBus(lossy_events={"data"})
+    gate = threading.Event()
+    received = []
+
+    def slow(event_type, data):
+        gate.wait()
+        received.append((event_type, data))
+
+    sub = bus.subscribe(slow, maxsize=10, max_batch=1)
+    start = time.perf_counter()
+    bus.publish("start", 0)
+    for i in range(5000):
+        bus.publish("data", i)
+    bus.publish("done", 1)
+    assert time.perf_counter() - start < 1.0
+
+    gate.set()
+    assert bus.flush(timeout=5.0)
+    types = [t for t, _ in received]
+    assert types[0] == "start" and types[-1] == "done"
+    assert types.count("data") <= 11
+    assert received[-2] == ("data", 4999)
+    assert sub.dropped >= 5000 - 11
+    bus.close()
+
+
+def test_coalesce_and_batch():
+    """合并保留最新值；批量投递同类连续事件"""
+    bus = EventBus(lossy_events={"progress", "data"})
+    gate = threading.Event()
+    progress = []
+    batches = []
+
+    bus.subscribe(lambda t, d: (gate.wait(), progress.append(d)),
+                  event_types={"progress"}, policy=OverflowPolicy.COALESCE)
+    bus.subscribe(lambda t, d: batches.append((t, d)), event_types={"data", "mark"},
+                  batch=True, max_batch=1000)
+    for i in range(100):
+        bus.publish("progress", i)
+    gate.set()
+    assert bus.flush(timeout=5.0)
+    assert progress[-1] == 99 and len(progress) <= 2
+
+    batches.clear()
+    sub = bus.subscriptions[1]
+    with sub._cond:  # 暂停投递线程取数，确保事件在同一批中
+        for i in range(10):
+            bus.publish("data", i)
+        bus.publish("mark", "m")
+    assert bus.flush(timeout=5.0)
+    assert batches == [("data", list(range(10))), ("mark", ["m"])]
+    bus.close()
+
+
+def test_engine_callbacks_off_thread():
+    """引擎回调在订阅者线程执行"""
+    engine = ExperimentEngine()
+    seen = []
+    engine.on(EVENT_STEP_STARTED, lambda data: seen.append(("step", threading.current_thread())))
+    engine.on_event(lambda t, data: seen.append((t, data["point"] if t == EVENT_ECHEM_DATA else None)))
+
+    engine._emit_event(EVENT_STEP_STARTED, {"index": 0})
+    engine._emit_event(EVENT_ECHEM_DATA, {"point": 1})
+    assert engine.flush_events(timeout=5.0)
+    assert ("step", threading.current_thread()) not in seen
+    assert (EVENT_ECHEM_DATA, 1) in seen
+
+    threads = [sub._thread for sub in engine.event_bus.subscriptions]
+    engine.shutdown()
+    assert engine.event_bus.subscriptions == ()
+    assert not any(t.is_alive() for t in threads)
@@ -0,0 +1,108 @@
+"""Execution plan tests."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import (
+    Experiment, ProgStep, ProgramStepType, PrepSolStep, ECSettings, ECTechnique,
+    SystemConfig, DilutionChannel, FlushChannel,
+)
+from src.core.execution_plan import (
+    ENCODER_DIVISIONS_PER_REV,
+    PUMP_SETTLE_S,
+    compile_execution_plan,
+    estimate_echem_seconds,
+    get_plan_cache,
+)
+
+
+def _config() -> SystemConfig:
+    config = SystemConfig()
+    config.dilution_channels = [
+        DilutionChannel("c1", "CuSO4", 1.0, pump_address=1, default_rpm=120),
+        DilutionChannel("c2", "NaCl", 2.0, pump_address=2, direction="REV", default_rpm=60),
+    ]
+    config.flush_channels = [FlushChannel("f1", "Inlet", 5, work_type="Inlet", rpm=200)]
+    config.calibration_data = {
+        1: {"ul_per_sec": 10.0, "slope_k": 100.0, "intercept_b": 0.0},
+        2: {"ul_per_sec": 20.0},
+    }
+    return config
+
+
+def _experiment() -> Experiment:
+    prep = PrepSolStep(
+        injection_order=["CuSO4", "NaCl", "H2O"],
+        total_volume_ul=1000.0,
+        target_concentrations={"CuSO4": 0.1, "NaCl": 0.2},
+        solvent_flags={"H2O": True},
+        selected_solutions={"CuSO4": True, "NaCl": True, "H2O": True},
+        injection_order_numbers={"CuSO4": 1, "NaCl": 1, "H2O": 2},
+    )
+    ec = ECSettings(technique=ECTechnique.CV, e0=0.0, eh=0.5, el=-0.5,
+                    scan_rate=0.1, seg_num=2)
+    return Experiment("e1", "plan", steps=[
+        ProgStep("s1", ProgramStepType.PREP_SOL, prep_sol_params=prep),
+        ProgStep("s2", ProgramStepType.ECHEM, ec_settings=ec),
+        ProgStep("s3", ProgramStepType.BLANK, duration_s=3.0),
+    ])
+
+
+def test_prep_sol_commands():
+    """配液步骤编译为分批泵命令"""
+    plan = compile_execution_plan(_experiment(), _config())
+    prep = plan.step(0)
+    assert len(prep.batches) == 2
+    cu, nacl = prep.batches[0]
+    h2o, = prep.batches[1]
+
+    # CuSO4: 位置模式, 100uL / k=100 → 1 圈
+    assert cu.use_position_mode
+    assert cu.volume_ul == 100.0
+    assert cu.encoder_counts == ENCODER_DIVISIONS_PER_REV
+    assert abs(cu.estimated_seconds - (60.0 / 120 + PUMP_SETTLE_S)) < 1e-9
+
+    # NaCl: 无位置校准, 回退 RPM 时间模式
+    assert not nacl.use_position_mode
+    assert abs(nacl.run_seconds - 100.0 / 20.0) < 1e-9
+    assert any("回退 RPM 时间模式" in n for n in prep.notes)
+
+    # H2O 溶剂取剩余体积, 走 Inlet 泵
+    assert h2o.pump_address == 5
+    assert abs(h2o.volume_ul - 800.0) < 1e-9
+
+
+def test_durations_and_eta():
+    """总时长等于各步骤之和, 剩余时长递减"""
+    plan = compile_execution_plan(_experiment(), _config())
+    assert abs(plan.total_seconds - sum(s.predicted_seconds for s in plan.steps)) < 1e-9
+    assert plan.remaining_from(0) == plan.total_seconds
+    assert plan.remaining_from(2) == plan.steps[2].predicted_seconds
+    # CV: 0→0.5 (0.5V) + 一整段 (1.0V) @ 0.1V/s
+    assert abs(plan.step(1).echem_seconds - 15.0) < 1e-9
+
+
+def test_plan_cached_by_content():
+    """相同输入复用计划, 修改后重新编译"""
+    get_plan_cache().clear()
+    exp = _experiment()
+    config = _config()
+    first = compile_execution_plan(exp, config)
+    assert compile_execution_plan(_experiment(), _config()) is first
+
+    exp.steps[2].duration_s = 30.0
+    changed = compile_execution_plan(exp, config)
+    assert changed is not first
+    assert changed.key != first.key
+
+
+def test_echem_models():
+    """电化学时长模型"""
+    assert estimate_echem_seconds("i-t", quiet_time=2.0, run_time=30.0) == 32.0
+    assert estimate_echem_seconds("LSV", e_init=0.0, e_final=1.0, scan_rate=0.05) == 20.0
+    assert estimate_echem_seconds(ECTechnique.OCPT, run_time=10.0) == 10.0
+    # EIS 低频点主导时长
+    assert estimate_echem_seconds("EIS", freq_low=0.1, freq_high=1e5) > \
+        estimate_echem_seconds("EIS", freq_low=10.0, freq_high=1e5)
@@ -0,0 +1,53 @@
+"""Copy-on-write experiment variant tests."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.param_access import ComboApplier
+from src.core.experiment_variant import ExperimentVariant
+from src.echem_sdl.core.exp_program import ExpProgram, ComboParameter
+from src.echem_sdl.core.prog_step import ProgStepFactory
+
+
+def test_variant_materialize(combo_experiment):
+    """变体物化不修改基础实验，未改动步骤共享"""
+    base = combo_experiment
+    applier = ComboApplier(base, ["step_0_CuSO4_浓度(M)", "3:扫描速率"])
+    variant = applier.variant(base, {"step_0_CuSO4_浓度(M)": 0.2, "3:扫描速率": 0.05})
+    assert variant.get(2, "ec_settings.scan_rate") == 0.05
+    assert variant.get(1, "flush_cycles") == 1
+
+    exp = variant.materialize()
+    assert exp.steps[0].prep_sol_params.target_concentrations["CuSO4"] == 0.2
+    assert exp.steps[2].ec_settings.scan_rate == 0.05
+    assert exp.steps[1] is base.steps[1]
+    assert base.steps[0].prep_sol_params.target_concentrations["CuSO4"] == 0.1
+    assert base.steps[2].ec_settings.scan_rate == 0.1
+
+
+def test_variant_diff_and_roundtrip(combo_experiment):
+    """变体比较与序列化"""
+    base = combo_experiment
+    a = ExperimentVariant(base, {(2, "ec_settings.scan_rate"): 0.05})
+    b = a.with_overrides({(1, "flush_cycles"): 4})
+    assert b.diff(a) == {(1, "flush_cycles"): (4, 1)}
+    assert a.diff(ExperimentVariant(base)) == {(2, "ec_settings.scan_rate"): (0.05, 0.1)}
+    assert ExperimentVariant.from_dict(base, b.to_dict()) == b
+
+
+def test_exp_program_variant():
+    """ExpProgram 变体不修改原程序"""
+    program = ExpProgram(name="p")
+    program.add_step(ProgStepFactory.create_cv())
+    program.add_combo_param(ComboParameter(
+        name="scan", target_path="steps[0].ec_config.scan_rate", values=[0.01, 0.02]))
+    variant = program.get_variant(1)
+    assert variant.steps[0].ec_config.scan_rate == 0.02
+    assert program.steps[0].ec_config.scan_rate == 0.1
+    assert program.get_variant(5) is None
+
+    clone = program.copy()
+    assert clone.to_dict() == program.to_dict()
+    assert clone.steps[0] is not program.steps[0]
@@ -0,0 +1,101 @@
+"""Batched KafkaClient tests."""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_kafka_broker import FakeBroker
+from src.echem_sdl.services.kafka_client import KafkaClient
+
+
+def _client(broker, **config):
+    client = KafkaClient(config, producer=broker.producer(),
+                         consumer=broker.consumer("echem"))
+    client.initialize()
+    return client
+
+
+def test_produce_does_not_wait_for_broker():
+    """慢速 broker 不拖慢采集线程"""
+    broker = FakeBroker(send_delay=0.001)
+    client = _client(broker)
+    t0 = time.perf_counter()
+    for k in range(2000):
+        client.produce("echem", {"k": k, "i": 1e-6})
+    assert time.perf_counter() - t0 < 0.2
+
+    assert client.flush(10)
+    values = [json.loads(v) for v in broker.messages("echem")]
+    assert [v["k"] for v in values] == list(range(2000))
+    metrics = client.metrics()
+    assert metrics["sent"] == 2000 and metrics["dropped"] == 0
+    assert metrics["latency_max"] >= metrics["latency_mean"] > 0
+    client.close()
+
+
+def test_linger_groups_messages_into_batches():
+    """按 linger / batch.size 成批发送"""
+    broker = FakeBroker()
+    client = _client(broker, **{"linger.ms": 50, "batch.size": 100})
+    for k in range(250):
+        client.produce("echem", {"k": k})
+    client.flush()
+    metrics = client.metrics()
+    assert metrics["sent"] == 250
+    assert metrics["batches"] <= 5
+    client.close()
+
+
+def test_full_queue_drops_and_counts():
+    """队列满时丢弃并计数"""
+    broker = FakeBroker(send_delay=0.05)
+    client = _client(broker, **{"queue.buffering.max.messages": 10, "batch.size": 1})
+    accepted = sum(client.produce("echem", "x") for _ in range(100))
+    metrics = client.metrics()
+    assert metrics["dropped"] == 100 - accepted > 0
+    client.close(timeout=0.1)
+
+
+def test_disabled_client_is_noop():
+    """未启用时 produce 直接返回"""
+    client = KafkaClient({})
+    client.initialize()
+    assert not client.produce("echem", {"k": 1})
+    assert client.metrics()["enqueued"] == 0
+
+
+def test_consumer_batches_decoded_records():
+    """消费端按批解码回调"""
+    broker = FakeBroker()
+    client = _client(broker)
+    batches = []
+    client.start_consumer(batches.append, batch=True)
+    for k in range(20):
+        client.produce("echem", {"k": k})
+    client.flush()
+    deadline = time.monotonic() + 5
+    while sum(map(len, batches)) < 20 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    client.close()
+    assert [d["k"] for b in batches for d in b] == list(range(20))
+    assert len(batches) < 20
+
+
+def test_non_str_keys_and_numpy_values_are_sent():
+    """int 键与 numpy 数值可编码，不计入失败"""
+    import numpy as np
+
+    broker = FakeBroker()
+    client = _client(broker)
+    client.produce("echem", {1: "a", "i": np.float64(1e-6), "v": np.arange(3.0)})
+    client.produce("echem", {"t": {2.5: 1}})
+    assert client.flush(5)
+    values = [json.loads(v) for v in broker.messages("echem")]
+    assert values == [{"1": "a", "i": 1e-6, "v": [0.0, 1.0, 2.0]}, {"t": {"2.5": 1}}]
+    metrics = client.metrics()
+    assert metrics["sent"] == 2 and metrics["failed"] == 0
+    client.close()
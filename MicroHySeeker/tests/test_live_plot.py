@@ -0,0 +1,85 @@
+"""Live echem plot tests (ring buffer, decimation)."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.plot_buffer import RingBuffer, decimate_minmax
+
+
+def test_ring_buffer_wraps_in_order():
+    """超出容量后保留最近的行，视图按时间顺序且零拷贝"""
+    buf = RingBuffer(100, 3)
+    rows = np.arange(3 * 350, dtype=float).reshape(350, 3)
+    for k in range(0, 350, 7):
+        buf.extend(rows[k:k + 7])
+    assert len(buf) == 100 and buf.total == 350
+    assert np.array_equal(buf.view(), rows[-100:])
+    assert buf.view().base is not None
+
+    # 单次追加超过容量
+    buf.extend(np.ones((250, 3)))
+    assert np.array_equal(buf.view(), np.ones((100, 3)))
+
+    buf.clear()
+    assert len(buf) == 0 and len(buf.view()) == 0
+
+
+def test_decimate_minmax_keeps_peaks():
+    """抽点后点数受限，尖峰保留，顺序不变"""
+    n = 1_000_003
+    x = np.arange(n, dtype=float)
+    y = np.sin(x / 5000.0)
+    y[123_457] = 50.0
+    y[987_653] = -50.0
+    dx, dy = decimate_minmax(x, y, 2000)
+    assert len(dx) <= 2002
+    assert dy.max() == 50.0 and dy.min() == -50.0
+    assert np.all(np.diff(dx) >= 0)
+
+    small = np.arange(10.0)
+    assert decimate_minmax(small, small, 2000)[0] is small
+
+
+def test_live_plot_widget(qtbot):
+    """数据块只入缓冲，刷新时按宽度抽点"""
+    from src.ui.widgets.live_echem_plot import LiveEchemPlot
+
+    plot = LiveEchemPlot(capacity=50_000)
+    qtbot.addWidget(plot)
+    plot.resize(300, 200)
+    plot.show()
+    plot.start("i-t")
+    t = np.arange(100_000, dtype=float)
+    for k in range(0, len(t), 10_000):
+        block = np.column_stack((t[k:k + 10_000], np.zeros(10_000), np.cos(t[k:k + 10_000])))
+        plot.append(block)
+    assert len(plot) == 50_000
+    plot.refresh()
+    x, y = plot._curve.getData()
+    assert x[0] >= 50_000 and len(x) <= 2 * max(400, 2 * plot.width())
+    plot.stop()
+
+
+def test_eis_nyquist_uses_impedance_columns(qtbot):
+    """EIS 实时曲线与结果图共用版式: 取 (Z', -Z'')，而非频率列"""
+    from src.echem_sdl.hardware.chi_output import technique_columns
+    from src.ui.widgets.live_echem_plot import LiveEchemPlot
+    from src.utils.plot_styles import plot_style
+
+    raw = np.array([[1e5, 10.0, -1.0], [1e3, 20.0, -5.0], [1e1, 40.0, -2.0]])
+    data = np.column_stack(technique_columns("imp", raw))
+    xi, yi, sign, *_ = plot_style("eis")
+    assert np.array_equal(data[:, xi], raw[:, 1])
+    assert np.array_equal(data[:, yi] * sign, -raw[:, 2])
+
+    plot = LiveEchemPlot()
+    qtbot.addWidget(plot)
+    plot.show()
+    plot.set_data("EIS", data)
+    x, y = plot._curve.getData()
+    assert np.array_equal(x, raw[:, 1]) and np.array_equal(y, -raw[:, 2])
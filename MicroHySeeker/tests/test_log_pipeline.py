@@ -0,0 +1,152 @@
+"""Async log pipeline tests."""
+
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.services.log_pipeline import AsyncLogPipeline, RotatingBatchFile
+from src.echem_sdl.services.logger import LoggerService
+
+
+def _logger(pipeline, name):
+    logger = logging.Logger(name, logging.DEBUG)
+    logger.addHandler(pipeline.handler)
+    return logger
+
+
+class _SlowHandler(logging.Handler):
+    def __init__(self, gate):
+        super().__init__()
+        self.gate = gate
+        self.seen = []
+
+    def emit(self, record):
+        self.gate.wait(5)
+        self.seen.append(record.getMessage())
+
+
+def test_slow_sink_does_not_block_caller():
+    """磁盘卡顿时调用方仍立即返回"""
+    gate = threading.Event()
+    pipeline = AsyncLogPipeline()
+    handler = _SlowHandler(gate)
+    pipeline.add_handler(handler)
+    pipeline.start()
+    logger = _logger(pipeline, "slow")
+
+    t0 = time.perf_counter()
+    for k in range(1000):
+        logger.info("cmd %d", k)
+    assert time.perf_counter() - t0 < 0.5
+
+    gate.set()
+    assert pipeline.flush()
+    assert handler.seen[:2] == ["cmd 0", "cmd 1"] and len(handler.seen) == 1000
+    pipeline.stop()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """队列满时丢弃并计数"""
+    pipeline = AsyncLogPipeline(queue_size=10)
+    logger = _logger(pipeline, "drop")   # 未启动监听线程
+    for k in range(15):
+        logger.info("x")
+    assert pipeline.dropped == 5
+
+
+def test_batched_file_and_size_rotation(tmp_path):
+    """批量写文件并按大小轮转"""
+    pipeline = AsyncLogPipeline(batch_size=20)
+    path = tmp_path / "app.log"
+    pipeline.add_file(path, logging.Formatter("%(message)s"), logging.INFO,
+                      max_bytes=1000, backup_count=2)
+    pipeline.start()
+    logger = _logger(pipeline, "file")
+    for k in range(300):
+        logger.info("line %04d", k)
+        logger.debug("hidden")
+    pipeline.stop()
+
+    assert pipeline.batches < 300
+    files = [path, path.with_name("app.log.1"), path.with_name("app.log.2")]
+    assert all(f.exists() for f in files)
+    assert not path.with_name("app.log.3").exists()
+    text = path.read_text(encoding="utf-8")
+    assert "hidden" not in text
+    assert text.rstrip().endswith("line 0299")
+
+
+def test_time_rotation(tmp_path):
+    """按时间轮转"""
+    target = RotatingBatchFile(tmp_path / "t.log", max_bytes=0, rotate_seconds=0.05)
+    target.write("a\n")
+    time.sleep(0.1)
+    target.write("b\n")
+    target.close()
+    assert (tmp_path / "t.log").read_text() == "b\n"
+    assert (tmp_path / "t.log.1").read_text() == "a\n"
+
+
+def test_ui_fanout_is_coalesced():
+    """UI 回调按间隔合并为少量批次"""
+    pipeline = AsyncLogPipeline(ui_interval=0.2)
+    calls = []
+    pipeline.add_ui_callback(calls.append)
+    pipeline.start()
+    logger = _logger(pipeline, "ui")
+    for k in range(50):
+        logger.warning("w%d", k)
+        time.sleep(0.005)
+    pipeline.flush()
+    pipeline.stop()
+
+    assert sum(len(batch) for batch in calls) == 50
+    assert len(calls) <= 5
+
+
+def test_logger_service_async_file(tmp_path):
+    """LoggerService 默认异步写文件"""
+    service = LoggerService(handlers=[logging.NullHandler()])
+    records = []
+    service.bind_ui_callback(records.append)
+    service.add_file_handler(tmp_path / "echem.log")
+    try:
+        service.info("pump %s started")
+        service.error("boom")
+        assert service.flush()
+        text = (tmp_path / "echem.log").read_text(encoding="utf-8")
+        assert "[INFO] echem_sdl - pump %s started" in text
+        assert "[ERROR]" in text
+        assert [r.levelname for r in records] == ["INFO", "ERROR"]
+    finally:
+        service.close()
+
+
+def test_logger_services_share_one_pipeline(tmp_path):
+    """多个 LoggerService 共用一条管线与一个队列处理器，close() 只移除自身的输出"""
+    def listeners():
+        return sum(t.name == "LogPipeline" for t in threading.enumerate())
+
+    first = LoggerService(handlers=[logging.NullHandler()])
+    running = listeners()
+    second = LoggerService(handlers=[logging.NullHandler()])
+    try:
+        assert first.pipeline is second.pipeline
+        assert first.logger.handlers.count(first.pipeline.handler) == 1
+        assert listeners() == running
+
+        first.add_file_handler(tmp_path / "first.log")
+        second.add_file_handler(tmp_path / "second.log")
+        first.info("both")
+        first.close()
+        second.info("second only")
+        assert second.flush()
+        assert (tmp_path / "first.log").read_text(encoding="utf-8").count("\n") == 1
+        assert "second only" in (tmp_path / "second.log").read_text(encoding="utf-8")
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,68 @@
+"""UI log view tests (ring buffer, archive index, virtualised model)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.log_buffer import ERROR, WARNING, LogArchive, LogEntry, LogRing
+
+
+def _entry(seq, kind="info", text=None):
+    return LogEntry(seq, "12:00:00", kind, text if text is not None else f"line {seq}")
+
+
+def test_ring_keeps_latest_and_filters():
+    """超出容量后只保留最近条目，按级别与文本筛选"""
+    ring = LogRing(100)
+    for k in range(1, 1001):
+        ring.append(_entry(k, "error" if k % 50 == 0 else "info", f"[Mock] 进度 {k}"))
+    assert len(ring) == 100 and ring.total == 1000
+    assert [e.seq for e in ring][0] == 901
+    assert [e.seq for e in ring.filtered(ERROR)] == [950, 1000]
+    assert [e.seq for e in ring.filtered(text="进度 99")] == [990, 991, 992, 993, 994,
+                                                             995, 996, 997, 998, 999]
+
+
+def test_archive_search_uses_level_index(tmp_path):
+    """归档检索: 级别位图跳过无关块，转义往返，限制条数"""
+    archive = LogArchive(tmp_path / "ui.log", stride=100)
+    for k in range(1, 10_001):
+        kind = "warning" if k == 4321 else "info"
+        archive.append(_entry(k, kind, f"pump {k % 12}\tok" if k != 77 else "multi\nline"))
+    assert archive.block_count == 100
+
+    warnings = archive.search(min_level=WARNING)
+    assert [e.seq for e in warnings] == [4321]
+    assert warnings[0].text == "pump 1\tok"
+
+    assert [e.text for e in archive.search("MULTI")] == ["multi\nline"]
+    latest = archive.search("pump 3\t", limit=5)
+    assert [e.seq for e in latest] == [9951, 9963, 9975, 9987, 9999]
+    assert [e.seq for e in archive.search("pump 3\t", limit=2, before_seq=100)] == [87, 99]
+    archive.close()
+
+
+def test_log_view_bounded_and_history(qtbot, tmp_path):
+    """视图行数受容量限制，历史搜索可找到已丢弃的日志"""
+    from src.ui.widgets.log_view import LogView
+
+    view = LogView(capacity=50, archive_path=tmp_path / "ui.log")
+    qtbot.addWidget(view)
+    for k in range(500):
+        view.append(f"[Mock] 进度 {k}", "error" if k == 3 else "info")
+    view.refresh()
+    assert view.model.rowCount() == 50
+    assert view.model.entry(49).text == "[Mock] 进度 499"
+
+    view.level_combo.setCurrentIndex(2)   # 仅错误
+    assert view.model.rowCount() == 0     # 已被环形缓冲丢弃
+
+    with qtbot.waitSignal(view.search_finished, timeout=5000) as blocker:
+        view.search_history()
+    assert blocker.args == [1] and view.in_history
+    assert view.model.entry(0).text == "[Mock] 进度 3"
+
+    view.btn_live.click()
+    assert not view.in_history
+    view.close_archive()
@@ -0,0 +1,106 @@
+"""Parameter accessor tests."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.param_access import ComboApplier, compile_path, parse_combo_key
+from src.echem_sdl.core.exp_program import ExpProgram, ComboParameter
+from src.echem_sdl.core.prog_step import ProgStepFactory
+
+
+def test_compile_path_cached(combo_experiment):
+    """同一路径只编译一次"""
+    assert compile_path("steps[0].ec_settings.scan_rate") is compile_path("steps[0].ec_settings.scan_rate")
+
+    exp = combo_experiment
+    accessor = compile_path("steps[0].prep_sol_params.target_concentrations[CuSO4]")
+    assert accessor.get(exp) == 0.1
+    accessor.set(exp, 0.5)
+    assert exp.steps[0].prep_sol_params.target_concentrations["CuSO4"] == 0.5
+
+    # 兼容以 "." 访问字典键
+    assert compile_path("steps.0.prep_sol_params.target_concentrations.CuSO4").get(exp) == 0.5
+
+
+def test_replace_copies_path_only(combo_experiment):
+    """写时复制只拷贝路径上的对象"""
+    step = combo_experiment.steps[0]
+    accessor = compile_path("prep_sol_params.target_concentrations[CuSO4]")
+    new = accessor.replace(step, 0.3)
+    assert step.prep_sol_params.target_concentrations["CuSO4"] == 0.1
+    assert new.prep_sol_params.target_concentrations["CuSO4"] == 0.3
+    assert new.prep_sol_params.injection_order is step.prep_sol_params.injection_order
+
+
+def test_parse_combo_key():
+    """两种组合键格式"""
+    assert parse_combo_key("3:扫描速率") == (2, None, "扫描速率")
+    assert parse_combo_key("1:CuSO4/浓度(M)") == (0, "CuSO4", "浓度(M)")
+    assert parse_combo_key("step_2_扫速(V/s)") == (2, None, "扫速(V/s)")
+    assert parse_combo_key("step_0_Cu_SO4_浓度(M)") == (0, "Cu_SO4", "浓度(M)")
+    assert parse_combo_key("bogus") is None
+
+
+def test_combo_applier(combo_experiment):
+    """组合键 → 类型化字段赋值"""
+    base = combo_experiment
+    combos = [
+        {"step_0_CuSO4_浓度(M)": 0.2, "step_0_配液_总体积(mL)": 2.5,
+         "step_1_循环次数": 3.0, "3:扫描速率": 0.05, "step_9_E0(V)": 1.0},
+    ]
+    applier = ComboApplier(base, list(combos[0]))
+    assert applier.unknown_keys == ["step_9_E0(V)"]
+
+    applier.apply(base, combos[0])
+    assert base.steps[0].prep_sol_params.target_concentrations["CuSO4"] == 0.2
+    assert base.steps[0].prep_sol_params.total_volume_ul == 2500.0
+    assert base.steps[1].flush_cycles == 3 and isinstance(base.steps[1].flush_cycles, int)
+    assert base.steps[2].ec_settings.scan_rate == 0.05
+
+    columns = applier.columns(combos)
+    assert columns[(0, "prep_sol_params.total_volume_ul")] == [2500.0]
+    assert columns[(2, "ec_settings.scan_rate")] == [0.05]
+
+
+def test_exp_program_paths():
+    """ExpProgram 组合参数经由预编译路径写入"""
+    program = ExpProgram(name="p")
+    program.add_step(ProgStepFactory.create_cv())
+    program.add_combo_param(ComboParameter(
+        name="scan", target_path="steps[0].ec_config.scan_rate", values=[0.01, 0.02]))
+    program.fill_param_matrix()
+    assert program.load_param_values(1)
+    assert program.steps[0].ec_config.scan_rate == 0.02
+    program.restore_original_values()
+    assert program.steps[0].ec_config.scan_rate == 0.1
+
+
+def test_combo_editor_only_emits_swept_params(qtbot, combo_experiment):
+    """组合编辑器只输出被扫描的参数，未扫描参数保持程序原值"""
+    from src.dialogs.combo_exp_editor import ComboExpEditorDialog
+    from src.models import DilutionChannel, SystemConfig
+
+    base = combo_experiment
+    base.steps[2].ec_settings.scan_rate = 0.005
+    base.steps[2].ec_settings.quiet_time_s = 0.0
+    config = SystemConfig()
+    config.dilution_channels = [DilutionChannel("1", "CuSO4", 1.0, 1)]
+
+    dialog = ComboExpEditorDialog(base, config)
+    qtbot.addWidget(dialog)
+    row = next(r for r in dialog.param_rows
+               if r['step_index'] == 1 and r['param_name'] == "循环次数")
+    row['end_spin'].setValue(3)
+    row['interval_spin'].setValue(1)
+
+    combos = dialog._generate_combo_params()
+    assert [set(c) for c in combos] == [{"step_1_循环次数"}] * 3
+
+    applier = ComboApplier(base, list(combos[0]))
+    variant = applier.variant(base, combos[2]).materialize()
+    assert variant.steps[1].flush_cycles == 3
+    assert variant.steps[0].prep_sol_params.target_concentrations["CuSO4"] == 0.1
+    assert variant.steps[2].ec_settings.scan_rate == 0.005
+    assert variant.steps[2].ec_settings.quiet_time_s == 0.0
@@ -0,0 +1,131 @@
+"""Precheck engine tests."""
+
+import copy
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models import (
+    Experiment, ProgStep, ProgramStepType, PrepSolStep, ECSettings, ECTechnique,
+    SystemConfig, DilutionChannel,
+)
+from src.core.precheck import PrecheckEngine
+from src.core.step_validator import StepValidator
+
+
+def _config() -> SystemConfig:
+    config = SystemConfig()
+    config.dilution_channels = [
+        DilutionChannel("c1", "CuSO4", 1.0, pump_address=1),
+        DilutionChannel("c2", "NaCl", 2.0, pump_address=2),
+    ]
+    config.calibration_data = {1: {"ul_per_sec": 10.0}}
+    return config
+
+
+def _experiment() -> Experiment:
+    prep = PrepSolStep(
+        injection_order=["CuSO4", "NaCl"],
+        total_volume_ul=1000.0,
+        target_concentrations={"CuSO4": 0.1, "NaCl": 0.2},
+        selected_solutions={"CuSO4": True, "NaCl": True},
+    )
+    ec = ECSettings(technique=ECTechnique.CV, e0=0.0, eh=0.5, el=-0.5, scan_rate=0.1)
+    return Experiment("e1", "precheck", steps=[
+        ProgStep("s1", ProgramStepType.PREP_SOL, prep_sol_params=prep),
+        ProgStep("s2", ProgramStepType.TRANSFER, pump_address=3, transfer_duration=5.0),
+        ProgStep("s3", ProgramStepType.ECHEM, ec_settings=ec),
+    ])
+
+
+def test_messages():
+    """错误消息带步骤序号"""
+    engine = PrecheckEngine()
+    errors = engine.check_experiment(_experiment(), _config())
+    assert errors == ["步骤 1 [配液]: 泵 2 (NaCl) 未校准流速。"
+                      "请先在配置中完成泵流速校准，否则无法准确控制注液量"]
+
+    assert engine.check_experiment(Experiment("e", "empty"), _config()) == ["实验没有任何步骤"]
+    errors = engine.check_experiment(_experiment(), _config(), rs485_connected=False)
+    assert errors[0].startswith("RS485 端口未连接")
+
+
+def test_incremental_cache():
+    """只重新检查变化的步骤"""
+    engine = PrecheckEngine()
+    exp = _experiment()
+    config = _config()
+    engine.check_experiment(exp, config)
+    assert (engine.hits, engine.misses) == (0, 3)
+
+    exp.steps[2].ec_settings.scan_rate = 0
+    errors = engine.check_experiment(exp, config)
+    assert (engine.hits, engine.misses) == (2, 4)
+    assert "步骤 3 [电化学 CV]: 扫描速率必须大于 0" in errors
+
+    # 配置版本变化 → 全部重新检查
+    config.calibration_data[2] = {"ul_per_sec": 5.0}
+    assert engine.check_experiment(exp, config) == ["步骤 3 [电化学 CV]: 扫描速率必须大于 0"]
+    assert engine.misses == 7
+
+
+def test_combos_match_per_variant_check():
+    """向量化组合检查与逐组合检查结果一致"""
+    config = _config()
+    config.calibration_data[2] = {"ul_per_sec": 5.0}
+    base = _experiment()
+    columns = {
+        (0, "prep_sol_params.target_concentrations[CuSO4]"): [0.1, 1.5, 0.95, 0.1],
+        (0, "prep_sol_params.total_volume_ul"): [1000.0, 1000.0, 1000.0, 0.0],
+        (1, "transfer_duration"): [5.0, 5.0, 0.0, 5.0],
+        (2, "ec_settings.eh"): [0.5, -0.5, 0.5, 0.5],
+    }
+    failures = PrecheckEngine().check_combos(base, config, columns)
+
+    reference = PrecheckEngine()
+    for combo in range(4):
+        variant = copy.deepcopy(base)
+        variant.steps[0].prep_sol_params.target_concentrations["CuSO4"] = \
+            columns[(0, "prep_sol_params.target_concentrations[CuSO4]")][combo]
+        variant.steps[0].prep_sol_params.total_volume_ul = \
+            columns[(0, "prep_sol_params.total_volume_ul")][combo]
+        variant.steps[1].transfer_duration = columns[(1, "transfer_duration")][combo]
+        variant.steps[2].ec_settings.eh = columns[(2, "ec_settings.eh")][combo]
+        expected = reference.check_experiment(variant, config)
+        assert sorted(failures.get(combo, [])) == sorted(expected)
+
+    assert 0 not in failures
+    assert any("溶质总体积" in e for e in failures[2])
+
+
+def test_large_campaign():
+    """大规模组合一次完成"""
+    config = _config()
+    config.calibration_data[2] = {"ul_per_sec": 5.0}
+    n = 20000
+    rates = [0.01 * (i % 100) for i in range(n)]
+    failures = PrecheckEngine().check_combos(_experiment(), config, {(2, "ec_settings.scan_rate"): rates})
+    assert len(failures) == n // 100
+    assert all(i % 100 == 0 for i in failures)
+
+
+def test_step_validator_cache(monkeypatch):
+    """步骤验证缓存有上限；配置版本只在设置配置时计算"""
+    config = _config()
+    validator = StepValidator(config, max_entries=2)
+    calls = []
+    original = SystemConfig.to_dict
+    monkeypatch.setattr(SystemConfig, "to_dict", lambda self: calls.append(1) or original(self))
+
+    steps = _experiment().steps
+    validator.validate_experiment(steps)
+    assert validator.validate_step(steps[0]).is_valid
+    for step in steps:
+        validator.validate_step(step)
+    assert calls == [] and len(validator._cache) == 2
+
+    config.dilution_channels[0].stock_concentration = 0.05
+    validator.set_config(config)
+    assert len(calls) == 1
+    assert not validator.validate_step(steps[0]).is_valid
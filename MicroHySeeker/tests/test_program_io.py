@@ -0,0 +1,119 @@
+"""Program/config serialization tests (cached schemas, snapshots, atomic saves)."""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.core.exp_program import ComboParameter, ExpProgram
+from src.echem_sdl.core.prog_step import ProgStepFactory
+from src.models import (
+    ECSettings, Experiment, PrepSolStep, ProgStep, ProgramStepType, PumpConfig, SystemConfig,
+)
+from src.echem_sdl.utils.serialization import atomic_write, is_snapshot
+
+
+def _experiment(n):
+    kinds = [ProgramStepType.TRANSFER, ProgramStepType.ECHEM, ProgramStepType.PREP_SOL]
+    steps = []
+    for i in range(n):
+        step = ProgStep(step_id=f"s{i}", step_type=kinds[i % 3], pump_address=2,
+                        transfer_duration=3.0)
+        if step.step_type == ProgramStepType.ECHEM:
+            step.ec_settings = ECSettings(e0=0.1, eh=0.8, el=-0.2, scan_rate=0.1)
+        elif step.step_type == ProgramStepType.PREP_SOL:
+            step.prep_sol_params = PrepSolStep(
+                injection_order=["A", "B"], target_concentrations={"A": 0.1, "B": 0.2},
+                selected_solutions={"A": True, "B": True})
+        steps.append(step)
+    return Experiment(exp_id="e1", exp_name="大程序", steps=steps)
+
+
+def test_experiment_json_matches_to_dict_and_round_trips():
+    """快速序列化与 to_dict 一致，往返不变"""
+    exp = _experiment(30)
+    text = exp.to_json_str()
+    assert json.loads(text) == exp.to_dict()
+    assert "大程序" in text
+    assert Experiment.from_json_str(text) == exp
+    assert Experiment.from_json_str(text.encode("utf-8")) == exp
+
+
+def test_legacy_fields_use_compat_path():
+    """旧字段名与不符合模式的数据回退到 from_dict"""
+    legacy = json.dumps({"exp_id": "a", "exp_name": "b", "steps": [
+        {"step_id": "s", "step_type": "echem",
+         "ec_settings": {"technique": "CV", "sample_interval": 5}}]})
+    assert Experiment.from_json_str(legacy).steps[0].ec_settings.sample_interval_ms == 5
+
+    program = ExpProgram.from_json(json.dumps({"name": "x", "steps": [{"step_type": "weird"}]}))
+    assert program.steps[0].step_type.value == "blank"
+
+
+def test_system_config_round_trip(tmp_path):
+    """配置: 整数键校准数据往返，原子保存"""
+    config = SystemConfig(rs485_port="COM7", calibration_data={3: {"ul_per_count": 0.01}})
+    config.pumps = [PumpConfig(address=1, name="P1")]
+    path = tmp_path / "system.json"
+    config.save_to_file(str(path))
+    assert json.loads(path.read_text(encoding="utf-8")) == config.to_dict()
+    assert SystemConfig.load_from_file(str(path)) == config
+
+
+def test_system_config_optional_keys():
+    """可选功能开关可从配置文件读取"""
+    config = SystemConfig.from_json_str(json.dumps({"chi_screen_capture": True,
+                                                    "chi_batch_macros": False,
+                                                    "result_store_dir": "",
+                                                    "telemetry_path": "",
+                                                    "ui_log_dir": "",
+                                                    "ui_log_capacity": 500}))
+    assert config.chi_screen_capture is True
+    assert config.chi_batch_macros is False
+    assert config.result_store_dir == ""
+    assert config.telemetry_path == ""
+    assert config.ui_log_dir == "" and config.ui_log_capacity == 500
+    assert SystemConfig().chi_screen_capture is False
+    assert SystemConfig().result_store_dir == "campaign"
+
+
+def test_large_program_json_and_snapshot_are_fast(tmp_path):
+    """1 万步 / 1 万组合程序: JSON 与快照往返快速且一致"""
+    program = ExpProgram(name="big")
+    for i in range(10_000):
+        program.add_step(ProgStepFactory.create_cv(f"cv{i}") if i % 2
+                         else ProgStepFactory.create_blank(f"b{i}", 1.0))
+    program.add_combo_param(ComboParameter("rate", "steps[1].ec_config.scan_rate",
+                                           [0.01 * k for k in range(1, 101)]))
+    program.add_combo_param(ComboParameter("eh", "steps[1].ec_config.e_high",
+                                           [0.5 + 0.01 * k for k in range(100)]))
+    expected = program.to_dict()
+
+    t0 = time.perf_counter()
+    text = program.to_json()
+    loaded = ExpProgram.from_json(text)
+    assert time.perf_counter() - t0 < 1.0
+    assert loaded.to_dict() == expected
+    assert loaded.combo_count == 10_000
+
+    path = tmp_path / "big.mhsnap"
+    assert program.save(path)
+    data = path.read_bytes()
+    assert is_snapshot(data) and len(data) * 20 < len(text)
+    assert ExpProgram.load(path).to_dict() == program.to_dict()
+
+
+def test_atomic_write_skips_unchanged(tmp_path):
+    """内容未变时跳过写入，不留临时文件"""
+    path = tmp_path / "last_experiment.json"
+    exp = _experiment(3)
+    assert exp.save(path)
+    assert not exp.save(path)
+    exp.exp_name = "changed"
+    assert exp.save(path)
+    assert Experiment.load(path).exp_name == "changed"
+
+    assert atomic_write(path, b"{}") and path.read_bytes() == b"{}"
+    assert [p.name for p in tmp_path.iterdir()] == ["last_experiment.json"]
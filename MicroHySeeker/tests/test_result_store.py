@@ -0,0 +1,256 @@
+"""Campaign result store tests."""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.core.experiment_engine import ExperimentResult
+from src.echem_sdl.core.echem_features import attach_features
+from src.echem_sdl.hardware.chi import ECDataSet
+from src.echem_sdl.services.result_store import CampaignStore
+
+
+def _result(k, scan_rate, acid):
+    n = 200 + k
+    data_set = ECDataSet.from_arrays(np.arange(n) * 0.01, np.linspace(-0.2, 0.8, n),
+                                     np.full(n, 1e-6 * (k + 1)), technique="CV")
+    data_set.metadata = {"params": {"scan_rate": scan_rate}}
+    attach_features(data_set)
+    start = datetime(2026, 1, 1) + timedelta(minutes=k)
+    return ExperimentResult(
+        experiment_name=f"exp{k}", program_name="p", combo_index=k,
+        start_time=start, end_time=start + timedelta(seconds=90),
+        combo_params={"H2SO4": acid, "label": f"c{k}"},
+        step_results=[{"index": 0, "name": "cv", "type": "echem", "success": True, "duration": 12.5}],
+        ec_data_sets=[data_set],
+        telemetry={"pump1_flow": np.arange(10.0)},
+        success=True,
+    )
+
+
+def test_append_query_and_mmap_read(tmp_path):
+    """参数 / 特征过滤只查索引；数组以 memmap 读取"""
+    store = CampaignStore(tmp_path / "campaign")
+    acids = [0.1, 0.6, 1.0]
+    for k in range(30):
+        store.append_run(_result(k, 0.1 if k % 2 else 0.05, acids[k % 3]))
+    assert store.run_count() == 30
+
+    hits = store.query_echem("CV", {"scan_rate": 0.1, "H2SO4": (">", 0.5)})
+    expected = [k for k in range(30) if k % 2 and acids[k % 3] > 0.5]
+    assert [r.run_id - 1 for r in hits] == expected
+
+    # 特征与文本参数同样可查
+    hits = store.query_echem(where={"anodic_peak_current": (">=", 25e-6), "label": "c27"})
+    assert [r.run_id for r in hits] == [28]
+    record = hits[0]
+    assert record.features["n_points"] == 227
+
+    data = store.load_array(record.array_id)
+    assert isinstance(data, np.memmap) and data.shape == (227, 3)
+    assert np.allclose(data[:, 2], 28e-6)
+
+    assert store.run_params(record.run_id)["H2SO4"] == 0.1
+    assert store.step_timings(record.run_id)[0]["duration"] == 12.5
+    assert np.array_equal(store.telemetry(record.run_id)["pump1_flow"][:, 0], np.arange(10.0))
+    store.close()
+
+    # 重新打开后数据仍在
+    with CampaignStore(tmp_path / "campaign") as reopened:
+        assert reopened.run_count() == 30
+        assert len(reopened.query_echem("CV")) == 30
+
+
+def test_paging_columns_and_aggregation(tmp_path):
+    """分页、列式取数与库内聚合"""
+    store = CampaignStore(tmp_path / "campaign")
+    acids = [0.1, 0.6, 1.0]
+    for k in range(30):
+        store.append_run(_result(k, 0.1 if k % 2 else 0.05, acids[k % 3]))
+
+    page = store.page_echem("CV", {"H2SO4": 0.6}, limit=4)
+    assert page.total == 10 and [r.run_id for r in page.items] == [2, 5, 8, 11]
+    page = store.page_echem("CV", {"H2SO4": 0.6}, limit=4, offset=8)
+    assert len(page.items) == 2 and page.next_offset is None
+
+    runs = store.page_runs({"label": "c3"})
+    assert runs.total == 1 and runs.items[0]["params"]["H2SO4"] == 0.1
+    runs = store.page_runs({"combo_index": (">=", 25)}, limit=2)
+    assert runs.total == 5 and runs.next_offset == 2 and runs.items[0]["success"] is True
+
+    cols = store.echem_columns(["run_id", "H2SO4", "scan_rate", "anodic_peak_current", "label", "missing"],
+                               "CV", {"success": True})
+    assert cols["run_id"].dtype == np.float64 and len(cols["run_id"]) == 30
+    assert np.allclose(cols["H2SO4"], [acids[k % 3] for k in range(30)])
+    assert np.allclose(cols["anodic_peak_current"], [1e-6 * (k + 1) for k in range(30)])
+    assert cols["label"][3] == "c3" and np.isnan(cols["missing"]).all()
+
+    agg = store.aggregate_echem("anodic_peak_current", "H2SO4", "CV")
+    assert [a["H2SO4"] for a in agg] == acids
+    for a, acid_k in zip(agg, range(3)):
+        currents = [1e-6 * (k + 1) for k in range(30) if k % 3 == acid_k]
+        assert a["count"] == 10
+        assert np.isclose(a["mean"], np.mean(currents)) and np.isclose(a["max"], max(currents))
+        assert np.isclose(a["std"], np.std(currents), rtol=1e-4)
+
+    agg = store.aggregate_echem("anodic_peak_current", ["scan_rate", "H2SO4"], "CV",
+                                {"combo_index": ("<", 12)})
+    assert sum(a["count"] for a in agg) == 12 and len(agg) == 6
+    store.close()
+
+
+def test_runner_worker_appends_run(tmp_path, fake_rs485, transfer_blank_experiment):
+    """界面运行路径: Worker 运行结束时带步骤时间线遥测入库"""
+    from src.engine.runner import ExperimentWorker
+
+    store = CampaignStore(tmp_path / "campaign")
+    worker = ExperimentWorker(transfer_blank_experiment, fake_rs485, None, None, store,
+                              combo_index=3, combo_params={"H2SO4": 0.5})
+    worker.run()
+
+    assert store.run_count() == 1
+    assert store.run_params(1) == {"H2SO4": 0.5}
+    assert [s["type"] for s in store.step_timings(1)] == ["transfer", "blank"]
+    timeline = store.telemetry(1)["step_timeline"]
+    assert timeline.shape == (2, 4)
+    assert list(timeline[:, 0]) == [0, 1] and np.all(timeline[:, 3] == 1)
+    assert timeline[1, 1] >= timeline[0, 1] + timeline[0, 2]
+    store.close()
+
+
+def test_engine_saves_with_step_timeline(tmp_path):
+    """引擎保存结果前填写步骤时间线遥测"""
+    from src.echem_sdl.core.experiment_engine import ExperimentEngine
+
+    store = CampaignStore(tmp_path / "campaign")
+    engine = ExperimentEngine()
+    engine.set_result_store(store)
+    result = _result(0, 0.1, 0.5)
+    result.telemetry = {}
+    result.step_results[0]["start"] = 1.5
+    engine._save_result(result)
+    engine.shutdown()
+
+    timeline = store.telemetry(1)["step_timeline"]
+    assert timeline.tolist() == [[0.0, 1.5, 12.5, 1.0]]
+    store.close()
+
+
+class _FakeBridge:
+    """按 CHI 控制器格式返回原始数据行 (CV/LSV: 电位, 电流) 的假 CHIBridge"""
+
+    def __init__(self, rows, delays=()):
+        self.rows = rows
+        self.delays = delays
+
+    def _result(self):
+        from src.echem_sdl.hardware.chi660f_gui_controller import ExperimentResult as ChiResult
+        return ChiResult(success=True, data_points=self.rows, headers=["Potential/V", "Current/A"])
+
+    def run(self, ec, on_data=None):
+        return self._result()
+
+    def run_batch(self, ec_list, on_data=None, on_item=None):
+        results = []
+        for k, _ in enumerate(ec_list):
+            if on_item is not None:
+                on_item(k, None)
+            time.sleep(self.delays[k] if k < len(self.delays) else 0.0)
+            results.append(self._result())
+            if on_item is not None:
+                on_item(k, results[-1])
+        return results
+
+
+def _run_echem_steps(tmp_path, monkeypatch, rs485, settings, rows, delays=(), events=None):
+    """经假 CHIBridge 运行若干电化学步骤，返回 (结果库, 发出的数据集)
+
+    events 给出时记录步骤开始/结束信号 ("start"/"end", 步骤序号)。
+    """
+    from src.echem_sdl.hardware import chi_echem_bridge
+    from src.engine.runner import ExperimentWorker
+    from src.models import Experiment, ProgStep, ProgramStepType, SystemConfig
+
+    monkeypatch.setattr(chi_echem_bridge, "acquire_bridge", lambda config: _FakeBridge(rows, delays))
+    monkeypatch.setattr(chi_echem_bridge, "release_bridge", lambda bridge, healthy=True: None)
+    config = SystemConfig()
+    config.chi_output_dir = str(tmp_path / "chi")
+    experiment = Experiment(exp_id="e1", exp_name="t", steps=[
+        ProgStep(step_id=f"s{k}", step_type=ProgramStepType.ECHEM, ec_settings=ec)
+        for k, ec in enumerate(settings)
+    ])
+    emitted = []
+    store = CampaignStore(tmp_path / "campaign")
+    worker = ExperimentWorker(experiment, rs485, config, None, store)
+    worker.echem_result.connect(lambda tech, data, headers: emitted.append(data))
+    if events is not None:
+        worker.step_started.connect(lambda k, name: events.append(("start", k)))
+        worker.step_finished.connect(lambda k, name, ok: events.append(("end", k)))
+    worker.run()
+    return store, emitted
+
+
+def _cv_rows():
+    e = np.linspace(-0.2, 0.8, 50)
+    return e, [[float(x), 1e-5 * float(x)] for x in e]
+
+
+def test_controller_rows_are_stored_as_data_sets(tmp_path, monkeypatch, fake_rs485):
+    """CHI 控制器返回原始数据行: 转为 (t, E, I) 数据集后入库，可按技术与参数查询"""
+    from src.models import ECSettings, ECTechnique
+
+    e, rows = _cv_rows()
+    ec = ECSettings(technique=ECTechnique.CV, e0=0.0, eh=0.8, el=-0.2, scan_rate=0.1)
+    store, emitted = _run_echem_steps(tmp_path, monkeypatch, fake_rs485, [ec], rows)
+
+    hits = store.query_echem("CV", {"scan_rate": 0.1})
+    assert len(hits) == 1 and hits[0].rows == 50
+    data = store.load_array(hits[0].array_id)
+    assert data.shape == (50, 3)
+    assert np.allclose(data[:, 1], e) and np.allclose(data[:, 2], 1e-5 * e)
+    assert emitted[0].as_array().shape == (50, 3)
+    store.close()
+
+
+def test_every_batched_result_carries_features(tmp_path, monkeypatch, fake_rs485):
+    """批量执行的每个测量都按自身技术带上特征"""
+    from src.models import ECSettings, ECTechnique
+
+    e, rows = _cv_rows()
+    settings = [ECSettings(technique=ECTechnique.CV, eh=0.8, el=-0.2, scan_rate=0.05),
+                ECSettings(technique=ECTechnique.LSV, eh=0.8, el=-0.2, scan_rate=0.1)]
+    store, emitted = _run_echem_steps(tmp_path, monkeypatch, fake_rs485, settings, rows)
+
+    assert [d.technique for d in emitted] == ["CV", "LSV"]
+    cv, lsv = (d.metadata["features"] for d in emitted)
+    assert cv["n_points"] == lsv["n_points"] == 50
+    assert "cathodic_peak_current" in cv and "cathodic_peak_current" not in lsv
+    assert lsv["anodic_peak_potential"] == pytest.approx(0.8)
+    hits = store.query_echem(where={"anodic_peak_current": (">", 0)})
+    assert [h.technique for h in hits] == ["CV", "LSV"]
+    store.close()
+
+
+def test_batched_steps_report_their_own_timings(tmp_path, monkeypatch, fake_rs485):
+    """批量宏内各测量逐个发出开始/结束信号，步骤耗时为各自实测值"""
+    from src.models import ECSettings, ECTechnique
+
+    _, rows = _cv_rows()
+    settings = [ECSettings(technique=ECTechnique.CV, scan_rate=0.05),
+                ECSettings(technique=ECTechnique.CV, scan_rate=0.1)]
+    events = []
+    store, emitted = _run_echem_steps(tmp_path, monkeypatch, fake_rs485, settings, rows,
+                                      delays=(0.02, 0.3), events=events)
+
+    assert events == [("start", 0), ("end", 0), ("start", 1), ("end", 1)]
+    timeline = store.telemetry(1)["step_timeline"]
+    assert np.all(timeline[:, 3] == 1)
+    assert timeline[0, 2] < 0.2 <= timeline[1, 2]
+    assert timeline[1, 1] >= timeline[0, 1] + timeline[0, 2]
+    store.close()
@@ -0,0 +1,102 @@
+"""Telemetry recorder and analyser tests."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.echem_sdl.services.telemetry import (
+    TelemetryRecorder,
+    analyse_telemetry,
+    format_report,
+    read_events,
+)
+from src.engine.runner import ExperimentWorker
+
+
+def test_recorder_writes_compact_jsonl(tmp_path):
+    """紧凑 JSONL，单调时间戳"""
+    path = tmp_path / "telemetry.jsonl"
+    recorder = TelemetryRecorder(path)
+    recorder.emit("pump_cmd", pump=3, cmd="start", ok=True, rtt=0.012)
+    with recorder.span("chi_phase", phase="measure", technique="CV") as tel:
+        tel["ok"] = True
+    recorder.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert all(": " not in line and ", " not in line for line in lines)
+    events = [json.loads(line) for line in lines]
+    assert [e["ev"] for e in events] == ["session", "pump_cmd", "chi_phase"]
+    assert "wall" in events[0]
+    assert events[1]["t"] <= events[2]["t"]
+    assert events[2]["ok"] is True and events[2]["dur"] >= 0
+
+
+def _events():
+    return [
+        {"t": 100.0, "ev": "session", "wall": 1.7e9},
+        {"t": 100.0, "ev": "run_start", "steps": 3},
+        {"t": 100.0, "ev": "step_start", "step": 0, "type": "prep_sol"},
+        {"t": 100.1, "ev": "pump_cmd", "pump": 1, "cmd": "position", "ok": True,
+         "rtt": 0.02, "est_s": 8.0},
+        {"t": 100.2, "ev": "pump_cmd", "pump": 2, "cmd": "start", "ok": True, "rtt": 0.04},
+        {"t": 110.0, "ev": "batch", "pumps": [1, 2], "volumes_ul": [400.0, 600.0], "dur": 9.9},
+        {"t": 110.2, "ev": "pump_cmd", "pump": 2, "cmd": "stop", "ok": True, "rtt": 0.02},
+        {"t": 110.5, "ev": "step_end", "step": 0, "type": "prep_sol", "ok": True, "dur": 10.5},
+        # 20 s 空闲
+        {"t": 150.0, "ev": "step_end", "step": 1, "type": "echem", "ok": True, "dur": 19.5},
+        {"t": 150.0, "ev": "chi_phase", "phase": "measure", "dur": 18.0},
+        {"t": 150.1, "ev": "pump_cmd", "pump": 2, "cmd": "start", "ok": False, "rtt": 0.5},
+        {"t": 160.0, "ev": "step_end", "step": 2, "type": "blank", "ok": True, "dur": 10.0},
+        {"t": 160.0, "ev": "run_end", "ok": True, "dur": 60.0},
+    ]
+
+
+def test_analyser_utilisation_gaps_and_pumps():
+    """利用率、空闲间隙与各泵吞吐"""
+    report = analyse_telemetry(_events(), idle_threshold=1.0)
+    assert report.runs == 1 and report.steps == 3
+    assert abs(report.span_s - 60.0) < 1e-9
+    assert abs(report.busy_s - 40.0) < 1e-9
+    assert abs(report.utilisation - 40.0 / 60.0) < 1e-9
+    assert report.idle_gaps == [(110.5, 130.5)]
+    assert report.step_time["echem"] == 19.5
+    assert report.chi_time["measure"] == 18.0
+
+    pump1, pump2 = report.pumps[1], report.pumps[2]
+    assert pump1.run_s == 8.0 and pump1.volume_ul == 400.0
+    assert abs(pump2.run_s - 10.0) < 1e-9
+    assert pump2.commands == 3 and pump2.failures == 1
+    assert abs(pump2.rtt_max - 0.5) < 1e-9
+    assert abs(report.throughput_ul_per_h(2) - 600.0 * 60) < 1e-6
+    assert "utilisation 66.7%" in format_report(report)
+
+
+def test_analyser_rebases_sessions_on_wall_clock():
+    """多个会话拼接: 各会话时间按 wall 锚点换算到同一时间轴"""
+    later = [{"t": 5.0, "ev": "session", "wall": 1.7e9 + 100.0},
+             {"t": 5.0, "ev": "run_start", "steps": 1},
+             {"t": 15.0, "ev": "step_end", "step": 0, "type": "blank", "ok": True, "dur": 10.0}]
+    report = analyse_telemetry(_events() + later, idle_threshold=1.0)
+    assert report.runs == 2 and report.steps == 4
+    assert abs(report.span_s - 110.0) < 1e-9
+    assert abs(report.busy_s - 50.0) < 1e-9
+    assert report.idle_gaps == [(110.5, 130.5), (160.0, 200.0)]
+
+
+def test_worker_emits_step_events(tmp_path, fake_rs485, transfer_blank_experiment):
+    """Worker 输出运行与步骤事件"""
+    path = tmp_path / "telemetry.jsonl"
+    recorder = TelemetryRecorder(path)
+    worker = ExperimentWorker(transfer_blank_experiment, fake_rs485, None, recorder)
+    worker.run()
+    recorder.close()
+
+    events = list(read_events(path))
+    kinds = [e["ev"] for e in events]
+    assert kinds == ["session", "run_start", "step_start", "step_end",
+                     "step_start", "step_end", "run_end"]
+    assert events[3]["type"] == "transfer" and events[3]["ok"] is True
+    report = analyse_telemetry(events)
+    assert report.steps == 2 and 0 < report.utilisation <= 1.0